@@ -0,0 +1,117 @@
+"""
+Бенчмарк профилей Celery для частых периодических задач.
+
+Запускает встроенный worker (брокер и backend в памяти) и прогоняет
+поток I/O-задач, похожих на check_reminders: каждая ждет ответа
+"внешнего сервиса" на общем event loop через tasks._run_async.
+
+Сравниваются:
+    legacy  — прежние настройки: 2 слота, prefetch 4, результат каждого запуска сохраняется
+    prefork — профиль "prefork" из celery_app (слоты как у legacy, без результатов)
+    io      — профиль "io" из celery_app: пул потоков, prefetch 1, late ack, без результатов
+
+Prefork-процессы не работают с брокером в памяти, поэтому слоты
+prefork-профилей эмулируются пулом потоков той же ширины.
+
+Брокер в памяти замирает примерно на секунду каждый раз, когда окно
+prefetch заполнено, поэтому с ним prefetch не ограничивается и
+сравниваются только ширина пула и хранение результатов. Чтобы учесть
+prefetch и late ack, укажите настоящий брокер в BENCH_BROKER_URL.
+
+Использование:
+    python -m benchmarks.bench_celery [количество_задач] [задержка_мс]
+    BENCH_BROKER_URL=redis://localhost:6379/15 python -m benchmarks.bench_celery
+"""
+
+import asyncio
+import os
+import sys
+import threading
+import time
+
+os.environ.setdefault("BOT_TOKEN", "123456:benchmark")
+# Без Redis агрегатор статистики только добавлял бы ошибки подключения
+os.environ["CELERY_STATS_ENABLED"] = "false"
+
+from celery import Celery
+from celery.contrib.testing.worker import start_worker
+
+from celery_app import WORKER_PROFILES
+from tasks import _run_async
+
+PROFILES = {
+    "legacy": {
+        "worker_pool": "prefork",
+        "worker_concurrency": 2,
+        "worker_prefetch_multiplier": 4,
+        "task_acks_late": False,
+        "task_ignore_result": False,
+    },
+    "prefork": {**WORKER_PROFILES["prefork"], "task_ignore_result": True},
+    "io": {**WORKER_PROFILES["io"], "task_ignore_result": True},
+}
+
+
+BROKER_URL = os.getenv("BENCH_BROKER_URL", "memory://")
+IN_MEMORY = BROKER_URL.startswith("memory://")
+
+
+def run_profile(name: str, settings: dict, count: int, delay: float) -> dict:
+    app = Celery(f"bench_{name}", broker=BROKER_URL, backend="cache+memory://")
+    app.conf.update(
+        broker_transport_options={"polling_interval": 0.001},
+        task_serializer="json",
+        result_serializer="json",
+        worker_prefetch_multiplier=0 if IN_MEMORY else settings["worker_prefetch_multiplier"],
+        task_acks_late=settings["task_acks_late"],
+        task_ignore_result=settings["task_ignore_result"],
+    )
+
+    done = threading.Semaphore(0)
+    # Кэш backend в памяти общий для всех приложений процесса
+    stored_before = len(app.backend.client.cache)
+
+    @app.task(name="bench.check_reminders")
+    def check_reminders():
+        _run_async(asyncio.sleep(delay))
+        done.release()
+        return {"status": "success", "users_count": 1, "sent_count": 1, "error_count": 0}
+
+    with start_worker(
+        app,
+        pool="threads",
+        concurrency=settings["worker_concurrency"],
+        perform_ping_check=False,
+    ):
+        start = time.perf_counter()
+        for _ in range(count):
+            check_reminders.delay()
+        for _ in range(count):
+            done.acquire()
+        elapsed = time.perf_counter() - start
+
+    return {
+        "elapsed": elapsed,
+        "rate": count / elapsed,
+        "stored": len(app.backend.client.cache) - stored_before,
+    }
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    delay = (float(sys.argv[2]) if len(sys.argv) > 2 else 20.0) / 1000
+
+    print(f"{count} задач, ожидание I/O {delay * 1000:.0f} мс, брокер {BROKER_URL}")
+    if IN_MEMORY:
+        print("prefetch не ограничен (брокер в памяти), сравниваются пул и результаты")
+    print(f"{'профиль':<10}{'слоты':>7}{'задач/с':>10}{'время, с':>10}{'результатов':>13}")
+    for name, settings in PROFILES.items():
+        result = run_profile(name, settings, count, delay)
+        print(
+            f"{name:<10}{settings['worker_concurrency']:>7}{result['rate']:>10.1f}"
+            f"{result['elapsed']:>10.2f}{result['stored']:>13}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Бенчмарк выбора обработчика для входящего обновления.
+
+Сравнивает линейный проход aiogram по всем роутерам (проверка фильтров
+каждого обработчика по порядку до первого совпадения) и хэш-индекс
+handlers.dispatch. Считается только стоимость выбора обработчика,
+сами обработчики не вызываются.
+
+Использование:
+    python -m benchmarks.bench_dispatch [количество_обновлений]
+"""
+
+import asyncio
+import sys
+import time
+from datetime import datetime
+
+from aiogram.types import CallbackQuery, Chat, Message, User
+
+from handlers import (
+    buttons_router, export_router, faq_router, insight_router, onboarding_router, phase_router,
+    quests_router, recurring_router, reflect_router, reminder_router, search_router, settings_router, stats_router,
+    user_router,
+)
+from handlers.dispatch import DispatchIndex
+from utils.callback_codec import FAQ_ITEM, INSIGHT_NAV, QUEST_DONE, REFLECT_VIEW
+
+ROUTERS = [
+    phase_router, quests_router, insight_router, reflect_router, reminder_router,
+    user_router, settings_router, stats_router, export_router, search_router, recurring_router, onboarding_router, buttons_router, faq_router,
+]
+
+TEXTS = ["/start", "/status", "/reflect", "/done 2", "👤 Мой статус", "📋 Квесты", "❓ Помощь", "🗑️ Удалить квест"]
+CALLBACKS = [
+    QUEST_DONE.pack(quest_id=12),
+    REFLECT_VIEW.pack(pos=40, day="2025-04-01"),
+    INSIGHT_NAV.pack(pos=3),
+    FAQ_ITEM.pack(item=4),
+    "reminder_toggle",
+]
+
+USER = User(id=1, is_bot=False, first_name="bench")
+CHAT = Chat(id=1, type="private")
+
+
+def make_message(text: str) -> Message:
+    return Message(message_id=1, date=datetime.now(), chat=CHAT, from_user=USER, text=text)
+
+
+def make_callback(data: str) -> CallbackQuery:
+    return CallbackQuery(id="1", from_user=USER, chat_instance="1", data=data, message=make_message("x"))
+
+
+async def resolve_linear(event, observer_name: str):
+    """Как TelegramEventObserver.trigger: фильтры обработчиков по порядку"""
+    for router in ROUTERS:
+        for handler in getattr(router, observer_name).handlers:
+            matched, _ = await handler.check(event, raw_state=None, bot=None)
+            if matched:
+                return handler
+    return None
+
+
+async def resolve_indexed(index: DispatchIndex, event, observer_name: str):
+    if observer_name == "message":
+        resolved = index.resolve_message(event.text)
+        return resolved[0] if resolved else None
+    return index.resolve_callback(event.data)
+
+
+async def measure(resolve, events, count: int) -> float:
+    start = time.perf_counter()
+    for i in range(count):
+        event, observer_name = events[i % len(events)]
+        await resolve(event, observer_name)
+    return (time.perf_counter() - start) / count * 1e6
+
+
+async def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    index = DispatchIndex().compile(ROUTERS)
+    events = [(make_message(text), "message") for text in TEXTS]
+    events += [(make_callback(data), "callback_query") for data in CALLBACKS]
+
+    # Оба способа должны выбирать один и тот же обработчик
+    for event, observer_name in events:
+        linear = await resolve_linear(event, observer_name)
+        indexed = await resolve_indexed(index, event, observer_name)
+        assert linear is indexed, (event, linear, indexed)
+
+    handlers_total = sum(
+        len(router.message.handlers) + len(router.callback_query.handlers) for router in ROUTERS
+    )
+    print(f"{count} обновлений, {handlers_total} обработчиков, {len(index)} ключей в индексе")
+    linear_us = await measure(resolve_linear, events, count)
+    indexed_us = await measure(lambda event, name: resolve_indexed(index, event, name), events, count)
+    print(f"линейный проход: {linear_us:8.2f} мкс/обновление")
+    print(f"индекс:          {indexed_us:8.2f} мкс/обновление ({linear_us / indexed_us:.0f}x)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,133 @@
+"""
+Бенчмарк логирования: строк в секунду и задержка event loop.
+
+Сравнивает прежний JSONFormatter из bot.py с синхронным StreamHandler
+и единый конвейер core.logger.setup_logging (очередь + один буферизованный
+писатель). Вывод пишется в /dev/null, чтобы измерять только стоимость
+форматирования и передачи записи; отдельно считаются вызовы write
+(системные вызовы) и процессорное время на строку.
+
+Использование:
+    python -m benchmarks.bench_logging [количество_строк]
+"""
+
+import asyncio
+import json
+import logging
+import os
+import sys
+import time
+
+from core.logger import setup_logging, shutdown_logging
+
+
+class LegacyJSONFormatter(logging.Formatter):
+    """Копия прежнего форматтера из bot.py (dir(record) на каждую строку)"""
+    def format(self, record):
+        log_record = {
+            "level": record.levelname.lower(),
+            "function": f"{record.module}:{record.funcName}:{record.lineno}",
+            "message": record.getMessage()
+        }
+        if hasattr(record, 'command_name'):
+            log_record['command_name'] = record.command_name
+        if hasattr(record, 'username'):
+            log_record['username'] = record.username
+        if hasattr(record, 'args') and isinstance(record.args, dict):
+            if 'command_name' in record.args:
+                log_record['command_name'] = record.args['command_name']
+            if 'username' in record.args:
+                log_record['username'] = record.args['username']
+        if '__dict__' in dir(record):
+            if 'command_name' in record.__dict__:
+                log_record['command_name'] = record.__dict__['command_name']
+            if 'username' in record.__dict__:
+                log_record['username'] = record.__dict__['username']
+        return json.dumps(log_record)
+
+
+class CountingSink:
+    """Поток в /dev/null, считающий вызовы write"""
+    def __init__(self, binary: bool):
+        self._file = open(os.devnull, "wb" if binary else "w")
+        self.writes = 0
+
+    def write(self, data):
+        self.writes += 1
+        return self._file.write(data)
+
+    def flush(self):
+        self._file.flush()
+
+
+async def run(lines: int) -> dict:
+    """Log `lines` records from a coroutine while a ticker measures loop stalls"""
+    logger = logging.getLogger("bench")
+    stalls = []
+    done = asyncio.Event()
+
+    async def ticker():
+        loop = asyncio.get_running_loop()
+        while not done.is_set():
+            start = loop.time()
+            await asyncio.sleep(0.001)
+            stalls.append(loop.time() - start - 0.001)
+
+    async def producer():
+        for i in range(lines):
+            logger.info(
+                f"Command received: /status {i}",
+                extra={"command_name": "/status", "username": "bench_user"}
+            )
+            if i % 100 == 0:
+                await asyncio.sleep(0)
+        done.set()
+
+    start = time.perf_counter()
+    cpu_start = time.process_time()
+    await asyncio.gather(ticker(), producer())
+    elapsed = time.perf_counter() - start
+    cpu = time.process_time() - cpu_start
+    stalls.sort()
+    return {
+        "lines_per_sec": lines / elapsed,
+        "cpu_us_per_line": cpu / lines * 1e6,
+        "max_stall_ms": stalls[-1] * 1000 if stalls else 0.0,
+        "p99_stall_ms": stalls[int(len(stalls) * 0.99)] * 1000 if stalls else 0.0,
+    }
+
+
+def main():
+    lines = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    root = logging.getLogger()
+
+    # Прежний вариант: форматирование и запись в потоке event loop
+    legacy_sink = CountingSink(binary=False)
+    handler = logging.StreamHandler(legacy_sink)
+    handler.setFormatter(LegacyJSONFormatter())
+    root.handlers.clear()
+    root.setLevel(logging.INFO)
+    root.addHandler(handler)
+    legacy = asyncio.run(run(lines))
+    legacy["writes"] = legacy_sink.writes
+
+    # Единый конвейер: очередь, фоновый поток и один буферизованный писатель
+    unified_sink = CountingSink(binary=True)
+    setup_logging(stream=unified_sink)
+    unified = asyncio.run(run(lines))
+    shutdown_logging()
+    unified["writes"] = unified_sink.writes
+
+    print(
+        f"{'pipeline':<10}{'lines/s':>12}{'cpu us/line':>14}"
+        f"{'writes':>10}{'max stall ms':>15}{'p99 stall ms':>15}"
+    )
+    for name, result in (("legacy", legacy), ("unified", unified)):
+        print(
+            f"{name:<10}{result['lines_per_sec']:>12.0f}{result['cpu_us_per_line']:>14.1f}"
+            f"{result['writes']:>10}{result['max_stall_ms']:>15.2f}{result['p99_stall_ms']:>15.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
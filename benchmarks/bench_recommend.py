@@ -0,0 +1,86 @@
+"""
+Бенчмарк подсказок квестов и проверки квеста на соответствие фазе.
+
+Строит индексы utils.recommend для синтетической базы (по умолчанию
+10 000 пользователей по 200 завершенных квестов) и меряет:
+    полная индексация — первый проход фоновой задачи;
+    доиндексация      — повторный проход, когда изменился 1% пользователей;
+    suggest           — выдача top-k для /today и /add_quest;
+    проверка фазы     — прежний перебор слов совета против скомпилированного шаблона.
+
+Использование:
+    python -m benchmarks.bench_recommend [пользователей] [квестов_на_пользователя]
+"""
+
+import random
+import sys
+import time
+
+from utils.quest_logic import get_quest_by_phase, matches_phase_tip
+from utils.recommend import QuestRecommender
+
+PHASES = ("active", "low", "fog")
+TEMPLATES = (
+    "помыть кухню", "прогулка", "созвон по проекту", "разобрать почту", "поспать днем",
+    "написать пост", "обновить документацию", "сходить в зал", "позвонить маме", "почитать книгу",
+)
+
+
+def make_users(users: int, quests: int, rng: random.Random):
+    return {
+        str(user_id): [
+            (rng.choice(PHASES), f"{rng.choice(TEMPLATES)} {rng.randint(1, 30)}")
+            for _ in range(quests)
+        ]
+        for user_id in range(users)
+    }
+
+
+def timed(call) -> float:
+    start = time.perf_counter()
+    call()
+    return time.perf_counter() - start
+
+
+def legacy_phase_check(quest: str, phase: str) -> bool:
+    tip = get_quest_by_phase(phase)
+    return any(kw.lower() in quest.lower() for kw in tip.lower().split())
+
+
+def per_call_us(call, cases) -> float:
+    start = time.perf_counter()
+    for case in cases:
+        call(*case)
+    return (time.perf_counter() - start) / len(cases) * 1e6
+
+
+def main():
+    users = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    quests = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    rng = random.Random(7)
+    data = make_users(users, quests, rng)
+    recommender = QuestRecommender(min_users=3)
+
+    full = timed(lambda: recommender.apply(data, set(data)))
+    for user_id in rng.sample(sorted(data), users // 100):
+        data[user_id] = data[user_id] + [(rng.choice(PHASES), rng.choice(TEMPLATES))]
+    changed = {user_id: completed for user_id, completed in data.items()
+               if recommender.signatures.get(user_id) != (len(completed), hash(tuple(completed)))}
+    partial = timed(lambda: recommender.apply(changed, set(data)))
+
+    cases = [(str(rng.randrange(users)), rng.choice(PHASES)) for _ in range(100_000)]
+    suggest_us = per_call_us(lambda user_id, phase: recommender.suggest(user_id, phase, 3), cases)
+
+    checks = [(f"{rng.choice(TEMPLATES)} до конца", rng.choice(PHASES)) for _ in range(100_000)]
+    legacy_us = per_call_us(legacy_phase_check, checks)
+    compiled_us = per_call_us(matches_phase_tip, checks)
+
+    print(f"{users} пользователей × {quests} завершенных квестов")
+    print(f"полная индексация   {full:>10.2f} с")
+    print(f"доиндексация 1%     {partial:>10.2f} с ({len(changed)} пользователей)")
+    print(f"suggest top-3       {suggest_us:>10.2f} мкс")
+    print(f"проверка фазы       {legacy_us:>10.2f} мкс -> {compiled_us:.2f} мкс")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Бенчмарк отрисовки списка квестов.
+
+Сравнивает прежнюю сборку (текст и InlineKeyboardBuilder заново на каждый
+вызов, весь список на одной странице) и utils.quest_render: первая
+keyset-страница из закэшированных фрагментов. Отдельно меряется повторный показ
+после изменения одного квеста — перестраивается только его фрагмент.
+
+Использование:
+    python -m benchmarks.bench_render [количество_вызовов]
+"""
+
+import sys
+import time
+
+from aiogram.utils.keyboard import InlineKeyboardBuilder
+
+from utils.callback_codec import QUEST_DONE
+from utils.quest_render import paginate, render_quest_list
+
+SIZES = (10, 50, 200)
+
+
+def make_quests(count: int):
+    phases = ("active", "low", "fog", None)
+    return [
+        {
+            "id": i,
+            "text": f"Квест номер {i}: разобрать задачи и закрыть хвосты",
+            "status": "done" if i % 3 == 0 else "todo",
+            "phase": phases[i % len(phases)],
+        }
+        for i in range(1, count + 1)
+    ]
+
+
+def render_legacy(quests):
+    lines = ["📋 <b>Твои квесты:</b>\n"]
+    keyboard = InlineKeyboardBuilder()
+    for q in quests:
+        status_icon = "✅" if q.get("status") == "done" else "🕒"
+        phase_note = f" ({q.get('phase')})" if q.get("phase") else ""
+        lines.append(f"{status_icon} <b>{q['id']}</b>: {q['text']}{phase_note}")
+        if q.get("status") != "done":
+            keyboard.button(
+                text=f"✅ Завершить: {q['text'][:20]}",
+                callback_data=QUEST_DONE.pack(quest_id=q['id'])
+            )
+    keyboard.adjust(1)
+    return "\n".join(lines), keyboard.as_markup()
+
+
+def measure(render, count: int) -> float:
+    start = time.perf_counter()
+    for _ in range(count):
+        render()
+    return (time.perf_counter() - start) / count * 1e6
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    print(f"{count} вызовов на замер, мкс/вызов")
+    print(f"{'квестов':>8} {'прежний':>10} {'кэш':>10} {'изменение':>10}")
+    for size in SIZES:
+        quests = make_quests(size)
+        legacy_us = measure(lambda: render_legacy(quests), count)
+        cached_us = measure(lambda: render_quest_list(paginate(quests)), count)
+
+        # Каждый вызов меняет текст первого квеста: промах страницы,
+        # попадание по всем остальным фрагментам
+        counter = iter(range(10 ** 9))
+
+        def render_changed():
+            quests[0]["text"] = f"Измененный квест {next(counter)}"
+            return render_quest_list(paginate(quests))
+
+        changed_us = measure(render_changed, count)
+        print(f"{size:>8} {legacy_us:>10.1f} {cached_us:>10.1f} {changed_us:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
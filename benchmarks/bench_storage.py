@@ -0,0 +1,87 @@
+"""
+Бенчмарк чтения JSON-хранилища.
+
+Сравнивает прежний Storage.read (открыть файл и json.load на каждый вызов)
+с кэшем снимка utils.storage: промах (чтение, разбор orjson или json,
+заморозка), попадание (только os.stat) и read_copy при попадании (разбор
+закэшированных байтов без обращения к диску).
+
+Использование:
+    python -m benchmarks.bench_storage [количество_пользователей]
+"""
+
+import fcntl
+import json
+import os
+import sys
+import tempfile
+import time
+
+from utils import storage as storage_module
+from utils.storage import Storage
+
+
+def make_data(users: int):
+    return {
+        str(100000 + i): {
+            "phase": "active",
+            "reminder_enabled": i % 2 == 0,
+            "reminder_time": "21:00",
+            "quests": [
+                {"id": q, "text": f"Квест {q}: разобрать задачи", "status": "done" if q % 3 == 0 else "todo",
+                 "phase": "active"}
+                for q in range(1, 11)
+            ],
+            "insights": [{"text": f"Инсайт {n}", "date": "2025-03-01 10:00"} for n in range(5)],
+            "reflections": [
+                {"date": "2025-03-01 21:00", "q1": "важное", "q2": "сработало", "q3": "изменить"}
+                for _ in range(5)
+            ],
+        }
+        for i in range(users)
+    }
+
+
+def legacy_read(path: str):
+    with open(path, "r") as f:
+        fcntl.flock(f, fcntl.LOCK_SH)
+        try:
+            return json.load(f)
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def measure(func, count: int) -> float:
+    start = time.perf_counter()
+    for _ in range(count):
+        func()
+    return (time.perf_counter() - start) / count * 1e3
+
+
+def main():
+    users = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "data.json")
+        storage = Storage(path)
+        storage.write(make_data(users))
+        size = os.path.getsize(path) / 1024 / 1024
+        count = max(3, 20000 // users)
+        codec = "orjson" if storage_module.orjson is not None else "json"
+        print(f"Пользователей: {users}, файл {size:.1f} МБ, декодер: {codec}")
+
+        legacy = measure(lambda: legacy_read(path), count)
+        miss = measure(lambda: (storage._invalidate(), storage.read()), count)
+        storage.read()
+        hit = measure(storage.read, count * 1000)
+        copy_hit = measure(storage.read_copy, count)
+
+        print(f"  прежний read (json.load):  {legacy:10.3f} мс")
+        print(f"  промах кэша:               {miss:10.3f} мс")
+        print(f"  попадание в кэш:           {hit:10.3f} мс  (x{legacy / hit:,.0f})")
+        print(f"  read_copy при попадании:   {copy_hit:10.3f} мс")
+        # reminder_loop читает файл раз в минуту
+        print(f"  1440 чтений в сутки без изменений: {legacy * 1440 / 1e3:.2f} с -> {hit * 1440 / 1e3:.4f} с")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Бенчмарк чтения JSON-хранилища во время непрерывной записи.
+
+Писатель без остановки перезаписывает файл, а читатель в event loop каждые
+TICK секунд вызывает Storage.read. Задержка чтения считается от момента,
+когда тик должен был сработать, поэтому в нее входит и время, пока event
+loop был занят записью. Второй читатель в отдельном потоке считает чтения,
+заставшие пустой или недописанный файл.
+
+Режимы:
+- прежняя запись: json.dump с indent=2 в открытый на "w" файл под LOCK_EX
+  прямо в event loop;
+- новая запись: Storage.write_async (компактная кодировка во временный
+  файл, fsync и os.replace в потоке записи).
+
+Использование:
+    python -m benchmarks.bench_storage_writes [пользователей] [секунд]
+"""
+
+import asyncio
+import fcntl
+import json
+import logging
+import os
+import sys
+import tempfile
+import threading
+import time
+
+from benchmarks.bench_storage import make_data
+from utils.storage import Storage
+
+TICK = 0.005
+
+
+def legacy_write(path: str, data) -> None:
+    with open(path, "w") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            json.dump(data, f, indent=2)
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def percentile(values, share: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * share))]
+
+
+async def run(storage: Storage, data, seconds: float, legacy: bool):
+    path = str(storage.file_path)
+    storage.write(data)
+    storage.read()
+    stop = asyncio.Event()
+    latencies, torn, writes = [], [0], [0]
+
+    async def writer():
+        while not stop.is_set():
+            if legacy:
+                legacy_write(path, data)
+                await asyncio.sleep(0)
+            else:
+                await storage.write_async(data)
+            writes[0] += 1
+
+    async def reader():
+        due = time.perf_counter()
+        while not stop.is_set():
+            due += TICK
+            await asyncio.sleep(max(0.0, due - time.perf_counter()))
+            storage.read()
+            now = time.perf_counter()
+            latencies.append(now - due)
+            # Опоздавший читатель не копит долг тиков
+            due = max(due, now)
+
+    def thread_reader():
+        while not stop.is_set():
+            if len(storage.read()) != len(data):
+                torn[0] += 1
+            time.sleep(TICK)
+
+    thread = threading.Thread(target=thread_reader)
+    thread.start()
+    tasks = [asyncio.create_task(writer()), asyncio.create_task(reader())]
+    await asyncio.sleep(seconds)
+    stop.set()
+    await asyncio.gather(*tasks)
+    thread.join()
+    return latencies, torn[0], writes[0]
+
+
+def main():
+    users = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    seconds = float(sys.argv[2]) if len(sys.argv) > 2 else 5
+    # Ошибки разбора недописанного файла ожидаемы в прежнем режиме
+    logging.disable(logging.CRITICAL)
+    data = make_data(users)
+    with tempfile.TemporaryDirectory() as folder:
+        storage = Storage(os.path.join(folder, "data.json"))
+        print(f"Пользователей: {users}, {seconds:g} с на режим, тик читателя {TICK * 1e3:g} мс")
+        for name, legacy in (("прежняя запись", True), ("новая запись", False)):
+            latencies, torn, writes = asyncio.run(run(storage, data, seconds, legacy))
+            size = os.path.getsize(storage.file_path) / 1024 / 1024
+            print(
+                f"  {name:15} файл {size:5.1f} МБ, записей {writes:4}, чтений {len(latencies):5}: "
+                f"p50 {percentile(latencies, 0.5) * 1e3:7.2f} мс, "
+                f"p99 {percentile(latencies, 0.99) * 1e3:7.2f} мс, "
+                f"max {max(latencies) * 1e3:7.2f} мс, "
+                f"пустых/битых чтений в потоке {torn}"
+            )
+
+
+if __name__ == "__main__":
+    main()
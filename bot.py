@@ -3,63 +3,17 @@ import os
 import logging
 import json
 import sys
-from datetime import datetime
+import time
+from datetime import date, datetime
 from pathlib import Path
 
 # Настраиваем логирование до импорта других модулей
-class JSONFormatter(logging.Formatter):
-    def format(self, record):
-        log_record = {
-            "level": record.levelname.lower(),
-            "function": f"{record.module}:{record.funcName}:{record.lineno}",
-            "message": record.getMessage()
-        }
-        
-        # Добавляем дополнительные поля, если они есть
-        # Проверяем наличие поля в атрибутах
-        if hasattr(record, 'command_name'):
-            log_record['command_name'] = record.command_name
-        if hasattr(record, 'username'):
-            log_record['username'] = record.username
-        
-        # Проверяем наличие поля в extra аргументах
-        if hasattr(record, 'args') and isinstance(record.args, dict):
-            if 'command_name' in record.args:
-                log_record['command_name'] = record.args['command_name']
-            if 'username' in record.args:
-                log_record['username'] = record.args['username']
-                
-        # Проверяем наличие поля в __dict__
-        if '__dict__' in dir(record):
-            if 'command_name' in record.__dict__:
-                log_record['command_name'] = record.__dict__['command_name']
-            if 'username' in record.__dict__:
-                log_record['username'] = record.__dict__['username']
-            
-        return json.dumps(log_record)
-
-# Конфигурируем корневой логгер
-root_logger = logging.getLogger()
-root_logger.setLevel(logging.INFO)
-
-# Очищаем существующие обработчики
-if root_logger.hasHandlers():
-    root_logger.handlers.clear()
-
-# Создаем обработчик для консоли
-console_handler = logging.StreamHandler(sys.stdout)
-console_handler.setFormatter(JSONFormatter())
-root_logger.addHandler(console_handler)
-
-# Устанавливаем уровни логирования
-logging.getLogger("aiogram").setLevel(logging.WARNING)
-logging.getLogger("asyncio").setLevel(logging.WARNING)
-logging.getLogger("uvicorn.access").disabled = True
+from core.logger import setup_logging
+
+logger = setup_logging("bot")
 # Устанавливаем INFO вместо DEBUG для middleware.logging
 logging.getLogger("middleware").setLevel(logging.INFO)
 
-# Создаем объект логгера для использования в нашем коде
-logger = logging.getLogger("bot")
 logger.info("Logging system initialized with JSON format")
 
 # Теперь импортируем остальные модули
@@ -69,33 +23,40 @@ from aiogram.client.default import DefaultBotProperties
 from aiogram.types import BotCommand
 from aiogram.fsm.storage.memory import MemoryStorage
 
-from config import BOT_TOKEN, DATA_FILE
+from config import (
+    BOT_TOKEN, CALLBACK_DEBOUNCE_WINDOW, DATA_FILE, METRICS_ENABLED, METRICS_HOST, METRICS_PORT,
+    RECOMMENDATION_REFRESH_INTERVAL, ARCHIVE_AFTER_MONTHS, ARCHIVE_DIR, ARCHIVE_ENABLED, setup_tracing,
+)
 from db.database import init_db
 from services.user_service import UserService
 from services.reminder_service import ReminderService
 from utils.storage import Storage
+from utils.recommend import recommender
+from utils.reminders import due_kinds, render_reminder
+from utils.archive import archive_snapshot, cutoff_month, drop_archived
 from middleware.logging import LoggingMiddleware
 from middleware.error_handler import ErrorHandlerMiddleware
+from middleware.debounce import CallbackDebounceMiddleware
+from middleware.tracing import TracingRequestMiddleware
 from core.service_provider import ServiceProvider
-
-from handlers import (
-    phase_router,
-    quests_router,
-    insight_router,
-    reflect_router,
-    reminder_router,
-    user_router,
-    settings_router,
-    onboarding_router,
-    buttons_router,
-    faq_router,
+from core.scheduler import MinuteScheduler
+from utils.cache import redis_client
+from core.metrics import (
+    REMINDER_FANOUT_LAG,
+    REMINDERS_SENT,
+    HANDLER_LABELS,
+    monitor_event_loop_lag,
+    start_http_server,
 )
 
+from handlers import ROUTERS, dispatch_router, dispatch_index, faq_cache
+
 # Initialize bot
 bot = Bot(
     token=BOT_TOKEN,
     default=DefaultBotProperties(parse_mode=ParseMode.HTML)
 )
+bot.session.middleware(TracingRequestMiddleware())
 
 # Configure storage and dispatcher
 storage = MemoryStorage()
@@ -104,18 +65,18 @@ dp = Dispatcher(storage=storage)
 # Add middleware
 dp.update.middleware(LoggingMiddleware())
 dp.update.middleware(ErrorHandlerMiddleware())
+# Повторные нажатия одной кнопки отсекаются до фильтров и обработчиков
+dp.callback_query.outer_middleware(CallbackDebounceMiddleware(window=CALLBACK_DEBOUNCE_WINDOW))
 
 # Include all routers
-dp.include_router(phase_router)
-dp.include_router(quests_router)
-dp.include_router(insight_router)
-dp.include_router(reflect_router)
-dp.include_router(reminder_router)
-dp.include_router(user_router)
-dp.include_router(settings_router)
-dp.include_router(onboarding_router)
-dp.include_router(buttons_router)
-dp.include_router(faq_router)
+# Индекс точных команд, кнопок и callback-префиксов проверяется первым
+dp.include_router(dispatch_router)
+for handler_router in ROUTERS:
+    dp.include_router(handler_router)
+dispatch_index.compile(dp.chain_tail)
+HANDLER_LABELS.update(dispatch_index.labels)
+logger.info(f"Dispatch index compiled: {len(dispatch_index)} keys")
+logger.info(faq_cache.report())
 
 # Register services
 def setup_services():
@@ -130,23 +91,62 @@ async def reminder_loop(bot: Bot):
     """Background task for sending reminders to users."""
     logger.info("Starting reminder loop")
     storage = Storage(DATA_FILE)
-    
+    scheduler = MinuteScheduler(redis_client, "reminders:bot")
+
+    async def send_reminders(minute: datetime):
+        """Send reminders of users whose reminder time is this minute"""
+        data = storage.read()
+        now = minute.strftime("%H:%M")
+
+        for user_id, user_data in data.items():
+            # Reminders of several kinds at the same time go out as one message
+            kinds = due_kinds(user_data, now)
+            if kinds:
+                if not await scheduler.claim_send(user_id, minute.date(), now):
+                    REMINDERS_SENT.inc("bot", "duplicate")
+                    continue
+                try:
+                    await bot.send_message(int(user_id), render_reminder(kinds))
+                    REMINDER_FANOUT_LAG.observe(time.time() - minute.timestamp(), "bot")
+                    REMINDERS_SENT.inc("bot", "sent")
+                    logger.info(f"Sent reminder to user {user_id}")
+                except Exception as e:
+                    await scheduler.release_send(user_id, minute.date(), now)
+                    REMINDERS_SENT.inc("bot", "error")
+                    logger.error(f"Failed to send reminder to {user_id}: {e}")
+
+    await scheduler.run_forever(send_reminders)
+
+async def recommendation_loop():
+    """Background task keeping the quest suggestion indexes up to date."""
+    logger.info("Starting recommendation loop")
+    while True:
+        try:
+            await recommender.refresh_from_file(DATA_FILE)
+        except Exception as e:
+            logger.error(f"Failed to refresh quest recommendations: {e}")
+        await asyncio.sleep(RECOMMENDATION_REFRESH_INTERVAL)
+
+async def archive_loop():
+    """Background task moving months past ARCHIVE_AFTER_MONTHS to the cold archive."""
+    logger.info("Starting archive loop")
+    storage = Storage(DATA_FILE)
     while True:
         try:
-            data = storage.read()
-            now = datetime.now().strftime("%H:%M")
-
-            for user_id, user_data in data.items():
-                if user_data.get("reminder_enabled") and user_data.get("reminder_time") == now:
-                    try:
-                        await bot.send_message(int(user_id), "🧘 Пора на рефлексию. Напиши /reflect")
-                        logger.info(f"Sent reminder to user {user_id}")
-                    except Exception as e:
-                        logger.error(f"Failed to send reminder to {user_id}: {e}")
+            cutoff = cutoff_month(date.today(), ARCHIVE_AFTER_MONTHS)
+            # Compressing runs on a snapshot in a thread; archived entries are
+            # then dropped from fresh data, which write_async stages before
+            # its first await, so handler writes in between are not lost
+            snapshot = await asyncio.to_thread(storage.read)
+            archived = await asyncio.to_thread(archive_snapshot, snapshot, ARCHIVE_DIR, cutoff)
+            if archived:
+                data = storage.read_copy()
+                removed = drop_archived(data, archived)
+                await storage.write_async(data)
+                logger.info(f"Archived {removed} entries of {len(archived)} users before {cutoff}")
         except Exception as e:
-            logger.error(f"Error in reminder loop: {e}")
-            
-        await asyncio.sleep(60)  # Check every minute
+            logger.error(f"Failed to archive cold months: {e}")
+        await asyncio.sleep(24 * 3600)
 
 async def main():
     try:
@@ -156,27 +156,38 @@ async def main():
         
         # Setup services
         setup_services()
+        setup_tracing("rpg_bot")
         
         # Set up command menu
         await bot.set_my_commands([
             BotCommand(command="help", description="Как пользоваться ботом"),
             BotCommand(command="faq", description="Часто задаваемые вопросы"),
             BotCommand(command="me", description="Мой статус"),
+            BotCommand(command="stats", description="Календарь фаз и статистика"),
+            BotCommand(command="export", description="Выгрузить свои данные"),
             BotCommand(command="settings", description="Настройки"),
             BotCommand(command="today", description="Что делать сегодня"),
             BotCommand(command="status", description="Посмотреть текущие квесты"),
             BotCommand(command="start_day", description="Выбрать фазу дня"),
             BotCommand(command="add_quest", description="Добавить квест"),
+            BotCommand(command="repeat", description="Повторяющиеся квесты"),
             BotCommand(command="reflect", description="Вечерняя рефлексия"),
             BotCommand(command="reflections", description="Архив рефлексий"),
             BotCommand(command="insight", description="Добавить инсайт"),
             BotCommand(command="thoughts", description="Посмотреть инсайты"),
+            BotCommand(command="search", description="Поиск по инсайтам и рефлексиям"),
             BotCommand(command="reminder", description="Установить напоминание"),
             BotCommand(command="delete_quest", description="Удалить квест")
         ])
         
         # Start background tasks
         asyncio.create_task(reminder_loop(bot))
+        asyncio.create_task(recommendation_loop())
+        if ARCHIVE_ENABLED:
+            asyncio.create_task(archive_loop())
+        if METRICS_ENABLED:
+            start_http_server(METRICS_PORT, METRICS_HOST)
+            asyncio.create_task(monitor_event_loop_lag())
         logger.info("Background tasks started")
         
         # Start polling
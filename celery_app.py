@@ -1,6 +1,13 @@
 import os
 from celery import Celery
-from config import REDIS_HOST, REDIS_PORT
+from celery.schedules import crontab
+from celery.signals import worker_init, worker_process_init, setup_logging as celery_setup_logging
+from config import (
+    REDIS_HOST, REDIS_PORT, METRICS_ENABLED, METRICS_HOST, CELERY_METRICS_PORT,
+    CELERY_PROFILE, CELERY_CONCURRENCY, CELERY_STATS_ENABLED, CELERY_STATS_TTL, setup_tracing,
+)
+from core.task_stats import TaskStatsSink, install_task_stats
+from core.tracing import install_celery_tracing
 
 app = Celery(
     'rpg_bot',
@@ -9,6 +16,29 @@ app = Celery(
     include=['tasks']  # Import tasks modules
 )
 
+# Worker execution profiles.
+# "io": tasks spend their time awaiting Telegram/DB/Redis, so many threads
+# share one process and its event loop; prefetch 1 with late ack keeps
+# tasks in the broker until a thread is actually free and re-delivers them
+# if the worker dies.
+# "prefork": CPU-bound work (large migrations) in separate processes.
+WORKER_PROFILES = {
+    "io": {
+        "worker_pool": "threads",
+        "worker_concurrency": 16,
+        "worker_prefetch_multiplier": 1,
+        "task_acks_late": True,
+        "task_reject_on_worker_lost": True,
+    },
+    "prefork": {
+        "worker_pool": "prefork",
+        "worker_concurrency": 2,
+        "worker_prefetch_multiplier": 4,
+        "task_acks_late": False,
+        "task_reject_on_worker_lost": False,
+    },
+}
+
 # Configure Celery
 app.conf.update(
     # Task settings
@@ -18,24 +48,88 @@ app.conf.update(
     timezone='Europe/Moscow',
     enable_utc=True,
     
-    # Concurrency settings
-    worker_concurrency=2,
-    
-    # Task result backend settings
-    task_ignore_result=False,
-    task_store_errors_even_if_ignored=True,
+    # Task result backend settings: results are opt-in per task
+    # (the migration chord needs them), periodic runs go to the stats sink
+    task_ignore_result=True,
+    task_store_errors_even_if_ignored=False,
+    result_extended=False,
     
-    # Tasks will be removed from the result backend after 1 day
+    # Stored results (migration reports) are removed after 1 day
     result_expires=86400,
     
     # Beat settings for periodic tasks
     beat_schedule={
         'check-reminders-every-minute': {
             'task': 'tasks.check_reminders',
-            'schedule': 60.0,  # Every minute
+            'schedule': crontab(),  # At the start of every minute
+            # A run that waited longer than a minute is superseded by the next one
+            'options': {'expires': 55},
+        },
+        'materialize-recurring-quests': {
+            'task': 'tasks.materialize_recurring_quests',
+            # Hourly, so every timezone bucket is picked up soon after its morning
+            'schedule': crontab(minute=0),
+            'options': {'expires': 3300},
+        },
+        'maintain-partitions': {
+            'task': 'tasks.maintain_partitions',
+            'schedule': crontab(minute=15, hour=3),
+            'options': {'expires': 3600},
+        },
+        'weekly-summaries': {
+            'task': 'tasks.generate_summaries',
+            'schedule': crontab(minute=0, hour=10, day_of_week=1),
+            'args': ('week',),
+            'options': {'expires': 3600},
+        },
+        'monthly-summaries': {
+            'task': 'tasks.generate_summaries',
+            'schedule': crontab(minute=30, hour=10, day_of_month=1),
+            'args': ('month',),
+            'options': {'expires': 3600},
         },
     },
+    
+    **WORKER_PROFILES.get(CELERY_PROFILE, WORKER_PROFILES["io"]),
 )
+if CELERY_CONCURRENCY:
+    app.conf.worker_concurrency = CELERY_CONCURRENCY
+
+@celery_setup_logging.connect
+def configure_logging(**kwargs):
+    """Use the application logging pipeline instead of Celery's own handlers"""
+    from core.logger import setup_logging
+
+    setup_logging()
+
+# Propagate trace context from publishers to task spans
+install_celery_tracing()
+
+# Aggregate run stats instead of storing a result per run
+install_task_stats(
+    TaskStatsSink(app.backend.client, ttl=CELERY_STATS_TTL) if CELERY_STATS_ENABLED else None
+)
+
+def start_worker_observability(index: int = 0):
+    """Start tracing exporter and metrics endpoint in the current process"""
+    setup_tracing("rpg_bot_worker")
+    if METRICS_ENABLED:
+        from core.metrics import start_http_server
+
+        start_http_server(CELERY_METRICS_PORT + index, METRICS_HOST)
+
+@worker_init.connect
+def start_worker_main_observability(**kwargs):
+    """Thread and solo pools run tasks in the main worker process"""
+    if app.conf.worker_pool != "prefork":
+        start_worker_observability()
+
+@worker_process_init.connect
+def start_worker_process_observability(**kwargs):
+    """Exporter threads do not survive fork, start them per pool process"""
+    from billiard.process import current_process
+
+    start_worker_observability(getattr(current_process(), "index", None) or 0)
 
 if __name__ == '__main__':
-    app.start() 
\ No newline at end of file
+    app.start()
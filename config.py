@@ -27,6 +27,45 @@ SQLITE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "rpg_bot.
 REDIS_HOST = os.getenv("REDIS_HOST", "localhost")
 REDIS_PORT = int(os.getenv("REDIS_PORT", "6379"))
 
+# Logging settings
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+# Path to append JSON lines to; empty means stdout
+LOG_FILE = os.getenv("LOG_FILE", "")
+# Share of per-command info lines to keep (1.0 keeps everything)
+LOG_SAMPLE_RATE = float(os.getenv("LOG_SAMPLE_RATE", "1.0"))
+# Errors per call site allowed per window before they are suppressed
+LOG_ERROR_BURST = int(os.getenv("LOG_ERROR_BURST", "10"))
+LOG_ERROR_WINDOW = float(os.getenv("LOG_ERROR_WINDOW", "60"))
+LOG_BUFFER_SIZE = int(os.getenv("LOG_BUFFER_SIZE", str(64 * 1024)))
+LOG_FLUSH_INTERVAL = float(os.getenv("LOG_FLUSH_INTERVAL", "1.0"))
+
+# Tracing settings (spans go to a local JSONL file or an OTLP/HTTP collector)
+TRACING_ENABLED = os.getenv("TRACING_ENABLED", "false").lower() in ("true", "1", "yes")
+TRACING_EXPORTER = os.getenv("TRACING_EXPORTER", "file")
+TRACING_SAMPLE_RATE = float(os.getenv("TRACING_SAMPLE_RATE", "0.1"))
+TRACING_FILE = os.getenv("TRACING_FILE", "logs/traces.jsonl")
+TRACING_OTLP_ENDPOINT = os.getenv("TRACING_OTLP_ENDPOINT", "http://127.0.0.1:4318/v1/traces")
+
+# Metrics settings (Prometheus text format, local interface only by default)
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() in ("true", "1", "yes")
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+METRICS_PORT = int(os.getenv("METRICS_PORT", "9100"))
+# Celery workers listen on CELERY_METRICS_PORT + pool process index
+CELERY_METRICS_PORT = int(os.getenv("CELERY_METRICS_PORT", "9101"))
+
+# Celery worker profile: "io" (threads pool for async I/O tasks) or "prefork"
+CELERY_PROFILE = os.getenv("CELERY_PROFILE", "io")
+CELERY_CONCURRENCY = int(os.getenv("CELERY_CONCURRENCY", "0"))  # 0 = profile default
+# Aggregated per-task run stats in Redis, kept for CELERY_STATS_TTL seconds
+CELERY_STATS_ENABLED = os.getenv("CELERY_STATS_ENABLED", "true").lower() in ("true", "1", "yes")
+CELERY_STATS_TTL = int(os.getenv("CELERY_STATS_TTL", str(7 * 86400)))
+
+# Weekly/monthly summaries: active users per chunk task, messages per
+# sender task and messages per second of one worker process
+SUMMARY_CHUNK_SIZE = int(os.getenv("SUMMARY_CHUNK_SIZE", "1000"))
+SUMMARY_BATCH_SIZE = int(os.getenv("SUMMARY_BATCH_SIZE", "200"))
+SUMMARY_SEND_RATE = float(os.getenv("SUMMARY_SEND_RATE", "20"))
+
 # Create database URL
 def get_database_url(use_sqlite=False) -> str:
     """Get database URL
@@ -55,6 +94,71 @@ def get_sync_database_url(use_sqlite=False) -> str:
         return f"sqlite:///{SQLITE_PATH}"
     return f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}/{DB_NAME}"
 
+def setup_tracing(service_name: str) -> None:
+    """Configure the process tracer from the TRACING_* settings"""
+    from core.tracing import configure_tracing
+
+    configure_tracing(
+        TRACING_ENABLED,
+        exporter=TRACING_EXPORTER,
+        sample_rate=TRACING_SAMPLE_RATE,
+        file_path=TRACING_FILE,
+        otlp_endpoint=TRACING_OTLP_ENDPOINT,
+        service_name=service_name,
+    )
+
 # Other settings
 DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "storage")
-DATA_FILE = os.path.join(DATA_DIR, "data.json") 
\ No newline at end of file
+DATA_FILE = os.path.join(DATA_DIR, "data.json")
+
+# Number of users inserted per transaction when migrating JSON data
+MIGRATION_CHUNK_SIZE = int(os.getenv("MIGRATION_CHUNK_SIZE", "500")) 
+# Per-chunk shards of data.json written by the Celery migration; must be
+# on storage the workers share, like DATA_FILE itself
+MIGRATION_SHARD_DIR = os.getenv("MIGRATION_SHARD_DIR", os.path.join(DATA_DIR, "migration"))
+# Shards of the summary window's daily stats, shared by the workers as well
+SUMMARY_SHARD_DIR = os.getenv("SUMMARY_SHARD_DIR", os.path.join(DATA_DIR, "summaries"))
+# Repeated taps on the same inline button within this many seconds are
+# collapsed into one handler run (0 disables debouncing)
+CALLBACK_DEBOUNCE_WINDOW = float(os.getenv("CALLBACK_DEBOUNCE_WINDOW", "1.0"))
+
+# Optional FAQ answers published as posts in a channel: copy_message reuses
+# them instead of sending the text. FAQ_SOURCE_MESSAGE_IDS lists post ids
+# in FAQ order, comma separated; empty items fall back to the text.
+FAQ_SOURCE_CHAT_ID = os.getenv("FAQ_SOURCE_CHAT_ID", "")
+FAQ_SOURCE_MESSAGE_IDS = [
+    int(item) if item.strip() else None
+    for item in os.getenv("FAQ_SOURCE_MESSAGE_IDS", "").split(",")
+] if os.getenv("FAQ_SOURCE_MESSAGE_IDS") else []
+
+# Exports are encoded into a temporary file kept in memory up to
+# EXPORT_SPOOL_SIZE bytes; histories over EXPORT_INLINE_MAX_ROWS rows are
+# built by a Celery worker and sent as a document when ready
+EXPORT_SPOOL_SIZE = int(os.getenv("EXPORT_SPOOL_SIZE", str(1024 * 1024)))
+EXPORT_INLINE_MAX_ROWS = int(os.getenv("EXPORT_INLINE_MAX_ROWS", "2000"))
+
+# Quest suggestions in /today and /add_quest: the bot re-indexes completed
+# quests every RECOMMENDATION_REFRESH_INTERVAL seconds; a quest is suggested
+# to other users once RECOMMENDATION_MIN_USERS people have completed it
+RECOMMENDATION_REFRESH_INTERVAL = int(os.getenv("RECOMMENDATION_REFRESH_INTERVAL", "300"))
+RECOMMENDATION_MIN_USERS = int(os.getenv("RECOMMENDATION_MIN_USERS", "3"))
+RECOMMENDATION_TOP_K = int(os.getenv("RECOMMENDATION_TOP_K", "3"))
+
+# Repeating quests: timezone of new templates and the local hour from which
+# the day's instances are created
+DEFAULT_TIMEZONE = os.getenv("DEFAULT_TIMEZONE", "Europe/Moscow")
+QUEST_MATERIALIZE_HOUR = int(os.getenv("QUEST_MATERIALIZE_HOUR", "5"))
+
+# Reminders are claimed from the reminders table REMINDER_CLAIM_BATCH rows
+# at a time; a failed send is retried after REMINDER_RETRY_DELAY seconds
+REMINDER_CLAIM_BATCH = int(os.getenv("REMINDER_CLAIM_BATCH", "500"))
+REMINDER_RETRY_DELAY = int(os.getenv("REMINDER_RETRY_DELAY", "300"))
+
+# Cold storage: with ARCHIVE_ENABLED, reflections older than
+# ARCHIVE_AFTER_MONTHS full months move to gzip archives in ARCHIVE_DIR
+# (PostgreSQL month partitions are created PARTITION_MONTHS_AHEAD months
+# in advance either way)
+ARCHIVE_ENABLED = os.getenv("ARCHIVE_ENABLED", "false").lower() in ("true", "1", "yes")
+ARCHIVE_DIR = os.getenv("ARCHIVE_DIR", os.path.join(DATA_DIR, "archive"))
+ARCHIVE_AFTER_MONTHS = int(os.getenv("ARCHIVE_AFTER_MONTHS", "12"))
+PARTITION_MONTHS_AHEAD = int(os.getenv("PARTITION_MONTHS_AHEAD", "3"))
@@ -1,155 +1,341 @@
+import atexit
 import logging
 import os
+import queue
 import sys
 import json
+import threading
+import time
+from collections import OrderedDict
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
-from datetime import datetime
-from loguru import logger
+from typing import BinaryIO, Dict, Iterable, Optional, Tuple
 
-# Make sure logs directory exists
-logs_dir = Path("logs")
-logs_dir.mkdir(exist_ok=True)
+from config import (
+    LOG_LEVEL,
+    LOG_FILE,
+    LOG_SAMPLE_RATE,
+    LOG_ERROR_BURST,
+    LOG_ERROR_WINDOW,
+    LOG_BUFFER_SIZE,
+    LOG_FLUSH_INTERVAL,
+)
 
-# Get current date for log file name
-current_date = datetime.now().strftime("%Y-%m-%d")
-log_file = logs_dir / f"{current_date}.log"
+try:
+    import orjson
+except ImportError:  # orjson is optional, fall back to the stdlib encoder
+    orjson = None
 
-class SimpleJsonFormatter(logging.Formatter):
+# Extra fields copied from LogRecord into the JSON line (passed via `extra=`)
+EXTRA_FIELDS = ("command_name", "username", "suppressed")
+
+_listener: Optional[QueueListener] = None
+
+
+def dumps(obj) -> str:
+    """Encode a log line with orjson when available"""
+    if orjson is not None:
+        return orjson.dumps(obj, default=str).decode("utf-8")
+    return json.dumps(obj, ensure_ascii=False, default=str)
+
+
+class JSONFormatter(logging.Formatter):
     """
-    Simple JSON formatter for standard logging
+    JSON formatter reading only whitelisted extra fields.
+
+    Extra fields are looked up directly in record.__dict__, which is where
+    `logger.info(..., extra={...})` puts them.
     """
+    def __init__(self, extra_fields: Iterable[str] = EXTRA_FIELDS):
+        super().__init__()
+        self.extra_fields = tuple(extra_fields)
+
     def format(self, record):
-        # Create a simple log record
         log_record = {
             "level": record.levelname.lower(),
             "function": f"{record.module}:{record.funcName}:{record.lineno}",
             "message": record.getMessage()
         }
-        
-        # Add extra fields if available in record.__dict__
-        if hasattr(record, 'command_name'):
-            log_record['command_name'] = record.command_name
-        if hasattr(record, 'username'):
-            log_record['username'] = record.username
-            
-        # Get extras from LoggerAdapter
-        if hasattr(record, 'args') and isinstance(record.args, dict):
-            if 'command_name' in record.args:
-                log_record['command_name'] = record.args['command_name']
-            if 'username' in record.args:
-                log_record['username'] = record.args['username']
-            
-        return json.dumps(log_record)
-
-class InterceptHandler(logging.Handler):
+
+        attributes = record.__dict__
+        for field in self.extra_fields:
+            value = attributes.get(field)
+            if value is not None:
+                log_record[field] = value
+
+        if record.exc_info:
+            if not record.exc_text:
+                record.exc_text = self.formatException(record.exc_info)
+            log_record["exception"] = record.exc_text
+
+        return dumps(log_record)
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keep only a fraction of high-volume per-command info lines.
+
+    Records carrying `command_name` at INFO level or below are sampled
+    deterministically per key, so every command keeps the same share of
+    lines. The key is `sample_key` when the caller sets it (the bounded
+    metric label of the handler), otherwise `command_name`; at most
+    `max_keys` keys are tracked, the least recently seen are evicted.
+    Warnings and errors always pass.
+    """
+    def __init__(self, rate: float, max_keys: int = 1024):
+        super().__init__()
+        self.rate = max(0.0, min(rate, 1.0))
+        self.max_keys = max_keys
+        self._credit: "OrderedDict[str, float]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        if self.rate >= 1.0 or record.levelno > logging.INFO:
+            return True
+        attributes = record.__dict__
+        command = attributes.get("command_name")
+        if command is None:
+            return True
+        key = attributes.get("sample_key") or command
+
+        with self._lock:
+            credit = self._credit.pop(key, 1.0 - self.rate) + self.rate
+            passed = credit >= 1.0
+            self._credit[key] = credit - 1.0 if passed else credit
+            if len(self._credit) > self.max_keys:
+                self._credit.popitem(last=False)
+            return passed
+
+
+class RateLimitFilter(logging.Filter):
     """
-    Intercept standard logging messages toward Loguru.
-    
-    This handler intercepts all standard logging messages and redirects them to loguru,
-    which provides better formatting and handling.
+    Limit repeated errors from the same call site.
+
+    At most `burst` records per `window` seconds pass for each
+    (logger, file, line). The first record after a suppressed period
+    carries the number of dropped records in the `suppressed` field.
     """
-    
+    def __init__(self, burst: int, window: float, level: int = logging.ERROR):
+        super().__init__()
+        self.burst = burst
+        self.window = window
+        self.level = level
+        # key -> [window start, passed in window, suppressed in window]
+        self._state: Dict[Tuple[str, str, int], list] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        if record.levelno < self.level or self.burst <= 0:
+            return True
+
+        key = (record.name, record.pathname, record.lineno)
+        now = time.monotonic()
+        with self._lock:
+            state = self._state.get(key)
+            if state is None or now - state[0] >= self.window:
+                suppressed = state[2] if state else 0
+                self._state[key] = [now, 1, 0]
+                if suppressed:
+                    record.suppressed = suppressed
+                return True
+            if state[1] < self.burst:
+                state[1] += 1
+                return True
+            state[2] += 1
+            return False
+
+
+class BufferedWriterHandler(logging.Handler):
+    """
+    Single writer that batches formatted lines into one write call.
+
+    Lines are flushed when the buffer reaches `capacity` bytes, when a
+    record at `flush_level` or above arrives, and every `flush_interval`
+    seconds from a background thread.
+    """
+    def __init__(
+        self,
+        stream: BinaryIO,
+        capacity: int = 64 * 1024,
+        flush_interval: float = 1.0,
+        flush_level: int = logging.ERROR,
+    ):
+        super().__init__()
+        self.stream = stream
+        self.capacity = capacity
+        self.flush_level = flush_level
+        self._buffer = []
+        self._size = 0
+        self.flush_interval = flush_interval
+        self._stopped = threading.Event()
+        self.start_flusher()
+
+    def start_flusher(self):
+        """Start the periodic flush thread (again after a fork)"""
+        if self.flush_interval > 0:
+            threading.Thread(
+                target=self._flush_periodically, args=(self.flush_interval,),
+                name="log-flusher", daemon=True
+            ).start()
+
     def emit(self, record):
-        # Get corresponding Loguru level if it exists
         try:
-            level = logger.level(record.levelname).name
-        except ValueError:
-            level = record.levelno
-            
-        # Extract extra fields if available
-        extras = {}
-        if hasattr(record, 'command_name'):
-            extras['command_name'] = record.command_name
-        if hasattr(record, 'username'):
-            extras['username'] = record.username
-            
-        # Find caller from where the logged message originated
-        frame, depth = logging.currentframe(), 2
-        while frame.f_code.co_filename == logging.__file__:
-            frame = frame.f_back
-            depth += 1
-            
-        # Pass the message to loguru
-        logger_instance = logger.bind(**extras) if extras else logger
-        logger_instance.opt(depth=depth, exception=record.exc_info).log(
-            level, record.getMessage()
-        )
-
-def json_serializer(record):
-    """Serialize log record to JSON format."""
-    # Base log fields with minimal information
-    output = {
-        "level": record["level"].name.lower(),
-        "function": f"{record['name']}:{record['function']}:{record['line']}",
-        "message": record["message"]
-    }
-    
-    # Add command_name and username if available
-    if "command_name" in record["extra"]:
-        output["command_name"] = record["extra"]["command_name"]
-    
-    if "username" in record["extra"]:
-        output["username"] = record["extra"]["username"]
-    
-    return json.dumps(output)
-
-def setup_logging():
+            line = (self.format(record) + "\n").encode("utf-8")
+        except Exception:
+            self.handleError(record)
+            return
+
+        self.acquire()
+        try:
+            self._buffer.append(line)
+            self._size += len(line)
+            if self._size >= self.capacity or record.levelno >= self.flush_level:
+                self._write_buffer()
+        finally:
+            self.release()
+
+    def _write_buffer(self):
+        if not self._buffer:
+            return
+        data = b"".join(self._buffer)
+        self._buffer.clear()
+        self._size = 0
+        try:
+            self.stream.write(data)
+            self.stream.flush()
+        except Exception:
+            # Nothing sensible to log to if the log stream itself fails
+            pass
+
+    def flush(self):
+        self.acquire()
+        try:
+            self._write_buffer()
+        finally:
+            self.release()
+
+    def _flush_periodically(self, interval: float):
+        while not self._stopped.wait(interval):
+            self.flush()
+
+    def close(self):
+        self._stopped.set()
+        self.flush()
+        super().close()
+
+
+def _open_destination(log_file: Optional[str]) -> BinaryIO:
+    if not log_file:
+        return sys.stdout.buffer
+    path = Path(log_file)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    return open(path, "ab", buffering=0)
+
+
+class _InProcessQueueHandler(QueueHandler):
     """
-    Configure logging for the application.
-    This sets up both console and file logging with appropriate formatting.
+    Queue handler that leaves formatting to the listener thread.
+
+    The stock QueueHandler formats the record (and its traceback) in the
+    calling thread to make it picklable; an in-process queue does not need
+    that, so only the message arguments are merged here.
     """
-    # Remove default loguru handler
-    logger.remove()
-    
-    # Configure standard logging first
+    def prepare(self, record):
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+def setup_logging(
+    name: Optional[str] = None,
+    level: str = LOG_LEVEL,
+    log_file: Optional[str] = LOG_FILE,
+    sample_rate: float = LOG_SAMPLE_RATE,
+    error_burst: int = LOG_ERROR_BURST,
+    error_window: float = LOG_ERROR_WINDOW,
+    stream: Optional[BinaryIO] = None,
+) -> logging.Logger:
+    """
+    Configure the application-wide logging pipeline.
+
+    Every record goes through one path: sampling and rate-limit filters on
+    the calling side, a queue, and a single buffered JSON writer drained by
+    a background thread. Calling it again replaces the previous pipeline.
+
+    Args:
+        name: Name of the logger to return
+        level: Root log level name
+        log_file: File to append to; stdout when empty
+        sample_rate: Share of per-command info lines to keep (0..1)
+        error_burst: Errors per call site allowed in each window (0 disables)
+        error_window: Rate-limit window in seconds
+        stream: Binary stream overriding log_file (used by benchmarks)
+
+    Returns:
+        Logger with the given name
+    """
+    global _listener
+
+    if _listener is not None:
+        _stop_listener(_listener)
+        _listener = None
+
     root_logger = logging.getLogger()
-    root_logger.setLevel(logging.INFO)
-    
-    # Clear any existing handlers
-    if root_logger.hasHandlers():
-        root_logger.handlers.clear()
-    
-    # Set up console handler with JSON formatter
-    console_handler = logging.StreamHandler(sys.stdout)
-    console_handler.setFormatter(SimpleJsonFormatter())
-    root_logger.addHandler(console_handler)
-    
-    # Set up file handler with JSON formatter
-    file_handler = logging.FileHandler(log_file)
-    file_handler.setFormatter(SimpleJsonFormatter())
-    root_logger.addHandler(file_handler)
-    
-    # Disable aiogram and other library logging to avoid duplicate entries
+    root_logger.setLevel(level)
+    for handler in list(root_logger.handlers):
+        root_logger.removeHandler(handler)
+
+    writer = BufferedWriterHandler(
+        stream or _open_destination(log_file),
+        capacity=LOG_BUFFER_SIZE,
+        flush_interval=LOG_FLUSH_INTERVAL,
+    )
+    writer.setFormatter(JSONFormatter())
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = _InProcessQueueHandler(log_queue)
+    queue_handler.addFilter(SamplingFilter(sample_rate))
+    queue_handler.addFilter(RateLimitFilter(error_burst, error_window))
+    root_logger.addHandler(queue_handler)
+
+    _listener = QueueListener(log_queue, writer, respect_handler_level=True)
+    _listener.start()
+
+    # Library loggers are noisy at INFO
     logging.getLogger("aiogram").setLevel(logging.WARNING)
     logging.getLogger("asyncio").setLevel(logging.WARNING)
-    
-    # Add loguru handlers for our own logging
-    logger.add(
-        sys.stdout,
-        serialize=json_serializer,
-        level="INFO",
-        enqueue=True,  # Safe for concurrent writes
-        backtrace=False,  # Simpler error logs
-        diagnose=False,  # Cleaner output
-    )
-    
-    # Add file handler with JSON formatting
-    logger.add(
-        log_file,
-        serialize=json_serializer,
-        level="DEBUG",
-        rotation="1 day",
-        retention="30 days",
-        compression="zip",
-        enqueue=True,
-        backtrace=False,
-        diagnose=False,
-    )
-    
-    # Disable uvicorn access logging if needed
     logging.getLogger("uvicorn.access").disabled = True
-    
-    # Log setup completion
-    logging.info("Logging system configured with simple JSON format")
-    
-    return logger 
\ No newline at end of file
+
+    return logging.getLogger(name)
+
+
+def _stop_listener(listener: QueueListener) -> None:
+    """Drain queued records and flush the writer unless already stopped"""
+    if listener._thread is not None:
+        listener.stop()
+    for handler in listener.handlers:
+        handler.close()
+
+
+@atexit.register
+def shutdown_logging() -> None:
+    """Drain the queue and flush the writer (also runs at exit)"""
+    global _listener
+    if _listener is not None:
+        _stop_listener(_listener)
+        _listener = None
+
+
+def _restart_after_fork() -> None:
+    """Threads do not survive fork (Celery prefork pool): restart them in the child"""
+    if _listener is None or _listener._thread is None:
+        return
+    _listener._thread = None
+    _listener.start()
+    for handler in _listener.handlers:
+        if isinstance(handler, BufferedWriterHandler):
+            handler.start_flusher()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_restart_after_fork)
@@ -0,0 +1,420 @@
+import asyncio
+import bisect
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    """Escape a label value for the Prometheus text format"""
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if value == int(value):
+        return str(int(value))
+    return repr(value)
+
+
+class _Metric:
+    """Base class for labelled metrics stored in process memory"""
+
+    type_name = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labelvalues: Sequence) -> LabelValues:
+        if len(labelvalues) != len(self.labelnames):
+            raise ValueError(
+                f"Metric {self.name} expects labels {self.labelnames}, got {tuple(labelvalues)}"
+            )
+        return tuple(str(v) for v in labelvalues)
+
+    def _labels(self, key: LabelValues, extra: Optional[Tuple[str, str]] = None) -> str:
+        pairs = [f'{name}="{_escape(value)}"' for name, value in zip(self.labelnames, key)]
+        if extra:
+            pairs.append(f'{extra[0]}="{extra[1]}"')
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+
+    def samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type_name}",
+        ]
+        lines.extend(self.samples())
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    """Monotonically increasing counter"""
+
+    type_name = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, *labelvalues, amount: float = 1.0) -> None:
+        key = self._key(labelvalues)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, *labelvalues) -> float:
+        return self._values.get(self._key(labelvalues), 0.0)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return [f"{self.name}{self._labels(k)} {_format_value(v)}" for k, v in items]
+
+
+class Gauge(_Metric):
+    """Value that can go up and down"""
+
+    type_name = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def set(self, value: float, *labelvalues) -> None:
+        key = self._key(labelvalues)
+        with self._lock:
+            self._values[key] = value
+
+    def value(self, *labelvalues) -> float:
+        return self._values.get(self._key(labelvalues), 0.0)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return [f"{self.name}{self._labels(k)} {_format_value(v)}" for k, v in items]
+
+
+class Histogram(_Metric):
+    """Bucketed distribution of observed values (latencies, lags)"""
+
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [non-cumulative bucket counts (+Inf last), sum, count]
+        self._values: Dict[LabelValues, list] = {}
+
+    def observe(self, value: float, *labelvalues) -> None:
+        key = self._key(labelvalues)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = [[0] * (len(self.buckets) + 1), 0.0, 0]
+                self._values[key] = state
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    @contextmanager
+    def time(self, *labelvalues):
+        """Observe the duration of the wrapped block in seconds"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, *labelvalues)
+
+    def count(self, *labelvalues) -> int:
+        state = self._values.get(self._key(labelvalues))
+        return state[2] if state else 0
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = [(k, list(v[0]), v[1], v[2]) for k, v in self._values.items()]
+        lines = []
+        for key, counts, total, count in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                labels = self._labels(key, ("le", _format_value(bound)))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            lines.append(f"{self.name}_sum{self._labels(key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{self._labels(key)} {count}")
+        return lines
+
+
+class Registry:
+    """Collection of metrics rendered together on the metrics endpoint"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return "\n".join(metric.render() for metric in metrics) + "\n"
+
+
+REGISTRY = Registry()
+
+# Bot handlers
+HANDLER_LATENCY = REGISTRY.histogram(
+    "bot_handler_latency_seconds",
+    "Update processing time by command, button or callback prefix",
+    ["command"],
+)
+HANDLER_ERRORS = REGISTRY.counter(
+    "bot_handler_errors_total",
+    "Updates that raised an exception by command, button or callback prefix",
+    ["command"],
+)
+# Label values the handler metrics accept. The registered commands, texts and
+# callback prefixes are added at startup (handlers.dispatch); anything else
+# a user types or sends is reported as "other"
+HANDLER_LABELS: Set[str] = {"message", "callback", "other"}
+
+# Database
+DB_QUERIES = REGISTRY.counter(
+    "db_queries_total", "Executed SQL statements by operation", ["operation"]
+)
+DB_QUERY_LATENCY = REGISTRY.histogram(
+    "db_query_latency_seconds",
+    "SQL statement execution time by operation",
+    ["operation"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0),
+)
+
+# Redis cache
+CACHE_REQUESTS = REGISTRY.counter(
+    "cache_requests_total", "Cache lookups by result (hit, miss, error)", ["result"]
+)
+
+# Message edits
+MESSAGE_EDITS = REGISTRY.counter(
+    "bot_message_edits_total",
+    "edit_text calls by result (edited, skipped locally, not_modified from the API)",
+    ["result"],
+)
+
+# Callback debouncing
+CALLBACK_QUERIES = REGISTRY.counter(
+    "bot_callback_queries_total",
+    "Callback queries by outcome (handled, duplicate tap, superseded navigation)",
+    ["result"],
+)
+
+# Reminders
+REMINDER_FANOUT_LAG = REGISTRY.histogram(
+    "reminder_fanout_lag_seconds",
+    "Delay between the scheduled reminder minute and the actual send",
+    ["source"],
+    buckets=(0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0),
+)
+REMINDERS_SENT = REGISTRY.counter(
+    "reminders_sent_total", "Reminder messages by source and status", ["source", "status"]
+)
+
+# Celery tasks
+TASK_RUNS = REGISTRY.counter(
+    "celery_task_runs_total", "Finished Celery task runs by task and state", ["task", "state"]
+)
+TASK_DURATION = REGISTRY.histogram(
+    "celery_task_duration_seconds",
+    "Celery task run time by task",
+    ["task"],
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0),
+)
+
+# Periodic summaries
+SUMMARY_CHUNK_DURATION = REGISTRY.histogram(
+    "summary_chunk_duration_seconds",
+    "Time to collect and render the summaries of one user id range",
+    ["period"],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0),
+)
+SUMMARY_MESSAGES = REGISTRY.counter(
+    "summary_messages_total",
+    "Summary messages by period and status (rendered, sent, blocked, failed)",
+    ["period", "status"],
+)
+
+# Repeating quests
+RECURRING_QUESTS_CREATED = REGISTRY.counter(
+    "recurring_quests_created_total", "Quests created from repeating templates"
+)
+RECURRING_MATERIALIZE_DURATION = REGISTRY.histogram(
+    "recurring_materialize_duration_seconds",
+    "Time of one INSERT ... SELECT over a timezone bucket",
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0),
+)
+
+# Event loop
+EVENT_LOOP_LAG = REGISTRY.histogram(
+    "event_loop_lag_seconds",
+    "Extra delay of a scheduled event loop wakeup",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0),
+)
+
+
+def callback_prefix(data: str) -> str:
+    """
+    Reduce callback data to its static prefix to keep label cardinality bounded.
+
+    Codec callbacks ("<prefix>:<payload>", see utils.callback_codec) map
+    to their schema prefix, older ones to their leading words.
+
+    Examples:
+        "qd:DA" -> "qd"
+        "inline_done_12" -> "inline_done"
+        "reflect_view_2025-04-01_0" -> "reflect_view"
+    """
+    head, separator, _ = data.partition(":")
+    if separator:
+        return head or "callback"
+    parts = []
+    for part in data.split("_"):
+        if not part.isalpha():
+            break
+        parts.append(part)
+    return "_".join(parts) or "callback"
+
+
+def handler_label(label: str) -> str:
+    """Map a label to a known value so user input can't add new series"""
+    return label if label in HANDLER_LABELS else "other"
+
+
+def instrument_engine(engine) -> None:
+    """
+    Count and time every SQL statement executed through the engine.
+
+    Args:
+        engine: SQLAlchemy Engine or AsyncEngine
+    """
+    from sqlalchemy import event
+
+    sync_engine = getattr(engine, "sync_engine", engine)
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("metrics_query_start", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        starts = conn.info.get("metrics_query_start")
+        if not starts:
+            return
+        elapsed = time.perf_counter() - starts.pop()
+        operation = statement.lstrip().split(None, 1)[0].upper() if statement else "OTHER"
+        DB_QUERIES.inc(operation)
+        DB_QUERY_LATENCY.observe(elapsed, operation)
+
+    @event.listens_for(sync_engine, "handle_error")
+    def _handle_error(exception_context):
+        conn = exception_context.connection
+        if conn is not None and conn.info.get("metrics_query_start"):
+            conn.info["metrics_query_start"].pop()
+        DB_QUERIES.inc("ERROR")
+
+
+async def monitor_event_loop_lag(interval: float = 1.0) -> None:
+    """Background task measuring how late the event loop wakes up a sleeper"""
+    loop = asyncio.get_running_loop()
+    while True:
+        start = loop.time()
+        await asyncio.sleep(interval)
+        EVENT_LOOP_LAG.observe(max(loop.time() - start - interval, 0.0))
+
+
+class _MetricsRequestHandler(BaseHTTPRequestHandler):
+    registry: Registry = REGISTRY
+
+    def do_GET(self):
+        if self.path.split("?", 1)[0] not in ("/metrics", "/"):
+            self.send_error(404)
+            return
+        body = self.registry.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Scrapes are frequent, keep them out of the application log
+        pass
+
+
+def start_http_server(
+    port: int, host: str = "127.0.0.1", registry: Registry = REGISTRY
+) -> Optional[ThreadingHTTPServer]:
+    """
+    Serve the registry in Prometheus text format from a daemon thread.
+
+    Args:
+        port: Port to listen on
+        host: Interface to bind, local-only by default
+        registry: Registry to expose
+
+    Returns:
+        Running server or None if the port could not be bound
+    """
+    handler = type("MetricsRequestHandler", (_MetricsRequestHandler,), {"registry": registry})
+    try:
+        server = ThreadingHTTPServer((host, port), handler)
+    except OSError as e:
+        logger.error(f"Failed to start metrics server on {host}:{port}: {e}")
+        return None
+
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True)
+    thread.start()
+    logger.info(f"Metrics endpoint listening on http://{host}:{port}/metrics")
+    return server
@@ -0,0 +1,73 @@
+import asyncio
+import logging
+import time
+from typing import Dict, Iterable, Tuple
+
+from aiogram import Bot
+from aiogram.exceptions import TelegramForbiddenError, TelegramRetryAfter
+
+logger = logging.getLogger(__name__)
+
+
+class RateLimiter:
+    """
+    Token bucket pacing calls to `rate` per second with bursts up to `burst`.
+
+    Shared by the coroutines of one event loop; Telegram allows about 30
+    messages per second per bot, split the budget between worker processes.
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+async def send_paced(
+    bot: Bot,
+    messages: Iterable[Tuple[str, str]],
+    limiter: RateLimiter,
+    max_retries: int = 2,
+) -> Dict[str, int]:
+    """
+    Send (chat_id, text) messages one by one within the limiter's rate.
+
+    Flood control answers (RetryAfter) pause the sender for the requested
+    time and retry the message; users who blocked the bot are skipped.
+
+    Returns:
+        Counts of sent, blocked and failed messages
+    """
+    counts = {"sent": 0, "blocked": 0, "failed": 0}
+    for chat_id, text in messages:
+        for attempt in range(max_retries + 1):
+            await limiter.acquire()
+            try:
+                await bot.send_message(chat_id=chat_id, text=text)
+                counts["sent"] += 1
+            except TelegramRetryAfter as e:
+                if attempt < max_retries:
+                    logger.warning(f"Flood control, pausing sender for {e.retry_after}s")
+                    await asyncio.sleep(e.retry_after)
+                    continue
+                counts["failed"] += 1
+            except TelegramForbiddenError:
+                counts["blocked"] += 1
+            except Exception as e:
+                counts["failed"] += 1
+                logger.error(f"Failed to send message to {chat_id}: {e}")
+            break
+    return counts
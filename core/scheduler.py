@@ -0,0 +1,168 @@
+import asyncio
+import logging
+import os
+import time
+import uuid
+from datetime import date, datetime, timedelta
+from typing import Awaitable, Callable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+MinuteJob = Callable[[datetime], Awaitable[None]]
+
+
+def floor_minute(moment: datetime) -> datetime:
+    return moment.replace(second=0, microsecond=0)
+
+
+class MinuteScheduler:
+    """
+    Run a per-minute job exactly once across all processes sharing Redis.
+
+    - ticks are aligned to minute boundaries, the job receives the minute
+      it runs for rather than the wall clock at wakeup;
+    - a leader lock keeps only one process per scheduler name active;
+    - every minute is claimed with SET NX, so even during a leader handover
+      a minute is processed once;
+    - minutes missed because of drift or a restart are caught up (at most
+      catch_up of them, older reminders are no longer useful);
+    - claim_send deduplicates deliveries per (user, date) across schedulers.
+
+    When Redis is unavailable the scheduler degrades to running every
+    minute locally, preferring a possible duplicate over a lost reminder.
+    """
+
+    def __init__(
+        self,
+        client,
+        name: str,
+        lock_ttl: int = 90,
+        catch_up: int = 5,
+        key_ttl: int = 2 * 86400,
+    ):
+        self.client = client
+        self.name = name
+        self.lock_ttl = lock_ttl
+        self.catch_up = catch_up
+        self.key_ttl = key_ttl
+        self.owner = f"{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        # Last minute processed by this process, used when Redis is down
+        self._local_last: Optional[datetime] = None
+
+    @property
+    def _prefix(self) -> str:
+        return f"scheduler:{self.name}"
+
+    async def is_leader(self) -> bool:
+        """Take or extend the leader lock"""
+        key = f"{self._prefix}:leader"
+        if await self.client.set(key, self.owner, nx=True, ex=self.lock_ttl):
+            return True
+        if await self.client.get(key) == self.owner:
+            await self.client.expire(key, self.lock_ttl)
+            return True
+        return False
+
+    async def claim_minute(self, minute: datetime) -> bool:
+        """Idempotency key of a minute; False if another process already ran it"""
+        key = f"{self._prefix}:minute:{minute:%Y%m%d%H%M}"
+        return bool(await self.client.set(key, self.owner, nx=True, ex=self.key_ttl))
+
+    @staticmethod
+    def _send_key(user_id: str, day: date, slot: str) -> str:
+        key = f"reminder:sent:{user_id}:{day:%Y%m%d}"
+        return f"{key}:{slot}" if slot else key
+
+    async def claim_send(self, user_id: str, day: date, slot: str = "") -> bool:
+        """
+        Reserve the reminder of a user for a day.
+
+        Args:
+            user_id: User's Telegram ID
+            day: Day of the reminder
+            slot: Time of day, for users with several reminders a day
+
+        Returns:
+            False if the reminder was already sent by any scheduler
+        """
+        try:
+            key = self._send_key(user_id, day, slot)
+            return bool(await self.client.set(key, self.owner, nx=True, ex=self.key_ttl))
+        except Exception as e:
+            logger.warning(f"Reminder dedup unavailable for {user_id}: {e}")
+            return True
+
+    async def release_send(self, user_id: str, day: date, slot: str = "") -> None:
+        """Drop the reservation after a failed send so it can be retried"""
+        try:
+            await self.client.delete(self._send_key(user_id, day, slot))
+        except Exception as e:
+            logger.warning(f"Failed to release reminder dedup for {user_id}: {e}")
+
+    async def pending_minutes(self, now: datetime) -> List[datetime]:
+        """Minutes since the last processed one up to now (inclusive)"""
+        current = floor_minute(now)
+        last_value = await self.client.get(f"{self._prefix}:last")
+        return self._minutes_after(datetime.fromisoformat(last_value) if last_value else None, current)
+
+    def _minutes_after(self, last: Optional[datetime], current: datetime) -> List[datetime]:
+        if last is None or last >= current:
+            return [current] if last is None else []
+        first = max(last + timedelta(minutes=1), current - timedelta(minutes=self.catch_up - 1))
+        count = int((current - first).total_seconds() // 60) + 1
+        return [first + timedelta(minutes=i) for i in range(count)]
+
+    async def tick(self, job: MinuteJob, now: Optional[datetime] = None) -> List[datetime]:
+        """
+        Run the job for every pending minute this process wins.
+
+        Returns:
+            Minutes the job was run for
+        """
+        now = now or datetime.now()
+        try:
+            if not await self.is_leader():
+                return []
+            minutes = await self.pending_minutes(now)
+        except Exception as e:
+            logger.warning(f"Scheduler {self.name}: Redis unavailable, running locally: {e}")
+            return await self._tick_locally(job, now)
+
+        ran = []
+        for minute in minutes:
+            try:
+                claimed = await self.claim_minute(minute)
+            except Exception as e:
+                logger.warning(f"Scheduler {self.name}: failed to claim {minute:%H:%M}: {e}")
+                claimed = True
+            if claimed:
+                await self._run(job, minute)
+                ran.append(minute)
+            try:
+                await self.client.set(f"{self._prefix}:last", minute.isoformat(), ex=self.key_ttl)
+            except Exception as e:
+                logger.warning(f"Scheduler {self.name}: failed to store progress: {e}")
+        self._local_last = floor_minute(now)
+        return ran
+
+    async def _tick_locally(self, job: MinuteJob, now: datetime) -> List[datetime]:
+        minutes = self._minutes_after(self._local_last, floor_minute(now))
+        for minute in minutes:
+            await self._run(job, minute)
+        if minutes:
+            self._local_last = minutes[-1]
+        return minutes
+
+    async def _run(self, job: MinuteJob, minute: datetime) -> None:
+        try:
+            await job(minute)
+        except Exception as e:
+            logger.error(f"Scheduler {self.name}: job failed for {minute:%H:%M}: {e}")
+
+    async def run_forever(self, job: MinuteJob) -> None:
+        """Tick shortly after every minute boundary"""
+        logger.info(f"Starting scheduler {self.name} ({self.owner})")
+        while True:
+            await self.tick(job)
+            # Sleep to the next boundary instead of a fixed 60s to avoid drift
+            await asyncio.sleep(60 - time.time() % 60 + 0.05)
@@ -0,0 +1,81 @@
+import logging
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+from core.metrics import TASK_DURATION, TASK_RUNS
+
+logger = logging.getLogger(__name__)
+
+
+class TaskStatsSink:
+    """
+    Aggregate Celery task runs into one Redis hash per task and day.
+
+    Periodic tasks run with ignored results; instead of a result blob per
+    run, the sink increments run/state counters, total run time and every
+    integer field of the returned dict (sent_count, error_count, ...).
+    """
+
+    def __init__(self, client, ttl: int = 7 * 86400, prefix: str = "celery:stats"):
+        self.client = client
+        self.ttl = ttl
+        self.prefix = prefix
+
+    def key(self, task_name: str, day: Optional[str] = None) -> str:
+        day = day or datetime.now(timezone.utc).strftime("%Y%m%d")
+        return f"{self.prefix}:{task_name}:{day}"
+
+    def record(self, task_name: str, state: str, runtime: float, retval: Any = None) -> None:
+        key = self.key(task_name)
+        pipe = self.client.pipeline(transaction=False)
+        pipe.hincrby(key, "runs", 1)
+        pipe.hincrby(key, f"state:{state}", 1)
+        pipe.hincrbyfloat(key, "runtime_seconds", runtime)
+        if isinstance(retval, dict):
+            for field, value in retval.items():
+                if isinstance(value, int) and not isinstance(value, bool):
+                    pipe.hincrby(key, field, value)
+        pipe.expire(key, self.ttl)
+        pipe.execute()
+
+    def read(self, task_name: str, day: Optional[str] = None) -> Dict[str, float]:
+        """Aggregated stats of a task for a day (YYYYMMDD, UTC), today by default"""
+        raw = self.client.hgetall(self.key(task_name, day))
+        return {
+            (field.decode() if isinstance(field, bytes) else field): float(value)
+            for field, value in raw.items()
+        }
+
+
+def install_task_stats(sink: Optional[TaskStatsSink] = None) -> None:
+    """
+    Record run time and state of every task in the metrics registry and,
+    when a sink is given, in its aggregated Redis stats.
+    """
+    from celery.signals import task_prerun, task_postrun
+
+    started: Dict[str, float] = {}
+    lock = threading.Lock()
+
+    @task_prerun.connect(weak=False)
+    def _task_started(task_id=None, **kwargs):
+        with lock:
+            started[task_id] = time.perf_counter()
+
+    @task_postrun.connect(weak=False)
+    def _task_finished(task_id=None, task=None, retval=None, state=None, **kwargs):
+        with lock:
+            start = started.pop(task_id, None)
+        if start is None or task is None:
+            return
+        runtime = time.perf_counter() - start
+        TASK_RUNS.inc(task.name, state or "UNKNOWN")
+        TASK_DURATION.observe(runtime, task.name)
+        if sink is None:
+            return
+        try:
+            sink.record(task.name, state or "UNKNOWN", runtime, retval)
+        except Exception as e:
+            logger.warning(f"Failed to record stats for {task.name}: {e}")
@@ -0,0 +1,389 @@
+import atexit
+import functools
+import inspect
+import json
+import logging
+import queue
+import random
+import threading
+import time
+import urllib.request
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+_current_span: ContextVar[Optional["Span"]] = ContextVar("current_span", default=None)
+
+
+class Span:
+    """Timed operation inside a trace"""
+
+    __slots__ = (
+        "name", "trace_id", "span_id", "parent_id", "sampled",
+        "start_ns", "end_ns", "attributes", "error",
+    )
+
+    def __init__(
+        self,
+        name: str,
+        trace_id: int,
+        parent_id: Optional[int],
+        sampled: bool,
+        attributes: Optional[Dict[str, Any]] = None,
+    ):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = random.getrandbits(64)
+        self.parent_id = parent_id
+        self.sampled = sampled
+        self.start_ns = time.time_ns()
+        self.end_ns = 0
+        self.attributes = attributes or {}
+        self.error: Optional[str] = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    @property
+    def duration_ms(self) -> float:
+        return (self.end_ns - self.start_ns) / 1e6
+
+    def to_otlp(self) -> Dict[str, Any]:
+        """Span in the OTLP/JSON wire shape"""
+        span = {
+            "traceId": f"{self.trace_id:032x}",
+            "spanId": f"{self.span_id:016x}",
+            "name": self.name,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": [
+                {"key": key, "value": {"stringValue": str(value)}}
+                for key, value in self.attributes.items()
+                if value is not None
+            ],
+            "status": {"code": 2, "message": self.error} if self.error else {"code": 1},
+        }
+        if self.parent_id:
+            span["parentSpanId"] = f"{self.parent_id:016x}"
+        return span
+
+
+class FileSpanExporter:
+    """Append spans to a local file, one OTLP/JSON span per line"""
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+    def export(self, spans: List[Span]) -> None:
+        lines = "".join(json.dumps(span.to_otlp(), ensure_ascii=False) + "\n" for span in spans)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(lines)
+
+
+class OTLPHttpExporter:
+    """Send spans to an OTLP/HTTP collector (JSON encoding)"""
+
+    def __init__(self, endpoint: str, service_name: str, timeout: float = 5.0):
+        self.endpoint = endpoint
+        self.service_name = service_name
+        self.timeout = timeout
+
+    def export(self, spans: List[Span]) -> None:
+        payload = {
+            "resourceSpans": [{
+                "resource": {"attributes": [
+                    {"key": "service.name", "value": {"stringValue": self.service_name}}
+                ]},
+                "scopeSpans": [{
+                    "scope": {"name": "rpg_bot"},
+                    "spans": [span.to_otlp() for span in spans],
+                }],
+            }]
+        }
+        request = urllib.request.Request(
+            self.endpoint,
+            data=json.dumps(payload).encode("utf-8"),
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout):
+            pass
+
+
+_NOTHING = object()
+
+
+class BatchSpanProcessor:
+    """Export finished spans in batches from a background thread"""
+
+    def __init__(self, exporter, max_batch: int = 512, interval: float = 2.0):
+        self.exporter = exporter
+        self.max_batch = max_batch
+        self.interval = interval
+        self._queue: "queue.SimpleQueue[Optional[Span]]" = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._run, name="span-exporter", daemon=True)
+        self._thread.start()
+
+    def on_end(self, span: Span) -> None:
+        self._queue.put(span)
+
+    def _run(self) -> None:
+        batch: List[Span] = []
+        deadline = time.monotonic() + self.interval
+        while True:
+            try:
+                finished = self._queue.get(timeout=max(deadline - time.monotonic(), 0.01))
+            except queue.Empty:
+                finished = _NOTHING
+            if finished is None:
+                self._export(batch)
+                return
+            if finished is not _NOTHING:
+                batch.append(finished)
+            if len(batch) >= self.max_batch or time.monotonic() >= deadline:
+                self._export(batch)
+                batch = []
+                deadline = time.monotonic() + self.interval
+
+    def _export(self, batch: List[Span]) -> None:
+        if not batch:
+            return
+        try:
+            self.exporter.export(batch)
+        except Exception as e:
+            logger.warning(f"Failed to export {len(batch)} spans: {e}")
+
+    def shutdown(self) -> None:
+        self._queue.put(None)
+        self._thread.join(timeout=5)
+
+
+class Tracer:
+    """Creates spans and hands sampled ones to the processor"""
+
+    def __init__(self, processor: Optional[BatchSpanProcessor] = None, sample_rate: float = 1.0):
+        self.processor = processor
+        self.sample_rate = sample_rate
+
+    @property
+    def enabled(self) -> bool:
+        return self.processor is not None
+
+    def start_span(
+        self,
+        name: str,
+        attributes: Optional[Dict[str, Any]] = None,
+        parent: Optional[Span] = None,
+    ) -> Span:
+        parent = parent if parent is not None else _current_span.get()
+        if parent is None:
+            return Span(name, random.getrandbits(128), None,
+                        random.random() < self.sample_rate, attributes)
+        return Span(name, parent.trace_id, parent.span_id, parent.sampled, attributes)
+
+    def end_span(self, span: Span) -> None:
+        span.end_ns = time.time_ns()
+        if span.sampled and self.processor is not None:
+            self.processor.on_end(span)
+
+
+_tracer = Tracer()
+
+
+def configure_tracing(
+    enabled: bool,
+    exporter: str = "file",
+    sample_rate: float = 1.0,
+    file_path: str = "logs/traces.jsonl",
+    otlp_endpoint: str = "http://127.0.0.1:4318/v1/traces",
+    service_name: str = "rpg_bot",
+) -> None:
+    """
+    Configure the process-wide tracer.
+
+    Args:
+        enabled: When False spans are not created at all
+        exporter: "file" for a local JSONL file or "otlp" for an OTLP/HTTP collector
+        sample_rate: Share of root spans (whole traces) that are recorded
+        file_path: Output file for the file exporter
+        otlp_endpoint: Collector URL for the OTLP exporter
+        service_name: service.name resource attribute
+    """
+    global _tracer
+
+    if _tracer.processor is not None:
+        _tracer.processor.shutdown()
+
+    if not enabled:
+        _tracer = Tracer()
+        return
+
+    if exporter == "otlp":
+        span_exporter = OTLPHttpExporter(otlp_endpoint, service_name)
+    else:
+        span_exporter = FileSpanExporter(file_path)
+    _tracer = Tracer(BatchSpanProcessor(span_exporter), sample_rate)
+    logger.info(f"Tracing enabled: exporter={exporter}, sample_rate={sample_rate}")
+
+
+@atexit.register
+def _shutdown() -> None:
+    if _tracer.processor is not None:
+        _tracer.processor.shutdown()
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+@contextmanager
+def span(name: str, parent: Optional[Span] = None, **attributes):
+    """
+    Run the block inside a child span of the current one.
+
+    Yields None when tracing is disabled, so callers should not rely on
+    the span object being present.
+    """
+    tracer = _tracer
+    if not tracer.enabled:
+        yield None
+        return
+
+    current = tracer.start_span(name, attributes, parent)
+    token = _current_span.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        _current_span.reset(token)
+        tracer.end_span(current)
+
+
+def traced(name: Optional[str] = None):
+    """
+    Decorator wrapping a function call in a span.
+
+    Usage:
+        @staticmethod
+        @traced()
+        async def add_quest(...):
+    """
+    def decorator(func):
+        span_name = name or func.__qualname__
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                if not _tracer.enabled:
+                    return await func(*args, **kwargs)
+                with span(span_name):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _tracer.enabled:
+                return func(*args, **kwargs)
+            with span(span_name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def inject(headers: Dict[str, Any]) -> None:
+    """Add a W3C traceparent header for the current span"""
+    current = _current_span.get()
+    if current is not None:
+        flags = "01" if current.sampled else "00"
+        headers["traceparent"] = f"00-{current.trace_id:032x}-{current.span_id:016x}-{flags}"
+
+
+def extract(traceparent: Optional[str]) -> Optional[Span]:
+    """Build a remote parent span from a W3C traceparent header"""
+    if not traceparent:
+        return None
+    try:
+        _, trace_id, span_id, flags = traceparent.split("-")
+        parent = Span("remote", int(trace_id, 16), None, flags == "01")
+        parent.span_id = int(span_id, 16)
+        return parent
+    except ValueError:
+        return None
+
+
+def instrument_engine(engine) -> None:
+    """
+    Record a span for every SQL statement executed inside a traced request.
+
+    Args:
+        engine: SQLAlchemy Engine or AsyncEngine
+    """
+    from sqlalchemy import event
+
+    sync_engine = getattr(engine, "sync_engine", engine)
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        parent = _current_span.get()
+        if parent is None or not parent.sampled:
+            return
+        operation = statement.lstrip().split(None, 1)[0].upper() if statement else "OTHER"
+        db_span = _tracer.start_span(f"db.{operation}", {"db.statement": statement[:200]}, parent)
+        conn.info.setdefault("trace_spans", []).append(db_span)
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        spans = conn.info.get("trace_spans")
+        if spans:
+            _tracer.end_span(spans.pop())
+
+    @event.listens_for(sync_engine, "handle_error")
+    def _handle_error(exception_context):
+        conn = exception_context.connection
+        spans = conn.info.get("trace_spans") if conn is not None else None
+        if spans:
+            db_span = spans.pop()
+            db_span.error = str(exception_context.original_exception)
+            _tracer.end_span(db_span)
+
+
+def install_celery_tracing() -> None:
+    """Propagate trace context through Celery message headers"""
+    from celery.signals import before_task_publish, task_prerun, task_postrun
+
+    active: Dict[str, tuple] = {}
+
+    @before_task_publish.connect(weak=False)
+    def _inject_headers(headers=None, **kwargs):
+        if headers is not None and _tracer.enabled:
+            inject(headers)
+
+    @task_prerun.connect(weak=False)
+    def _start_task_span(task_id=None, task=None, **kwargs):
+        if not _tracer.enabled:
+            return
+        request = task.request
+        traceparent = request.get("traceparent") or (request.headers or {}).get("traceparent")
+        task_span = _tracer.start_span(
+            f"celery.{task.name}", {"celery.task_id": task_id}, extract(traceparent)
+        )
+        active[task_id] = (task_span, _current_span.set(task_span))
+
+    @task_postrun.connect(weak=False)
+    def _end_task_span(task_id=None, state=None, **kwargs):
+        entry = active.pop(task_id, None)
+        if entry is None:
+            return
+        task_span, token = entry
+        task_span.set_attribute("celery.state", state)
+        try:
+            _current_span.reset(token)
+        except ValueError:
+            _current_span.set(None)
+        _tracer.end_span(task_span)
@@ -7,6 +7,7 @@ from typing import AsyncGenerator
 
 from config import get_database_url
 from db.models import Base
+from core import metrics, tracing
 
 # Определяем, какую базу использовать
 # В Docker контейнере будет использоваться PostgreSQL, локально - SQLite
@@ -19,6 +20,11 @@ engine = create_async_engine(
     echo=False,  # Set to True for SQL debugging
 )
 
+# Collect query counts and latencies for the metrics endpoint
+metrics.instrument_engine(engine)
+# Record SQL statements as spans of the current trace
+tracing.instrument_engine(engine)
+
 # Create async session factory
 async_session = sessionmaker(
     engine,
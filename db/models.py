@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, DateTime, Text
+from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, DateTime, Date, Text, Index, UniqueConstraint
+from sqlalchemy import DDL, event
 from sqlalchemy.ext.declarative import declarative_base
 from datetime import datetime
 
@@ -29,10 +30,72 @@ class Quest(Base):
     phase = Column(String, nullable=True)
     created_at = Column(DateTime, default=datetime.now)
     completed_at = Column(DateTime, nullable=True)
+    # Set on instances created from a repeating quest template
+    template_id = Column(Integer, ForeignKey("quest_templates.id"), nullable=True)
+    due_date = Column(Date, nullable=True)
+
+    # Keyset pagination of a user's quest list, with and without status filter;
+    # one instance per template and day
+    __table_args__ = (
+        Index("ix_quests_user_id_id", "user_id", "id"),
+        Index("ix_quests_user_id_status_id", "user_id", "status", "id"),
+        Index("uq_quests_template_id_due_date", "template_id", "due_date", unique=True),
+    )
     
     def __repr__(self):
         return f"<Quest(id={self.id}, text={self.text[:20]}{'...' if len(self.text) > 20 else ''}, status={self.status})>"
 
+class QuestTemplate(Base):
+    """Repeating quest materialized into a Quest on the days of its weekday mask"""
+    __tablename__ = "quest_templates"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    text = Column(String, nullable=False)
+    phase = Column(String, nullable=True)
+    # Bit i set = repeats on weekday i (Monday is 0), see utils.recurrence
+    weekday_mask = Column(Integer, nullable=False, default=127)
+    timezone = Column(String, nullable=False)
+    active = Column(Boolean, nullable=False, default=True)
+    # Last local day an instance was created for
+    materialized_on = Column(Date, nullable=True)
+    created_at = Column(DateTime, default=datetime.now)
+
+    # The daily job selects one timezone bucket at a time
+    __table_args__ = (
+        Index("ix_quest_templates_timezone_materialized_on", "timezone", "materialized_on"),
+        Index("ix_quest_templates_user_id", "user_id"),
+    )
+
+    def __repr__(self):
+        return f"<QuestTemplate(id={self.id}, text={self.text[:20]}, weekday_mask={self.weekday_mask})>"
+
+class Reminder(Base):
+    """Reminder of one kind (reflection, quests, phase) at a daily time"""
+    __tablename__ = "reminders"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    kind = Column(String, nullable=False)
+    # Time of day as minutes after midnight
+    minute = Column(Integer, nullable=False)
+    # NULL while the reminder is switched off
+    next_fire_at = Column(DateTime, nullable=True)
+    created_at = Column(DateTime, default=datetime.now)
+
+    # Schedulers claim due rows in next_fire_at order
+    __table_args__ = (
+        Index("uq_reminders_user_id_kind", "user_id", "kind", unique=True),
+        Index("ix_reminders_next_fire_at", "next_fire_at"),
+    )
+
+    def __repr__(self):
+        return f"<Reminder(user_id={self.user_id}, kind={self.kind}, next_fire_at={self.next_fire_at})>"
+
+# On PostgreSQL insights and reflections are partitioned by created_at
+# month (migration e7c2a4f6b8d1, PRIMARY KEY (id, created_at)); ids still
+# come from one sequence, so the ORM identity stays id. Old partitions are
+# moved to the cold archive by services.partition_service.
 class Insight(Base):
     """Insight model representing user thoughts and ideas"""
     __tablename__ = "insights"
@@ -70,4 +133,83 @@ class LastActive(Base):
     phase = Column(String, nullable=True)
     
     def __repr__(self):
-        return f"<LastActive(user_id={self.user_id}, context={self.context})>" 
\ No newline at end of file
+        return f"<LastActive(user_id={self.user_id}, context={self.context})>"
+
+class DailyStat(Base):
+    """Per-user daily rollup maintained on every write, read by /stats"""
+    __tablename__ = "daily_stats"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    day = Column(Date, nullable=False)
+    phase = Column(String, nullable=True)
+    quests_added = Column(Integer, nullable=False, default=0)
+    quests_done = Column(Integer, nullable=False, default=0)
+    insights = Column(Integer, nullable=False, default=0)
+    reflections = Column(Integer, nullable=False, default=0)
+
+    # The unique index also serves the month range read (user_id, day BETWEEN ...)
+    __table_args__ = (
+        UniqueConstraint("user_id", "day", name="uq_daily_stats_user_id_day"),
+    )
+
+    def __repr__(self):
+        return f"<DailyStat(user_id={self.user_id}, day={self.day}, phase={self.phase})>"
+
+
+# Full-text search over insights and reflections (/search).
+# PostgreSQL: GIN expression indexes over a Russian tsvector, led by user_id
+# (btree_gin) so one user's matches are found without touching others.
+# Queries must repeat SEARCH_DOCUMENTS verbatim for the planner to use them.
+# SQLite: external-content FTS5 tables kept in sync by triggers.
+# Both are maintained incrementally on every insert, update and delete.
+SEARCH_CONFIG = "russian"
+SEARCH_DOCUMENTS = {
+    "insights": "coalesce(text, '')",
+    "reflections": "coalesce(important, '') || ' ' || coalesce(worked, '') || ' ' || coalesce(change, '')",
+}
+SEARCH_COLUMNS = {
+    "insights": ("text",),
+    "reflections": ("important", "worked", "change"),
+}
+
+
+def _postgresql_search_ddl(table: str):
+    return [
+        DDL("CREATE EXTENSION IF NOT EXISTS btree_gin"),
+        DDL(
+            f"CREATE INDEX IF NOT EXISTS ix_{table}_search ON {table} "
+            f"USING gin (user_id, to_tsvector('{SEARCH_CONFIG}', {SEARCH_DOCUMENTS[table]}))"
+        ),
+    ]
+
+
+def _sqlite_search_ddl(table: str):
+    # user_id is indexed as a token: "user_id:42 AND ..." intersects the
+    # posting lists instead of filtering every user's matches afterwards
+    columns = ", ".join(("user_id",) + SEARCH_COLUMNS[table])
+    new_values = ", ".join(f"new.{column}" for column in ("user_id",) + SEARCH_COLUMNS[table])
+    old_values = ", ".join(f"old.{column}" for column in ("user_id",) + SEARCH_COLUMNS[table])
+    delete = f"INSERT INTO {table}_fts({table}_fts, rowid, {columns}) VALUES ('delete', old.id, {old_values});"
+    insert = f"INSERT INTO {table}_fts(rowid, {columns}) VALUES (new.id, {new_values});"
+    return [
+        DDL(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {table}_fts USING fts5({columns}, "
+            f"content='{table}', content_rowid='id', tokenize='unicode61 remove_diacritics 2')"
+        ),
+        DDL(f"CREATE TRIGGER IF NOT EXISTS {table}_fts_ai AFTER INSERT ON {table} BEGIN {insert} END"),
+        DDL(f"CREATE TRIGGER IF NOT EXISTS {table}_fts_ad AFTER DELETE ON {table} BEGIN {delete} END"),
+        DDL(f"CREATE TRIGGER IF NOT EXISTS {table}_fts_au AFTER UPDATE ON {table} BEGIN {delete} {insert} END"),
+    ]
+
+
+for _model in (Insight, Reflection):
+    _table = _model.__tablename__
+    for _ddl in _postgresql_search_ddl(_table):
+        event.listen(_model.__table__, "after_create", _ddl.execute_if(dialect="postgresql"))
+    for _ddl in _sqlite_search_ddl(_table):
+        event.listen(_model.__table__, "after_create", _ddl.execute_if(dialect="sqlite"))
+    event.listen(
+        _model.__table__, "before_drop",
+        DDL(f"DROP TABLE IF EXISTS {_table}_fts").execute_if(dialect="sqlite"),
+    )
@@ -1,3 +1,4 @@
+from .dispatch import router as dispatch_router, index as dispatch_index
 from .phase import router as phase_router
 from .quests import router as quests_router
 from .insight import router as insight_router
@@ -5,11 +6,39 @@ from .reflect import router as reflect_router
 from .reminder import router as reminder_router
 from .user import router as user_router
 from .settings import router as settings_router
+from .stats import router as stats_router
+from .export import router as export_router
+from .search import router as search_router
+from .recurring import router as recurring_router
 from .onboarding import router as onboarding_router
 from .buttons import router as buttons_router
-from .faq import router as faq_router
+from .faq import router as faq_router, faq_cache
+from .fallback import router as fallback_router
+
+# Routers in the order the dispatcher includes them, after dispatch_router;
+# the dispatch index relies on it for first-match order
+ROUTERS = [
+    phase_router,
+    quests_router,
+    insight_router,
+    reflect_router,
+    reminder_router,
+    user_router,
+    settings_router,
+    stats_router,
+    export_router,
+    search_router,
+    recurring_router,
+    onboarding_router,
+    buttons_router,
+    faq_router,
+    fallback_router,
+]
 
 __all__ = [
+    "ROUTERS",
+    "dispatch_router",
+    "dispatch_index",
     "phase_router",
     "quests_router",
     "insight_router",
@@ -17,7 +46,13 @@ __all__ = [
     "reminder_router",
     "user_router",
     "settings_router",
+    "stats_router",
+    "export_router",
+    "search_router",
+    "recurring_router",
     "onboarding_router",
     "buttons_router",
     "faq_router",
+    "faq_cache",
+    "fallback_router",
 ]
\ No newline at end of file
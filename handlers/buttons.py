@@ -1,6 +1,7 @@
 from aiogram import Router, F
 from aiogram.types import Message, KeyboardButton, ReplyKeyboardMarkup, InlineKeyboardMarkup, InlineKeyboardButton, CallbackQuery
 from aiogram.fsm.context import FSMContext
+from aiogram.dispatcher.event.handler import HandlerObject
 from handlers.insight import handle_insight
 from handlers.reflect import handle_reflect_start
 from handlers.phase import handle_start_day
@@ -33,43 +34,51 @@ async def handle_faq_command(message: Message):
     from handlers.faq import faq_intro
     await faq_intro(message)
 
+async def show_focus(message: Message):
+    await message.answer(await render_today_message(str(message.from_user.id)))
+
+# Кнопки клавиатуры -> обработчики. Регистрируются точным совпадением текста,
+# поэтому попадают в индекс handlers.dispatch и не требуют перебора
+BUTTON_ACTIONS = {
+    "👤 Мой статус": show_status,
+    "🎯 Сегодня": handle_start_day,
+    "🎯 Фокус": show_focus,
+    "📋 Квесты": handle_status,
+    "➕ Новый квест": start_add_quest,
+    "✅ Завершить квест": handle_done,
+    "🧠 Инсайт": handle_insight,
+    "🕯 Рефлексия": handle_reflect_start,
+    "⚙️ Настройки": show_settings,
+    "❓ Помощь": help_cmd,
+    "🗑️ Удалить квест": handle_delete_quest,
+}
+
+for button_text, action in BUTTON_ACTIONS.items():
+    router.message.register(action, F.text == button_text)
+
+# Запасной поиск по подстроке для старых клавиатур (другие эмодзи, пробелы)
+BUTTON_KEYWORDS = [
+    ("Мой статус", HandlerObject(show_status)),
+    ("Сегодня", HandlerObject(handle_start_day)),
+    ("Фокус", HandlerObject(show_focus)),
+    ("Квесты", HandlerObject(handle_status)),
+    ("Новый квест", HandlerObject(start_add_quest)),
+    ("Завершить", HandlerObject(handle_done)),
+    ("Инсайт", HandlerObject(handle_insight)),
+    ("Рефлексия", HandlerObject(handle_reflect_start)),
+    ("Настройки", HandlerObject(show_settings)),
+    ("Помощь", HandlerObject(help_cmd)),
+    ("Удалить квест", HandlerObject(handle_delete_quest)),
+]
+
 @router.message()
 async def handle_keyboard_button(message: Message, state: FSMContext):
-    text = message.text.strip()
-
-    if "Мой статус" in text:
-        await show_status(message)
-
-    elif "Сегодня" in text:
-        await handle_start_day(message)
-
-    elif "Фокус" in text:
-        text = render_today_message(str(message.from_user.id))
-        await message.answer(text)
-
-    elif "Квесты" in text:
-        await handle_status(message)
-
-    elif "Новый квест" in text:
-        await start_add_quest(message, state)
-
-    elif "Завершить" in text:
-        await handle_done(message)
-
-    elif "Инсайт" in text:
-        await handle_insight(message, state)
-
-    elif "Рефлексия" in text:
-        await handle_reflect_start(message, state)
-
-    elif "Настройки" in text:
-        await show_settings(message)
-
-    elif "Помощь" in text:
-        await help_cmd(message)
+    text = (message.text or "").strip()
 
-    elif "Удалить квест" in text:
-        await handle_delete_quest(message)
+    for keyword, action in BUTTON_KEYWORDS:
+        if keyword in text:
+            await action.call(message, state=state)
+            return
 
 # Отмена через inline кнопки
 @router.callback_query(F.data == "cancel_insight")
@@ -0,0 +1,240 @@
+import operator
+from typing import Any, Dict, Iterable, Optional, Set, Tuple
+
+from aiogram import Router
+from aiogram.dispatcher.event.handler import HandlerObject
+from aiogram.filters import Command, CommandObject, StateFilter
+from aiogram.fsm.state import State
+from aiogram.types import CallbackQuery, Message
+from magic_filter.operations import CallOperation, ComparatorOperation, GetAttributeOperation
+
+from core.metrics import callback_prefix
+
+router = Router(name="dispatch")
+
+# Индекс: ключ -> (порядок регистрации, обработчик)
+Entry = Tuple[int, HandlerObject]
+
+
+def _magic_key(magic) -> Optional[Tuple[str, str, str]]:
+    """
+    Разбор простых magic-фильтров:
+        F.text == "/reflect"            -> ("eq", "text", "/reflect")
+        F.data.startswith("insight_")   -> ("prefix", "data", "insight_")
+    """
+    ops = getattr(magic, "_operations", ())
+    if (
+        len(ops) == 2
+        and isinstance(ops[0], GetAttributeOperation)
+        and isinstance(ops[1], ComparatorOperation)
+        and ops[1].comparator is operator.eq
+        and isinstance(ops[1].right, str)
+    ):
+        return "eq", ops[0].name, ops[1].right
+    if (
+        len(ops) == 3
+        and isinstance(ops[0], GetAttributeOperation)
+        and isinstance(ops[1], GetAttributeOperation)
+        and ops[1].name == "startswith"
+        and isinstance(ops[2], CallOperation)
+        and len(ops[2].args) == 1
+        and isinstance(ops[2].args[0], str)
+        and not ops[2].kwargs
+    ):
+        return "prefix", ops[0].name, ops[2].args[0]
+    return None
+
+
+def _requires_state(callback) -> bool:
+    """Фильтр срабатывает только в конкретном состоянии FSM (не при state=None)"""
+    if isinstance(callback, State):
+        return callback.state not in (None, "*")
+    if isinstance(callback, StateFilter):
+        return all(
+            isinstance(state, State) and state.state not in (None, "*")
+            or isinstance(state, str) and state != "*"
+            for state in callback.states
+        )
+    return False
+
+
+class DispatchIndex:
+    """
+    Хэш-индекс обработчиков по точному тексту, команде и callback data.
+
+    Строится один раз при старте из уже подключенных роутеров. Индексируются
+    обработчики с единственным фильтром вида F.text == ..., Command(...),
+    F.data == ... или F.data.startswith(...). Порядок роутеров сохраняется:
+    обработчик за "ловушкой" без фильтров или за фильтром, который индекс
+    не понимает, не индексируется и обрабатывается обычным способом.
+    """
+
+    def __init__(self):
+        self.texts: Dict[str, Entry] = {}
+        self.commands: Dict[str, Entry] = {}
+        self.callbacks: Dict[str, Entry] = {}
+        self.prefixes: Dict[str, Entry] = {}
+        self.prefix_lengths: Tuple[int, ...] = ()
+        # Метки метрик всех зарегистрированных команд, текстов и
+        # callback-префиксов, в том числе неиндексируемых
+        self.labels: Set[str] = set()
+
+    def __len__(self) -> int:
+        return len(self.texts) + len(self.commands) + len(self.callbacks) + len(self.prefixes)
+
+    def compile(self, routers: Iterable[Router]) -> "DispatchIndex":
+        self.texts, self.commands, self.callbacks, self.prefixes = {}, {}, {}, {}
+        self.labels = set()
+        order = 0
+        message_open = callback_open = True
+
+        for current in routers:
+            if current is router:
+                continue
+            # Фильтры и middleware уровня роутера индекс обойти не должен
+            indexable = (
+                not current.message._handler.filters
+                and not current.callback_query._handler.filters
+                and not current.message.middleware._middlewares
+                and not current.callback_query.middleware._middlewares
+            )
+
+            for handler in current.message.handlers:
+                order += 1
+                self._add_labels(handler)
+                if message_open:
+                    message_open = self._add_message(handler, order, indexable)
+            for handler in current.callback_query.handlers:
+                order += 1
+                self._add_labels(handler)
+                if callback_open:
+                    callback_open = self._add_callback(handler, order, indexable)
+
+        lengths = {len(prefix) for prefix in self.prefixes}
+        self.prefix_lengths = tuple(sorted(lengths, reverse=True))
+        return self
+
+    def _add_labels(self, handler: HandlerObject) -> None:
+        for filter_object in handler.filters:
+            if isinstance(filter_object.callback, Command):
+                self.labels.update(
+                    f"/{name}" for name in filter_object.callback.commands if isinstance(name, str)
+                )
+                continue
+            key = _magic_key(filter_object.magic)
+            if key is None:
+                continue
+            if key[1] == "text":
+                self.labels.add(key[2])
+            elif key[1] == "data":
+                self.labels.add(callback_prefix(key[2]))
+
+    def _add_message(self, handler: HandlerObject, order: int, indexable: bool) -> bool:
+        """Добавить обработчик сообщений; False — дальше индексировать нельзя"""
+        callbacks = [f.callback for f in handler.filters]
+        if any(_requires_state(callback) for callback in callbacks):
+            return True
+        if not indexable or len(handler.filters) != 1:
+            return False
+
+        filter_object = handler.filters[0]
+        if isinstance(filter_object.callback, Command):
+            command = filter_object.callback
+            if command.prefix != "/" or command.ignore_case or not all(
+                isinstance(name, str) for name in command.commands
+            ):
+                return False
+            for name in command.commands:
+                self.commands.setdefault(name, (order, handler))
+            return True
+
+        key = _magic_key(filter_object.magic)
+        if key is None or key[:2] != ("eq", "text"):
+            return False
+        self.texts.setdefault(key[2], (order, handler))
+        return True
+
+    def _add_callback(self, handler: HandlerObject, order: int, indexable: bool) -> bool:
+        """Добавить обработчик callback; False — дальше индексировать нельзя"""
+        if any(_requires_state(f.callback) for f in handler.filters):
+            return True
+        if not indexable or len(handler.filters) != 1:
+            return False
+
+        key = _magic_key(handler.filters[0].magic)
+        if key is None or key[1] != "data":
+            return False
+        target = self.callbacks if key[0] == "eq" else self.prefixes
+        target.setdefault(key[2], (order, handler))
+        return True
+
+    def resolve_message(self, text: Optional[str]) -> Optional[Tuple[HandlerObject, Dict[str, Any]]]:
+        if not text:
+            return None
+        exact = self.texts.get(text)
+
+        command_entry = None
+        extra: Dict[str, Any] = {}
+        if text[0] == "/":
+            full_command, _, args = text.partition(" ")
+            # Упоминание бота (/cmd@bot) проверяет обычный фильтр Command
+            if "@" not in full_command:
+                command_entry = self.commands.get(full_command[1:])
+                if command_entry is not None:
+                    extra["command"] = CommandObject(
+                        prefix="/", command=full_command[1:], args=args or None
+                    )
+
+        if exact is not None and (command_entry is None or exact[0] < command_entry[0]):
+            return exact[1], {}
+        if command_entry is not None:
+            return command_entry[1], extra
+        return None
+
+    def resolve_callback(self, data: Optional[str]) -> Optional[HandlerObject]:
+        if not data:
+            return None
+        # Точное совпадение важнее префикса ("reflect_back_months" и "reflect_back_")
+        entry = self.callbacks.get(data)
+        if entry is not None:
+            return entry[1]
+        for length in self.prefix_lengths:
+            entry = self.prefixes.get(data[:length])
+            if entry is not None:
+                return entry[1]
+        return None
+
+
+index = DispatchIndex()
+
+
+async def message_index_filter(message: Message, raw_state: Optional[str] = None):
+    # В состоянии FSM ввод принадлежит обработчику состояния
+    if raw_state is not None:
+        return False
+    resolved = index.resolve_message(message.text)
+    if resolved is None:
+        return False
+    handler, extra = resolved
+    return {"dispatch_target": handler, **extra}
+
+
+async def callback_index_filter(callback: CallbackQuery, raw_state: Optional[str] = None):
+    if raw_state is not None:
+        return False
+    handler = index.resolve_callback(callback.data)
+    if handler is None:
+        return False
+    return {"dispatch_target": handler}
+
+
+@router.message(message_index_filter)
+async def dispatch_message(message: Message, dispatch_target: HandlerObject, **kwargs):
+    kwargs["handler"] = dispatch_target
+    return await dispatch_target.call(message, **kwargs)
+
+
+@router.callback_query(callback_index_filter)
+async def dispatch_callback(callback: CallbackQuery, dispatch_target: HandlerObject, **kwargs):
+    kwargs["handler"] = dispatch_target
+    return await dispatch_target.call(callback, **kwargs)
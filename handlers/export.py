@@ -0,0 +1,66 @@
+from aiogram import Router, F
+from aiogram.types import Message, CallbackQuery, InlineKeyboardButton
+from aiogram.utils.keyboard import InlineKeyboardBuilder
+import logging
+
+from config import ARCHIVE_DIR, EXPORT_INLINE_MAX_ROWS, EXPORT_SPOOL_SIZE
+from utils.archive import with_archived
+from utils.callback_codec import EXPORT_FORMAT
+from utils.export import SpooledInputFile, export_filename, legacy_rows, write_rows
+from utils.storage import read_data
+
+router = Router()
+logger = logging.getLogger(__name__)
+
+# Статичная клавиатура выбора формата
+_format_kb = InlineKeyboardBuilder()
+_format_kb.row(
+    InlineKeyboardButton(text="📝 Markdown", callback_data=EXPORT_FORMAT.pack(fmt="md")),
+    InlineKeyboardButton(text="🧾 JSON", callback_data=EXPORT_FORMAT.pack(fmt="json")),
+)
+FORMAT_KEYBOARD = _format_kb.as_markup()
+
+
+def count_export_rows(user_data: dict) -> int:
+    return sum(len(user_data.get(key) or []) for key in ("quests", "insights", "reflections"))
+
+
+@router.message(F.text == "/export")
+async def export_start(message: Message):
+    await message.answer(
+        "📦 <b>Экспорт данных</b>\n\nКвесты, инсайты и рефлексии одним файлом. В каком формате?",
+        reply_markup=FORMAT_KEYBOARD
+    )
+
+
+@router.callback_query(EXPORT_FORMAT.filter)
+async def export_format(callback: CallbackQuery):
+    user_id = str(callback.from_user.id)
+    fmt = EXPORT_FORMAT.unpack(callback.data).fmt
+    if fmt not in ("md", "json"):
+        await callback.answer("Неизвестный формат", show_alert=True)
+        return
+
+    # В выгрузку попадают и архивные месяцы
+    user_data = with_archived(ARCHIVE_DIR, read_data().get(user_id) or {}, user_id)
+    rows = count_export_rows(user_data)
+
+    # Большую историю собирает воркер Celery и присылает документ сам
+    if rows > EXPORT_INLINE_MAX_ROWS:
+        from celery_app import app
+
+        app.send_task("tasks.export_user_data", args=[user_id, callback.message.chat.id, fmt])
+        await callback.message.edit_text("⏳ Готовлю файл, пришлю его, как только он будет готов.")
+        await callback.answer()
+        return
+
+    if not rows:
+        await callback.message.edit_text("Данных для экспорта пока нет.")
+        await callback.answer()
+        return
+
+    writer = write_rows(fmt, user_id, legacy_rows(user_data), EXPORT_SPOOL_SIZE)
+    with writer.file as file:
+        await callback.message.answer_document(SpooledInputFile(file, export_filename(fmt)))
+    await callback.message.edit_text(f"✅ Экспорт готов: {rows} записей.")
+    await callback.answer()
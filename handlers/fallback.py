@@ -0,0 +1,10 @@
+from aiogram import Router
+from aiogram.types import CallbackQuery
+
+router = Router()
+
+# Подключается последним: callback без обработчика (например, кнопки старых
+# сообщений в прежнем формате callback_data) не должен оставлять "часики"
+@router.callback_query()
+async def handle_stale_callback(callback: CallbackQuery):
+    await callback.answer("Кнопка устарела, открой раздел заново.")
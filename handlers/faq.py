@@ -2,6 +2,12 @@ from aiogram import Router, F
 from aiogram.types import Message, CallbackQuery, InlineKeyboardButton
 from aiogram.utils.keyboard import InlineKeyboardBuilder, InlineKeyboardMarkup
 from aiogram.filters import Command
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+import time
+
+from config import FAQ_SOURCE_CHAT_ID, FAQ_SOURCE_MESSAGE_IDS
+from utils.callback_codec import FAQ_ITEM, FAQ_PAGE
+from utils.render_cache import edit_text_cached
 
 router = Router()
 
@@ -94,52 +100,39 @@ FAQ_ENTRIES = [
 
 ITEMS_PER_PAGE = 5
 
-@router.message(Command("faq"))
-async def faq_intro(message: Message):
-    kb = build_faq_keyboard(page=0)
-    text = (
-        "📚 <b>FAQ — Частые вопросы</b>\n"
-        "Этот раздел поможет понять, как устроен бот и как получать от него максимум.\n\n"
-        "Просто выбери интересующий вопрос 👇"
-    )
-    await message.answer(text, reply_markup=kb)
-
-@router.callback_query(F.data.startswith("faq_page_"))
-async def show_faq_page(callback: CallbackQuery):
-    page = int(callback.data.split("_")[-1])
-    kb = build_faq_keyboard(page)
-    await callback.message.edit_text("📚 <b>Выбери вопрос:</b>", reply_markup=kb)
-    await callback.answer()
-
-@router.callback_query(F.data.startswith("faq_item_"))
-async def show_faq_item(callback: CallbackQuery):
-    idx = int(callback.data.split("_")[-1])
-    question, answer = FAQ_ENTRIES[idx]
-    text = f"❓ <b>{question}</b>\n\n{answer}"
+INTRO_TEXT = (
+    "📚 <b>FAQ — Частые вопросы</b>\n"
+    "Этот раздел поможет понять, как устроен бот и как получать от него максимум.\n\n"
+    "Просто выбери интересующий вопрос 👇"
+)
+PAGE_TEXT = "📚 <b>Выбери вопрос:</b>"
+STALE_TEXT = "Кнопка устарела, открой раздел заново."
 
-    page = idx // ITEMS_PER_PAGE
-    kb = build_faq_keyboard(page)
 
-    await callback.message.edit_text(text, reply_markup=kb)
-    await callback.answer()
+class FaqPayload(NamedTuple):
+    """Готовое к отправке сообщение FAQ"""
+    text: str
+    reply_markup: InlineKeyboardMarkup
+    # id поста в FAQ_SOURCE_CHAT_ID для copy_message
+    source_message_id: Optional[int] = None
 
 
-def build_faq_keyboard(page: int) -> InlineKeyboardMarkup:
+def build_faq_keyboard(page: int, entries: Sequence[Tuple[str, str]] = FAQ_ENTRIES) -> InlineKeyboardMarkup:
     kb = InlineKeyboardBuilder()
     start = page * ITEMS_PER_PAGE
     end = start + ITEMS_PER_PAGE
 
     # Кнопки вопросов — по одной в строку
-    for i, (question, _) in enumerate(FAQ_ENTRIES[start:end], start=start):
-        kb.button(text=question, callback_data=f"faq_item_{i}")
+    for i, (question, _) in enumerate(entries[start:end], start=start):
+        kb.button(text=question, callback_data=FAQ_ITEM.pack(item=i))
     kb.adjust(1)
 
     # Навигация
     nav_buttons = []
     if start > 0:
-        nav_buttons.append(InlineKeyboardButton(text="⬅️", callback_data=f"faq_page_{page - 1}"))
-    if end < len(FAQ_ENTRIES):
-        nav_buttons.append(InlineKeyboardButton(text="➡️", callback_data=f"faq_page_{page + 1}"))
+        nav_buttons.append(InlineKeyboardButton(text="⬅️", callback_data=FAQ_PAGE.pack(page=page - 1)))
+    if end < len(entries):
+        nav_buttons.append(InlineKeyboardButton(text="➡️", callback_data=FAQ_PAGE.pack(page=page + 1)))
 
     if nav_buttons:
         kb.row(*nav_buttons)
@@ -147,3 +140,72 @@ def build_faq_keyboard(page: int) -> InlineKeyboardMarkup:
     return kb.as_markup()
 
 
+class FaqCache:
+    """
+    FAQ, собранный один раз при импорте: вступление, страницы и ответы —
+    готовые тексты с клавиатурами, поиск по номеру за O(1).
+    """
+
+    def __init__(self, entries: Sequence[Tuple[str, str]], source_message_ids: Sequence[Optional[int]] = ()):
+        started = time.perf_counter()
+        page_count = max(1, -(-len(entries) // ITEMS_PER_PAGE))
+        keyboards = [build_faq_keyboard(page, entries) for page in range(page_count)]
+
+        self.intro = FaqPayload(INTRO_TEXT, keyboards[0])
+        self.pages: List[FaqPayload] = [FaqPayload(PAGE_TEXT, kb) for kb in keyboards]
+        self.items: Dict[int, FaqPayload] = {
+            i: FaqPayload(
+                f"❓ <b>{question}</b>\n\n{answer}",
+                keyboards[i // ITEMS_PER_PAGE],
+                source_message_ids[i] if i < len(source_message_ids) else None,
+            )
+            for i, (question, answer) in enumerate(entries)
+        }
+        self.compile_seconds = time.perf_counter() - started
+
+    def report(self) -> str:
+        payloads = [self.intro, *self.pages, *self.items.values()]
+        size = sum(len(p.text.encode("utf-8")) + len(p.reply_markup.model_dump_json()) for p in payloads)
+        copied = sum(1 for p in self.items.values() if p.source_message_id)
+        return (
+            f"FAQ compiled: {len(self.items)} entries, {len(self.pages)} pages, "
+            f"{size / 1024:.1f} KiB, {copied} via copy_message, {self.compile_seconds * 1000:.2f} ms"
+        )
+
+
+faq_cache = FaqCache(FAQ_ENTRIES, FAQ_SOURCE_MESSAGE_IDS if FAQ_SOURCE_CHAT_ID else ())
+
+
+@router.message(Command("faq"))
+async def faq_intro(message: Message):
+    payload = faq_cache.intro
+    await message.answer(payload.text, reply_markup=payload.reply_markup)
+
+@router.callback_query(FAQ_PAGE.filter)
+async def show_faq_page(callback: CallbackQuery):
+    page = FAQ_PAGE.unpack(callback.data).page
+    if page >= len(faq_cache.pages):
+        await callback.answer(STALE_TEXT)
+        return
+    payload = faq_cache.pages[page]
+    await edit_text_cached(callback.message, payload.text, reply_markup=payload.reply_markup)
+    await callback.answer()
+
+@router.callback_query(FAQ_ITEM.filter)
+async def show_faq_item(callback: CallbackQuery):
+    payload = faq_cache.items.get(FAQ_ITEM.unpack(callback.data).item)
+    if payload is None:
+        await callback.answer(STALE_TEXT)
+        return
+
+    if payload.source_message_id:
+        # Ответ уже опубликован в канале — Telegram копирует пост без повторной отправки текста
+        await callback.bot.copy_message(
+            chat_id=callback.message.chat.id,
+            from_chat_id=FAQ_SOURCE_CHAT_ID,
+            message_id=payload.source_message_id,
+            reply_markup=payload.reply_markup,
+        )
+    else:
+        await edit_text_cached(callback.message, payload.text, reply_markup=payload.reply_markup)
+    await callback.answer()
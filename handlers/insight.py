@@ -1,16 +1,15 @@
 from aiogram import Router, F
 from aiogram.types import Message, CallbackQuery, InlineKeyboardButton, InlineKeyboardMarkup
 from aiogram.utils.keyboard import InlineKeyboardBuilder
-from aiogram.exceptions import TelegramBadRequest
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import State, StatesGroup
 from datetime import datetime
-from pathlib import Path
-from utils.helpers import update_last_active
-import json
+from utils.helpers import record_daily_stat, update_last_active
+from utils.render_cache import edit_text_cached, remember_sent
+from utils.callback_codec import INSIGHT_DELETE, INSIGHT_NAV
+from utils.storage import load_data, read_data, save_data
 
 router = Router()
-DATA_FILE = Path("storage/data.json")
 
 class InsightState(StatesGroup):
     waiting = State()
@@ -45,12 +44,7 @@ async def save_insight(message: Message, state: FSMContext):
     user_id = str(message.from_user.id)
     insight = message.text.strip()
 
-    if not DATA_FILE.exists():
-        data = {}
-    else:
-        with open(DATA_FILE, "r") as f:
-            data = json.load(f)
-
+    data = load_data()
     user_data = data.get(user_id, {})
     insights = user_data.get("insights", [])
 
@@ -61,10 +55,9 @@ async def save_insight(message: Message, state: FSMContext):
         "date": datetime.now().strftime("%Y-%m-%d %H:%M")
     })
     user_data["insights"] = insights
+    record_daily_stat(user_data, "insights")
     data[user_id] = user_data
-
-    with open(DATA_FILE, "w") as f:
-        json.dump(data, f, indent=2)
+    await save_data(data)
 
     await message.answer("✅ Инсайт сохранён.")
     await state.clear()
@@ -73,13 +66,11 @@ async def save_insight(message: Message, state: FSMContext):
 async def handle_thoughts(message: Message):
     user_id = str(message.from_user.id)
 
-    if not DATA_FILE.exists():
+    data = read_data()
+    if not data:
         await message.answer("🧠 Мысли не найдены.")
         return
 
-    with open(DATA_FILE, "r") as f:
-        data = json.load(f)
-
     insights = data.get(user_id, {}).get("insights", [])
 
     if not insights:
@@ -102,47 +93,39 @@ async def show_insight(target, insights, index: int):
     next_index = (index + 1) % total
 
     kb.row(
-        InlineKeyboardButton(text="⬅️", callback_data=f"insight_nav_{prev_index}"),
-        InlineKeyboardButton(text="🗑️", callback_data=f"insight_delete_{index}"),
-        InlineKeyboardButton(text="➡️", callback_data=f"insight_nav_{next_index}")
+        InlineKeyboardButton(text="⬅️", callback_data=INSIGHT_NAV.pack(pos=prev_index)),
+        InlineKeyboardButton(text="🗑️", callback_data=INSIGHT_DELETE.pack(pos=index)),
+        InlineKeyboardButton(text="➡️", callback_data=INSIGHT_NAV.pack(pos=next_index))
     )
 
+    markup = kb.as_markup()
     if isinstance(target, Message):
-        await target.answer(text, reply_markup=kb.as_markup())
+        sent = await target.answer(text, reply_markup=markup)
+        remember_sent(sent, text, markup)
     elif isinstance(target, CallbackQuery):
-        try:
-            await target.message.edit_text(text, reply_markup=kb.as_markup())
-        except TelegramBadRequest as e:
-            if "message is not modified" in str(e):
-                await target.answer("📌 Это уже текущая запись.")
-            else:
-                raise e
-        else:
+        if await edit_text_cached(target.message, text, reply_markup=markup):
             await target.answer()
+        else:
+            await target.answer("📌 Это уже текущая запись.")
 
-@router.callback_query(F.data.startswith("insight_nav_"))
+@router.callback_query(INSIGHT_NAV.filter)
 async def handle_insight_navigation(callback: CallbackQuery):
-    index = int(callback.data.split("_")[-1])
+    index = INSIGHT_NAV.unpack(callback.data).pos
     user_id = str(callback.from_user.id)
 
-    with open(DATA_FILE, "r") as f:
-        data = json.load(f)
-
-    insights = data.get(user_id, {}).get("insights", [])
+    insights = read_data().get(user_id, {}).get("insights", [])
     if not insights:
         await callback.message.edit_text("Нет инсайтов.")
         return
 
-    await show_insight(callback, insights, index)
+    await show_insight(callback, insights, min(index, len(insights) - 1))
 
-@router.callback_query(F.data.startswith("insight_delete_"))
+@router.callback_query(INSIGHT_DELETE.filter)
 async def delete_insight(callback: CallbackQuery):
     user_id = str(callback.from_user.id)
-    index = int(callback.data.split("_")[-1])
-
-    with open(DATA_FILE, "r") as f:
-        data = json.load(f)
+    index = INSIGHT_DELETE.unpack(callback.data).pos
 
+    data = load_data()
     insights = data.get(user_id, {}).get("insights", [])
 
     if index >= len(insights):
@@ -151,9 +134,7 @@ async def delete_insight(callback: CallbackQuery):
 
     del insights[index]
     data[user_id]["insights"] = insights
-
-    with open(DATA_FILE, "w") as f:
-        json.dump(data, f, indent=2)
+    await save_data(data)
 
     if not insights:
         await callback.message.edit_text("🧠 Все инсайты удалены.")
@@ -6,20 +6,23 @@ from utils.keyboards import main_keyboard
 
 router = Router()
 
+WELCOME_TEXT = (
+    "🎮 <b>Добро пожаловать в RPG-жизнь</b>\n\n"
+    "Этот бот — твоя ролевая система развития. Он помогает:\n"
+    "• Определять свою фазу\n"
+    "• Планировать день как квест\n"
+    "• Фиксировать важные мысли\n"
+    "• Рефлексировать каждый вечер\n\n"
+    "Готов начать путь?"
+)
+
+_start_kb = InlineKeyboardBuilder()
+_start_kb.button(text="🚀 Начать", callback_data="onboarding_start_day")
+START_KEYBOARD = _start_kb.as_markup()
+
 @router.message(F.text == "/start")
 async def cmd_start(message: Message):
-    text = (
-        "🎮 <b>Добро пожаловать в RPG-жизнь</b>\n\n"
-        "Этот бот — твоя ролевая система развития. Он помогает:\n"
-        "• Определять свою фазу\n"
-        "• Планировать день как квест\n"
-        "• Фиксировать важные мысли\n"
-        "• Рефлексировать каждый вечер\n\n"
-        "Готов начать путь?"
-    )
-    kb = InlineKeyboardBuilder()
-    kb.button(text="🚀 Начать", callback_data="onboarding_start_day")
-    await message.answer(text, reply_markup=kb.as_markup())
+    await message.answer(WELCOME_TEXT, reply_markup=START_KEYBOARD)
     await message.answer("📋 Главное меню доступно ниже:", reply_markup=main_keyboard)
 
 @router.callback_query(F.data == "onboarding_start_day")
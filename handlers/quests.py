@@ -1,19 +1,25 @@
 from aiogram import Router, F
 from aiogram.types import Message, CallbackQuery, InlineKeyboardButton
-from aiogram.utils.keyboard import InlineKeyboardBuilder
 from aiogram.exceptions import TelegramBadRequest
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import State, StatesGroup
 from aiogram.filters import Command
 from datetime import datetime
-from pathlib import Path
-import json
-
-from utils.helpers import update_last_active
-from utils.quest_logic import get_quest_by_phase
+from html import escape
+
+from utils.helpers import record_daily_stat, update_last_active
+from utils.quest_logic import get_quest_by_phase, matches_phase_tip
+from utils.recommend import recommender
+from utils.recurrence import materialize_due
+from utils.storage import load_data, read_data, save_data
+from config import RECOMMENDATION_TOP_K
+from utils.render_cache import edit_text_cached
+from utils.callback_codec import QUEST_DELETE, QUEST_DONE, QUEST_PAGE
+from utils.quest_render import (
+    VIEW_DELETE, VIEW_DONE, VIEW_STATUS, current_after, paginate, render_quest_list,
+)
 
 router = Router()
-DATA_FILE = Path("storage/data.json")
 
 class QuestStates(StatesGroup):
     waiting_for_text = State()
@@ -23,9 +29,18 @@ def get_next_id(quests):
         return 1
     return max(q["id"] for q in quests) + 1
 
+def render_suggestions(user_id: str, user_data: dict) -> str:
+    """Подсказки квестов на текущую фазу из уже построенного индекса"""
+    pending = [q.get("text", "") for q in user_data.get("quests", []) if q.get("status") == "todo"]
+    suggestions = recommender.suggest(user_id, user_data.get("phase"), RECOMMENDATION_TOP_K, exclude=pending)
+    if not suggestions:
+        return ""
+    return "\n\n💡 <b>Обычно в этой фазе получается:</b>\n" + "\n".join(f"• {escape(text)}" for text in suggestions)
+
 @router.message(Command("add_quest"))
 async def start_add_quest(message: Message, state: FSMContext):
-    await message.answer("📝 Напиши квест:")
+    user_data = read_data().get(str(message.from_user.id), {})
+    await message.answer("📝 Напиши квест:" + render_suggestions(str(message.from_user.id), user_data))
     await state.set_state(QuestStates.waiting_for_text)
 
 @router.message(F.text == "➕ Новый квест")
@@ -41,21 +56,15 @@ async def save_quest(message: Message, state: FSMContext):
         await message.answer("⛔️ Квест не может быть пустым.")
         return
 
-    if DATA_FILE.exists():
-        with open(DATA_FILE, "r") as f:
-            data = json.load(f)
-    else:
-        data = {}
-
+    data = load_data()
     user_data = data.get(user_id, {})
     quests = user_data.get("quests", [])
     phase = user_data.get("phase")
     update_last_active(user_data, context="quest", phase=phase)
 
     # 🔥 проверка соответствия фазе
-    phase_tip = get_quest_by_phase(phase) if phase else None
-    if phase and phase_tip and not any(kw.lower() in quest.lower() for kw in phase_tip.lower().split()):
-        await message.answer(f"⚠️ Этот квест может не соответствовать текущей фазе: <b>{phase.upper()}</b>\n💡 Рекомендация: {phase_tip}")
+    if phase and not matches_phase_tip(quest, phase):
+        await message.answer(f"⚠️ Этот квест может не соответствовать текущей фазе: <b>{phase.upper()}</b>\n💡 Рекомендация: {get_quest_by_phase(phase)}")
 
     new_id = get_next_id(quests)
     quests.append({
@@ -65,10 +74,9 @@ async def save_quest(message: Message, state: FSMContext):
         "phase": phase
     })
     user_data["quests"] = quests
+    record_daily_stat(user_data, "quests_added")
     data[user_id] = user_data
-
-    with open(DATA_FILE, "w") as f:
-        json.dump(data, f, indent=2)
+    await save_data(data)
 
     await state.clear()
     await message.answer("✅ Квест добавлен!", show_alert=True)
@@ -78,143 +86,118 @@ async def save_quest(message: Message, state: FSMContext):
 async def handle_status(message: Message):
     user_id = str(message.from_user.id)
 
-    if not DATA_FILE.exists():
+    user_data = read_data().get(user_id, {})
+    # Повторяющиеся квесты появляются при первом просмотре за день
+    if user_data.get("templates"):
+        data = load_data()
+        user_data = data.get(user_id, {})
+        if materialize_due(user_data):
+            data[user_id] = user_data
+            await save_data(data)
+    quests = user_data.get("quests", [])
+
+    if not quests:
         await message.answer("У тебя пока нет квестов.")
         return
 
-    with open(DATA_FILE, "r") as f:
-        data = json.load(f)
+    text, markup = render_quest_list(paginate(quests), VIEW_STATUS)
+    await message.answer(text, reply_markup=markup)
 
-    user_data = data.get(user_id, {})
-    quests = user_data.get("quests", [])
+@router.callback_query(QUEST_PAGE.filter)
+async def handle_quest_page(callback: CallbackQuery):
+    user_id = str(callback.from_user.id)
+    cursor = QUEST_PAGE.unpack(callback.data)
 
+    quests = read_data().get(user_id, {}).get("quests", [])
     if not quests:
-        await message.answer("У тебя пока нет квестов.")
+        await callback.answer("У тебя пока нет квестов.")
         return
 
-    lines = ["📋 <b>Твои квесты:</b>\n"]
-    keyboard = InlineKeyboardBuilder()
+    # Для выбора квеста к завершению показываются только активные
+    status = "todo" if cursor.view == VIEW_DONE else None
+    page = paginate(quests, after=cursor.after, before=cursor.before, status=status)
+    if not page.items:
+        await callback.answer("Список пуст.")
+        return
 
-    for q in quests:
-        status_icon = "✅" if q.get("status") == "done" else "🕒"
-        phase_note = f" ({q.get('phase')})" if q.get("phase") else ""
-        lines.append(f"{status_icon} <b>{q['id']}</b>: {q['text']}{phase_note}")
-        if q.get("status") != "done":
-            keyboard.button(
-                text=f"✅ Завершить: {q['text'][:20]}",
-                callback_data=f"inline_done_{q['id']}"
-            )
-
-    keyboard.adjust(1)
-    await message.answer("\n".join(lines), reply_markup=keyboard.as_markup())
-
-@router.callback_query(F.data.startswith("inline_done_"))
+    text, markup = render_quest_list(page, cursor.view)
+    await edit_text_cached(callback.message, text, reply_markup=markup)
+    await callback.answer()
+
+@router.callback_query(QUEST_DONE.filter)
 async def handle_inline_done(callback: CallbackQuery):
     user_id = str(callback.from_user.id)
-    quest_id = int(callback.data.split("_")[-1])
+    quest_id = QUEST_DONE.unpack(callback.data).quest_id
 
-    if not DATA_FILE.exists():
+    data = load_data()
+    if not data:
         await callback.answer("Нет данных.")
         return
 
-    with open(DATA_FILE, "r") as f:
-        data = json.load(f)
-
     user_data = data.get(user_id, {})
     quests = user_data.get("quests", [])
 
     for q in quests:
         if q["id"] == quest_id:
+            # Повторное или устаревшее нажатие не должно снова попадать в статистику
+            if q.get("status") == "done":
+                await callback.answer("Квест уже выполнен.")
+                return
             q["status"] = "done"
             update_last_active(user_data, context="quest_done", phase=user_data.get("phase"))
+            record_daily_stat(user_data, "quests_done")
+            recommender.record_done(user_id, q.get("phase"), q.get("text", ""))
             break
     else:
-        await callback.answer("⛔️ Квест не найден или уже выполнен.")
+        await callback.answer("⛔️ Квест не найден.")
         return
 
-    with open(DATA_FILE, "w") as f:
-        json.dump(data, f, indent=2)
+    await save_data(data)
 
-    lines = ["📋 <b>Твои квесты:</b>\n"]
-    keyboard = InlineKeyboardBuilder()
-    for q in quests:
-        status_icon = "✅" if q.get("status") == "done" else "🕒"
-        phase_note = f" ({q.get('phase')})" if q.get("phase") else ""
-        lines.append(f"{status_icon} <b>{q['id']}</b>: {q['text']}{phase_note}")
-        if q.get("status") != "done":
-            keyboard.button(
-                text=f"✅ Завершить: {q['text'][:20]}",
-                callback_data=f"inline_done_{q['id']}"
-            )
-    keyboard.adjust(1)
-    await callback.message.edit_text("\n".join(lines), reply_markup=keyboard.as_markup())
+    # Остаемся на странице, где был завершенный квест
+    page = paginate(quests, after=current_after(callback.message.reply_markup))
+    text, markup = render_quest_list(page, VIEW_STATUS)
+    await edit_text_cached(callback.message, text, reply_markup=markup)
     await callback.answer("✅ Квест завершён!", show_alert=True)
 
 @router.message(Command("done"))
 async def handle_done(message: Message):
     user_id = str(message.from_user.id)
 
-    if not DATA_FILE.exists():
-        await message.answer("У тебя пока нет квестов.")
-        return
-
-    with open(DATA_FILE, "r") as f:
-        data = json.load(f)
+    quests = read_data().get(user_id, {}).get("quests", [])
+    page = paginate(quests, status="todo")
 
-    quests = data.get(user_id, {}).get("quests", [])
-    pending = [q for q in quests if q["status"] == "todo"]
-
-    if not pending:
+    if not page.items:
         await message.answer("Нет активных квестов для завершения.")
         return
 
-    keyboard = InlineKeyboardBuilder()
-    for q in pending:
-        keyboard.button(text=f"{q['id']}: {q['text'][:30]}", callback_data=f"inline_done_{q['id']}")
-    keyboard.adjust(1)
-
-    await message.answer("Выбери квест, который выполнил:", reply_markup=keyboard.as_markup())
+    text, markup = render_quest_list(page, VIEW_DONE)
+    await message.answer(text, reply_markup=markup)
 
 @router.message(F.text == "/delete_quest")
 async def handle_delete_quest(message: Message):
     user_id = str(message.from_user.id)
 
-    if not DATA_FILE.exists():
-        await message.answer("Квесты не найдены.")
-        return
-
-    with open(DATA_FILE, "r") as f:
-        data = json.load(f)
-
-    quests = data.get(user_id, {}).get("quests", [])
+    quests = read_data().get(user_id, {}).get("quests", [])
 
     if not quests:
         await message.answer("Пока нет квестов.")
         return
 
-    builder = InlineKeyboardBuilder()
-    for q in quests:
-        label = f"{q['id']}: {q['text'][:30]}"
-        builder.button(text=f"❌ {label}", callback_data=f"del_quest_{q['id']}")
-    builder.adjust(1)
+    text, markup = render_quest_list(paginate(quests), VIEW_DELETE)
+    await message.answer(text, reply_markup=markup)
 
-    await message.answer("Выбери квест для удаления:", reply_markup=builder.as_markup())
 
-
-@router.callback_query(F.data.startswith("del_quest_"))
+@router.callback_query(QUEST_DELETE.filter)
 async def delete_quest(callback: CallbackQuery):
     user_id = str(callback.from_user.id)
-    quest_id = int(callback.data.split("_")[-1])
-
-    with open(DATA_FILE, "r") as f:
-        data = json.load(f)
+    quest_id = QUEST_DELETE.unpack(callback.data).quest_id
 
+    data = load_data()
     quests = data.get(user_id, {}).get("quests", [])
     quests = [q for q in quests if q["id"] != quest_id]
     data[user_id]["quests"] = quests
-
-    with open(DATA_FILE, "w") as f:
-        json.dump(data, f, indent=2)
+    await save_data(data)
 
     await callback.message.edit_text("🗑️ Квест удалён.")
     await callback.answer()
\ No newline at end of file
@@ -0,0 +1,102 @@
+from aiogram import Router
+from aiogram.types import Message, CallbackQuery, InlineKeyboardButton, InlineKeyboardMarkup
+from aiogram.filters import Command, CommandObject
+from html import escape
+
+from config import DEFAULT_TIMEZONE
+from utils.callback_codec import REPEAT_DELETE
+from utils.recurrence import describe_mask, materialize_due, parse_rule
+from utils.storage import load_data, save_data
+
+router = Router()
+
+USAGE = (
+    "🔁 <b>Повторяющиеся квесты</b>\n\n"
+    "<code>/repeat правило текст</code>\n\n"
+    "Правило:\n"
+    "• <code>ежедневно</code>, <code>будни</code>, <code>выходные</code>\n"
+    "• дни недели: <code>пн,ср,пт</code>\n"
+    "• как в cron: <code>1-5</code>, <code>1,3,5</code>\n\n"
+    "Пример: <code>/repeat будни Зарядка 10 минут</code>"
+)
+
+
+def render_templates(templates):
+    """Список шаблонов с кнопками удаления"""
+    if not templates:
+        return "Повторяющихся квестов пока нет.\n\n" + USAGE, None
+    lines = ["🔁 <b>Повторяющиеся квесты</b>\n"]
+    buttons = []
+    for template in templates:
+        lines.append(f"• {escape(template['text'])} — <i>{describe_mask(template['mask'])}</i>")
+        buttons.append([InlineKeyboardButton(
+            text=f"🗑️ {template['text'][:30]}",
+            callback_data=REPEAT_DELETE.pack(template_id=template["id"]),
+        )])
+    return "\n".join(lines), InlineKeyboardMarkup(inline_keyboard=buttons)
+
+
+@router.message(Command("repeat"))
+async def handle_repeat(message: Message, command: CommandObject):
+    user_id = str(message.from_user.id)
+    data = load_data()
+    user_data = data.get(user_id, {})
+    templates = user_data.get("templates", [])
+
+    rule, _, text = (command.args or "").strip().partition(" ")
+    if not rule:
+        text, markup = render_templates(templates)
+        await message.answer(text, reply_markup=markup)
+        return
+
+    try:
+        mask = parse_rule(rule)
+    except ValueError:
+        await message.answer("Не понял правило повтора.\n\n" + USAGE)
+        return
+    text = text.strip()
+    if not text:
+        await message.answer("Добавь текст квеста после правила.\n\n" + USAGE)
+        return
+
+    templates.append({
+        "id": max((template["id"] for template in templates), default=0) + 1,
+        "text": text,
+        "mask": mask,
+        "phase": None,
+        "tz": DEFAULT_TIMEZONE,
+        "last_date": None,
+    })
+    user_data["templates"] = templates
+    # Если сегодня подходящий день, квест появится сразу
+    added = materialize_due(user_data)
+    data[user_id] = user_data
+    await save_data(data)
+
+    await message.answer(
+        f"🔁 Квест «{escape(text)}» будет появляться {describe_mask(mask)}."
+        + ("\nСегодняшний уже в /status." if added else "")
+    )
+
+
+@router.callback_query(REPEAT_DELETE.filter)
+async def delete_template(callback: CallbackQuery):
+    user_id = str(callback.from_user.id)
+    template_id = REPEAT_DELETE.unpack(callback.data).template_id
+    data = load_data()
+    user_data = data.get(user_id, {})
+    templates = user_data.get("templates", [])
+
+    remaining = [template for template in templates if template["id"] != template_id]
+    if len(remaining) == len(templates):
+        await callback.answer("Уже удалено.")
+        return
+
+    # Созданные квесты остаются, новые больше не появятся
+    user_data["templates"] = remaining
+    data[user_id] = user_data
+    await save_data(data)
+
+    text, markup = render_templates(remaining)
+    await callback.message.edit_text(text, reply_markup=markup)
+    await callback.answer("🗑️ Повтор удален")
@@ -3,13 +3,16 @@ from aiogram.types import Message, CallbackQuery, InlineKeyboardButton, InlineKe
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import State, StatesGroup
 from aiogram.utils.keyboard import InlineKeyboardBuilder
-from aiogram.exceptions import TelegramBadRequest
 from datetime import datetime
-from pathlib import Path
-import json
+
+from config import ARCHIVE_DIR
+from utils.archive import read_month
+from utils.helpers import record_daily_stat
+from utils.render_cache import edit_text_cached
+from utils.storage import load_data, read_data, save_data
+from utils.callback_codec import REFLECT_BACK, REFLECT_DELETE, REFLECT_MONTH, REFLECT_VIEW
 
 router = Router()
-DATA_FILE = Path("storage/data.json")
 
 class ReflectStates(StatesGroup):
     q1 = State()
@@ -44,12 +47,7 @@ async def handle_q3(message: Message, state: FSMContext):
     q3 = message.text.strip()
     answers = await state.get_data()
 
-    if not DATA_FILE.exists():
-        data = {}
-    else:
-        with open(DATA_FILE, "r") as f:
-            data = json.load(f)
-
+    data = load_data()
     user_data = data.get(user_id, {})
     reflections = user_data.get("reflections", [])
 
@@ -62,68 +60,102 @@ async def handle_q3(message: Message, state: FSMContext):
 
     reflections.append(reflection_entry)
     user_data["reflections"] = reflections
+    record_daily_stat(user_data, "reflections")
     data[user_id] = user_data
-
-    with open(DATA_FILE, "w") as f:
-        json.dump(data, f, indent=2)
+    await save_data(data)
 
     await message.answer("🧠 Рефлексия сохранена. День закрыт.")
     await state.clear()
 
+def archived_months(user_data) -> list:
+    return (user_data.get("archived") or {}).get("reflections", [])
+
+
+def month_reflections(user_id: str, user_data, month: str):
+    """
+    Записи, среди которых ищется месяц: архивный месяц поднимается из
+    холодного хранилища, остальные берутся из JSON.
+
+    Returns:
+        (список записей, архивный ли месяц)
+    """
+    if month in archived_months(user_data):
+        return read_month(ARCHIVE_DIR, "reflections", month, user_id), True
+    return user_data.get("reflections", []), False
+
+
 @router.message(F.text == "/reflections")
 async def reflections_start(message: Message):
     user_id = str(message.from_user.id)
-    with open(DATA_FILE) as f:
-        data = json.load(f)
-
-    reflections = data.get(user_id, {}).get("reflections", [])
-    if not reflections:
+    user_data = read_data().get(user_id, {})
+    reflections = user_data.get("reflections", [])
+    archived = set(archived_months(user_data))
+    if not reflections and not archived:
         await message.answer("Нет рефлексий.")
         return
 
-    months = sorted(set([r["date"][:7] for r in reflections]), reverse=True)
+    months = sorted(set([r["date"][:7] for r in reflections]) | archived, reverse=True)
     kb = InlineKeyboardBuilder()
     for m in months:
-        kb.button(text=m, callback_data=f"reflect_month_{m}")
+        kb.button(text=f"🗄 {m}" if m in archived else m, callback_data=REFLECT_MONTH.pack(month=m))
     kb.adjust(2)
     await message.answer("📅 Выбери месяц:", reply_markup=kb.as_markup())
 
-@router.callback_query(F.data.startswith("reflect_month_"))
-async def reflections_select_month(callback: CallbackQuery):
-    month = callback.data.split("_")[-1]
-    user_id = str(callback.from_user.id)
-
-    with open(DATA_FILE) as f:
-        data = json.load(f)
+def build_dates_keyboard(reflections, month: str):
+    """Кнопки дат месяца; каждая ведет сразу к первой записи дня по позиции"""
+    first_positions = {}
+    for pos, r in enumerate(reflections):
+        if r["date"].startswith(month):
+            first_positions.setdefault(r["date"][:10], pos)
+    if not first_positions:
+        return None
 
-    reflections = data.get(user_id, {}).get("reflections", [])
-    dates = [r["date"][:10] for r in reflections if r["date"].startswith(month)]
-    unique_dates = sorted(set(dates))
     kb = InlineKeyboardBuilder()
-    for d in unique_dates:
-        kb.button(text=d, callback_data=f"reflect_view_{d}_0")
+    for d in sorted(first_positions):
+        kb.button(text=d, callback_data=REFLECT_VIEW.pack(pos=first_positions[d], day=d))
+    kb.adjust(3)
     kb.row(InlineKeyboardButton(text="⬅️ Назад к месяцам", callback_data="reflect_back_months"))
-    await callback.message.edit_text(f"📅 Записи за {month}:", reply_markup=kb.as_markup())
-    await callback.answer()
+    return kb.as_markup()
 
-@router.callback_query(F.data.startswith("reflect_view_"))
-async def reflections_view(callback: CallbackQuery):
-    parts = callback.data.split("_")
-    date = parts[2]
-    index = int(parts[3])
+@router.callback_query(REFLECT_MONTH.filter)
+async def reflections_select_month(callback: CallbackQuery):
+    month = REFLECT_MONTH.unpack(callback.data).month
     user_id = str(callback.from_user.id)
 
-    with open(DATA_FILE) as f:
-        data = json.load(f)
-
-    all_reflections = data.get(user_id, {}).get("reflections", [])
-    day_reflections = [r for r in all_reflections if r["date"].startswith(date)]
-    if not day_reflections:
-        await callback.answer("Нет записей на эту дату")
+    reflections, _ = month_reflections(user_id, read_data().get(user_id, {}), month)
+    markup = build_dates_keyboard(reflections, month)
+    if markup is None:
+        await callback.message.edit_text("Нет записей за этот месяц.")
+        await callback.answer()
         return
+    await edit_text_cached(callback.message, f"📅 Записи за {month}:", reply_markup=markup)
+    await callback.answer()
+
+@router.callback_query(REFLECT_VIEW.filter)
+async def reflections_view(callback: CallbackQuery):
+    view = REFLECT_VIEW.unpack(callback.data)
+    date = view.day
+    user_id = str(callback.from_user.id)
 
-    r = day_reflections[index]
-    total = len(day_reflections)
+    all_reflections, archived = month_reflections(user_id, read_data().get(user_id, {}), date[:7])
+    pos = view.pos
+    if pos >= len(all_reflections) or not all_reflections[pos]["date"].startswith(date):
+        # Список изменился после построения клавиатуры — ищем запись заново
+        pos = next((i for i, r in enumerate(all_reflections) if r["date"].startswith(date)), None)
+        if pos is None:
+            await callback.answer("Нет записей на эту дату")
+            return
+
+    # Записи одного дня идут подряд: границы дня находим от текущей позиции
+    first = last = pos
+    while first > 0 and all_reflections[first - 1]["date"].startswith(date):
+        first -= 1
+    while last + 1 < len(all_reflections) and all_reflections[last + 1]["date"].startswith(date):
+        last += 1
+
+    r = all_reflections[pos]
+    index = pos - first
+    total = last - first + 1
     text = (
         f"🪞 <b>Рефлексия #{index + 1} из {total}</b>\n\n"
         f"1. {r['q1']}\n"
@@ -133,73 +165,53 @@ async def reflections_view(callback: CallbackQuery):
     )
 
     kb = InlineKeyboardBuilder()
-    prev_index = index - 1 if index > 0 else len(day_reflections) - 1
-    next_index = (index + 1) % len(day_reflections)
-
-    kb.row(
-        InlineKeyboardButton(text="⬅️", callback_data=f"reflect_view_{date}_{prev_index}"),
-        InlineKeyboardButton(text="🗑️", callback_data=f"reflect_delete_{date}_{index}"),
-        InlineKeyboardButton(text="➡️", callback_data=f"reflect_view_{date}_{next_index}")
-    )
-    kb.row(InlineKeyboardButton(text="↩️ Назад к датам", callback_data=f"reflect_back_{date[:7]}"))
-
-    try:
-        await callback.message.edit_text(text, reply_markup=kb.as_markup())
-    except TelegramBadRequest as e:
-        if "message is not modified" in str(e):
-            await callback.answer("📌 Это уже текущая запись.")
-        else:
-            raise e
-    else:
+    prev_pos = pos - 1 if pos > first else last
+    next_pos = pos + 1 if pos < last else first
+
+    # Архивные записи только для чтения
+    buttons = [InlineKeyboardButton(text="⬅️", callback_data=REFLECT_VIEW.pack(pos=prev_pos, day=date))]
+    if not archived:
+        buttons.append(InlineKeyboardButton(text="🗑️", callback_data=REFLECT_DELETE.pack(pos=pos, day=date)))
+    buttons.append(InlineKeyboardButton(text="➡️", callback_data=REFLECT_VIEW.pack(pos=next_pos, day=date)))
+    kb.row(*buttons)
+    kb.row(InlineKeyboardButton(text="↩️ Назад к датам", callback_data=REFLECT_BACK.pack(month=date[:7])))
+
+    if await edit_text_cached(callback.message, text, reply_markup=kb.as_markup()):
         await callback.answer()
+    else:
+        await callback.answer("📌 Это уже текущая запись.")
 
-@router.callback_query(F.data.startswith("reflect_delete_"))
+@router.callback_query(REFLECT_DELETE.filter)
 async def reflections_delete(callback: CallbackQuery):
-    _, _, date, index = callback.data.split("_")
-    index = int(index)
+    target = REFLECT_DELETE.unpack(callback.data)
     user_id = str(callback.from_user.id)
 
-    with open(DATA_FILE) as f:
-        data = json.load(f)
-
+    data = load_data()
     reflections = data.get(user_id, {}).get("reflections", [])
-    day_entries = [i for i, r in enumerate(reflections) if r["date"].startswith(date)]
 
-    if index >= len(day_entries):
-        await callback.answer("Неверный индекс")
+    if target.pos >= len(reflections) or not reflections[target.pos]["date"].startswith(target.day):
+        await callback.answer("Запись не найдена, открой список заново")
         return
 
-    del reflections[day_entries[index]]
+    del reflections[target.pos]
     data[user_id]["reflections"] = reflections
-
-    with open(DATA_FILE, "w") as f:
-        json.dump(data, f, indent=2)
+    await save_data(data)
 
     await callback.message.edit_text("🗑️ Рефлексия удалена.")
     await callback.answer()
 
-@router.callback_query(F.data.startswith("reflect_back_"))
+@router.callback_query(REFLECT_BACK.filter)
 async def reflections_back_to_dates(callback: CallbackQuery):
-    month = callback.data.split("_")[-1]
+    month = REFLECT_BACK.unpack(callback.data).month
     user_id = str(callback.from_user.id)
 
-    with open(DATA_FILE) as f:
-        data = json.load(f)
-
-    reflections = data.get(user_id, {}).get("reflections", [])
-    dates = [r["date"][:10] for r in reflections if r["date"].startswith(month)]
-    unique_dates = sorted(set(dates))
-    if not unique_dates:
+    reflections, _ = month_reflections(user_id, read_data().get(user_id, {}), month)
+    markup = build_dates_keyboard(reflections, month)
+    if markup is None:
         await callback.message.edit_text("Нет записей за этот месяц.")
         return
 
-    kb = InlineKeyboardBuilder()
-    for d in unique_dates:
-        kb.button(text=d, callback_data=f"reflect_view_{d}_0")
-    kb.adjust(3)
-    kb.row(InlineKeyboardButton(text="⬅️ Назад к месяцам", callback_data="reflect_back_months"))
-
-    await callback.message.edit_text(f"📅 Записи за {month}:", reply_markup=kb.as_markup())
+    await edit_text_cached(callback.message, f"📅 Записи за {month}:", reply_markup=markup)
     await callback.answer()
 
 @router.callback_query(F.data == "reflect_back_months")
@@ -3,63 +3,111 @@ from aiogram.types import Message, CallbackQuery
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import State, StatesGroup
 from aiogram.utils.keyboard import InlineKeyboardBuilder
-from pathlib import Path
+from aiogram.filters import Command, CommandObject
 from datetime import datetime
-import json
+from typing import Optional
 import re
 
+from utils.reminders import KIND_ALIASES, parse_kind
+from utils.storage import load_data, read_data, save_data
+
 router = Router()
-DATA_FILE = Path("storage/data.json")
 
 
 class ReminderState(StatesGroup):
     waiting_for_time = State()
 
 
-@router.message(F.text == "/reminder")
-async def handle_reminder(message: Message):
-    user_id = str(message.from_user.id)
+def build_reminder_keyboard(enabled: bool):
+    kb = InlineKeyboardBuilder()
+    kb.button(
+        text="❌ Выключить" if enabled else "✅ Включить",
+        callback_data="reminder_toggle"
+    )
+    kb.button(text="⏱ Изменить время", callback_data="reminder_set_time")
+    kb.adjust(1)
+    return kb.as_markup()
 
-    if not DATA_FILE.exists():
-        data = {}
-    else:
-        with open(DATA_FILE, "r") as f:
-            data = json.load(f)
 
-    user_data = data.get(user_id, {})
+# Вариантов всего два — включено/выключено, собираем заранее
+REMINDER_KEYBOARDS = {enabled: build_reminder_keyboard(enabled) for enabled in (True, False)}
+
+
+KIND_LABELS = {"phase": "🌗 Фаза дня", "quests": "📋 Квесты"}
+
+KINDS_HELP = (
+    "Другие напоминания:\n"
+    "• <code>/reminder квесты 09:00</code>\n"
+    "• <code>/reminder фаза 08:30</code>\n"
+    "• выключить — <code>/reminder квесты off</code>\n"
+    "Напоминания на одно время приходят одним сообщением."
+)
+
+
+@router.message(Command("reminder"))
+async def handle_reminder(message: Message, command: Optional[CommandObject] = None):
+    user_id = str(message.from_user.id)
+    args = (command.args or "").split() if command else []
+    if args:
+        await set_kind_reminder(message, user_id, args)
+        return
+
+    user_data = read_data().get(user_id, {})
     enabled = user_data.get("reminder_enabled", False)
     time = user_data.get("reminder_time", "21:00")
+    reminders = user_data.get("reminders") or {}
+    kinds = "".join(
+        f"{label}: {reminders[kind]}\n" for kind, label in KIND_LABELS.items() if kind in reminders
+    )
 
     text = (
         f"🔔 Напоминание о рефлексии: {'включено' if enabled else 'выключено'}\n"
         f"⏰ Время: {time}\n\n"
-        f"Выбери действие:"
     )
+    if kinds:
+        text += kinds + "\n"
+    text += f"{KINDS_HELP}\n\nВыбери действие:"
+
+    await message.answer(text, reply_markup=REMINDER_KEYBOARDS[bool(enabled)])
+
+
+async def set_kind_reminder(message: Message, user_id: str, args):
+    """/reminder <тип> HH:MM|off"""
+    kind = parse_kind(args[0])
+    value = args[1].lower() if len(args) > 1 else ""
+    if kind is None or not (value == "off" or re.match(r"^\d{2}:\d{2}$", value)):
+        await message.answer(
+            "⛔ Формат: /reminder тип HH:MM или /reminder тип off\n"
+            f"Типы: {', '.join(alias for alias, name in KIND_ALIASES.items() if alias != name)}"
+        )
+        return
 
-    kb = InlineKeyboardBuilder()
-    kb.button(
-        text="❌ Выключить" if enabled else "✅ Включить",
-        callback_data="reminder_toggle"
-    )
-    kb.button(text="⏱ Изменить время", callback_data="reminder_set_time")
-    kb.adjust(1)
+    data = load_data()
+    user_data = data.setdefault(user_id, {})
+    if kind == "reflection":
+        # Напоминание о рефлексии хранится в прежних полях
+        user_data["reminder_enabled"] = value != "off"
+        if value != "off":
+            user_data["reminder_time"] = value
+    elif value == "off":
+        (user_data.get("reminders") or {}).pop(kind, None)
+    else:
+        user_data.setdefault("reminders", {})[kind] = value
+
+    await save_data(data)
 
-    await message.answer(text, reply_markup=kb.as_markup())
+    await message.answer("🔕 Напоминание выключено." if value == "off" else f"✅ Напоминание в {value}.")
 
 
 @router.callback_query(F.data == "reminder_toggle")
 async def reminder_toggle(callback: CallbackQuery):
     user_id = str(callback.from_user.id)
 
-    with open(DATA_FILE, "r") as f:
-        data = json.load(f)
-
+    data = load_data()
     user_data = data.setdefault(user_id, {})
     current = user_data.get("reminder_enabled", False)
     user_data["reminder_enabled"] = not current
-
-    with open(DATA_FILE, "w") as f:
-        json.dump(data, f, indent=2)
+    await save_data(data)
 
     status = "включено" if user_data["reminder_enabled"] else "отключено"
     await callback.message.answer(f"🔔 Напоминание {status}.")
@@ -81,15 +129,11 @@ async def set_custom_time(message: Message, state: FSMContext):
         return
 
     user_id = str(message.from_user.id)
-    with open(DATA_FILE, "r") as f:
-        data = json.load(f)
-
+    data = load_data()
     user_data = data.setdefault(user_id, {})
     user_data["reminder_time"] = time_text
     data[user_id] = user_data
-
-    with open(DATA_FILE, "w") as f:
-        json.dump(data, f, indent=2)
+    await save_data(data)
 
     await message.answer(f"✅ Время напоминания установлено: {time_text}")
     await state.clear()
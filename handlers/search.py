@@ -0,0 +1,99 @@
+from aiogram import Router, F
+from aiogram.types import Message, CallbackQuery, InlineKeyboardButton, InlineKeyboardMarkup
+from aiogram.filters import Command, CommandObject
+from aiogram.fsm.context import FSMContext
+from aiogram.fsm.state import State, StatesGroup
+from html import escape
+
+from config import ARCHIVE_DIR
+from utils.archive import with_archived
+from utils.callback_codec import SEARCH_PAGE
+from utils.render_cache import edit_text_cached
+from utils.search import SEARCH_PAGE_SIZE, search_entries, snippet
+from utils.storage import read_data
+
+router = Router()
+
+KIND_ICONS = {"insight": "🧠", "reflection": "🕯"}
+
+
+class SearchState(StatesGroup):
+    waiting = State()
+
+
+def result_rows(hits, query: str) -> list:
+    """Найденное в виде [вид, дата, фрагмент] — так результаты хранятся в FSM"""
+    return [[hit.kind, hit.date, snippet(hit.text, query)] for hit in hits]
+
+
+def render_results(rows, query: str, page: int):
+    """Текст и клавиатура одной страницы результатов"""
+    pages = max(1, -(-len(rows) // SEARCH_PAGE_SIZE))
+    page = min(page, pages - 1)
+    start = page * SEARCH_PAGE_SIZE
+
+    lines = [f"🔎 <b>Поиск:</b> «{escape(query)}» — найдено {len(rows)}\n"]
+    for kind, date, fragment in rows[start:start + SEARCH_PAGE_SIZE]:
+        date = f"<i>{escape(date)}</i>\n" if date else ""
+        lines.append(f"{KIND_ICONS[kind]} {date}{escape(fragment)}\n")
+    if pages > 1:
+        lines.append(f"Страница {page + 1} из {pages}")
+
+    buttons = []
+    if page > 0:
+        buttons.append(InlineKeyboardButton(text="⬅️", callback_data=SEARCH_PAGE.pack(page=page - 1)))
+    if page < pages - 1:
+        buttons.append(InlineKeyboardButton(text="➡️", callback_data=SEARCH_PAGE.pack(page=page + 1)))
+    markup = InlineKeyboardMarkup(inline_keyboard=[buttons]) if buttons else None
+    return "\n".join(lines), markup
+
+
+def load_user_data(user_id: str) -> dict:
+    # Архивные месяцы тоже участвуют в поиске
+    return with_archived(ARCHIVE_DIR, read_data().get(user_id, {}), user_id)
+
+
+async def answer_search(message: Message, user_id: str, query: str, state: FSMContext):
+    hits = search_entries(load_user_data(user_id), query)
+    await state.set_state(None)
+    if not hits:
+        await message.answer(f"🔎 По запросу «{escape(query)}» ничего не нашлось.")
+        return
+    # Страницы листаются по сохраненным результатам, без повторного поиска
+    rows = result_rows(hits, query)
+    await state.update_data(search_query=query, search_hits=rows)
+    text, markup = render_results(rows, query, 0)
+    await message.answer(text, reply_markup=markup)
+
+
+@router.message(Command("search"))
+async def handle_search(message: Message, command: CommandObject, state: FSMContext):
+    query = (command.args or "").strip()
+    if query:
+        await answer_search(message, str(message.from_user.id), query, state)
+        return
+    await message.answer("🔎 Что ищем в инсайтах и рефлексиях? Напиши слово или фразу:")
+    await state.set_state(SearchState.waiting)
+
+
+@router.message(SearchState.waiting)
+async def handle_search_query(message: Message, state: FSMContext):
+    query = (message.text or "").strip()
+    if not query:
+        await message.answer("Напиши хотя бы одно слово.")
+        return
+    await answer_search(message, str(message.from_user.id), query, state)
+
+
+@router.callback_query(SEARCH_PAGE.filter)
+async def handle_search_page(callback: CallbackQuery, state: FSMContext):
+    page = SEARCH_PAGE.unpack(callback.data).page
+    data = await state.get_data()
+    query, rows = data.get("search_query"), data.get("search_hits")
+    if not query or not rows:
+        await callback.answer("Поиск устарел, повтори /search", show_alert=True)
+        return
+
+    text, markup = render_results(rows, query, page)
+    await edit_text_cached(callback.message, text, reply_markup=markup)
+    await callback.answer()
@@ -1,32 +1,36 @@
 from aiogram import Router, F
 from aiogram.types import Message, CallbackQuery, InlineKeyboardButton
 from aiogram.utils.keyboard import InlineKeyboardBuilder
-from pathlib import Path
-import json
+
+from utils.storage import load_data, save_data
 
 router = Router()
-DATA_FILE = Path("storage/data.json")
+
+# Статичные клавиатуры собираются один раз при импорте
+_settings_kb = InlineKeyboardBuilder()
+_settings_kb.row(
+    InlineKeyboardButton(
+        text="🧨 Удалить все данные", callback_data="reset_confirm"
+    )
+)
+SETTINGS_KEYBOARD = _settings_kb.as_markup()
+
+_reset_kb = InlineKeyboardBuilder()
+_reset_kb.row(
+    InlineKeyboardButton(text="❌ Отмена", callback_data="cancel_reset"),
+    InlineKeyboardButton(text="🔥 Удалить всё", callback_data="reset_all")
+)
+RESET_CONFIRM_KEYBOARD = _reset_kb.as_markup()
 
 @router.message(F.text == "/settings")
 async def show_settings(message: Message):
-    kb = InlineKeyboardBuilder()
-    kb.row(
-        InlineKeyboardButton(
-            text="🧨 Удалить все данные", callback_data="reset_confirm"
-        )
-    )
-    await message.answer("⚙️ <b>Настройки</b>", reply_markup=kb.as_markup())
+    await message.answer("⚙️ <b>Настройки</b>", reply_markup=SETTINGS_KEYBOARD)
 
 @router.callback_query(F.data == "reset_confirm")
 async def confirm_reset(callback: CallbackQuery):
-    kb = InlineKeyboardBuilder()
-    kb.row(
-        InlineKeyboardButton(text="❌ Отмена", callback_data="cancel_reset"),
-        InlineKeyboardButton(text="🔥 Удалить всё", callback_data="reset_all")
-    )
     await callback.message.edit_text(
         "🚨 Ты точно хочешь удалить <b>все</b> свои данные? Это <u>безвозвратно</u>.",
-        reply_markup=kb.as_markup()
+        reply_markup=RESET_CONFIRM_KEYBOARD
     )
     await callback.answer()
 
@@ -39,14 +43,10 @@ async def cancel_reset(callback: CallbackQuery):
 async def reset_all(callback: CallbackQuery):
     user_id = str(callback.from_user.id)
 
-    if DATA_FILE.exists():
-        with open(DATA_FILE, "r") as f:
-            data = json.load(f)
-
-        if user_id in data:
-            del data[user_id]
-            with open(DATA_FILE, "w") as f:
-                json.dump(data, f, indent=2)
+    data = load_data()
+    if user_id in data:
+        del data[user_id]
+        await save_data(data)
 
     await callback.message.edit_text("🧹 Все данные удалены. Можно начинать с чистого листа.")
     await callback.answer("Данные очищены", show_alert=True)
@@ -0,0 +1,92 @@
+from aiogram import Router, F
+from aiogram.types import Message, CallbackQuery, InlineKeyboardButton, InlineKeyboardMarkup
+from calendar import monthrange
+from datetime import date
+
+from utils.callback_codec import STATS_MONTH
+from utils.render_cache import edit_text_cached
+from utils.helpers import shift_month
+from utils.storage import read_data
+
+router = Router()
+
+MONTH_NAMES = [
+    "Январь", "Февраль", "Март", "Апрель", "Май", "Июнь",
+    "Июль", "Август", "Сентябрь", "Октябрь", "Ноябрь", "Декабрь",
+]
+PHASE_EMOJI = {"active": "⚡", "low": "🌀", "fog": "😵"}
+NO_PHASE = "⬜"
+UNKNOWN_PHASE = "🔸"
+PADDING = "➖"
+COUNTERS = ("quests_added", "quests_done", "insights", "reflections")
+
+
+def render_month(daily_stats: dict, month: str, today: date):
+    """
+    Календарь фаз и сводка за месяц из дневных итогов пользователя.
+
+    Читаются только дни этого месяца (не больше 31 ключа), размер всей
+    истории на отрисовку не влияет.
+    """
+    year, number = (int(part) for part in month.split("-"))
+    first_weekday, days = monthrange(year, number)
+
+    cells = [PADDING] * first_weekday
+    totals = dict.fromkeys(COUNTERS, 0)
+    phase_days = dict.fromkeys(PHASE_EMOJI, 0)
+    for day in range(1, days + 1):
+        stats = daily_stats.get(f"{month}-{day:02d}") or {}
+        phase = stats.get("phase")
+        cells.append(PHASE_EMOJI.get(phase, UNKNOWN_PHASE) if phase else NO_PHASE)
+        if phase in phase_days:
+            phase_days[phase] += 1
+        for counter in COUNTERS:
+            totals[counter] += stats.get(counter, 0)
+    cells.extend([PADDING] * (-len(cells) % 7))
+
+    weeks = []
+    for start in range(0, len(cells), 7):
+        first_day = max(1, start - first_weekday + 1)
+        weeks.append(f"<code>{first_day:02d}</code> " + "".join(cells[start:start + 7]))
+
+    text = (
+        f"📈 <b>Статистика — {MONTH_NAMES[number - 1]} {year}</b>\n\n"
+        + "\n".join(weeks)
+        + f"\n\n⚡ Актива · 🌀 Спад · 😵 Подвис · {NO_PHASE} нет отметки\n\n"
+        f"🌗 Дней по фазам: ⚡ {phase_days['active']} · 🌀 {phase_days['low']} · 😵 {phase_days['fog']}\n"
+        f"📋 Квестов добавлено: <b>{totals['quests_added']}</b>, завершено: <b>{totals['quests_done']}</b>\n"
+        f"🧠 Инсайтов: <b>{totals['insights']}</b>\n"
+        f"🕯 Рефлексий: <b>{totals['reflections']}</b>"
+    )
+
+    current = today.strftime("%Y-%m")
+    nav = [InlineKeyboardButton(text="<<", callback_data=STATS_MONTH.pack(month=shift_month(month, -1)))]
+    if month < current:
+        nav.append(InlineKeyboardButton(text=">>", callback_data=STATS_MONTH.pack(month=shift_month(month, 1))))
+    rows = [nav]
+    if month != current:
+        rows.append([InlineKeyboardButton(text="Назад", callback_data=STATS_MONTH.pack(month=current))])
+
+    return text, InlineKeyboardMarkup(inline_keyboard=rows)
+
+
+def load_daily_stats(user_id: str) -> dict:
+    return read_data().get(user_id, {}).get("daily_stats", {})
+
+
+@router.message(F.text == "/stats")
+@router.message(F.text == "📈 Статистика")
+async def handle_stats(message: Message):
+    today = date.today()
+    daily_stats = load_daily_stats(str(message.from_user.id))
+    text, markup = render_month(daily_stats, today.strftime("%Y-%m"), today)
+    await message.answer(text, reply_markup=markup)
+
+
+@router.callback_query(STATS_MONTH.filter)
+async def handle_stats_month(callback: CallbackQuery):
+    month = STATS_MONTH.unpack(callback.data).month
+    daily_stats = load_daily_stats(str(callback.from_user.id))
+    text, markup = render_month(daily_stats, month, date.today())
+    await edit_text_cached(callback.message, text, reply_markup=markup)
+    await callback.answer()
@@ -2,13 +2,14 @@ from aiogram import Router, F
 from aiogram.types import Message
 import json
 from utils.quest_logic import get_quest_by_phase
-from pathlib import Path
+from handlers.quests import render_suggestions
+from utils.recurrence import materialize_due
+from utils.storage import load_data, read_data, save_data
 from datetime import datetime
 import logging
 
 router = Router()
 logger = logging.getLogger("handlers.user")
-DATA_FILE = Path("storage/data.json")
 
 PHASE_LABELS = {
     "active": "⚡ Актива",
@@ -25,13 +26,11 @@ async def show_status(message: Message):
     logger.info(f"Command /me from user {user_id}", 
                 extra={"command_name": "/me", "username": username})
 
-    if not DATA_FILE.exists():
+    data = read_data()
+    if not data:
         await message.answer("Нет данных. Начни с /start_day")
         return
 
-    with open(DATA_FILE, "r") as f:
-        data = json.load(f)
-
     user_data = data.get(user_id, {})
 
     phase = user_data.get("phase")
@@ -82,7 +81,8 @@ async def help_cmd(message: Message):
         "1️⃣ <b>Каждое утро</b> — /start_day\n"
         "  • Определи свою фазу: ⚡ Актива / 🌀 Спад / 😵 Подвис\n\n"
         "2️⃣ <b>Добавь квесты</b> — /add_quest\n"
-        "  • Это задачи на день / шаги к целям\n\n"
+        "  • Это задачи на день / шаги к целям\n"
+        "  • Привычки на каждый день — /repeat\n\n"
         "3️⃣ <b>Проверь статус</b> — /status\n"
         "  • Посмотри, что осталось\n"
         "  • Заверши задачи — /done (через кнопки)\n\n"
@@ -108,17 +108,21 @@ async def handle_today(message: Message):
     logger.info(f"Command /today from user {user_id}", 
                 extra={"command_name": "/today", "username": username})
                 
-    text = render_today_message(user_id)
+    text = await render_today_message(user_id)
     await message.answer(text)
 
-def render_today_message(user_id: str) -> str:
-    if not DATA_FILE.exists():
+async def render_today_message(user_id: str) -> str:
+    data = read_data()
+    if not data:
         return "Нет данных. Начни с /start_day"
 
-    with open(DATA_FILE, "r") as f:
-        data = json.load(f)
-
     user_data = data.get(user_id, {})
+    if user_data.get("templates"):
+        data = load_data()
+        user_data = data.get(user_id, {})
+        if materialize_due(user_data):
+            data[user_id] = user_data
+            await save_data(data)
     phase = user_data.get("phase")
     quests = user_data.get("quests", [])
 
@@ -134,4 +138,5 @@ def render_today_message(user_id: str) -> str:
         f"🌗 Фаза: <b>{PHASE_LABELS.get(phase, phase.upper())}</b>\n\n"
         f"🎯 Главная задача: <b>{main_quest}</b>\n\n"
         f"💡 Совет на фазу:\n{tip}"
+        f"{render_suggestions(user_id, user_data)}"
     )
\ No newline at end of file
@@ -0,0 +1,107 @@
+import asyncio
+import logging
+import time
+from contextlib import suppress
+from typing import Any, Awaitable, Callable, Dict, List, Set, Tuple, Union
+
+from aiogram import BaseMiddleware
+from aiogram.exceptions import TelegramAPIError
+from aiogram.types import CallbackQuery, TelegramObject
+
+from core.metrics import CALLBACK_QUERIES
+from utils.callback_codec import is_navigation
+
+logger = logging.getLogger("middleware")
+
+# (user_id, message_id or inline_message_id, callback data)
+TapKey = Tuple[int, Union[int, str, None], str]
+
+
+class CallbackDebounceMiddleware(BaseMiddleware):
+    """
+    Collapses rapid repeated taps on inline buttons.
+
+    A tap identical to one from the same user on the same message within
+    `window` seconds, or while that one is still being handled, is not
+    handled again: its query is answered at once so the client stops the
+    spinner, and the first tap's handler produces the visible result.
+
+    Navigation taps (pagination, next/previous) on one message are handled
+    one at a time; a tap still waiting when a newer navigation tap arrives
+    is dropped, since only the latest position is worth rendering.
+
+    Registered as an outer middleware of dp.callback_query so suppressed
+    taps never reach filters, storage or the Telegram edit.
+    """
+
+    def __init__(self, window: float = 1.0, max_entries: int = 10000):
+        self.window = window
+        self.max_entries = max_entries
+        self._started: Dict[TapKey, float] = {}
+        self._in_flight: Set[TapKey] = set()
+        # (user_id, message) -> [generation, lock]
+        self._navigation: Dict[Tuple, List[Any]] = {}
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any]
+    ) -> Any:
+        if not isinstance(event, CallbackQuery) or self.window <= 0:
+            return await handler(event, data)
+
+        message_ref = event.message.message_id if event.message else event.inline_message_id
+        tap_key = (event.from_user.id, message_ref, event.data or "")
+
+        now = time.monotonic()
+        started = self._started.get(tap_key)
+        if tap_key in self._in_flight or (started is not None and now - started < self.window):
+            CALLBACK_QUERIES.inc("duplicate")
+            await self._answer(event)
+            return None
+
+        if len(self._started) >= self.max_entries:
+            self._prune(now)
+        self._started[tap_key] = now
+
+        if not is_navigation(event.data):
+            return await self._handle(tap_key, handler, event, data)
+
+        nav_key = tap_key[:2]
+        state = self._navigation.setdefault(nav_key, [0, asyncio.Lock()])
+        state[0] += 1
+        generation = state[0]
+        try:
+            async with state[1]:
+                if state[0] != generation:
+                    CALLBACK_QUERIES.inc("superseded")
+                    await self._answer(event)
+                    return None
+                return await self._handle(tap_key, handler, event, data)
+        finally:
+            # Newer taps keep their own reference to the state while waiting
+            if state[0] == generation and self._navigation.get(nav_key) is state:
+                del self._navigation[nav_key]
+
+    async def _handle(self, tap_key: TapKey, handler, event: CallbackQuery, data: Dict[str, Any]) -> Any:
+        self._in_flight.add(tap_key)
+        try:
+            result = await handler(event, data)
+        finally:
+            self._in_flight.discard(tap_key)
+        CALLBACK_QUERIES.inc("handled")
+        return result
+
+    @staticmethod
+    async def _answer(event: CallbackQuery) -> None:
+        # Запрос мог устареть — для дубля это не ошибка
+        with suppress(TelegramAPIError):
+            await event.answer()
+
+    def _prune(self, now: float) -> None:
+        expired = [key for key, started in self._started.items() if now - started >= self.window]
+        for key in expired:
+            del self._started[key]
+        if len(self._started) >= self.max_entries:
+            logger.warning(f"Callback debounce table is full ({len(self._started)} taps within {self.window}s)")
@@ -6,8 +6,17 @@ import logging
 import json
 import inspect
 
+from core.metrics import HANDLER_LATENCY, HANDLER_ERRORS, callback_prefix, handler_label
+from core.tracing import span
+
 logger = logging.getLogger("middleware")
 
+# Слова кнопок клавиатуры (как в handlers.buttons)
+BUTTON_KEYWORDS = (
+    "Мой статус", "Сегодня", "Фокус", "Квесты", "Новый квест", "Завершить",
+    "Инсайт", "Рефлексия", "Настройки", "Помощь", "Удалить квест",
+)
+
 class LoggingMiddleware(BaseMiddleware):
     """
     Middleware for logging all bot events and measuring execution time.
@@ -20,7 +29,9 @@ class LoggingMiddleware(BaseMiddleware):
         data: Dict[str, Any]
     ) -> Any:
         # Start timing
-        start_time = time.time()
+        start_time = time.perf_counter()
+        # Метка для метрик: команда, кнопка или префикс callback
+        metric_label = "other"
         
         # Extract user and chat info if available
         user_id = None
@@ -72,45 +83,58 @@ class LoggingMiddleware(BaseMiddleware):
                 if hasattr(message, 'message') and message.message and hasattr(message.message, 'chat'):
                     chat_id = message.message.chat.id
             
+        if isinstance(message, Message):
+            metric_label = "message"
+
         # Обрабатываем сообщения и callback запросы
         if isinstance(message, Message) and hasattr(message, 'text') and message.text:
             if message.text.startswith('/'):
                 # Log command
                 command = message.text.split()[0]
+                # Набранная пользователем неизвестная команда не создает новую метку
+                metric_label = handler_label(command.split("@")[0])
                 # Используем extra параметр - самый простой способ
                 logger.info(
                     f"Command received: {command}", 
-                    extra={"command_name": command, "username": username}
+                    extra={"command_name": command, "sample_key": metric_label, "username": username}
                 )
-            elif any(keyword in message.text for keyword in ["Мой статус", "Сегодня", "Фокус", "Квесты", "Новый квест", "Завершить", "Инсайт", "Рефлексия", "Настройки", "Помощь", "Удалить квест"]):
+            elif any(keyword in message.text for keyword in BUTTON_KEYWORDS):
                 # Log keyboard button press
                 command = message.text.strip()
+                # Меткой служит слово кнопки, а не произвольный текст вокруг него
+                metric_label = next(keyword for keyword in BUTTON_KEYWORDS if keyword in command)
                 # Используем extra параметр
                 logger.info(
                     f"Button pressed: {command}", 
-                    extra={"command_name": command, "username": username}
+                    extra={"command_name": command, "sample_key": metric_label, "username": username}
                 )
         elif isinstance(message, CallbackQuery) and hasattr(message, 'data') and message.data:
             # Log callback query
             command = message.data
+            metric_label = handler_label(callback_prefix(command))
             # Используем extra параметр
             logger.info(
                 f"Callback query: {command}", 
-                extra={"command_name": command, "username": username}
+                extra={"command_name": command, "sample_key": metric_label, "username": username}
             )
             
-        try:
-            # Handle the event
-            result = await handler(event, data)
-            # Log success
-            processing_time = time.time() - start_time
-            
-            # Здесь не выводим стандартные логи обработки, т.к. мы уже логируем команды и кнопки
-            
-            return result
-        except Exception as e:
-            # Log exception
-            processing_time = time.time() - start_time
-            logger.error(f"Error processing event in {processing_time:.4f}s: {e}", exc_info=True)
-            # Re-raise the exception
-            raise 
\ No newline at end of file
+        # Корневой span запроса: сервисы, SQL и вызовы Telegram API станут его потомками
+        with span("update", command=metric_label, user_id=user_id, chat_id=chat_id):
+            try:
+                # Handle the event
+                result = await handler(event, data)
+                # Log success
+                processing_time = time.perf_counter() - start_time
+                HANDLER_LATENCY.observe(processing_time, metric_label)
+                
+                # Здесь не выводим стандартные логи обработки, т.к. мы уже логируем команды и кнопки
+                
+                return result
+            except Exception as e:
+                # Log exception
+                processing_time = time.perf_counter() - start_time
+                HANDLER_LATENCY.observe(processing_time, metric_label)
+                HANDLER_ERRORS.inc(metric_label)
+                logger.error(f"Error processing event in {processing_time:.4f}s: {e}", exc_info=True)
+                # Re-raise the exception
+                raise
\ No newline at end of file
@@ -0,0 +1,21 @@
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware, NextRequestMiddlewareType
+from aiogram.methods import TelegramMethod
+from aiogram.methods.base import TelegramType, Response
+from typing import Any
+
+from core.tracing import span
+
+class TracingRequestMiddleware(BaseRequestMiddleware):
+    """
+    Bot session middleware recording a span for every Telegram API call
+    (send_message, edit_message_text, ...).
+    """
+    
+    async def __call__(
+        self,
+        make_request: NextRequestMiddlewareType[TelegramType],
+        bot: Any,
+        method: TelegramMethod[TelegramType]
+    ) -> Response[TelegramType]:
+        with span(f"telegram.{type(method).__name__}"):
+            return await make_request(bot, method)
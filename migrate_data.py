@@ -1,174 +1,173 @@
 """
 Скрипт для миграции данных из JSON в базу данных.
 Использование:
-    python migrate_data.py
+    python migrate_data.py [--chunk-size 500] [--checkpoint путь] [--restart] [--keep-source]
+
+Файл читается потоково, данные вставляются пачками с коммитом на каждый
+чанк. Прерванную миграцию можно запустить повторно: она продолжится
+с последнего checkpoint, уже перенесенные пользователи будут пропущены.
 """
 
+import argparse
 import asyncio
 import json
 import logging
 import os
-from pathlib import Path
+import time
 from datetime import datetime
 
 from db.database import init_db
-from db.models import User, Quest, Insight, Reflection, LastActive
-from utils.storage import Storage
-from config import DATA_FILE
+from services.migration_service import MigrationService
+from utils.json_stream import iter_json_object
+from config import DATA_FILE, MIGRATION_CHUNK_SIZE
 from core.logger import setup_logging
 
 # Настройка логирования
-logger = setup_logging()
+logger = setup_logging("migrate_data")
+
+CHECKPOINT_FILE = f"{DATA_FILE}.migration_checkpoint"
+
+
+def load_checkpoint(checkpoint_file: str, data_file: str) -> int:
+    """Количество уже перенесенных записей верхнего уровня для этого файла"""
+    if not os.path.exists(checkpoint_file):
+        return 0
+    try:
+        with open(checkpoint_file, "r") as f:
+            checkpoint = json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        logger.warning(f"Ignoring unreadable checkpoint {checkpoint_file}: {e}")
+        return 0
+
+    stat = os.stat(data_file)
+    if checkpoint.get("source") != os.path.abspath(data_file) or checkpoint.get("size") != stat.st_size:
+        logger.warning("Checkpoint belongs to another data file, starting from scratch")
+        return 0
+    return int(checkpoint.get("processed", 0))
+
+
+def save_checkpoint(checkpoint_file: str, data_file: str, processed: int) -> None:
+    """Атомарно сохраняет позицию после закоммиченного чанка"""
+    checkpoint = {
+        "source": os.path.abspath(data_file),
+        "size": os.stat(data_file).st_size,
+        "processed": processed,
+        "updated_at": datetime.now().isoformat(),
+    }
+    tmp_file = f"{checkpoint_file}.tmp"
+    with open(tmp_file, "w") as f:
+        json.dump(checkpoint, f)
+    os.replace(tmp_file, checkpoint_file)
 
-async def migrate_json_to_db():
-    """Миграция данных из JSON в базу данных"""
+
+async def migrate_json_to_db(
+    data_file: str = DATA_FILE,
+    chunk_size: int = MIGRATION_CHUNK_SIZE,
+    checkpoint_file: str = CHECKPOINT_FILE,
+    resume: bool = True,
+):
+    """
+    Потоковая миграция данных из JSON в базу данных.
+
+    Файл читается по одному пользователю, пользователи и их данные
+    вставляются пачками по chunk_size с коммитом на каждый чанк.
+    После коммита сохраняется checkpoint, поэтому прерванную миграцию
+    можно продолжить; уже существующие пользователи пропускаются.
+    После первого чанка с ошибками checkpoint больше не сдвигается:
+    повторный запуск снова пройдет неудачных пользователей.
+    """
     logger.info("Starting data migration from JSON to database")
     
     # Проверка наличия JSON-файла
-    if not os.path.exists(DATA_FILE):
-        logger.warning(f"JSON file {DATA_FILE} not found. Nothing to migrate.")
-        return
-    
-    # Чтение данных из JSON
-    storage = Storage(DATA_FILE)
-    data = storage.read()
-    
-    if not data:
-        logger.warning("JSON file is empty. Nothing to migrate.")
+    if not os.path.exists(data_file):
+        logger.warning(f"JSON file {data_file} not found. Nothing to migrate.")
         return
-    
-    # Инициализация счетчиков
-    users_migrated = 0
-    quests_migrated = 0
-    insights_migrated = 0
-    reflections_migrated = 0
+
+    start_from = load_checkpoint(checkpoint_file, data_file) if resume else 0
+    if start_from:
+        logger.info(f"Resuming from checkpoint: {start_from} users already processed")
+
+    totals = {"users": 0, "skipped": 0, "quests": 0, "insights": 0, "reflections": 0}
     errors = []
-    
-    # Импорт сессии здесь для избежания циклических импортов
-    from sqlalchemy.ext.asyncio import AsyncSession
-    from sqlalchemy.orm import sessionmaker
-    from db.database import engine
-    
-    async_session = sessionmaker(
-        engine, class_=AsyncSession, expire_on_commit=False
-    )
-    
-    async with async_session() as session:
-        # Обработка каждого пользователя
-        for user_id, user_data in data.items():
-            try:
-                logger.info(f"Migrating user {user_id}")
-                
-                # Создание или обновление пользователя
-                user = User(
-                    telegram_id=user_id,
-                    phase=user_data.get("phase"),
-                    reminder_enabled=user_data.get("reminder_enabled", False),
-                    reminder_time=user_data.get("reminder_time"),
-                    created_at=datetime.now()
-                )
-                session.add(user)
-                await session.flush()  # Получение ID пользователя
-                users_migrated += 1
-                
-                # Миграция квестов
-                quests = user_data.get("quests", [])
-                for quest_data in quests:
-                    quest = Quest(
-                        user_id=user.id,
-                        text=quest_data.get("text", ""),
-                        status=quest_data.get("status", "todo"),
-                        phase=quest_data.get("phase"),
-                        created_at=datetime.now()
-                    )
-                    session.add(quest)
-                    quests_migrated += 1
-                
-                # Миграция инсайтов
-                insights = user_data.get("insights", [])
-                for insight_data in insights:
-                    if isinstance(insight_data, dict):
-                        text = insight_data.get("text", "")
-                    elif isinstance(insight_data, str):
-                        text = insight_data
-                    else:
-                        continue
-                        
-                    insight = Insight(
-                        user_id=user.id,
-                        text=text,
-                        created_at=datetime.now()
-                    )
-                    session.add(insight)
-                    insights_migrated += 1
-                
-                # Миграция рефлексий
-                reflections = user_data.get("reflections", [])
-                for reflection_data in reflections:
-                    reflection = Reflection(
-                        user_id=user.id,
-                        important=reflection_data.get("important", ""),
-                        worked=reflection_data.get("worked", ""),
-                        change=reflection_data.get("change", ""),
-                        created_at=datetime.now()
-                    )
-                    session.add(reflection)
-                    reflections_migrated += 1
-                
-                # Миграция последней активности
-                last_active_data = user_data.get("last_active")
-                if last_active_data:
-                    last_active = LastActive(
-                        user_id=user.id,
-                        timestamp=datetime.now(),
-                        context=last_active_data.get("context", ""),
-                        phase=last_active_data.get("phase")
-                    )
-                    session.add(last_active)
-                
-            except Exception as e:
-                logger.error(f"Error migrating user {user_id}: {e}")
-                errors.append(f"User {user_id}: {str(e)}")
-                
-        # Сохранение изменений
-        try:
-            await session.commit()
-            logger.info("All changes committed to database")
-        except Exception as e:
-            logger.error(f"Error committing changes: {e}")
-            await session.rollback()
-            errors.append(f"Commit error: {str(e)}")
-            
+    processed = 0
+    chunk = []
+    started = time.perf_counter()
+
+    async def flush():
+        chunk_started = time.perf_counter()
+        counts, chunk_errors = await MigrationService.import_chunk(chunk)
+        # Checkpoint не должен перепрыгнуть пользователей, которых не удалось перенести
+        if not errors and not chunk_errors:
+            save_checkpoint(checkpoint_file, data_file, processed)
+        errors.extend(chunk_errors)
+
+        rows = sum(counts.get(key, 0) for key in ("users", "quests", "insights", "reflections"))
+        for key, value in counts.items():
+            totals[key] = totals.get(key, 0) + value
+        elapsed = time.perf_counter() - chunk_started
+        logger.info(
+            f"Chunk committed: {len(chunk)} users, {rows} rows in {elapsed:.2f}s "
+            f"({rows / elapsed if elapsed else 0:.0f} rows/s), {processed} users processed"
+        )
+        chunk.clear()
+
+    for user_id, user_data in iter_json_object(data_file):
+        processed += 1
+        if processed <= start_from:
+            continue
+        chunk.append((user_id, user_data))
+        if len(chunk) >= chunk_size:
+            await flush()
+
+    if chunk:
+        await flush()
+
+    if processed == 0:
+        logger.warning("JSON file is empty. Nothing to migrate.")
+
+    elapsed = time.perf_counter() - started
+    rows_total = sum(totals[key] for key in ("users", "quests", "insights", "reflections"))
+
     # Итоги миграции
-    logger.info(f"Migration completed:")
-    logger.info(f"- Users migrated: {users_migrated}")
-    logger.info(f"- Quests migrated: {quests_migrated}")
-    logger.info(f"- Insights migrated: {insights_migrated}")
-    logger.info(f"- Reflections migrated: {reflections_migrated}")
+    logger.info(f"Migration completed in {elapsed:.2f}s ({rows_total / elapsed if elapsed else 0:.0f} rows/s):")
+    logger.info(f"- Users migrated: {totals['users']}")
+    logger.info(f"- Users skipped (already in database): {totals['skipped']}")
+    logger.info(f"- Quests migrated: {totals['quests']}")
+    logger.info(f"- Insights migrated: {totals['insights']}")
+    logger.info(f"- Reflections migrated: {totals['reflections']}")
     
     if errors:
         logger.warning(f"There were {len(errors)} errors during migration:")
         for error in errors:
             logger.warning(f"- {error}")
+    elif os.path.exists(checkpoint_file):
+        # Миграция завершена полностью, checkpoint больше не нужен
+        os.remove(checkpoint_file)
     
     return {
-        "users_migrated": users_migrated,
-        "quests_migrated": quests_migrated,
-        "insights_migrated": insights_migrated,
-        "reflections_migrated": reflections_migrated,
+        "users_migrated": totals["users"],
+        "users_skipped": totals["skipped"],
+        "quests_migrated": totals["quests"],
+        "insights_migrated": totals["insights"],
+        "reflections_migrated": totals["reflections"],
+        "rows_per_second": rows_total / elapsed if elapsed else 0.0,
         "errors": errors
     }
 
-async def main():
+async def main(args):
     """Основная функция"""
     # Инициализация базы данных
     await init_db()
     
     # Миграция данных
-    result = await migrate_json_to_db()
+    result = await migrate_json_to_db(
+        chunk_size=args.chunk_size,
+        checkpoint_file=args.checkpoint,
+        resume=not args.restart,
+    )
     
-    # Создание резервной копии JSON-файла
-    if os.path.exists(DATA_FILE):
+    # Создание резервной копии JSON-файла (только после полной миграции без ошибок)
+    if result and not result["errors"] and not args.keep_source and os.path.exists(DATA_FILE):
         backup_file = f"{DATA_FILE}.bak.{datetime.now().strftime('%Y%m%d_%H%M%S')}"
         try:
             os.rename(DATA_FILE, backup_file)
@@ -177,4 +176,13 @@ async def main():
             logger.error(f"Error creating backup: {e}")
 
 if __name__ == "__main__":
-    asyncio.run(main()) 
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Миграция данных из JSON в базу данных")
+    parser.add_argument("--chunk-size", type=int, default=MIGRATION_CHUNK_SIZE,
+                        help="Количество пользователей в одной транзакции")
+    parser.add_argument("--checkpoint", default=CHECKPOINT_FILE,
+                        help="Файл для сохранения прогресса")
+    parser.add_argument("--restart", action="store_true",
+                        help="Игнорировать сохраненный checkpoint")
+    parser.add_argument("--keep-source", action="store_true",
+                        help="Не переименовывать JSON-файл после миграции")
+    asyncio.run(main(parser.parse_args())) 
\ No newline at end of file
@@ -0,0 +1,66 @@
+"""Full-text search indexes for insights and reflections
+
+Revision ID: b3e7a9c1d5f2
+Revises: 8d2f4b6a1c3e
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b3e7a9c1d5f2'
+down_revision = '8d2f4b6a1c3e'
+branch_labels = None
+depends_on = None
+
+# Must match db.models.SEARCH_DOCUMENTS / SEARCH_COLUMNS
+DOCUMENTS = {
+    'insights': "coalesce(text, '')",
+    'reflections': "coalesce(important, '') || ' ' || coalesce(worked, '') || ' ' || coalesce(change, '')",
+}
+COLUMNS = {
+    'insights': ('text',),
+    'reflections': ('important', 'worked', 'change'),
+}
+
+
+def upgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        op.execute('CREATE EXTENSION IF NOT EXISTS btree_gin')
+        for table, document in DOCUMENTS.items():
+            op.execute(
+                f"CREATE INDEX ix_{table}_search ON {table} "
+                f"USING gin (user_id, to_tsvector('russian', {document}))"
+            )
+    elif dialect == 'sqlite':
+        for table, columns in COLUMNS.items():
+            columns = ('user_id',) + columns
+            names = ', '.join(columns)
+            new_values = ', '.join(f'new.{column}' for column in columns)
+            old_values = ', '.join(f'old.{column}' for column in columns)
+            delete = f"INSERT INTO {table}_fts({table}_fts, rowid, {names}) VALUES ('delete', old.id, {old_values});"
+            insert = f"INSERT INTO {table}_fts(rowid, {names}) VALUES (new.id, {new_values});"
+            op.execute(
+                f"CREATE VIRTUAL TABLE {table}_fts USING fts5({names}, "
+                f"content='{table}', content_rowid='id', tokenize='unicode61 remove_diacritics 2')"
+            )
+            op.execute(f"CREATE TRIGGER {table}_fts_ai AFTER INSERT ON {table} BEGIN {insert} END")
+            op.execute(f"CREATE TRIGGER {table}_fts_ad AFTER DELETE ON {table} BEGIN {delete} END")
+            op.execute(f"CREATE TRIGGER {table}_fts_au AFTER UPDATE ON {table} BEGIN {delete} {insert} END")
+            # Index the rows that already exist
+            op.execute(f"INSERT INTO {table}_fts({table}_fts) VALUES ('rebuild')")
+
+
+def downgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        for table in DOCUMENTS:
+            op.drop_index(f'ix_{table}_search', table_name=table)
+    elif dialect == 'sqlite':
+        for table in COLUMNS:
+            for suffix in ('ai', 'ad', 'au'):
+                op.execute(f'DROP TRIGGER IF EXISTS {table}_fts_{suffix}')
+            op.execute(f'DROP TABLE IF EXISTS {table}_fts')
@@ -0,0 +1,102 @@
+"""Month partitions for insights and reflections
+
+Revision ID: e7c2a4f6b8d1
+Revises: d5a9c3e7f1b4
+Create Date: 2026-10-19 17:00:00.000000
+
+"""
+from datetime import date
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e7c2a4f6b8d1'
+down_revision = 'd5a9c3e7f1b4'
+branch_labels = None
+depends_on = None
+
+# Must match db.models.SEARCH_DOCUMENTS
+DOCUMENTS = {
+    'insights': "coalesce(text, '')",
+    'reflections': "coalesce(important, '') || ' ' || coalesce(worked, '') || ' ' || coalesce(change, '')",
+}
+# Partitions created ahead of the current month; later ones come from the
+# tasks.maintain_partitions job
+MONTHS_AHEAD = 3
+
+
+def _month_index(day: date) -> int:
+    return day.year * 12 + day.month - 1
+
+
+def _month_start(index: int) -> str:
+    return f"{index // 12:04d}-{index % 12 + 1:02d}-01"
+
+
+def _create_indexes(table: str) -> None:
+    op.execute(f"CREATE INDEX ix_{table}_user_id_created_at ON {table} (user_id, created_at)")
+    op.execute(
+        f"CREATE INDEX ix_{table}_search ON {table} "
+        f"USING gin (user_id, to_tsvector('russian', {DOCUMENTS[table]}))"
+    )
+
+
+def upgrade() -> None:
+    # Declarative partitioning is PostgreSQL only; SQLite keeps plain tables
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    for table in DOCUMENTS:
+        op.execute(f"DROP INDEX IF EXISTS ix_{table}_search")
+        op.execute(f"ALTER TABLE {table} RENAME TO {table}_unpartitioned")
+        op.execute(f"ALTER TABLE {table}_unpartitioned RENAME CONSTRAINT {table}_pkey TO {table}_unpartitioned_pkey")
+        # The partition key must be set; its primary key must include it
+        op.execute(f"UPDATE {table}_unpartitioned SET created_at = localtimestamp WHERE created_at IS NULL")
+        op.execute(
+            f"CREATE TABLE {table} (LIKE {table}_unpartitioned INCLUDING DEFAULTS) "
+            f"PARTITION BY RANGE (created_at)"
+        )
+        op.execute(
+            f"ALTER TABLE {table} ALTER COLUMN created_at SET NOT NULL, "
+            f"ALTER COLUMN created_at SET DEFAULT localtimestamp"
+        )
+        op.execute(f"ALTER TABLE {table} ADD CONSTRAINT {table}_pkey PRIMARY KEY (id, created_at)")
+        op.execute(f"ALTER TABLE {table} ADD FOREIGN KEY (user_id) REFERENCES users (id)")
+        op.execute(f"ALTER SEQUENCE {table}_id_seq OWNED BY {table}.id")
+
+        oldest = op.get_bind().execute(sa.text(f"SELECT min(created_at) FROM {table}_unpartitioned")).scalar()
+        first = _month_index(oldest or date.today())
+        last = _month_index(date.today()) + MONTHS_AHEAD
+        for index in range(first, last + 1):
+            name = f"{table}_y{index // 12:04d}m{index % 12 + 1:02d}"
+            op.execute(
+                f"CREATE TABLE {name} PARTITION OF {table} "
+                f"FOR VALUES FROM ('{_month_start(index)}') TO ('{_month_start(index + 1)}')"
+            )
+        # Rows beyond the prepared months until the job catches up
+        op.execute(f"CREATE TABLE {table}_default PARTITION OF {table} DEFAULT")
+
+        op.execute(f"INSERT INTO {table} SELECT * FROM {table}_unpartitioned")
+        op.execute(f"DROP TABLE {table}_unpartitioned")
+        _create_indexes(table)
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    for table in DOCUMENTS:
+        op.execute(f"CREATE TABLE {table}_plain (LIKE {table} INCLUDING DEFAULTS)")
+        op.execute(f"INSERT INTO {table}_plain SELECT * FROM {table}")
+        op.execute(f"ALTER SEQUENCE {table}_id_seq OWNED BY {table}_plain.id")
+        op.execute(f"DROP TABLE {table}")
+        op.execute(f"ALTER TABLE {table}_plain RENAME TO {table}")
+        op.execute(f"ALTER TABLE {table} ALTER COLUMN created_at DROP NOT NULL")
+        op.execute(f"ALTER TABLE {table} ADD CONSTRAINT {table}_pkey PRIMARY KEY (id)")
+        op.execute(f"ALTER TABLE {table} ADD FOREIGN KEY (user_id) REFERENCES users (id)")
+        op.execute(
+            f"CREATE INDEX ix_{table}_search ON {table} "
+            f"USING gin (user_id, to_tsvector('russian', {DOCUMENTS[table]}))"
+        )
@@ -0,0 +1,82 @@
+from db.database import get_session
+from core.tracing import traced
+from db.models import Insight, Quest, Reflection, User
+from sqlalchemy.future import select
+from sqlalchemy import func
+from typing import Optional
+
+from utils.export import ExportWriter
+
+# Rows fetched per round trip of a server-side cursor
+EXPORT_FETCH_SIZE = 500
+
+# Columns of each exported table, in the order of utils.export.SECTIONS
+EXPORT_COLUMNS = {
+    "quests": (Quest, ("id", "text", "status", "phase", "created_at", "completed_at")),
+    "insights": (Insight, ("text", "created_at")),
+    "reflections": (Reflection, ("important", "worked", "change", "created_at")),
+}
+
+
+class ExportService:
+    """Streaming export of a user's history"""
+
+    @staticmethod
+    @traced()
+    async def count_rows(telegram_id: str) -> int:
+        """
+        Number of rows an export of the user would contain.
+
+        Args:
+            telegram_id: Telegram user ID
+
+        Returns:
+            Total of quests, insights and reflections (0 for unknown users)
+        """
+        async with get_session() as session:
+            user_pk = select(User.id).where(User.telegram_id == telegram_id).scalar_subquery()
+            total = 0
+            for model, _ in EXPORT_COLUMNS.values():
+                result = await session.execute(
+                    select(func.count()).select_from(model).where(model.user_id == user_pk)
+                )
+                total += result.scalar_one()
+            return total
+
+    @staticmethod
+    @traced()
+    async def write_export(telegram_id: str, fmt: str, spool_size: int = 1024 * 1024) -> Optional[ExportWriter]:
+        """
+        Encode the user's quests, insights and reflections into a spooled file.
+
+        Each table is read through a server-side cursor in batches of
+        EXPORT_FETCH_SIZE rows and every row is encoded as soon as it
+        arrives, so neither the ORM nor the output holds the full history.
+
+        Args:
+            telegram_id: Telegram user ID
+            fmt: "md" or "json"
+            spool_size: Bytes kept in memory before the file moves to disk
+
+        Returns:
+            Finished writer (file rewound to the start) or None if the user is unknown
+        """
+        async with get_session() as session:
+            result = await session.execute(select(User.id).where(User.telegram_id == telegram_id))
+            user_pk = result.scalar_one_or_none()
+            if user_pk is None:
+                return None
+
+            writer = ExportWriter(fmt, telegram_id, spool_size)
+            for section, (model, columns) in EXPORT_COLUMNS.items():
+                writer.section(section)
+                stream = await session.stream(
+                    select(*(getattr(model, column) for column in columns))
+                    .where(model.user_id == user_pk)
+                    .order_by(model.id)
+                    .execution_options(yield_per=EXPORT_FETCH_SIZE)
+                )
+                async for row in stream.mappings():
+                    writer.write(section, dict(row))
+            writer.finish()
+            return writer
@@ -0,0 +1,321 @@
+from db.database import get_session
+from db.models import User, Quest, Insight, Reflection, LastActive, DailyStat, QuestTemplate, Reminder
+from core.tracing import traced
+from sqlalchemy import func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Sequence, Tuple
+import logging
+
+from config import DEFAULT_TIMEZONE
+from utils.recurrence import DAILY
+from utils.reminders import minute_of_day, next_fire, user_reminders
+
+logger = logging.getLogger(__name__)
+
+# Tables reported by imports and reconciliation
+MIGRATED_TABLES = ("users", "quests", "insights", "reflections")
+
+# Date formats used by the JSON handlers
+JSON_DATE_FORMATS = ("%Y-%m-%d %H:%M", "%d.%m.%Y %H:%M", "%Y-%m-%d")
+
+
+def parse_json_date(value: Any, default: datetime) -> datetime:
+    """Parse a date string written by the JSON handlers"""
+    if isinstance(value, str):
+        for date_format in JSON_DATE_FORMATS:
+            try:
+                return datetime.strptime(value, date_format)
+            except ValueError:
+                continue
+    return default
+
+
+class MigrationService:
+    """Bulk import of legacy JSON user data into the database"""
+
+    @staticmethod
+    def build_rows(user_pk: int, user_data: Dict[str, Any], now: datetime) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Convert one legacy user record into rows for the child tables.
+
+        Args:
+            user_pk: Primary key of the already inserted user
+            user_data: Legacy JSON record of the user
+            now: Fallback timestamp for entries without a date
+
+        Returns:
+            Dict with "quests", "insights", "reflections", "last_active",
+            "daily_stats", "quest_templates" and "reminders" row lists
+        """
+        quests = [
+            {
+                "user_id": user_pk,
+                "text": quest.get("text", ""),
+                "status": quest.get("status", "todo"),
+                "phase": quest.get("phase"),
+                "created_at": parse_json_date(quest.get("date"), now),
+                "completed_at": now if quest.get("status") == "done" else None,
+            }
+            for quest in user_data.get("quests", [])
+            if isinstance(quest, dict)
+        ]
+
+        insights = []
+        for insight in user_data.get("insights", []):
+            if isinstance(insight, dict):
+                text, created_at = insight.get("text", ""), parse_json_date(insight.get("date"), now)
+            elif isinstance(insight, str):
+                text, created_at = insight, now
+            else:
+                continue
+            insights.append({"user_id": user_pk, "text": text, "created_at": created_at})
+
+        # Handlers store answers as q1/q2/q3, older exports used named keys
+        reflections = [
+            {
+                "user_id": user_pk,
+                "important": reflection.get("q1", reflection.get("important", "")),
+                "worked": reflection.get("q2", reflection.get("worked", "")),
+                "change": reflection.get("q3", reflection.get("change", "")),
+                "created_at": parse_json_date(reflection.get("date"), now),
+            }
+            for reflection in user_data.get("reflections", [])
+            if isinstance(reflection, dict)
+        ]
+
+        last_active = []
+        last_active_data = user_data.get("last_active")
+        if isinstance(last_active_data, dict):
+            timestamp = last_active_data.get("timestamp")
+            last_active.append({
+                "user_id": user_pk,
+                "timestamp": datetime.fromtimestamp(timestamp) if isinstance(timestamp, (int, float)) else now,
+                "context": last_active_data.get("context", ""),
+                "phase": last_active_data.get("phase"),
+            })
+
+        daily_stats = []
+        for day, stats in (user_data.get("daily_stats") or {}).items():
+            if not isinstance(stats, dict):
+                continue
+            daily_stats.append({
+                "user_id": user_pk,
+                "day": parse_json_date(day, now).date(),
+                "phase": stats.get("phase"),
+                "quests_added": stats.get("quests_added", 0),
+                "quests_done": stats.get("quests_done", 0),
+                "insights": stats.get("insights", 0),
+                "reflections": stats.get("reflections", 0),
+            })
+
+        quest_templates = [
+            {
+                "user_id": user_pk,
+                "text": template.get("text", ""),
+                "phase": template.get("phase"),
+                "weekday_mask": template.get("mask", DAILY),
+                "timezone": template.get("tz") or DEFAULT_TIMEZONE,
+                "active": True,
+                "materialized_on": parse_json_date(template["last_date"], now).date()
+                if template.get("last_date") else None,
+                "created_at": now,
+            }
+            for template in user_data.get("templates", [])
+            if isinstance(template, dict)
+        ]
+
+        reminders = []
+        times = dict(user_data.get("reminders") or {})
+        if user_data.get("reminder_time"):
+            times["reflection"] = user_data["reminder_time"]
+        enabled = user_reminders(user_data)
+        for kind, time in times.items():
+            try:
+                minute = minute_of_day(time)
+            except (TypeError, ValueError):
+                continue
+            reminders.append({
+                "user_id": user_pk,
+                "kind": kind,
+                "minute": minute,
+                "next_fire_at": next_fire(minute, now) if kind in enabled else None,
+                "created_at": now,
+            })
+
+        return {
+            "quests": quests,
+            "insights": insights,
+            "reflections": reflections,
+            "last_active": last_active,
+            "daily_stats": daily_stats,
+            "quest_templates": quest_templates,
+            "reminders": reminders,
+        }
+
+    @staticmethod
+    @traced()
+    async def import_users(session: AsyncSession, users: Iterable[Tuple[str, Dict[str, Any]]]) -> Dict[str, int]:
+        """
+        Insert a chunk of legacy users with all their data using executemany.
+
+        Users that already exist are skipped together with their data, so
+        re-running an import over the same chunk does not create duplicates.
+        The caller owns the transaction and commits once per chunk.
+
+        Args:
+            session: Database session
+            users: (telegram_id, legacy user record) pairs
+
+        Returns:
+            Number of inserted rows per table and skipped users
+        """
+        users = [(str(telegram_id), data) for telegram_id, data in users if isinstance(data, dict)]
+        counts = dict.fromkeys(MIGRATED_TABLES, 0)
+        counts["skipped"] = 0
+        if not users:
+            return counts
+
+        telegram_ids = [telegram_id for telegram_id, _ in users]
+        result = await session.execute(
+            select(User.telegram_id).where(User.telegram_id.in_(telegram_ids))
+        )
+        existing = set(result.scalars().all())
+        new_users = [(telegram_id, data) for telegram_id, data in users if telegram_id not in existing]
+        counts["skipped"] = len(users) - len(new_users)
+        if not new_users:
+            return counts
+
+        now = datetime.now()
+        await session.execute(insert(User), [
+            {
+                "telegram_id": telegram_id,
+                "phase": data.get("phase"),
+                "reminder_enabled": bool(data.get("reminder_enabled", False)),
+                "reminder_time": data.get("reminder_time"),
+                "created_at": now,
+            }
+            for telegram_id, data in new_users
+        ])
+        counts["users"] = len(new_users)
+
+        result = await session.execute(
+            select(User.id, User.telegram_id).where(
+                User.telegram_id.in_([telegram_id for telegram_id, _ in new_users])
+            )
+        )
+        user_pks = {telegram_id: pk for pk, telegram_id in result.all()}
+
+        rows: Dict[str, List[Dict[str, Any]]] = {
+            "quests": [], "insights": [], "reflections": [], "last_active": [], "daily_stats": [],
+            "quest_templates": [], "reminders": [],
+        }
+        for telegram_id, data in new_users:
+            for table, table_rows in MigrationService.build_rows(user_pks[telegram_id], data, now).items():
+                rows[table].extend(table_rows)
+
+        for model, table in (
+            (Quest, "quests"),
+            (Insight, "insights"),
+            (Reflection, "reflections"),
+            (LastActive, "last_active"),
+            (DailyStat, "daily_stats"),
+            (QuestTemplate, "quest_templates"),
+            (Reminder, "reminders"),
+        ):
+            if rows[table]:
+                await session.execute(insert(model), rows[table])
+                if table in counts:
+                    counts[table] = len(rows[table])
+
+        return counts
+
+    @staticmethod
+    @traced()
+    async def import_chunk(users: Sequence[Tuple[str, Dict[str, Any]]]) -> Tuple[Dict[str, int], List[str]]:
+        """
+        Import a chunk of legacy users in its own transaction.
+
+        If the chunk fails as a whole, users are retried one by one so that
+        a single broken record does not block the rest of the chunk.
+
+        Args:
+            users: (telegram_id, legacy user record) pairs
+
+        Returns:
+            Tuple of inserted row counts and error messages
+        """
+        async with get_session() as session:
+            try:
+                counts = await MigrationService.import_users(session, users)
+                await session.commit()
+                return counts, []
+            except Exception as e:
+                await session.rollback()
+                logger.warning(f"Chunk import failed ({e}), retrying user by user")
+
+        totals: Dict[str, int] = {}
+        errors: List[str] = []
+        for telegram_id, user_data in users:
+            async with get_session() as session:
+                try:
+                    counts = await MigrationService.import_users(session, [(telegram_id, user_data)])
+                    await session.commit()
+                except Exception as e:
+                    await session.rollback()
+                    logger.error(f"Error migrating user {telegram_id}: {e}")
+                    errors.append(f"User {telegram_id}: {e}")
+                    continue
+            for key, value in counts.items():
+                totals[key] = totals.get(key, 0) + value
+        return totals, errors
+
+    @staticmethod
+    def count_legacy_rows(user_data: Dict[str, Any]) -> Dict[str, int]:
+        """
+        Number of rows a legacy user record produces when imported.
+
+        Args:
+            user_data: Legacy JSON record of the user
+
+        Returns:
+            Row counts per migrated table
+        """
+        if not isinstance(user_data, dict):
+            return dict.fromkeys(MIGRATED_TABLES, 0)
+        rows = MigrationService.build_rows(0, user_data, datetime.now())
+        return {
+            "users": 1,
+            "quests": len(rows["quests"]),
+            "insights": len(rows["insights"]),
+            "reflections": len(rows["reflections"]),
+        }
+
+    @staticmethod
+    @traced()
+    async def count_migrated_rows(telegram_ids: Sequence[str], batch_size: int = 500) -> Dict[str, int]:
+        """
+        Count rows stored in the database for the given users.
+
+        Args:
+            telegram_ids: Telegram IDs of the migrated users
+            batch_size: Number of IDs per IN (...) query
+
+        Returns:
+            Row counts per migrated table
+        """
+        counts = dict.fromkeys(MIGRATED_TABLES, 0)
+        async with get_session() as session:
+            for offset in range(0, len(telegram_ids), batch_size):
+                batch = [str(telegram_id) for telegram_id in telegram_ids[offset:offset + batch_size]]
+                counts["users"] += await session.scalar(
+                    select(func.count()).select_from(User).where(User.telegram_id.in_(batch))
+                )
+                for model, table in ((Quest, "quests"), (Insight, "insights"), (Reflection, "reflections")):
+                    counts[table] += await session.scalar(
+                        select(func.count())
+                        .select_from(model)
+                        .join(User, model.user_id == User.id)
+                        .where(User.telegram_id.in_(batch))
+                    )
+        return counts
@@ -0,0 +1,187 @@
+from db.database import get_session
+from core.tracing import traced
+from sqlalchemy import text
+from datetime import date
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import asyncio
+import logging
+import re
+
+from utils.archive import ARCHIVED_TABLES, append_month, cutoff_month, db_archive_root
+from utils.helpers import shift_month
+
+logger = logging.getLogger(__name__)
+
+# Month-partitioned tables (see migration e7c2a4f6b8d1) and how their rows
+# look in the archive: the same entries the JSON handlers store
+PARTITIONED_TABLES = {
+    "insights": "p.text",
+    "reflections": "p.important, p.worked, p.change",
+}
+ARCHIVE_FETCH_SIZE = 1000
+# Users written to the archive per thread hop
+ARCHIVE_USERS_PER_WRITE = 500
+
+_PARTITION_NAME = re.compile(r"_y(\d{4})m(\d{2})$")
+
+
+def partition_name(table: str, month: str) -> str:
+    return f"{table}_y{month[:4]}m{month[5:7]}"
+
+
+def _entry(table: str, row) -> Dict[str, Any]:
+    stamp = row.created_at.strftime("%Y-%m-%d %H:%M")
+    if table == "insights":
+        return {"text": row.text, "date": stamp}
+    return {"date": stamp, "q1": row.important, "q2": row.worked, "q3": row.change}
+
+
+def _group_by_user(rows: List[Any], table: str) -> Iterator[Tuple[str, List[Dict[str, Any]]]]:
+    current, entries = None, []
+    for row in rows:
+        if row.telegram_id != current and entries:
+            yield current, entries
+            entries = []
+        current = row.telegram_id
+        entries.append(_entry(table, row))
+    if entries:
+        yield current, entries
+
+
+class PartitionService:
+    """Service for month partitions of insights and reflections (PostgreSQL)"""
+
+    @staticmethod
+    async def _is_partitioned(session, table: str) -> bool:
+        if session.bind.dialect.name != "postgresql":
+            return False
+        result = await session.execute(
+            text("SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(:table)"),
+            {"table": table},
+        )
+        return result.scalar() is not None
+
+    @staticmethod
+    @traced()
+    async def list_partitions(table: str) -> List[str]:
+        """Months (YYYY-MM) that have a partition, oldest first"""
+        async with get_session() as session:
+            if not await PartitionService._is_partitioned(session, table):
+                return []
+            result = await session.execute(
+                text(
+                    "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+                    "WHERE i.inhparent = to_regclass(:table)"
+                ),
+                {"table": table},
+            )
+            months = []
+            for name in result.scalars().all():
+                match = _PARTITION_NAME.search(name)
+                if match:
+                    months.append(f"{match.group(1)}-{match.group(2)}")
+            return sorted(months)
+
+    @staticmethod
+    @traced()
+    async def ensure_partitions(months_ahead: int, today: Optional[date] = None) -> List[str]:
+        """
+        Create the partitions of the current month and months_ahead more.
+
+        A no-op outside PostgreSQL or before the partitioning migration.
+
+        Returns:
+            Names of the created partitions
+        """
+        current = (today or date.today()).strftime("%Y-%m")
+        created = []
+        for table in PARTITIONED_TABLES:
+            existing = set(await PartitionService.list_partitions(table))
+            async with get_session() as session:
+                if not await PartitionService._is_partitioned(session, table):
+                    continue
+                for offset in range(months_ahead + 1):
+                    month = shift_month(current, offset)
+                    if month in existing:
+                        continue
+                    name = partition_name(table, month)
+                    try:
+                        await session.execute(text(
+                            f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {table} "
+                            f"FOR VALUES FROM ('{month}-01') TO ('{shift_month(month, 1)}-01')"
+                        ))
+                        await session.commit()
+                        created.append(name)
+                    except Exception as e:
+                        # Rows of the month already sit in the default partition
+                        await session.rollback()
+                        logger.warning(f"Could not create partition {name}: {e}")
+        return created
+
+    @staticmethod
+    @traced()
+    async def archive_partition(table: str, month: str, root: str) -> int:
+        """
+        Move one month partition to the cold archive.
+
+        Rows are streamed in (telegram_id, created_at) order and written as
+        one archive member per user under db_archive_root(root), apart from
+        the data.json archive; only after the archive is on disk is the
+        partition detached and dropped. A failed run leaves the partition
+        in place, and a retry rewrites the users' members.
+
+        Returns:
+            Number of archived rows
+        """
+        name = partition_name(table, month)
+        root = db_archive_root(root)
+        rows = 0
+        async with get_session() as session:
+            result = await session.stream(
+                text(
+                    f"SELECT u.telegram_id, p.created_at, {PARTITIONED_TABLES[table]} "
+                    f"FROM {name} p JOIN users u ON u.id = p.user_id "
+                    f"ORDER BY u.telegram_id, p.created_at, p.id"
+                ).execution_options(yield_per=ARCHIVE_FETCH_SIZE)
+            )
+            batch, users = [], 0
+            async for row in result:
+                if batch and row.telegram_id != batch[-1].telegram_id:
+                    users += 1
+                    if users >= ARCHIVE_USERS_PER_WRITE:
+                        rows += await asyncio.to_thread(
+                            append_month, root, table, month, list(_group_by_user(batch, table))
+                        )
+                        batch, users = [], 0
+                batch.append(row)
+            if batch:
+                rows += await asyncio.to_thread(
+                    append_month, root, table, month, list(_group_by_user(batch, table))
+                )
+
+        async with get_session() as session:
+            await session.execute(text(f"ALTER TABLE {table} DETACH PARTITION {name}"))
+            await session.execute(text(f"DROP TABLE {name}"))
+            await session.commit()
+        logger.info(f"Archived partition {name}: {rows} rows")
+        return rows
+
+    @staticmethod
+    @traced()
+    async def archive_cold(root: str, after_months: int, today: Optional[date] = None) -> Dict[str, int]:
+        """
+        Archive every partition of ARCHIVED_TABLES older than after_months
+        full months.
+
+        Returns:
+            Archived rows per partition name
+        """
+        cutoff = cutoff_month(today or date.today(), after_months)
+        archived = {}
+        for table in ARCHIVED_TABLES:
+            for month in await PartitionService.list_partitions(table):
+                if month < cutoff:
+                    archived[partition_name(table, month)] = await PartitionService.archive_partition(
+                        table, month, root
+                    )
+        return archived
@@ -1,16 +1,19 @@
 from db.database import get_session
+from core.tracing import traced
 from db.models import Quest, User
 from sqlalchemy.future import select
-from sqlalchemy import update, delete
+from sqlalchemy import update, delete, func
 from datetime import datetime
 from typing import List, Optional, Dict, Any
 
 from services.user_service import UserService
+from services.stats_service import StatsService
 
 class QuestService:
     """Service for quest-related operations"""
     
     @staticmethod
+    @traced()
     async def add_quest(telegram_id: str, text: str, phase: Optional[str] = None) -> Dict[str, Any]:
         """
         Add a new quest for the user.
@@ -45,6 +48,7 @@ class QuestService:
             
             # Update last active
             await UserService.update_last_active(telegram_id, "quest", phase)
+            await StatsService.record(telegram_id, "quests_added")
             
             return {
                 "success": True,
@@ -52,6 +56,7 @@ class QuestService:
             }
     
     @staticmethod
+    @traced()
     async def complete_quest(telegram_id: str, quest_id: int) -> Dict[str, Any]:
         """
         Mark a quest as completed.
@@ -98,6 +103,7 @@ class QuestService:
             
             # Update last active
             await UserService.update_last_active(telegram_id, "quest_done")
+            await StatsService.record(telegram_id, "quests_done")
             
             return {
                 "success": True,
@@ -105,6 +111,7 @@ class QuestService:
             }
     
     @staticmethod
+    @traced()
     async def delete_quest(telegram_id: str, quest_id: int) -> Dict[str, Any]:
         """
         Delete a quest.
@@ -142,6 +149,7 @@ class QuestService:
             }
     
     @staticmethod
+    @traced()
     async def get_user_quests(telegram_id: str, status: Optional[str] = None) -> List[Quest]:
         """
         Get quests for a user, optionally filtered by status.
@@ -164,4 +172,84 @@ class QuestService:
             result = await session.execute(query)
             quests = result.scalars().all()
             
-            return quests 
\ No newline at end of file
+            return quests
+
+    @staticmethod
+    @traced()
+    async def get_quests_page(
+        telegram_id: str,
+        after_id: Optional[int] = None,
+        before_id: Optional[int] = None,
+        limit: int = 10,
+        status: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Get one page of the user's quests ordered by id using keyset cursors.
+
+        Only `limit + 1` rows are read (the extra row tells whether another
+        page exists), served by the (user_id, id) / (user_id, status, id)
+        indexes regardless of how deep the page is.
+
+        Args:
+            telegram_id: User's Telegram ID
+            after_id: Return quests with id greater than this (next page)
+            before_id: Return quests with id less than this (previous page),
+                takes precedence over after_id
+            limit: Page size
+            status: Optional status filter ("todo", "done", or None for all)
+
+        Returns:
+            Dict with "items" (dicts with id, text, status, phase in ascending
+            id order), "has_prev" and "has_next"
+        """
+        async with get_session() as session:
+            user = await UserService.get_or_create_user(telegram_id)
+
+            query = select(Quest.id, Quest.text, Quest.status, Quest.phase).where(Quest.user_id == user.id)
+            if status:
+                query = query.where(Quest.status == status)
+
+            backwards = before_id is not None
+            if backwards:
+                query = query.where(Quest.id < before_id).order_by(Quest.id.desc())
+            else:
+                if after_id is not None:
+                    query = query.where(Quest.id > after_id)
+                query = query.order_by(Quest.id)
+
+            result = await session.execute(query.limit(limit + 1))
+            rows = [dict(row) for row in result.mappings().all()]
+
+            has_more = len(rows) > limit
+            rows = rows[:limit]
+            if backwards:
+                rows.reverse()
+
+            return {
+                "items": rows,
+                "has_prev": has_more if backwards else after_id is not None,
+                "has_next": before_id is not None if backwards else has_more,
+            }
+
+    @staticmethod
+    @traced()
+    async def count_quests(telegram_id: str, status: Optional[str] = None) -> int:
+        """
+        Count the user's quests, optionally filtered by status.
+
+        Args:
+            telegram_id: User's Telegram ID
+            status: Optional status filter ("todo", "done", or None for all)
+
+        Returns:
+            Number of quests
+        """
+        async with get_session() as session:
+            user = await UserService.get_or_create_user(telegram_id)
+
+            query = select(func.count()).select_from(Quest).where(Quest.user_id == user.id)
+            if status:
+                query = query.where(Quest.status == status)
+
+            result = await session.execute(query)
+            return result.scalar_one()
@@ -0,0 +1,159 @@
+from db.database import get_session
+from core.tracing import traced
+from db.models import Quest, QuestTemplate, User
+from sqlalchemy.future import select
+from sqlalchemy import and_, func, literal, or_, update
+from sqlalchemy.dialects import postgresql, sqlite
+from datetime import date, datetime
+from typing import List, Optional
+
+from services.user_service import UserService
+
+
+def _due_templates(timezone: str, day: date):
+    """Active templates of a timezone bucket that still owe an instance for the day"""
+    return and_(
+        QuestTemplate.timezone == timezone,
+        QuestTemplate.active.is_(True),
+        QuestTemplate.weekday_mask.op("&")(1 << day.weekday()) != 0,
+        or_(QuestTemplate.materialized_on.is_(None), QuestTemplate.materialized_on < day),
+    )
+
+
+class RecurringService:
+    """Service for repeating quest templates and their daily instances"""
+
+    @staticmethod
+    @traced()
+    async def add_template(
+        telegram_id: str,
+        text: str,
+        weekday_mask: int,
+        timezone: str,
+        phase: Optional[str] = None,
+    ) -> QuestTemplate:
+        """
+        Create a repeating quest for the user.
+
+        Args:
+            telegram_id: User's Telegram ID
+            text: Quest text
+            weekday_mask: Days to repeat on (see utils.recurrence)
+            timezone: IANA timezone deciding when the user's day starts
+            phase: Phase of the created quests, the user's phase if None
+
+        Returns:
+            The created template
+        """
+        user = await UserService.get_or_create_user(telegram_id)
+        async with get_session() as session:
+            template = QuestTemplate(
+                user_id=user.id,
+                text=text,
+                phase=phase,
+                weekday_mask=weekday_mask,
+                timezone=timezone,
+                active=True,
+                created_at=datetime.now(),
+            )
+            session.add(template)
+            await session.commit()
+            await session.refresh(template)
+            return template
+
+    @staticmethod
+    @traced()
+    async def list_templates(telegram_id: str) -> List[QuestTemplate]:
+        """Active templates of the user, oldest first"""
+        async with get_session() as session:
+            result = await session.execute(
+                select(QuestTemplate)
+                .join(User, User.id == QuestTemplate.user_id)
+                .where(User.telegram_id == telegram_id, QuestTemplate.active.is_(True))
+                .order_by(QuestTemplate.id)
+            )
+            return list(result.scalars().all())
+
+    @staticmethod
+    @traced()
+    async def deactivate_template(telegram_id: str, template_id: int) -> bool:
+        """
+        Stop a repeating quest; instances created so far stay.
+
+        Returns:
+            True if an active template of the user was found
+        """
+        async with get_session() as session:
+            user_pk = select(User.id).where(User.telegram_id == telegram_id).scalar_subquery()
+            result = await session.execute(
+                update(QuestTemplate)
+                .where(
+                    QuestTemplate.id == template_id,
+                    QuestTemplate.user_id == user_pk,
+                    QuestTemplate.active.is_(True),
+                )
+                .values(active=False)
+            )
+            await session.commit()
+            return result.rowcount > 0
+
+    @staticmethod
+    @traced()
+    async def timezones() -> List[str]:
+        """Timezone buckets that have active templates"""
+        async with get_session() as session:
+            result = await session.execute(
+                select(QuestTemplate.timezone).where(QuestTemplate.active.is_(True)).distinct()
+            )
+            return list(result.scalars().all())
+
+    @staticmethod
+    @traced()
+    async def materialize(timezone: str, day: date, now: Optional[datetime] = None) -> int:
+        """
+        Create the day's quests of every due template in a timezone bucket.
+
+        One INSERT ... SELECT copies all due templates into quests (the
+        phase falls back to the user's current one), then one UPDATE marks
+        them as materialized for the day. Both run in one transaction, and
+        the unique (template_id, due_date) index makes a repeated run a no-op.
+
+        Args:
+            timezone: Timezone bucket
+            day: Local date of the bucket
+            now: created_at of the new quests
+
+        Returns:
+            Number of quests created
+        """
+        due = _due_templates(timezone, day)
+        async with get_session() as session:
+            source = (
+                select(
+                    QuestTemplate.user_id,
+                    QuestTemplate.text,
+                    literal("todo"),
+                    func.coalesce(QuestTemplate.phase, User.phase),
+                    literal(now or datetime.now()),
+                    QuestTemplate.id,
+                    literal(day),
+                )
+                .join(User, User.id == QuestTemplate.user_id)
+                .where(due)
+            )
+            dialect = postgresql if session.bind.dialect.name == "postgresql" else sqlite
+            stmt = (
+                dialect.insert(Quest)
+                .from_select(
+                    ["user_id", "text", "status", "phase", "created_at", "template_id", "due_date"],
+                    source,
+                )
+                .on_conflict_do_nothing(index_elements=["template_id", "due_date"])
+            )
+            result = await session.execute(stmt)
+            await session.execute(
+                update(QuestTemplate).where(due).values(materialized_on=day)
+                .execution_options(synchronize_session=False)
+            )
+            await session.commit()
+            return max(result.rowcount, 0)
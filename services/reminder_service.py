@@ -1,14 +1,49 @@
 from db.database import get_session
-from db.models import User
+from core.tracing import traced
+from db.models import Reminder, User
 from sqlalchemy.future import select
-from sqlalchemy import update
-from typing import List, Optional
-from datetime import datetime
+from sqlalchemy import case, func, literal, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.types import DateTime
+from typing import Dict, Iterable, List, Optional
+from datetime import datetime, timedelta
+
+from utils.reminders import REMINDER_KINDS, format_minute, minute_of_day, next_fire
+
+
+def _next_fire_at(dialect_name: str, now: datetime):
+    """
+    SQL for the first moment after now at each row's minute of the day.
+
+    Every claimed row shares the same now, so the choice between today and
+    tomorrow is a comparison with now's minute; the minutes are then added
+    with the dialect's date arithmetic.
+    """
+    today = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    day = case(
+        (Reminder.minute > now.hour * 60 + now.minute, literal(today, DateTime)),
+        else_=literal(today + timedelta(days=1), DateTime),
+    )
+    if dialect_name == "postgresql":
+        return day + func.make_interval(0, 0, 0, 0, 0, Reminder.minute)
+    return func.datetime(day, func.printf("+%d minutes", Reminder.minute))
+
+
+async def _upsert_reminder(session, user_pk: int, kind: str, minute: int, next_fire_at: Optional[datetime]):
+    dialect = postgresql if session.bind.dialect.name == "postgresql" else sqlite
+    stmt = dialect.insert(Reminder).values(
+        user_id=user_pk, kind=kind, minute=minute, next_fire_at=next_fire_at, created_at=datetime.now()
+    )
+    await session.execute(stmt.on_conflict_do_update(
+        index_elements=["user_id", "kind"],
+        set_={"minute": stmt.excluded.minute, "next_fire_at": stmt.excluded.next_fire_at},
+    ))
 
 class ReminderService:
     """Service for managing reminder settings and operations"""
     
     @staticmethod
+    @traced()
     async def set_reminder(telegram_id: str, time: str, enabled: bool = True) -> bool:
         """
         Set reminder time for a user.
@@ -45,6 +80,11 @@ class ReminderService:
                     )
                 )
                 await session.execute(stmt)
+                minute = minute_of_day(time)
+                await _upsert_reminder(
+                    session, user.id, "reflection", minute,
+                    next_fire(minute, datetime.now()) if enabled else None,
+                )
                 await session.commit()
                 
                 return True
@@ -55,6 +95,7 @@ class ReminderService:
             return False
     
     @staticmethod
+    @traced()
     async def disable_reminder(telegram_id: str) -> bool:
         """
         Disable reminder for a user.
@@ -74,6 +115,14 @@ class ReminderService:
                     .values(reminder_enabled=False)
                 )
                 await session.execute(stmt)
+                await session.execute(
+                    update(Reminder)
+                    .where(
+                        Reminder.user_id == select(User.id).where(User.telegram_id == telegram_id).scalar_subquery(),
+                        Reminder.kind == "reflection",
+                    )
+                    .values(next_fire_at=None)
+                )
                 await session.commit()
                 
                 return True
@@ -81,6 +130,7 @@ class ReminderService:
             return False
     
     @staticmethod
+    @traced()
     async def get_users_for_reminder(time: str) -> List[User]:
         """
         Get all users who should receive a reminder at the specified time.
@@ -98,4 +148,132 @@ class ReminderService:
                     User.reminder_time == time
                 )
             )
-            return result.scalars().all() 
\ No newline at end of file
+            return result.scalars().all()
+
+    @staticmethod
+    @traced()
+    async def set_kind_reminder(telegram_id: str, kind: str, time: Optional[str], now: Optional[datetime] = None) -> bool:
+        """
+        Turn on, move or turn off one reminder kind of a user.
+
+        Args:
+            telegram_id: User's Telegram ID
+            kind: One of utils.reminders.REMINDER_KINDS
+            time: HH:MM, or None to switch the reminder off
+            now: Current time, to compute the first firing
+
+        Returns:
+            False if the user is unknown
+
+        Raises:
+            ValueError: If the kind or the time is invalid
+        """
+        if kind not in REMINDER_KINDS:
+            raise ValueError(f"Unknown reminder kind: {kind}")
+        async with get_session() as session:
+            result = await session.execute(select(User.id).where(User.telegram_id == telegram_id))
+            user_pk = result.scalar_one_or_none()
+            if user_pk is None:
+                return False
+
+            if time is None:
+                await session.execute(
+                    update(Reminder)
+                    .where(Reminder.user_id == user_pk, Reminder.kind == kind)
+                    .values(next_fire_at=None)
+                )
+            else:
+                minute = minute_of_day(time)
+                await _upsert_reminder(session, user_pk, kind, minute, next_fire(minute, now or datetime.now()))
+            await session.commit()
+            return True
+
+    @staticmethod
+    @traced()
+    async def list_reminders(telegram_id: str) -> List[Reminder]:
+        """Reminders of the user that are switched on"""
+        async with get_session() as session:
+            result = await session.execute(
+                select(Reminder)
+                .join(User, User.id == Reminder.user_id)
+                .where(User.telegram_id == telegram_id, Reminder.next_fire_at.is_not(None))
+                .order_by(Reminder.minute, Reminder.kind)
+            )
+            return list(result.scalars().all())
+
+    @staticmethod
+    @traced()
+    async def claim_due_slots(now: Optional[datetime] = None, limit: int = 500) -> Dict[str, Dict[str, List[str]]]:
+        """
+        Claim up to limit due reminders and move them to their next day.
+
+        One UPDATE ... WHERE id IN (SELECT ... FOR UPDATE SKIP LOCKED)
+        RETURNING both claims the rows and advances next_fire_at, so
+        concurrent workers take disjoint batches and a reminder missed
+        during downtime fires once, not once per missed day. SQLite has a
+        single writer and ignores the locking clause.
+
+        Args:
+            now: Current time
+            limit: Batch size
+
+        Returns:
+            Telegram ID -> reminder time (HH:MM) -> kinds due at that time
+        """
+        now = now or datetime.now()
+        async with get_session() as session:
+            due = (
+                select(Reminder.id)
+                .where(Reminder.next_fire_at <= now)
+                .order_by(Reminder.next_fire_at, Reminder.user_id)
+                .limit(limit)
+                .with_for_update(skip_locked=True)
+            )
+            result = await session.execute(
+                update(Reminder)
+                .where(Reminder.id.in_(due.scalar_subquery()))
+                .values(next_fire_at=_next_fire_at(session.bind.dialect.name, now))
+                .returning(Reminder.user_id, Reminder.minute, Reminder.kind)
+                .execution_options(synchronize_session=False)
+            )
+            slots_by_pk: Dict[int, Dict[str, List[str]]] = {}
+            for user_pk, minute, kind in result.all():
+                slots_by_pk.setdefault(user_pk, {}).setdefault(format_minute(minute), []).append(kind)
+
+            claimed = {}
+            if slots_by_pk:
+                result = await session.execute(
+                    select(User.id, User.telegram_id).where(User.id.in_(list(slots_by_pk)))
+                )
+                claimed = {telegram_id: slots_by_pk[pk] for pk, telegram_id in result.all()}
+            await session.commit()
+            return claimed
+
+    @staticmethod
+    async def claim_due(now: Optional[datetime] = None, limit: int = 500) -> Dict[str, List[str]]:
+        """
+        Claim due reminders like claim_due_slots, without their times.
+
+        Returns:
+            Telegram ID -> kinds due for that user, to merge into one message
+        """
+        claimed = await ReminderService.claim_due_slots(now, limit)
+        return {
+            telegram_id: [kind for kinds in slots.values() for kind in kinds]
+            for telegram_id, slots in claimed.items()
+        }
+
+    @staticmethod
+    @traced()
+    async def retry_at(telegram_id: str, kinds: Iterable[str], at: datetime) -> None:
+        """Fire claimed reminders again at the given time after a failed send"""
+        async with get_session() as session:
+            await session.execute(
+                update(Reminder)
+                .where(
+                    Reminder.user_id == select(User.id).where(User.telegram_id == telegram_id).scalar_subquery(),
+                    Reminder.kind.in_(list(kinds)),
+                )
+                .values(next_fire_at=at)
+            )
+            await session.commit()
@@ -0,0 +1,103 @@
+from db.database import get_session
+from core.tracing import traced
+from db.models import Insight, Reflection, User, SEARCH_CONFIG, SEARCH_DOCUMENTS
+from sqlalchemy.future import select
+from sqlalchemy import column, func, literal_column, table, union_all
+from typing import Any, Dict
+
+from utils.search import SEARCH_PAGE_SIZE, fts5_query
+
+
+def _display_text(model):
+    if model is Reflection:
+        parts = [func.coalesce(getattr(model, name), "") for name in ("important", "worked", "change")]
+        return (parts[0] + "\n" + parts[1] + "\n" + parts[2]).label("text")
+    return model.text.label("text")
+
+
+def _postgresql_arm(model, kind: str, user_pk: int, query: str):
+    document = SEARCH_DOCUMENTS[model.__tablename__]
+    vector = literal_column(f"to_tsvector('{SEARCH_CONFIG}', {document})")
+    tsquery = func.websearch_to_tsquery(literal_column(f"'{SEARCH_CONFIG}'"), query)
+    return (
+        select(
+            literal_column(f"'{kind}'").label("kind"),
+            model.id.label("id"),
+            _display_text(model),
+            model.created_at.label("created_at"),
+            func.ts_rank(vector, tsquery).label("rank"),
+        )
+        .where(model.user_id == user_pk, vector.op("@@")(tsquery))
+    )
+
+
+def _sqlite_arm(model, kind: str, user_pk: int, match: str):
+    fts = f"{model.__tablename__}_fts"
+    index = table(fts, column("rowid"))
+    return (
+        select(
+            literal_column(f"'{kind}'").label("kind"),
+            model.id.label("id"),
+            _display_text(model),
+            model.created_at.label("created_at"),
+            # bm25 is lower for better matches; the user_id column gets no weight
+            (-literal_column(f"bm25({fts}, 0.0)")).label("rank"),
+        )
+        .select_from(model)
+        .join(index, index.c.rowid == model.id)
+        .where(model.user_id == user_pk, literal_column(fts).op("MATCH")(f"user_id:{user_pk} AND ({match})"))
+    )
+
+
+class SearchService:
+    """Ranked full-text search over a user's insights and reflections"""
+
+    @staticmethod
+    @traced()
+    async def search(telegram_id: str, query: str, offset: int = 0, limit: int = SEARCH_PAGE_SIZE) -> Dict[str, Any]:
+        """
+        One page of entries matching the query, best matches first.
+
+        PostgreSQL matches a Russian-stemmed tsvector through the GIN
+        expression indexes; SQLite matches word prefixes (stems cut by
+        utils.search) in the FTS5 tables, together with the user_id token.
+        One extra row is read to tell whether a next page exists.
+
+        Args:
+            telegram_id: Telegram user ID
+            query: Words to look for
+            offset: Number of results to skip
+            limit: Page size
+
+        Returns:
+            Dictionary with "items" (kind, id, text, created_at, rank) and "has_next"
+        """
+        async with get_session() as session:
+            result = await session.execute(select(User.id).where(User.telegram_id == telegram_id))
+            user_pk = result.scalar_one_or_none()
+            if user_pk is None:
+                return {"items": [], "has_next": False}
+
+            if session.bind.dialect.name == "postgresql":
+                arms = [
+                    _postgresql_arm(Insight, "insight", user_pk, query),
+                    _postgresql_arm(Reflection, "reflection", user_pk, query),
+                ]
+            else:
+                match = fts5_query(query)
+                if match is None:
+                    return {"items": [], "has_next": False}
+                arms = [
+                    _sqlite_arm(Insight, "insight", user_pk, match),
+                    _sqlite_arm(Reflection, "reflection", user_pk, match),
+                ]
+
+            hits = union_all(*arms).subquery()
+            result = await session.execute(
+                select(hits)
+                .order_by(hits.c.rank.desc(), hits.c.created_at.desc(), hits.c.id.desc())
+                .offset(offset)
+                .limit(limit + 1)
+            )
+            items = [dict(row) for row in result.mappings().all()]
+            return {"items": items[:limit], "has_next": len(items) > limit}
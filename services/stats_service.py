@@ -0,0 +1,98 @@
+from db.database import get_session
+from core.tracing import traced
+from db.models import DailyStat, User
+from sqlalchemy.future import select
+from sqlalchemy.dialects import postgresql, sqlite
+from datetime import date
+from typing import List, Optional
+
+# Counters of DailyStat that record() can increment
+COUNTERS = ("quests_added", "quests_done", "insights", "reflections")
+
+
+def month_bounds(year: int, month: int):
+    """First day of the month and first day of the next one"""
+    first = date(year, month, 1)
+    following = date(year + month // 12, month % 12 + 1, 1)
+    return first, following
+
+
+async def _user_pk(session, telegram_id: str) -> Optional[int]:
+    # UserService depends on this service, so the user is looked up directly
+    result = await session.execute(select(User.id).where(User.telegram_id == telegram_id))
+    return result.scalar_one_or_none()
+
+
+class StatsService:
+    """Service maintaining and reading the per-user daily rollup"""
+
+    @staticmethod
+    @traced()
+    async def record(
+        telegram_id: str,
+        counter: Optional[str] = None,
+        phase: Optional[str] = None,
+        day: Optional[date] = None,
+    ) -> None:
+        """
+        Add one event to the user's row for the day with a single upsert.
+
+        Args:
+            telegram_id: User's Telegram ID
+            counter: One of COUNTERS to increment, or None
+            phase: Phase chosen that day; the latest choice wins
+            day: Day of the event, today by default
+        """
+        if counter is not None and counter not in COUNTERS:
+            raise ValueError(f"Unknown daily stat counter: {counter}")
+
+        async with get_session() as session:
+            user_id = await _user_pk(session, telegram_id)
+            if user_id is None:
+                return
+
+            values = {"user_id": user_id, "day": day or date.today(), "phase": phase}
+            values.update({name: int(name == counter) for name in COUNTERS})
+
+            dialect = postgresql if session.bind.dialect.name == "postgresql" else sqlite
+            stmt = dialect.insert(DailyStat).values(**values)
+            updates = {}
+            if counter is not None:
+                updates[counter] = getattr(DailyStat, counter) + 1
+            if phase is not None:
+                updates["phase"] = stmt.excluded.phase
+
+            if updates:
+                stmt = stmt.on_conflict_do_update(index_elements=["user_id", "day"], set_=updates)
+            else:
+                stmt = stmt.on_conflict_do_nothing(index_elements=["user_id", "day"])
+
+            await session.execute(stmt)
+            await session.commit()
+
+    @staticmethod
+    @traced()
+    async def get_month(telegram_id: str, year: int, month: int) -> List[DailyStat]:
+        """
+        Get the rollup rows of one month, one indexed range read.
+
+        Args:
+            telegram_id: User's Telegram ID
+            year: Calendar year
+            month: Calendar month (1-12)
+
+        Returns:
+            Up to 31 DailyStat rows ordered by day; days without activity are absent
+        """
+        first, following = month_bounds(year, month)
+        async with get_session() as session:
+            user_id = await _user_pk(session, telegram_id)
+            if user_id is None:
+                return []
+
+            result = await session.execute(
+                select(DailyStat)
+                .where(DailyStat.user_id == user_id, DailyStat.day >= first, DailyStat.day < following)
+                .order_by(DailyStat.day)
+            )
+            return result.scalars().all()
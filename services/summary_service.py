@@ -0,0 +1,183 @@
+from db.database import get_session
+from core.tracing import traced
+from db.models import DailyStat, User
+from sqlalchemy.future import select
+from sqlalchemy import func
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+PERIODS = ("week", "month")
+
+PHASE_LABELS = {
+    "active": "⚡ Актива",
+    "low": "🌀 Спад",
+    "fog": "😵 Подвис"
+}
+
+
+def summary_window(period: str, today: date) -> Tuple[date, date]:
+    """
+    The last complete period before `today` as [since, until).
+
+    Args:
+        period: "week" (Monday to Monday) or "month"
+        today: Day the summary is generated
+
+    Returns:
+        Tuple of the first day and the day after the last one
+    """
+    if period == "week":
+        until = today - timedelta(days=today.weekday())
+        return until - timedelta(days=7), until
+    if period == "month":
+        until = today.replace(day=1)
+        return (until - timedelta(days=1)).replace(day=1), until
+    raise ValueError(f"Unknown summary period: {period}")
+
+
+def render_summary(period: str, since: date, until: date, summary: Dict[str, Any]) -> str:
+    """Message text of one user's summary"""
+    title = "Итоги недели" if period == "week" else "Итоги месяца"
+    last_day = until - timedelta(days=1)
+    lines = [
+        f"📊 <b>{title}</b> ({since:%d.%m} — {last_day:%d.%m})\n",
+        f"📋 Квестов добавлено: <b>{summary['quests_added']}</b>, завершено: <b>{summary['quests_done']}</b>",
+        f"🧠 Инсайтов: <b>{summary['insights']}</b>",
+        f"🕯 Рефлексий: <b>{summary['reflections']}</b>",
+    ]
+    phases = summary.get("phases") or {}
+    if phases:
+        top = sorted(phases.items(), key=lambda item: -item[1])
+        lines.append("🌗 Фазы: " + " · ".join(
+            f"{PHASE_LABELS.get(phase, phase)} {days}" for phase, days in top
+        ))
+    return "\n".join(lines)
+
+
+SUMMARY_COUNTERS = ("quests_added", "quests_done", "insights", "reflections")
+
+
+def window_stats(user_data: Any, since: date, until: date) -> Optional[Dict[str, Dict[str, Any]]]:
+    """
+    Days of a JSON record's daily_stats rollup inside [since, until).
+
+    This is the rollup the handlers record into (utils.helpers.record_daily_stat).
+
+    Returns:
+        Day -> counters and phase, or None for a record without activity
+    """
+    if not isinstance(user_data, dict):
+        return None
+    first, end = since.isoformat(), until.isoformat()
+    days = {
+        day: stats for day, stats in (user_data.get("daily_stats") or {}).items()
+        if first <= day < end and isinstance(stats, dict)
+    }
+    return days or None
+
+
+def summarize_days(telegram_id: str, days: Dict[str, Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """
+    One user's summary from window_stats, in the layout of SummaryService.collect.
+
+    Returns:
+        Dict with telegram_id, counters and "phases" (phase -> days), or None without activity
+    """
+    summary: Dict[str, Any] = {"telegram_id": telegram_id, **dict.fromkeys(SUMMARY_COUNTERS, 0), "phases": {}}
+    for stats in days.values():
+        for key in SUMMARY_COUNTERS:
+            summary[key] += stats.get(key) or 0
+        phase = stats.get("phase")
+        if phase:
+            summary["phases"][phase] = summary["phases"].get(phase, 0) + 1
+    if summary["phases"] or any(summary[key] for key in SUMMARY_COUNTERS):
+        return summary
+    return None
+
+
+class SummaryService:
+    """Set-based computation of periodic summaries for many users at once"""
+
+    @staticmethod
+    @traced()
+    async def user_id_ranges(chunk_size: int) -> List[Tuple[int, int]]:
+        """
+        Split the users table into primary key ranges of `chunk_size` ids.
+
+        Args:
+            chunk_size: Width of one range
+
+        Returns:
+            List of inclusive (start, end) primary key ranges
+        """
+        async with get_session() as session:
+            result = await session.execute(select(func.min(User.id), func.max(User.id)))
+            low, high = result.one()
+        if low is None:
+            return []
+        return [(start, min(start + chunk_size - 1, high)) for start in range(low, high + 1, chunk_size)]
+
+    @staticmethod
+    @traced()
+    async def collect(start_pk: int, end_pk: int, since: date, until: date) -> List[Dict[str, Any]]:
+        """
+        Summaries of all users in a primary key range from the daily_stats table.
+
+        The scheduled summaries read the JSON rollup instead (window_stats,
+        summarize_days): the handlers record their events there.
+
+        Two grouped statements cover the whole range: one for the counters,
+        one for days per phase. Users without activity in the window are
+        left out.
+
+        Args:
+            start_pk: First users.id of the range
+            end_pk: Last users.id of the range
+            since: First day of the window
+            until: Day after the last day of the window
+
+        Returns:
+            List of dicts with telegram_id, counters and "phases" (phase -> days)
+        """
+        in_window = (
+            DailyStat.user_id.between(start_pk, end_pk),
+            DailyStat.day >= since,
+            DailyStat.day < until,
+        )
+        async with get_session() as session:
+            totals = await session.execute(
+                select(
+                    DailyStat.user_id,
+                    User.telegram_id,
+                    func.sum(DailyStat.quests_added).label("quests_added"),
+                    func.sum(DailyStat.quests_done).label("quests_done"),
+                    func.sum(DailyStat.insights).label("insights"),
+                    func.sum(DailyStat.reflections).label("reflections"),
+                )
+                .join(User, User.id == DailyStat.user_id)
+                .where(*in_window)
+                .group_by(DailyStat.user_id, User.telegram_id)
+            )
+            phases = await session.execute(
+                select(DailyStat.user_id, DailyStat.phase, func.count().label("days"))
+                .where(*in_window, DailyStat.phase.isnot(None))
+                .group_by(DailyStat.user_id, DailyStat.phase)
+            )
+
+            by_user: Dict[int, Dict[str, int]] = {}
+            for user_id, phase, days in phases.all():
+                by_user.setdefault(user_id, {})[phase] = days
+
+            summaries = []
+            for row in totals.mappings().all():
+                summary = {
+                    "telegram_id": row["telegram_id"],
+                    "quests_added": row["quests_added"] or 0,
+                    "quests_done": row["quests_done"] or 0,
+                    "insights": row["insights"] or 0,
+                    "reflections": row["reflections"] or 0,
+                    "phases": by_user.get(row["user_id"], {}),
+                }
+                if summary["phases"] or any(summary[key] for key in ("quests_added", "quests_done", "insights", "reflections")):
+                    summaries.append(summary)
+            return summaries
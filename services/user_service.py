@@ -1,14 +1,18 @@
 from db.database import get_session
+from core.tracing import traced
 from db.models import User, Quest, Insight, Reflection, LastActive
 from sqlalchemy.future import select
 from sqlalchemy import update, delete
 from datetime import datetime
 from typing import List, Optional, Dict, Any
 
+from services.stats_service import StatsService
+
 class UserService:
     """Service for user-related operations"""
     
     @staticmethod
+    @traced()
     async def get_or_create_user(telegram_id: str) -> User:
         """Get user by telegram_id or create if not exists"""
         async with get_session() as session:
@@ -26,6 +30,7 @@ class UserService:
             return user
     
     @staticmethod
+    @traced()
     async def update_phase(telegram_id: str, phase: str) -> None:
         """Update user phase"""
         async with get_session() as session:
@@ -40,8 +45,11 @@ class UserService:
             # Update last active
             await UserService.update_last_active(telegram_id, "phase", phase)
             await session.commit()
+
+        await StatsService.record(telegram_id, phase=phase)
     
     @staticmethod
+    @traced()
     async def update_last_active(telegram_id: str, context: str, phase: Optional[str] = None) -> None:
         """Update user's last active status"""
         async with get_session() as session:
@@ -82,6 +90,7 @@ class UserService:
             await session.commit()
             
     @staticmethod
+    @traced()
     async def get_user_data(telegram_id: str) -> Dict[str, Any]:
         """Get comprehensive user data including stats"""
         async with get_session() as session:
@@ -1,6 +1,13 @@
 import asyncio
+import contextlib
+import contextvars
 import logging
-from datetime import datetime
+import os
+import shutil
+import threading
+import time
+import uuid
+from datetime import date, datetime, timedelta
 from typing import Dict, Any, List
 
 from celery_app import app
@@ -9,6 +16,12 @@ from aiogram import Bot
 from aiogram.enums import ParseMode
 from aiogram.client.default import DefaultBotProperties
 
+from core.metrics import (
+    REMINDER_FANOUT_LAG, REMINDERS_SENT, SUMMARY_CHUNK_DURATION, SUMMARY_MESSAGES,
+    RECURRING_MATERIALIZE_DURATION, RECURRING_QUESTS_CREATED,
+)
+from middleware.tracing import TracingRequestMiddleware
+
 logger = logging.getLogger(__name__)
 
 # Initialize bot instance for tasks
@@ -16,136 +29,575 @@ bot = Bot(
     token=BOT_TOKEN,
     default=DefaultBotProperties(parse_mode=ParseMode.HTML)
 )
+bot.session.middleware(TracingRequestMiddleware())
 
-@app.task
+# Event loop shared by all task threads of this process. The bot session
+# and the database engine are bound to the loop they were first used on.
+_loop = None
+_loop_lock = threading.Lock()
+
+def _get_loop() -> asyncio.AbstractEventLoop:
+    """Start the process-wide event loop thread on first use"""
+    global _loop
+    with _loop_lock:
+        if _loop is None or _loop.is_closed():
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="tasks-event-loop", daemon=True).start()
+        return _loop
+
+async def _in_context(coro, context: contextvars.Context):
+    """Run coro with the caller's context variables (current trace span)"""
+    for var, value in context.items():
+        var.set(value)
+    return await coro
+
+def _run_async(coro):
+    """
+    Run a coroutine on the shared event loop and wait for its result.
+
+    Works from prefork processes and from threads pool workers alike;
+    with the threads pool, concurrent tasks await on the same loop.
+    """
+    future = asyncio.run_coroutine_threadsafe(
+        _in_context(coro, contextvars.copy_context()), _get_loop()
+    )
+    return future.result()
+
+@app.task(ignore_result=True)
 def check_reminders() -> Dict[str, Any]:
     """
     Celery task to check reminders and send notifications.
     Runs every minute via beat schedule.
+
+    The result is not stored; its counters are aggregated by the task
+    stats sink (see core.task_stats).
     
     Returns:
         Dictionary with task results
     """
     logger.info("Running reminder check")
-    loop = asyncio.get_event_loop()
-    if loop.is_closed():
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        
     try:
-        result = loop.run_until_complete(_check_reminders_async())
-        return result
+        return _run_async(_check_reminders_async())
     except Exception as e:
         logger.error(f"Error in reminder check: {e}")
         return {"status": "error", "error": str(e)}
 
+_reminder_scheduler = None
+
+def _get_reminder_scheduler():
+    """Scheduler shared by all check_reminders runs of this process"""
+    global _reminder_scheduler
+    if _reminder_scheduler is None:
+        from core.scheduler import MinuteScheduler
+        from utils.cache import redis_client
+
+        _reminder_scheduler = MinuteScheduler(redis_client, "reminders:celery")
+    return _reminder_scheduler
+
 async def _check_reminders_async() -> Dict[str, Any]:
     """
-    Async function to check reminders and send notifications.
-    
+    Async function to claim due reminders and send notifications.
+
+    Reminders are claimed from the reminders table in batches; a claim
+    moves next_fire_at to the next day in the same statement, so workers
+    running this concurrently (or beat delivering a minute twice) never
+    send a reminder twice. All batches are claimed before sending, so
+    reminders of one user that are due together are merged into one
+    message even when they fall into different batches.
+
+    Users still served from data.json by the bot's reminder loop may have
+    the same reminder in both places; every (user, day, time) is reserved
+    with the scheduler's claim_send key shared with the bot before sending.
+
     Returns:
         Dictionary with task results
     """
+    from aiogram.exceptions import TelegramForbiddenError
     from services.reminder_service import ReminderService
-    
-    now = datetime.now().strftime("%H:%M")
-    logger.info(f"Checking reminders for time: {now}")
-    
+    from utils.reminders import render_reminder
+    from config import REMINDER_CLAIM_BATCH, REMINDER_RETRY_DELAY
+
+    scheduler = _get_reminder_scheduler()
+    now = datetime.now()
+    minute = now.replace(second=0, microsecond=0)
+    result = {
+        "users_count": 0, "reminders_count": 0, "sent_count": 0, "error_count": 0,
+        "blocked_count": 0, "duplicate_count": 0,
+    }
+
+    # Telegram ID -> reminder time -> kinds, across all claimed batches
+    due: Dict[str, Dict[str, List[str]]] = {}
+    while True:
+        claimed = await ReminderService.claim_due_slots(now, REMINDER_CLAIM_BATCH)
+        if not claimed:
+            break
+        for telegram_id, slots in claimed.items():
+            user_slots = due.setdefault(telegram_id, {})
+            for slot, kinds in slots.items():
+                user_slots.setdefault(slot, []).extend(kinds)
+    result["users_count"] = len(due)
+
+    for telegram_id, slots in due.items():
+        reserved, kinds = [], []
+        for slot, slot_kinds in slots.items():
+            result["reminders_count"] += len(slot_kinds)
+            if await scheduler.claim_send(telegram_id, now.date(), slot):
+                reserved.append(slot)
+                kinds.extend(slot_kinds)
+            else:
+                result["duplicate_count"] += 1
+                REMINDERS_SENT.inc("celery", "duplicate")
+        if not kinds:
+            continue
+        try:
+            await bot.send_message(chat_id=telegram_id, text=render_reminder(kinds))
+            result["sent_count"] += 1
+            REMINDER_FANOUT_LAG.observe(time.time() - minute.timestamp(), "celery")
+            REMINDERS_SENT.inc("celery", "sent")
+        except TelegramForbiddenError:
+            # The user blocked the bot, the reminder waits for the next day
+            result["blocked_count"] += 1
+            REMINDERS_SENT.inc("celery", "blocked")
+        except Exception as e:
+            for slot in reserved:
+                await scheduler.release_send(telegram_id, now.date(), slot)
+            await ReminderService.retry_at(telegram_id, kinds, now + timedelta(seconds=REMINDER_RETRY_DELAY))
+            result["error_count"] += 1
+            REMINDERS_SENT.inc("celery", "error")
+            logger.error(f"Failed to send reminder to {telegram_id}: {e}")
+
+    return {"status": "success", "time": minute.strftime("%H:%M"), **result}
+
+@app.task
+def generate_summaries(period: str = "week") -> Dict[str, Any]:
+    """
+    Celery task starting the weekly or monthly summary pipeline.
+
+    Streams data.json once, the file the handlers record their daily_stats
+    rollup into, and writes the window's days of active users to shard
+    files of SUMMARY_CHUNK_SIZE users in SUMMARY_SHARD_DIR. The shards are
+    fanned out as build_summary_chunk tasks, so the work spreads across
+    workers. Runs from beat on Mondays ("week") and on the 1st ("month").
+
+    Args:
+        period: "week" or "month"
+
+    Returns:
+        Dictionary with the summary window and number of chunks
+    """
+    from functools import partial
+    from celery import group
+    from services.summary_service import summary_window, window_stats
+    from utils.json_stream import write_shards
+    from config import DATA_FILE, SUMMARY_CHUNK_SIZE, SUMMARY_SHARD_DIR
+
+    since, until = summary_window(period, date.today())
+    shard_dir = os.path.join(SUMMARY_SHARD_DIR, f"{period}-{since:%Y%m%d}-{uuid.uuid4().hex[:8]}")
     try:
-        # Get users with reminders set for now
-        users = await ReminderService.get_users_for_reminder(now)
-        
-        # Send notifications
-        sent_count = 0
-        error_count = 0
-        
-        for user in users:
+        shards, users = write_shards(
+            DATA_FILE, shard_dir, SUMMARY_CHUNK_SIZE, partial(window_stats, since=since, until=until)
+        )
+    except FileNotFoundError:
+        shards, users = [], 0
+    if shards:
+        group(
+            build_summary_chunk.s(period, path, since.isoformat(), until.isoformat())
+            for path, _, _ in shards
+        ).apply_async()
+    else:
+        shutil.rmtree(shard_dir, ignore_errors=True)
+
+    logger.info(f"{period} summaries for {since}..{until}: {users} active users in {len(shards)} chunks")
+    return {"status": "started", "period": period, "since": since.isoformat(), "chunks_count": len(shards)}
+
+@app.task
+def build_summary_chunk(period: str, shard_path: str, since: str, until: str) -> Dict[str, Any]:
+    """
+    Celery task computing and rendering the summaries of one shard.
+
+    The shard holds the window's daily_stats days of its users; rendered
+    messages go to send_summary_batch in batches. The shard file is removed
+    once the batches are queued.
+
+    Args:
+        period: "week" or "month"
+        shard_path: Shard written by generate_summaries
+        since: First day of the window (ISO date)
+        until: Day after the last day of the window (ISO date)
+
+    Returns:
+        Dictionary with rendered messages, batches and chunk runtime
+    """
+    from services.summary_service import render_summary, summarize_days
+    from utils.json_stream import read_shard
+    from config import SUMMARY_BATCH_SIZE
+
+    started = time.perf_counter()
+    since_day, until_day = date.fromisoformat(since), date.fromisoformat(until)
+    summaries = [summarize_days(telegram_id, days) for telegram_id, days in read_shard(shard_path)]
+    messages = [
+        (summary["telegram_id"], render_summary(period, since_day, until_day, summary))
+        for summary in summaries if summary is not None
+    ]
+
+    batches = 0
+    for offset in range(0, len(messages), SUMMARY_BATCH_SIZE):
+        send_summary_batch.delay(period, messages[offset:offset + SUMMARY_BATCH_SIZE])
+        batches += 1
+
+    os.remove(shard_path)
+    # The last chunk of the run leaves an empty directory behind
+    with contextlib.suppress(OSError):
+        os.rmdir(os.path.dirname(shard_path))
+
+    runtime = time.perf_counter() - started
+    SUMMARY_CHUNK_DURATION.observe(runtime, period)
+    SUMMARY_MESSAGES.inc(period, "rendered", amount=len(messages))
+    logger.info(f"{period} summaries {os.path.basename(shard_path)}: {len(messages)} rendered in {runtime:.2f}s")
+    return {"rendered_count": len(messages), "batches_count": batches, "runtime_ms": int(runtime * 1000)}
+
+_summary_limiter = None
+
+def _get_summary_limiter():
+    """Sender rate limiter shared by all summary batches of this process"""
+    global _summary_limiter
+    if _summary_limiter is None:
+        from core.rate_limit import RateLimiter
+        from config import SUMMARY_SEND_RATE
+
+        _summary_limiter = RateLimiter(SUMMARY_SEND_RATE)
+    return _summary_limiter
+
+@app.task
+def send_summary_batch(period: str, messages: List[List[str]]) -> Dict[str, Any]:
+    """
+    Celery task sending rendered summaries at SUMMARY_SEND_RATE per process.
+
+    Args:
+        period: "week" or "month"
+        messages: (chat_id, text) pairs
+
+    Returns:
+        Dictionary with sent, blocked and failed counts
+    """
+    from core.rate_limit import send_paced
+
+    counts = _run_async(send_paced(bot, messages, _get_summary_limiter()))
+    for status, count in counts.items():
+        SUMMARY_MESSAGES.inc(period, status, amount=count)
+    return {f"{status}_count": count for status, count in counts.items()}
+
+@app.task
+def export_user_data(telegram_id: str, chat_id: int, fmt: str = "md") -> Dict[str, Any]:
+    """
+    Celery task building a user's export and sending it as a document.
+
+    The record is read from the JSON storage the handlers write to, with
+    archived months put back. Rows are encoded into a spooled temporary
+    file and uploaded in chunks, so worker memory does not grow with the
+    history.
+
+    Args:
+        telegram_id: Telegram user ID
+        chat_id: Chat receiving the document
+        fmt: "md" or "json"
+
+    Returns:
+        Dictionary with exported rows and file size
+    """
+    from utils.export import SpooledInputFile, export_filename, find_legacy_user, legacy_rows, write_rows
+    from utils.archive import with_archived
+    from config import ARCHIVE_DIR, DATA_FILE, EXPORT_SPOOL_SIZE
+
+    writer = None
+    user_data = find_legacy_user(DATA_FILE, telegram_id)
+    if isinstance(user_data, dict):
+        user_data = with_archived(ARCHIVE_DIR, user_data, telegram_id)
+        writer = write_rows(fmt, telegram_id, legacy_rows(user_data), EXPORT_SPOOL_SIZE)
+    if writer is None or not writer.rows:
+        if writer is not None:
+            writer.file.close()
+        _run_async(bot.send_message(chat_id=chat_id, text="Данных для экспорта пока нет."))
+        return {"status": "empty", "rows_count": 0}
+
+    with writer.file as file:
+        size = file.seek(0, 2)
+        document = SpooledInputFile(file, export_filename(fmt))
+        _run_async(bot.send_document(chat_id=chat_id, document=document, caption="📦 Экспорт готов"))
+    logger.info(f"Export for {telegram_id}: {writer.rows} rows, {size} bytes")
+    return {"status": "sent", "rows_count": writer.rows, "bytes_count": size}
+
+@app.task
+def materialize_recurring_quests() -> Dict[str, Any]:
+    """
+    Celery task creating today's quests from repeating templates.
+
+    Runs hourly from beat. Each timezone bucket whose local clock has
+    passed QUEST_MATERIALIZE_HOUR gets one INSERT ... SELECT for its
+    local date; buckets already done for the day insert nothing.
+
+    Returns:
+        Dictionary with created quests per timezone
+    """
+    from zoneinfo import ZoneInfo
+    from services.recurring_service import RecurringService
+    from config import QUEST_MATERIALIZE_HOUR
+
+    async def materialize_all() -> Dict[str, int]:
+        created = {}
+        now = datetime.now(ZoneInfo("UTC"))
+        for timezone in await RecurringService.timezones():
             try:
-                await bot.send_message(
-                    chat_id=user.telegram_id,
-                    text="🧘 Пора на рефлексию. Напиши /reflect"
-                )
-                sent_count += 1
-                logger.info(f"Sent reminder to user {user.telegram_id}")
-            except Exception as e:
-                error_count += 1
-                logger.error(f"Failed to send reminder to {user.telegram_id}: {e}")
-                
-        return {
-            "status": "success",
-            "time": now,
-            "users_count": len(users),
-            "sent_count": sent_count,
-            "error_count": error_count
-        }
-    except Exception as e:
-        logger.error(f"Error processing reminders: {e}")
-        return {"status": "error", "error": str(e)}
+                local = now.astimezone(ZoneInfo(timezone))
+            except (KeyError, ValueError):
+                logger.warning(f"Skipping repeating quests with unknown timezone {timezone!r}")
+                continue
+            if local.hour < QUEST_MATERIALIZE_HOUR:
+                continue
+            started = time.perf_counter()
+            created[timezone] = await RecurringService.materialize(timezone, local.date())
+            RECURRING_MATERIALIZE_DURATION.observe(time.perf_counter() - started)
+            RECURRING_QUESTS_CREATED.inc(amount=created[timezone])
+        return created
+
+    created = _run_async(materialize_all())
+    total = sum(created.values())
+    if total:
+        logger.info(f"Created {total} repeating quests in {len(created)} timezones")
+    return {"status": "completed", "created_count": total, "timezones": created}
 
 @app.task
-def migrate_legacy_data() -> Dict[str, Any]:
+def maintain_partitions() -> Dict[str, Any]:
+    """
+    Celery task keeping the month partitions of insights and reflections.
+
+    Creates partitions PARTITION_MONTHS_AHEAD months in advance and, with
+    ARCHIVE_ENABLED, moves reflection partitions older than
+    ARCHIVE_AFTER_MONTHS to the gzip archive in ARCHIVE_DIR/db, apart
+    from the months the bot archives out of data.json. Runs daily from
+    beat; does nothing outside PostgreSQL.
+
+    Returns:
+        Dictionary with created partitions and archived rows
+    """
+    from services.partition_service import PartitionService
+    from config import ARCHIVE_AFTER_MONTHS, ARCHIVE_DIR, ARCHIVE_ENABLED, PARTITION_MONTHS_AHEAD
+
+    async def maintain():
+        created = await PartitionService.ensure_partitions(PARTITION_MONTHS_AHEAD)
+        archived = {}
+        if ARCHIVE_ENABLED:
+            archived = await PartitionService.archive_cold(ARCHIVE_DIR, ARCHIVE_AFTER_MONTHS)
+        return created, archived
+
+    created, archived = _run_async(maintain())
+    if created or archived:
+        logger.info(f"Partitions created: {created}, archived: {archived}")
+    return {"status": "completed", "created": created, "archived_rows_count": sum(archived.values())}
+
+@app.task(ignore_result=False)
+def migrate_legacy_data(chunk_size: int = None) -> Dict[str, Any]:
     """
     Celery task to migrate legacy data from JSON to database.
     One-time task that can be triggered manually.
+
+    Streams the JSON file once, writing every chunk_size users to a shard
+    file in MIGRATION_SHARD_DIR, and runs the shards as a chord of
+    migrate_legacy_chunk tasks followed by finalize_legacy_migration, so
+    each worker parses only its own slice of the file.
+    Progress is available via legacy_migration_progress(group_id).
+    
+    Args:
+        chunk_size: Number of users per chunk task
     
     Returns:
-        Dictionary with migration results
+        Dictionary with the ids of the started chunk group and report task
     """
+    from celery import chord
+    from utils.json_stream import write_shards
+    from config import DATA_FILE, MIGRATION_CHUNK_SIZE, MIGRATION_SHARD_DIR
+
+    chunk_size = chunk_size or MIGRATION_CHUNK_SIZE
     logger.info("Starting legacy data migration")
-    loop = asyncio.get_event_loop()
-    if loop.is_closed():
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        
+
+    shard_dir = os.path.join(MIGRATION_SHARD_DIR, uuid.uuid4().hex)
     try:
-        result = loop.run_until_complete(_migrate_legacy_data_async())
-        return result
+        shards, users_total = write_shards(DATA_FILE, shard_dir, chunk_size)
+    except FileNotFoundError:
+        shutil.rmtree(shard_dir, ignore_errors=True)
+        logger.warning(f"JSON file {DATA_FILE} not found. Nothing to migrate.")
+        return {"status": "success", "chunks": 0, "users_total": 0}
     except Exception as e:
+        shutil.rmtree(shard_dir, ignore_errors=True)
         logger.error(f"Error in data migration: {e}")
         return {"status": "error", "error": str(e)}
 
-async def _migrate_legacy_data_async() -> Dict[str, Any]:
+    if not shards:
+        shutil.rmtree(shard_dir, ignore_errors=True)
+        return {"status": "success", "chunks": 0, "users_total": 0}
+
+    result = chord(
+        migrate_legacy_chunk.s(path, start_id, end_id) for path, start_id, end_id in shards
+    )(finalize_legacy_migration.s(shard_dir))
+    # Keep the group in the result backend so progress can be polled by id
+    result.parent.save()
+
+    logger.info(f"Legacy migration split into {len(shards)} chunks ({users_total} users)")
+    return {
+        "status": "started",
+        "chunks": len(shards),
+        "users_total": users_total,
+        "group_id": result.parent.id,
+        "report_task_id": result.id,
+    }
+
+@app.task(bind=True, ignore_result=False)
+def migrate_legacy_chunk(self, shard_path: str, start_id: str, end_id: str, batch_size: int = 100) -> Dict[str, Any]:
     """
-    Async function to migrate legacy data from JSON to database.
+    Celery task to bulk-import the legacy users of one shard file.
+
+    Reports PROGRESS state with processed/total users after every batch.
+    
+    Args:
+        shard_path: Shard written by migrate_legacy_data
+        start_id: First telegram id of the shard
+        end_id: Last telegram id of the shard
+        batch_size: Number of users committed per transaction
     
     Returns:
-        Dictionary with migration results
+        Dictionary with inserted and expected row counts, migrated ids and errors
+    """
+    from services.migration_service import MigrationService, MIGRATED_TABLES
+    from utils.json_stream import read_shard
+
+    try:
+        users = read_shard(shard_path)
+    except Exception as e:
+        logger.error(f"Error reading legacy chunk {start_id}..{end_id}: {e}")
+        return {
+            "start_id": start_id, "end_id": end_id, "counts": {}, "expected": {},
+            "telegram_ids": [], "errors": [str(e)],
+        }
+
+    # Rows the JSON records should produce, for the reconciliation report
+    expected = dict.fromkeys(MIGRATED_TABLES, 0)
+    for _, user_data in users:
+        for key, value in MigrationService.count_legacy_rows(user_data).items():
+            expected[key] += value
+
+    counts: Dict[str, int] = {}
+    errors: List[str] = []
+    for offset in range(0, len(users), batch_size):
+        batch = users[offset:offset + batch_size]
+        batch_counts, batch_errors = _run_async(MigrationService.import_chunk(batch))
+        for key, value in batch_counts.items():
+            counts[key] = counts.get(key, 0) + value
+        errors.extend(batch_errors)
+        self.update_state(state="PROGRESS", meta={
+            "start_id": start_id,
+            "end_id": end_id,
+            "processed": offset + len(batch),
+            "total": len(users),
+        })
+
+    logger.info(f"Legacy chunk {start_id}..{end_id} done: {counts}, {len(errors)} errors")
+    return {
+        "start_id": start_id,
+        "end_id": end_id,
+        "counts": counts,
+        "expected": expected,
+        "telegram_ids": [telegram_id for telegram_id, _ in users],
+        "errors": errors,
+    }
+
+@app.task(ignore_result=False)
+def finalize_legacy_migration(chunk_results: List[Dict[str, Any]], shard_dir: str = None) -> Dict[str, Any]:
     """
-    from utils.storage import Storage
-    from config import DATA_FILE
-    from services.user_service import UserService
-    from services.quest_service import QuestService
+    Chord callback building the reconciliation report.
+
+    Compares rows the chunks expected from their JSON shards with rows
+    found in the database for the migrated users, then removes the shards.
+    
+    Args:
+        chunk_results: Results of all migrate_legacy_chunk tasks
+        shard_dir: Shard directory of the migration run
     
-    storage = Storage(DATA_FILE)
-    data = storage.read()
+    Returns:
+        Dictionary with migration totals and reconciliation
+    """
+    from services.migration_service import MigrationService, MIGRATED_TABLES
+
+    totals = dict.fromkeys(MIGRATED_TABLES, 0)
+    totals["skipped"] = 0
+    expected = dict.fromkeys(MIGRATED_TABLES, 0)
+    errors: List[str] = []
+    for chunk in chunk_results:
+        for key, value in chunk["counts"].items():
+            totals[key] = totals.get(key, 0) + value
+        for key, value in chunk["expected"].items():
+            expected[key] += value
+        errors.extend(chunk["errors"])
+
+    telegram_ids = [telegram_id for chunk in chunk_results for telegram_id in chunk["telegram_ids"]]
+    stored = _run_async(MigrationService.count_migrated_rows(telegram_ids))
+    missing = {table: expected[table] - stored[table] for table in MIGRATED_TABLES if expected[table] != stored[table]}
+
+    if errors:
+        status = "partial"
+    elif missing:
+        status = "mismatch"
+    else:
+        status = "success"
+
+    if shard_dir:
+        shutil.rmtree(shard_dir, ignore_errors=True)
+
+    report = {
+        "status": status,
+        "chunks": len(chunk_results),
+        "users_migrated": totals["users"],
+        "users_skipped": totals["skipped"],
+        "quests_migrated": totals["quests"],
+        "insights_migrated": totals["insights"],
+        "reflections_migrated": totals["reflections"],
+        "reconciliation": {"expected": expected, "stored": stored, "missing": missing},
+        "errors": errors if errors else None
+    }
+    logger.info(f"Legacy migration finished: status={status}, missing={missing}, errors={len(errors)}")
+    return report
+
+def legacy_migration_progress(group_id: str) -> Dict[str, Any]:
+    """
+    Aggregate progress of a running legacy migration.
     
-    users_migrated = 0
-    quests_migrated = 0
-    insights_migrated = 0
-    reflections_migrated = 0
-    errors = []
+    Args:
+        group_id: group_id returned by migrate_legacy_data
     
-    for user_id, user_data in data.items():
-        try:
-            # Migrate user
-            user = await UserService.get_or_create_user(user_id)
-            users_migrated += 1
-            
-            # Update user properties
-            if user_data.get("phase"):
-                await UserService.update_phase(user_id, user_data["phase"])
-                
-            # TODO: Implement migration for other data types
-                
-        except Exception as e:
-            errors.append(f"Error migrating user {user_id}: {e}")
-            logger.error(f"Error migrating user {user_id}: {e}")
-            
+    Returns:
+        Dictionary with finished chunks and processed users
+    """
+    from celery.result import GroupResult
+
+    group = GroupResult.restore(group_id, app=app)
+    if group is None:
+        return {"status": "unknown", "group_id": group_id}
+
+    processed = 0
+    total = 0
+    for chunk in group.results:
+        if chunk.state == "PROGRESS" and isinstance(chunk.info, dict):
+            processed += chunk.info.get("processed", 0)
+            total += chunk.info.get("total", 0)
+        elif chunk.successful():
+            done = len(chunk.result["telegram_ids"])
+            processed += done
+            total += done
+
     return {
-        "status": "success" if not errors else "partial",
-        "users_migrated": users_migrated,
-        "quests_migrated": quests_migrated,
-        "insights_migrated": insights_migrated,
-        "reflections_migrated": reflections_migrated,
-        "errors": errors if errors else None
-    } 
\ No newline at end of file
+        "status": "done" if group.ready() else "running",
+        "chunks_total": len(group.results),
+        "chunks_done": group.completed_count(),
+        "users_processed": processed,
+        "users_seen": total,
+        "failed": group.failed(),
+    }
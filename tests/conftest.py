@@ -0,0 +1,39 @@
+from contextlib import asynccontextmanager
+
+import pytest_asyncio
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from db.models import Base
+
+
+@pytest_asyncio.fixture
+async def memory_db(monkeypatch):
+    """
+    Factory of in-memory SQLite databases with all tables created.
+
+    `await memory_db("services.quest_service", ...)` returns a session
+    factory and points get_session of the given modules at it; the
+    engines are disposed after the test.
+    """
+    engines = []
+
+    async def create(*modules: str):
+        engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+        engines.append(engine)
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        session_factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+        @asynccontextmanager
+        async def get_session():
+            async with session_factory() as session:
+                yield session
+
+        for module in modules:
+            monkeypatch.setattr(f"{module}.get_session", get_session)
+        return session_factory
+
+    yield create
+    for engine in engines:
+        await engine.dispose()
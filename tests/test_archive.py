@@ -0,0 +1,69 @@
+from datetime import date
+
+import handlers.reflect as reflect
+from utils.archive import (
+    append_month, archive_snapshot, cutoff_month, db_archive_root, drop_archived, read_month, with_archived,
+)
+from utils.search import search_entries
+
+
+def reflection(stamp, text):
+    return {"date": stamp, "q1": text, "q2": "", "q3": ""}
+
+
+def test_cold_months_move_to_archive_and_rehydrate(tmp_path, monkeypatch):
+    root = str(tmp_path)
+    data = {
+        "1": {
+            "reflections": [reflection("2024-01-05 21:00", "январь"), reflection("2024-01-09 21:00", "еще январь"),
+                            reflection("2025-03-01 21:00", "свежая")],
+            "insights": [{"text": "старый", "date": "2023-12-31 10:00"}, {"text": "без даты"}],
+        },
+        "2": {"reflections": [reflection("2024-01-20 22:00", "чужая")]},
+    }
+    cutoff = cutoff_month(date(2025, 4, 15), 12)
+    assert cutoff == "2024-04"
+
+    # Повтор после сбоя до drop_archived не дублирует записи в архиве
+    archive_snapshot(data, root, cutoff)
+    archived = archive_snapshot(data, root, cutoff)
+    # Инсайты не архивируются: /thoughts читает только data.json
+    assert archived == {"1": {"reflections": ["2024-01"]}, "2": {"reflections": ["2024-01"]}}
+    assert drop_archived(data, archived) == 3
+
+    assert [r["date"] for r in data["1"]["reflections"]] == ["2025-03-01 21:00"]
+    assert len(data["1"]["insights"]) == 2
+    assert data["1"]["archived"] == {"reflections": ["2024-01"]}
+    assert [r["q1"] for r in read_month(root, "reflections", "2024-01", "1")] == ["январь", "еще январь"]
+    assert read_month(root, "reflections", "2024-01", "3") == []
+
+    # Поиск и экспорт видят архивные месяцы перед живыми записями
+    full = with_archived(root, data["1"], "1")
+    assert [r["q1"] for r in full["reflections"]] == ["январь", "еще январь", "свежая"]
+    assert len(data["1"]["reflections"]) == 1
+    assert [hit.text for hit in search_entries(full, "январь")] == ["январь", "еще январь"]
+    assert with_archived(root, data["2"], "2")["reflections"][0]["q1"] == "чужая"
+
+    # Поздняя запись уже архивного месяца дописывается к нему
+    data["1"]["reflections"].append(reflection("2024-01-30 21:00", "поздняя"))
+    drop_archived(data, archive_snapshot(data, root, cutoff))
+    assert [r["q1"] for r in read_month(root, "reflections", "2024-01", "1")] == ["январь", "еще январь", "поздняя"]
+
+    # /reflections показывает архивный месяц без кнопки удаления
+    monkeypatch.setattr(reflect, "ARCHIVE_DIR", root)
+    entries, is_archived = reflect.month_reflections("1", data["1"], "2024-01")
+    assert is_archived and len(entries) == 3
+    markup = reflect.build_dates_keyboard(entries, "2024-01")
+    assert [b.text for row in markup.inline_keyboard[:-1] for b in row] == ["2024-01-05", "2024-01-09", "2024-01-30"]
+    assert reflect.month_reflections("1", data["1"], "2025-03") == (data["1"]["reflections"], False)
+
+
+def test_partition_and_json_archives_keep_their_own_members(tmp_path):
+    root = str(tmp_path)
+    data = {"1": {"reflections": [reflection("2024-01-05 21:00", "из json")]}}
+    drop_archived(data, archive_snapshot(data, root, "2024-04"))
+    # Секция PostgreSQL того же месяца архивируется после цикла бота
+    append_month(db_archive_root(root), "reflections", "2024-01", [("1", [reflection("2024-01-05 21:00", "из бд")])])
+
+    assert [r["q1"] for r in with_archived(root, data["1"], "1")["reflections"]] == ["из json"]
+    assert [r["q1"] for r in read_month(db_archive_root(root), "reflections", "2024-01", "1")] == ["из бд"]
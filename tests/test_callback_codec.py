@@ -0,0 +1,34 @@
+import pytest
+
+from utils import callback_codec
+from utils.callback_codec import MAX_CALLBACK_BYTES, CallbackSchema, REFLECT_VIEW, QUEST_DONE
+
+
+def test_round_trip_and_size():
+    data = REFLECT_VIEW.pack(pos=1234, day="2025-04-01")
+    assert data.startswith("rv:")
+    assert len(data) < len("reflect_view_2025-04-01_1234")
+
+    view = REFLECT_VIEW.unpack(data)
+    assert (view.pos, view.day) == (1234, "2025-04-01")
+
+
+def test_parse_finds_schema_by_prefix():
+    schema, values = callback_codec.parse(QUEST_DONE.pack(quest_id=7))
+    assert schema is QUEST_DONE and values.quest_id == 7
+
+    assert callback_codec.parse("inline_done_7") is None
+    assert callback_codec.parse("qd:!!") is None
+    assert callback_codec.is_navigation(REFLECT_VIEW.pack(pos=0, day="2025-04-01"))
+    assert not callback_codec.is_navigation(QUEST_DONE.pack(quest_id=7))
+
+
+def test_signed_and_string_fields():
+    schema = CallbackSchema("TestCursor", "t1", ("offset", "int"), ("query", "str"))
+    try:
+        data = schema.pack(offset=-3, query="сон")
+        assert schema.unpack(data) == (-3, "сон")
+        with pytest.raises(ValueError):
+            schema.pack(offset=0, query="x" * MAX_CALLBACK_BYTES)
+    finally:
+        callback_codec._SCHEMAS.pop("t1")
@@ -0,0 +1,64 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+from aiogram.types import CallbackQuery, Chat, Message, User
+
+from middleware.debounce import CallbackDebounceMiddleware
+from utils.callback_codec import INSIGHT_NAV, QUEST_DONE
+
+USER = User(id=1, is_bot=False, first_name="test")
+MESSAGE = Message(message_id=10, date=datetime.now(), chat=Chat(id=1, type="private"), text="x")
+
+
+def tap(data):
+    return CallbackQuery(id="1", from_user=USER, chat_instance="1", data=data, message=MESSAGE)
+
+
+@pytest.fixture
+def answered(monkeypatch):
+    answers = []
+
+    async def answer(event):
+        answers.append(event.data)
+
+    monkeypatch.setattr(CallbackDebounceMiddleware, "_answer", staticmethod(answer))
+    return answers
+
+
+@pytest.mark.asyncio
+async def test_duplicate_taps_run_handler_once(answered):
+    middleware = CallbackDebounceMiddleware(window=5)
+    calls = []
+
+    async def handler(event, data):
+        calls.append(event.data)
+        await asyncio.sleep(0.01)
+
+    data = QUEST_DONE.pack(quest_id=3)
+    await asyncio.gather(*(middleware(handler, tap(data), {}) for _ in range(3)))
+
+    assert calls == [data]
+    assert answered == [data, data]
+
+
+@pytest.mark.asyncio
+async def test_superseded_navigation_is_dropped(answered):
+    middleware = CallbackDebounceMiddleware(window=5)
+    calls = []
+    release = asyncio.Event()
+
+    async def handler(event, data):
+        calls.append(INSIGHT_NAV.unpack(event.data).pos)
+        await release.wait()
+
+    first = asyncio.create_task(middleware(handler, tap(INSIGHT_NAV.pack(pos=1)), {}))
+    await asyncio.sleep(0)
+    # Пока первая навигация выполняется, пользователь успевает нажать еще дважды
+    waiting = [asyncio.create_task(middleware(handler, tap(INSIGHT_NAV.pack(pos=pos)), {})) for pos in (2, 3)]
+    await asyncio.sleep(0)
+    release.set()
+    await asyncio.gather(first, *waiting)
+
+    assert calls == [1, 3]
+    assert answered == [INSIGHT_NAV.pack(pos=2)]
@@ -0,0 +1,72 @@
+import pytest
+
+import core.metrics as metrics
+from handlers import ROUTERS
+from handlers.buttons import show_status
+from handlers.dispatch import DispatchIndex, _magic_key
+from handlers.insight import handle_insight_navigation
+from handlers.quests import handle_done
+from handlers.reflect import reflections_back_to_months
+from utils.callback_codec import _SCHEMAS, INSIGHT_NAV, QUEST_DONE
+
+
+@pytest.fixture(scope="module")
+def index():
+    return DispatchIndex().compile(ROUTERS)
+
+
+def test_buttons_and_commands_resolve_by_exact_text(index):
+    handler, extra = index.resolve_message("👤 Мой статус")
+    assert handler.callback is show_status and extra == {}
+
+    handler, extra = index.resolve_message("/done 3")
+    assert handler.callback is handle_done
+    assert extra["command"].args == "3"
+
+    # Свободный текст и упоминание бота остаются обычным роутерам
+    assert index.resolve_message("просто текст") is None
+    assert index.resolve_message("/done@rpg_bot") is None
+
+
+def test_callbacks_prefer_exact_match_over_prefix(index):
+    assert index.resolve_callback(INSIGHT_NAV.pack(pos=3)).callback is handle_insight_navigation
+    assert index.resolve_callback("reflect_back_months").callback is reflections_back_to_months
+    assert index.resolve_callback("unknown_1") is None
+
+
+def test_every_callback_schema_and_late_router_resolves(index):
+    """Полный набор роутеров bot.py: у каждой схемы есть свой обработчик"""
+    samples = {"uint": 1, "int": -1, "date": "2025-04-01", "month": "2025-04", "str": "md"}
+    for prefix, schema in _SCHEMAS.items():
+        data = schema.pack(**{name: samples[kind] for name, kind in schema.fields})
+        handler = index.resolve_callback(data)
+        assert handler is not None, prefix
+        assert [_magic_key(f.magic) for f in handler.filters] == [_magic_key(schema.filter)], prefix
+
+    modules = {
+        text: index.resolve_message(text)[0].callback.__module__
+        for text in ("/stats", "/export", "/search слово", "/repeat")
+    }
+    assert modules == {
+        "/stats": "handlers.stats", "/export": "handlers.export",
+        "/search слово": "handlers.search", "/repeat": "handlers.recurring",
+    }
+
+
+def test_handlers_behind_catch_all_are_not_indexed(index):
+    """Command("faq") in faq_router is shadowed by the buttons catch-all"""
+    handler, _ = index.resolve_message("/faq")
+    assert handler.callback.__module__ == "handlers.buttons"
+    assert "faq" not in index.commands
+
+
+def test_metric_labels_cover_registered_handlers_only(index, monkeypatch):
+    # Команды за "ловушкой" тоже получают свою метку
+    assert {"/done", "/faq", "/reflect", "👤 Мой статус", "phase", "qd", "in"} <= index.labels
+    monkeypatch.setattr(metrics, "HANDLER_LABELS", metrics.HANDLER_LABELS | index.labels)
+    assert metrics.handler_label("/done") == "/done"
+    # Callback кодека получает метку своей схемы, а не общую "callback"
+    assert metrics.handler_label(metrics.callback_prefix(QUEST_DONE.pack(quest_id=12))) == "qd"
+    assert metrics.handler_label(metrics.callback_prefix("zz:AA")) == "other"
+    assert metrics.handler_label("/random_user_text") == "other"
+    assert metrics.handler_label(metrics.callback_prefix("forged_payload_1")) == "other"
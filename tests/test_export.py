@@ -0,0 +1,53 @@
+import json
+from datetime import datetime
+
+import pytest
+
+from db.models import Insight, Quest, Reflection, User
+from services.export_service import ExportService
+from utils.export import SpooledInputFile, legacy_rows, write_rows
+
+
+def test_legacy_record_encodes_to_markdown_and_json():
+    user_data = {
+        "quests": [{"id": 1, "text": "Прогулка", "status": "done", "phase": "low", "date": "2025-04-01 10:00"}],
+        "insights": ["старый инсайт", {"text": "новый", "date": "2025-04-02 09:00"}],
+    }
+
+    markdown = write_rows("md", "42", legacy_rows(user_data)).file.read().decode("utf-8")
+    document = json.loads(write_rows("json", "42", legacy_rows(user_data)).file.read())
+
+    assert "- [x] Прогулка _(low)_ — 2025-04-01 10:00" in markdown
+    assert "## Рефлексии\n\n_Пусто_" in markdown
+    assert [insight["text"] for insight in document["insights"]] == ["старый инсайт", "новый"]
+    assert document["reflections"] == []
+
+
+@pytest.mark.asyncio
+async def test_write_export_streams_rows_into_spooled_file(monkeypatch, memory_db):
+    session_factory = await memory_db("services.export_service")
+    monkeypatch.setattr("services.export_service.EXPORT_FETCH_SIZE", 7)
+    created = datetime(2025, 4, 1, 12, 0)
+    async with session_factory() as session:
+        session.add_all([User(id=1, telegram_id="42"), User(id=2, telegram_id="43")])
+        session.add_all(Quest(user_id=1, text=f"q{i}", status="todo", created_at=created) for i in range(30))
+        session.add(Quest(user_id=2, text="чужой", status="todo", created_at=created))
+        session.add(Insight(user_id=1, text="идея", created_at=created))
+        session.add(Reflection(user_id=1, important="сон", worked=None, change="раньше", created_at=created))
+        await session.commit()
+
+    assert await ExportService.count_rows("42") == 32
+    assert await ExportService.write_export("unknown", "json") is None
+
+    # Маленький порог: файл переезжает на диск по ходу записи
+    writer = await ExportService.write_export("42", "json", spool_size=256)
+    document = json.loads(writer.file.read())
+
+    assert writer.rows == 32 and writer.file._rolled
+    assert [quest["text"] for quest in document["quests"]] == [f"q{i}" for i in range(30)]
+    assert document["reflections"] == [
+        {"important": "сон", "worked": None, "change": "раньше", "created_at": "2025-04-01T12:00:00"}
+    ]
+
+    chunks = [chunk async for chunk in SpooledInputFile(writer.file, "export.json", chunk_size=100).read(None)]
+    assert len(chunks) > 1 and json.loads(b"".join(chunks)) == document
@@ -0,0 +1,26 @@
+from handlers.faq import FAQ_ENTRIES, ITEMS_PER_PAGE, FaqCache, faq_cache
+from utils.callback_codec import FAQ_ITEM, FAQ_PAGE
+
+
+def callbacks(markup):
+    return [button.callback_data for row in markup.inline_keyboard for button in row]
+
+
+def test_every_entry_is_prerendered_with_its_page_keyboard():
+    assert len(faq_cache.items) == len(FAQ_ENTRIES)
+    last = len(FAQ_ENTRIES) - 1
+    question, answer = FAQ_ENTRIES[last]
+
+    payload = faq_cache.items[last]
+
+    assert payload.text == f"❓ <b>{question}</b>\n\n{answer}"
+    assert payload.reply_markup is faq_cache.pages[last // ITEMS_PER_PAGE].reply_markup
+    assert FAQ_ITEM.pack(item=last) in callbacks(payload.reply_markup)
+    assert callbacks(faq_cache.intro.reply_markup)[-1] == FAQ_PAGE.pack(page=1)
+
+
+def test_source_posts_are_attached_by_position():
+    cache = FaqCache(FAQ_ENTRIES[:3], source_message_ids=[101, None])
+
+    assert [cache.items[i].source_message_id for i in range(3)] == [101, None, None]
+    assert "1 via copy_message" in cache.report()
@@ -0,0 +1,98 @@
+import io
+import json
+import logging
+import sys
+
+from core.logger import BufferedWriterHandler, JSONFormatter, RateLimitFilter, SamplingFilter
+
+
+def make_record(msg="Command received: %s", args=("/status",), exc_info=None, **extra):
+    record = logging.LogRecord(
+        name="test", level=logging.INFO, pathname=__file__, lineno=10,
+        msg=msg, args=args, exc_info=exc_info, func="handler"
+    )
+    record.__dict__.update(extra)
+    return record
+
+
+def test_json_formatter_whitelisted_extras():
+    """Only whitelisted extra fields end up in the JSON line"""
+    record = make_record(command_name="/status", username="tester", secret="x")
+    line = json.loads(JSONFormatter().format(record))
+
+    assert line["message"] == "Command received: /status"
+    assert line["command_name"] == "/status"
+    assert line["username"] == "tester"
+    assert "secret" not in line
+    assert line["function"] == "test_logger:handler:10"
+
+
+def test_json_formatter_includes_exception():
+    """Tracebacks are kept instead of being silently dropped"""
+    try:
+        raise RuntimeError("boom")
+    except RuntimeError:
+        record = make_record(exc_info=sys.exc_info())
+
+    line = json.loads(JSONFormatter().format(record))
+    assert "RuntimeError: boom" in line["exception"]
+
+
+def test_sampling_filter_keeps_share_per_command():
+    """A quarter of per-command info lines pass, other records are untouched"""
+    sampler = SamplingFilter(0.25)
+    kept = sum(sampler.filter(make_record(command_name="/status")) for _ in range(100))
+    assert kept == 25
+
+    assert sampler.filter(make_record())
+    error = make_record(command_name="/status")
+    error.levelno = logging.ERROR
+    assert sampler.filter(error)
+
+
+def test_sampling_filter_state_stays_bounded():
+    """Free-form input shares the handler's key and can't grow the state"""
+    sampler = SamplingFilter(0.25, max_keys=8)
+    kept = sum(sampler.filter(make_record(command_name=f"/x{i}", sample_key="other")) for i in range(100))
+    assert kept == 25
+    for i in range(100):
+        sampler.filter(make_record(command_name=f"/y{i}"))
+    assert len(sampler._credit) == 8
+
+
+def test_rate_limit_filter_reports_suppressed(monkeypatch):
+    """Errors over the burst are dropped and counted on the next window"""
+    clock = [0.0]
+    monkeypatch.setattr("core.logger.time.monotonic", lambda: clock[0])
+    limiter = RateLimitFilter(burst=2, window=10)
+
+    def error_record():
+        record = make_record(msg="Redis get error")
+        record.levelno = logging.ERROR
+        return record
+
+    results = [limiter.filter(error_record()) for _ in range(5)]
+    assert results == [True, True, False, False, False]
+
+    clock[0] = 11.0
+    record = error_record()
+    assert limiter.filter(record)
+    assert record.suppressed == 3
+
+
+def test_buffered_writer_batches_lines():
+    """Lines are written in one call when the buffer is flushed"""
+    stream = io.BytesIO()
+    writes = []
+    stream_write = stream.write
+    stream.write = lambda data: writes.append(data) or stream_write(data)
+
+    writer = BufferedWriterHandler(stream, capacity=1 << 20, flush_interval=0)
+    writer.setFormatter(JSONFormatter())
+    for _ in range(10):
+        writer.handle(make_record())
+    assert writes == []
+
+    writer.flush()
+    assert len(writes) == 1
+    assert stream.getvalue().count(b"\n") == 10
@@ -0,0 +1,83 @@
+import urllib.request
+
+import pytest
+from sqlalchemy import create_engine, text
+
+from core.metrics import Registry, callback_prefix, instrument_engine, start_http_server, DB_QUERIES
+
+
+def test_histogram_exposition_is_cumulative():
+    """Histogram buckets are rendered cumulatively with sum and count"""
+    registry = Registry()
+    histogram = registry.histogram("test_latency_seconds", "Test", ["command"], buckets=(0.1, 1.0))
+
+    histogram.observe(0.05, "/status")
+    histogram.observe(0.5, "/status")
+    histogram.observe(5.0, "/status")
+
+    output = registry.render()
+    assert 'test_latency_seconds_bucket{command="/status",le="0.1"} 1' in output
+    assert 'test_latency_seconds_bucket{command="/status",le="1"} 2' in output
+    assert 'test_latency_seconds_bucket{command="/status",le="+Inf"} 3' in output
+    assert 'test_latency_seconds_count{command="/status"} 3' in output
+
+
+def test_counter_rejects_wrong_labels():
+    """Label arity is validated"""
+    registry = Registry()
+    counter = registry.counter("test_total", "Test", ["result"])
+    counter.inc("hit")
+    assert counter.value("hit") == 1
+
+    with pytest.raises(ValueError):
+        counter.inc("hit", "extra")
+
+
+def test_label_values_are_escaped():
+    """Quotes and newlines in label values do not break the format"""
+    registry = Registry()
+    counter = registry.counter("test_escaped_total", "Test", ["command"])
+    counter.inc('say "hi"\n')
+    assert 'command="say \\"hi\\"\\n"' in registry.render()
+
+
+@pytest.mark.parametrize(
+    "data, expected",
+    [
+        ("qd:DA", "qd"),
+        ("rv:AQ", "rv"),
+        ("inline_done_12", "inline_done"),
+        ("reflect_view_2025-04-01_0", "reflect_view"),
+        ("reset_confirm", "reset_confirm"),
+        ("42", "callback"),
+    ],
+)
+def test_callback_prefix(data, expected):
+    assert callback_prefix(data) == expected
+
+
+def test_instrument_engine_counts_queries():
+    """SQLAlchemy events feed the query counters"""
+    engine = create_engine("sqlite://")
+    instrument_engine(engine)
+    before = DB_QUERIES.value("SELECT")
+
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+
+    assert DB_QUERIES.value("SELECT") == before + 1
+
+
+def test_http_endpoint_serves_registry():
+    """The endpoint returns the Prometheus text format"""
+    registry = Registry()
+    registry.gauge("test_gauge", "Test").set(3)
+    server = start_http_server(0, registry=registry)
+    try:
+        port = server.server_address[1]
+        with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics") as response:
+            body = response.read().decode()
+        assert "test_gauge 3" in body
+    finally:
+        server.shutdown()
+        server.server_close()
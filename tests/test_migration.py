@@ -0,0 +1,107 @@
+import json
+
+import pytest
+from sqlalchemy import func, select
+
+import migrate_data
+from db.models import Quest, Reflection, User
+from services.migration_service import MigrationService
+from utils.json_stream import iter_json_object
+
+
+LEGACY_DATA = {
+    "1001": {
+        "phase": "Огонь",
+        "quests": [{"id": 1, "text": "Пробежка", "status": "done", "date": "2024-05-01 08:00"}],
+        "insights": ["Старый формат", {"text": "Новый", "date": "01.05.2024 09:30"}],
+        "reflections": [{"q1": "a", "q2": "b", "q3": "c", "date": "2024-05-01 22:00"}],
+    },
+    "1002": {"quests": [{"text": "Чтение", "status": "todo"}], "note": 1.5e3},
+}
+
+
+def test_iter_json_object_small_chunks(tmp_path):
+    """Members are decoded correctly when values cross buffer boundaries"""
+    path = tmp_path / "data.json"
+    path.write_text(json.dumps(LEGACY_DATA, ensure_ascii=False, indent=2), encoding="utf-8")
+
+    assert dict(iter_json_object(str(path), chunk_size=7)) == LEGACY_DATA
+
+
+def test_iter_json_object_large_value_reads_grow(tmp_path, monkeypatch):
+    path = tmp_path / "data.json"
+    big = {"1": {"insights": [{"text": "x" * 50, "date": "2025-01-01"}] * 2000}, "2": {"phase": "1"}}
+    path.write_text(json.dumps(big), encoding="utf-8")
+    decodes = []
+    raw_decode = json.JSONDecoder.raw_decode
+    monkeypatch.setattr(json.JSONDecoder, "raw_decode", lambda self, s, idx=0: decodes.append(idx) or raw_decode(self, s, idx))
+
+    assert dict(iter_json_object(str(path), chunk_size=1024)) == big
+    # Повторные попытки удваивают буфер, а не добавляют по одному чанку
+    assert len(decodes) < 20
+
+
+def test_iter_json_object_empty(tmp_path):
+    path = tmp_path / "data.json"
+    path.write_text("{ }")
+    assert list(iter_json_object(str(path))) == []
+
+
+@pytest.mark.asyncio
+async def test_import_users_is_idempotent(memory_db):
+    """Re-importing a chunk skips existing users instead of duplicating rows"""
+    session_factory = await memory_db()
+
+    async with session_factory() as session:
+        counts = await MigrationService.import_users(session, LEGACY_DATA.items())
+        await session.commit()
+    assert counts == {"users": 2, "skipped": 0, "quests": 2, "insights": 2, "reflections": 1}
+
+    async with session_factory() as session:
+        counts = await MigrationService.import_users(session, LEGACY_DATA.items())
+        await session.commit()
+        assert counts["users"] == 0 and counts["skipped"] == 2
+
+        assert await session.scalar(select(func.count()).select_from(User)) == 2
+        assert await session.scalar(select(func.count()).select_from(Quest)) == 2
+        reflection = await session.scalar(select(Reflection))
+        assert (reflection.important, reflection.worked, reflection.change) == ("a", "b", "c")
+
+
+@pytest.mark.asyncio
+async def test_reconciliation_counts_match(memory_db):
+    """Rows expected from JSON match rows stored after an import"""
+    session_factory = await memory_db("services.migration_service")
+
+    counts, errors = await MigrationService.import_chunk(list(LEGACY_DATA.items()))
+    assert errors == []
+
+    expected = {"users": 0, "quests": 0, "insights": 0, "reflections": 0}
+    for user_data in LEGACY_DATA.values():
+        for key, value in MigrationService.count_legacy_rows(user_data).items():
+            expected[key] += value
+
+    assert await MigrationService.count_migrated_rows(list(LEGACY_DATA), batch_size=1) == expected
+
+
+@pytest.mark.asyncio
+async def test_checkpoint_stops_at_first_failed_chunk(tmp_path, monkeypatch):
+    data_file = tmp_path / "data.json"
+    data_file.write_text(json.dumps({str(i): {} for i in range(1, 7)}), encoding="utf-8")
+    checkpoint_file = str(tmp_path / "checkpoint")
+    imported = []
+
+    async def import_chunk(chunk):
+        imported.extend(user_id for user_id, _ in chunk)
+        errors = ["User 3: boom"] if any(user_id == "3" for user_id, _ in chunk) else []
+        return {"users": len(chunk) - len(errors)}, errors
+
+    monkeypatch.setattr(MigrationService, "import_chunk", import_chunk)
+    result = await migrate_data.migrate_json_to_db(str(data_file), 2, checkpoint_file)
+    assert result["errors"] == ["User 3: boom"]
+    # Чанк с ошибкой и все после него остаются за checkpoint
+    assert migrate_data.load_checkpoint(checkpoint_file, str(data_file)) == 2
+
+    imported.clear()
+    await migrate_data.migrate_json_to_db(str(data_file), 2, checkpoint_file)
+    assert imported[0] == "3"
@@ -0,0 +1,122 @@
+from types import SimpleNamespace
+
+import pytest
+
+import utils.storage as storage
+from db.models import Quest, User
+from handlers.quests import handle_inline_done, recommender
+from services.quest_service import QuestService
+from utils.callback_codec import QUEST_DONE, QUEST_PAGE
+from utils.quest_render import VIEW_DONE, VIEW_STATUS, current_after, paginate, render_quest_list
+
+
+def make_quests(count):
+    return [{"id": i, "text": f"Квест {i}", "status": "todo", "phase": "low"} for i in range(1, count + 1)]
+
+
+def callbacks(markup):
+    return [button.callback_data for row in markup.inline_keyboard for button in row]
+
+
+def test_matches_previous_layout():
+    quests = [
+        {"id": 1, "text": "Написать отчет", "status": "todo", "phase": "active"},
+        {"id": 2, "text": "Погулять", "status": "done", "phase": None},
+    ]
+    text, markup = render_quest_list(paginate(quests))
+
+    assert text == "📋 <b>Твои квесты:</b>\n\n🕒 <b>1</b>: Написать отчет (active)\n✅ <b>2</b>: Погулять"
+    assert callbacks(markup) == [QUEST_DONE.pack(quest_id=1)]
+
+
+def test_keyset_pages_follow_cursors():
+    quests = make_quests(25)
+    del quests[3]  # пропуски в id не ломают курсоры
+
+    first = paginate(quests, limit=10)
+    _, markup = render_quest_list(first)
+    next_cursor = QUEST_PAGE.unpack(callbacks(markup)[-1])
+    assert next_cursor == (VIEW_STATUS, 11, 0)
+
+    second = paginate(quests, after=next_cursor.after, limit=10)
+    assert [q["id"] for q in second.items] == list(range(12, 22))
+    assert second.has_prev and second.has_next
+
+    previous = paginate(quests, before=second.items[0]["id"], limit=10)
+    assert previous == first
+    # Страница восстанавливается по кнопке "назад" в самом сообщении
+    _, second_markup = render_quest_list(second)
+    assert paginate(quests, after=current_after(second_markup), limit=10) == second
+
+    # Курсор за концом списка (квесты удалены) показывает последнюю страницу
+    assert [q["id"] for q in paginate(quests, after=100, limit=10).items] == list(range(16, 26))
+
+
+def test_done_view_only_lists_pending():
+    quests = make_quests(3)
+    quests[1]["status"] = "done"
+
+    text, markup = render_quest_list(paginate(quests, status="todo"), VIEW_DONE)
+
+    assert text == "Выбери квест, который выполнил:"
+    assert callbacks(markup) == [QUEST_DONE.pack(quest_id=1), QUEST_DONE.pack(quest_id=3)]
+
+
+def test_changed_quest_invalidates_its_fragment():
+    quests = make_quests(3)
+    text, markup = render_quest_list(paginate(quests))
+    assert render_quest_list(paginate(quests)) == (text, markup)
+
+    quests[1]["status"] = "done"
+    changed_text, changed_markup = render_quest_list(paginate(quests))
+
+    assert "✅ <b>2</b>" in changed_text
+    assert QUEST_DONE.pack(quest_id=2) not in callbacks(changed_markup)
+
+
+@pytest.mark.asyncio
+async def test_service_keyset_page(memory_db):
+    session_factory = await memory_db("services.quest_service", "services.user_service")
+
+    async with session_factory() as session:
+        user = User(telegram_id="42")
+        session.add(user)
+        await session.flush()
+        session.add_all(
+            Quest(user_id=user.id, text=f"q{i}", status="done" if i % 2 else "todo") for i in range(1, 8)
+        )
+        await session.commit()
+
+    first = await QuestService.get_quests_page("42", limit=3)
+    assert [q["id"] for q in first["items"]] == [1, 2, 3]
+    assert not first["has_prev"] and first["has_next"]
+
+    last = await QuestService.get_quests_page("42", after_id=6, limit=3)
+    assert [q["id"] for q in last["items"]] == [7] and not last["has_next"]
+
+    back = await QuestService.get_quests_page("42", before_id=7, limit=3)
+    assert [q["id"] for q in back["items"]] == [4, 5, 6] and back["has_prev"]
+
+    todo = await QuestService.get_quests_page("42", status="todo", limit=10)
+    assert [q["id"] for q in todo["items"]] == [2, 4, 6]
+    assert await QuestService.count_quests("42") == 7
+    assert await QuestService.count_quests("42", status="todo") == 3
+
+
+@pytest.mark.asyncio
+async def test_repeated_done_tap_is_not_counted_again(tmp_path, monkeypatch):
+    monkeypatch.setattr(storage, "_data_storage", storage.Storage(str(tmp_path / "data.json")))
+    quests = make_quests(2)
+    quests[0]["status"] = "done"
+    await storage.save_data({"42": {"quests": quests, "daily_stats": {"2025-04-01": {"quests_done": 1}}}})
+    done, answers = [], []
+    monkeypatch.setattr(recommender, "record_done", lambda *args: done.append(args))
+
+    async def answer(text=None, **kwargs):
+        answers.append(text)
+
+    callback = SimpleNamespace(from_user=SimpleNamespace(id=42), data=QUEST_DONE.pack(quest_id=1), answer=answer)
+    await handle_inline_done(callback)
+
+    assert answers == ["Квест уже выполнен."] and done == []
+    assert storage.read_data()["42"]["daily_stats"] == {"2025-04-01": {"quests_done": 1}}
@@ -0,0 +1,49 @@
+import asyncio
+import json
+
+from utils.quest_logic import get_quest_by_phase, matches_phase_tip
+from utils.recommend import QuestRecommender
+
+
+def test_compiled_phase_check_matches_keyword_scan():
+    for phase in ("active", "low", "fog", "unknown"):
+        tip = get_quest_by_phase(phase)
+        for quest in ("Разобрать backlog", "Погулять", "Obsidian заметка", "ПОСПАТЬ", "сделать"):
+            expected = any(kw.lower() in quest.lower() for kw in tip.lower().split())
+            assert matches_phase_tip(quest, phase) == expected
+
+
+def test_suggestions_follow_incremental_refresh(tmp_path):
+    path = tmp_path / "data.json"
+
+    def done(text, phase="low"):
+        return {"id": 0, "text": text, "status": "done", "phase": phase}
+
+    data = {
+        "1": {"quests": [done("Помыть кухню"), done("помыть  кухню!"), done("Прогулка"),
+                         {"id": 9, "text": "Прогулка", "status": "todo", "phase": "low"}]},
+        "2": {"quests": [done("Прогулка"), done("Созвон", "active")]},
+        "3": {"quests": [done("Прогулка"), done("Поспать")]},
+    }
+    path.write_text(json.dumps(data))
+    recommender = QuestRecommender(min_users=3)
+
+    changed, seen = recommender.scan(str(path))
+    recommender.apply(changed, seen)
+
+    # Свои повторяющиеся квесты первыми, затем общие (от 3 пользователей)
+    assert recommender.suggest("1", "low", k=3) == ["Помыть кухню", "Прогулка"]
+    assert recommender.suggest("1", "low", k=3, exclude=["Прогулка"]) == ["Помыть кухню"]
+    assert recommender.suggest("2", "low", k=3) == ["Прогулка"]
+    assert recommender.suggest("4", "low", k=3) == ["прогулка"]
+    assert recommender.suggest("4", "active") == []
+
+    recommender.record_done("4", "fog", "Лечь пораньше")
+    assert recommender.suggest("4", "fog") == ["Лечь пораньше"]
+
+    # Без изменений файл не переиндексируется; удаленный пользователь уходит из общих
+    assert recommender.scan(str(path))[0] == {}
+    del data["3"]
+    path.write_text(json.dumps(data))
+    assert asyncio.run(recommender.refresh_from_file(str(path))) == 0
+    assert recommender.suggest("4", "low") == []
@@ -0,0 +1,72 @@
+from datetime import date, datetime, timezone
+
+import pytest
+from sqlalchemy import select
+
+from db.models import Quest, User
+from services.recurring_service import RecurringService
+from utils.recurrence import DAILY, WEEKDAYS, materialize_due, parse_rule
+
+
+def test_parse_rule_accepts_aliases_day_names_and_cron():
+    assert parse_rule("Ежедневно") == parse_rule("*") == parse_rule("0-6") == DAILY
+    assert parse_rule("будни") == parse_rule("1-5") == parse_rule("пн,вт,ср,чт,пт") == WEEKDAYS
+    # В cron и 0, и 7 — воскресенье
+    assert parse_rule("0") == parse_rule("7") == parse_rule("вс") == 1 << 6
+    for bad in ("", "каждый_час", "8", "5-1"):
+        with pytest.raises(ValueError):
+            parse_rule(bad)
+
+
+def test_materialize_due_adds_one_quest_per_local_day():
+    user_data = {
+        "phase": "low",
+        "quests": [{"id": 3, "text": "Старый", "status": "todo"}],
+        "templates": [
+            {"id": 1, "text": "Зарядка", "mask": WEEKDAYS, "tz": "Asia/Tokyo", "last_date": None},
+            {"id": 2, "text": "Уборка", "mask": parse_rule("сб"), "tz": "Europe/Moscow", "last_date": None},
+        ],
+    }
+    # Пятница 16:00 UTC: в Токио уже суббота, в Москве еще пятница
+    now = datetime(2025, 4, 11, 16, 0, tzinfo=timezone.utc)
+
+    assert materialize_due(user_data, now) == 0
+    assert materialize_due(user_data, datetime(2025, 4, 11, 12, 0, tzinfo=timezone.utc)) == 1
+    assert user_data["quests"][-1] == {
+        "id": 4, "text": "Зарядка", "status": "todo", "phase": "low", "template_id": 1, "due": "2025-04-11",
+    }
+    assert materialize_due(user_data, datetime(2025, 4, 12, 9, 0, tzinfo=timezone.utc)) == 1
+    assert materialize_due(user_data, datetime(2025, 4, 12, 20, 0, tzinfo=timezone.utc)) == 0
+    assert [quest["text"] for quest in user_data["quests"]] == ["Старый", "Зарядка", "Уборка"]
+
+
+@pytest.mark.asyncio
+async def test_materialize_is_one_bulk_insert_per_timezone(memory_db):
+    session_factory = await memory_db("services.recurring_service", "services.user_service")
+    async with session_factory() as session:
+        session.add_all([User(telegram_id="1", phase="fog"), User(telegram_id="2", phase="active")])
+        await session.commit()
+
+    await RecurringService.add_template("1", "Зарядка", DAILY, "Europe/Moscow")
+    await RecurringService.add_template("2", "Отчет", WEEKDAYS, "Europe/Moscow", phase="low")
+    stopped = await RecurringService.add_template("2", "Бег", DAILY, "Europe/Moscow")
+    await RecurringService.add_template("2", "Звонок", DAILY, "Asia/Tokyo")
+    assert await RecurringService.deactivate_template("2", stopped.id)
+    assert not await RecurringService.deactivate_template("1", stopped.id)
+
+    saturday, monday = date(2025, 4, 12), date(2025, 4, 14)
+    assert await RecurringService.materialize("Europe/Moscow", saturday) == 1
+    assert await RecurringService.materialize("Europe/Moscow", saturday) == 0
+    assert await RecurringService.materialize("Europe/Moscow", monday) == 2
+    assert sorted(await RecurringService.timezones()) == ["Asia/Tokyo", "Europe/Moscow"]
+
+    async with session_factory() as session:
+        rows = (await session.execute(
+            select(Quest.text, Quest.phase, Quest.due_date).order_by(Quest.due_date, Quest.text)
+        )).all()
+    assert rows == [
+        ("Зарядка", "fog", saturday),
+        ("Зарядка", "fog", monday),
+        ("Отчет", "low", monday),
+    ]
+    assert [t.text for t in await RecurringService.list_templates("2")] == ["Отчет", "Звонок"]
@@ -0,0 +1,60 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy import select
+
+from db.models import Reminder, User
+from services.reminder_service import ReminderService
+from utils.reminders import due_kinds, next_fire, render_reminder
+
+
+def test_json_reminders_due_together_are_merged():
+    user_data = {
+        "reminder_enabled": True,
+        "reminder_time": "21:00",
+        "reminders": {"quests": "21:00", "phase": "08:30"},
+    }
+
+    assert due_kinds(user_data, "08:30") == ["phase"]
+    assert render_reminder(due_kinds(user_data, "08:30")) == "🌗 Отметь фазу дня — /start_day"
+    merged = render_reminder(due_kinds(user_data, "21:00"))
+    assert merged.startswith("🔔 <b>Напоминания</b>")
+    assert merged.index("/status") < merged.index("/reflect")
+    assert due_kinds({"reminder_enabled": False, "reminder_time": "21:00"}, "21:00") == []
+    assert next_fire(9 * 60, datetime(2025, 4, 7, 9, 0)) == datetime(2025, 4, 8, 9, 0)
+
+
+@pytest.mark.asyncio
+async def test_claim_merges_kinds_and_advances_next_fire(memory_db):
+    session_factory = await memory_db("services.reminder_service")
+    async with session_factory() as session:
+        session.add_all([User(telegram_id="1"), User(telegram_id="2")])
+        await session.commit()
+
+    created = datetime(2025, 4, 7, 8, 0)
+    assert await ReminderService.set_kind_reminder("1", "quests", "09:00", now=created)
+    assert await ReminderService.set_kind_reminder("1", "phase", "09:00", now=created)
+    assert await ReminderService.set_kind_reminder("2", "reflection", "09:00", now=created)
+    assert await ReminderService.set_kind_reminder("2", "quests", "10:00", now=created)
+    assert await ReminderService.set_kind_reminder("2", "reflection", None)
+    assert not await ReminderService.set_kind_reminder("3", "quests", "09:00")
+    with pytest.raises(ValueError):
+        await ReminderService.set_kind_reminder("1", "sleep", "09:00")
+
+    assert await ReminderService.claim_due(datetime(2025, 4, 7, 8, 59)) == {}
+    # Пропущенные запуски не копятся: напоминание приходит один раз
+    now = datetime(2025, 4, 9, 9, 30)
+    claimed = await ReminderService.claim_due(now)
+    assert {user: sorted(kinds) for user, kinds in claimed.items()} == {"1": ["phase", "quests"], "2": ["quests"]}
+    assert await ReminderService.claim_due(now) == {}
+
+    async with session_factory() as session:
+        fires = dict((await session.execute(select(Reminder.kind, Reminder.next_fire_at).where(Reminder.user_id == 2))).all())
+    assert fires == {"reflection": None, "quests": datetime(2025, 4, 9, 10, 0)}
+
+    await ReminderService.retry_at("1", ["quests"], datetime(2025, 4, 9, 9, 35))
+    assert await ReminderService.claim_due(datetime(2025, 4, 9, 9, 35)) == {"1": ["quests"]}
+    # Время напоминания — ключ дедупликации, общий с циклом бота
+    await ReminderService.retry_at("1", ["quests"], datetime(2025, 4, 9, 9, 40))
+    assert await ReminderService.claim_due_slots(datetime(2025, 4, 9, 9, 40)) == {"1": {"09:00": ["quests"]}}
+    assert [r.kind for r in await ReminderService.list_reminders("1")] == ["phase", "quests"]
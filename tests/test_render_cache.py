@@ -0,0 +1,41 @@
+from types import SimpleNamespace
+
+import pytest
+from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
+
+from utils.render_cache import RenderCache, edit_text_cached
+
+
+class EditableMessage:
+    """Message stand-in recording edit_text calls"""
+    def __init__(self, message_id):
+        self.chat = SimpleNamespace(id=1)
+        self.message_id = message_id
+        self.edits = []
+
+    async def edit_text(self, text, reply_markup=None, **kwargs):
+        self.edits.append(text)
+
+
+def markup(data):
+    return InlineKeyboardMarkup(inline_keyboard=[[InlineKeyboardButton(text="➡️", callback_data=data)]])
+
+
+@pytest.mark.asyncio
+async def test_identical_edit_is_skipped():
+    message = EditableMessage(message_id=101)
+
+    assert await edit_text_cached(message, "Инсайт #1", reply_markup=markup("in:AA"))
+    assert not await edit_text_cached(message, "Инсайт #1", reply_markup=markup("in:AA"))
+    # Same text with another keyboard is a real change
+    assert await edit_text_cached(message, "Инсайт #1", reply_markup=markup("in:AQ"))
+
+    assert message.edits == ["Инсайт #1", "Инсайт #1"]
+
+
+def test_cache_is_bounded():
+    cache = RenderCache(max_entries=2)
+    for message_id in range(3):
+        cache.set((1, message_id), b"x")
+    assert len(cache) == 2
+    assert cache.get((1, 0)) is None
@@ -0,0 +1,76 @@
+from datetime import datetime
+
+import pytest
+
+from core.scheduler import MinuteScheduler
+
+
+class KeyStore:
+    """In-memory stand-in for the async Redis string commands used by the scheduler"""
+    def __init__(self):
+        self.values = {}
+
+    async def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.values:
+            return None
+        self.values[key] = value
+        return True
+
+    async def get(self, key):
+        return self.values.get(key)
+
+    async def expire(self, key, ttl):
+        return key in self.values
+
+    async def delete(self, key):
+        self.values.pop(key, None)
+
+
+@pytest.mark.asyncio
+async def test_minute_runs_once_across_processes():
+    """Several processes ticking the same minute run the job once"""
+    store = KeyStore()
+    ran = []
+
+    async def job(minute):
+        ran.append(minute)
+
+    schedulers = [MinuteScheduler(store, "reminders:test") for _ in range(3)]
+    now = datetime(2025, 4, 1, 8, 0, 59, 900000)
+    for scheduler in schedulers:
+        await scheduler.tick(job, now)
+    # Leader lock expired and another process took over
+    store.values.pop("scheduler:reminders:test:leader")
+    await schedulers[1].tick(job, datetime(2025, 4, 1, 8, 0, 59, 950000))
+
+    assert ran == [datetime(2025, 4, 1, 8, 0)]
+
+
+@pytest.mark.asyncio
+async def test_missed_minutes_are_caught_up():
+    """A tick at :59.9 followed by one at :01.1 still runs minute :00"""
+    scheduler = MinuteScheduler(KeyStore(), "reminders:test", catch_up=5)
+    ran = []
+
+    async def job(minute):
+        ran.append(minute.strftime("%H:%M"))
+
+    await scheduler.tick(job, datetime(2025, 4, 1, 8, 59, 59, 900000))
+    await scheduler.tick(job, datetime(2025, 4, 1, 9, 1, 1, 100000))
+    await scheduler.tick(job, datetime(2025, 4, 1, 9, 30, 0))
+
+    assert ran == ["08:59", "09:00", "09:01", "09:26", "09:27", "09:28", "09:29", "09:30"]
+
+
+@pytest.mark.asyncio
+async def test_send_is_deduplicated_per_user_and_day():
+    store = KeyStore()
+    bot_scheduler = MinuteScheduler(store, "reminders:bot")
+    celery_scheduler = MinuteScheduler(store, "reminders:celery")
+    day = datetime(2025, 4, 1).date()
+
+    assert await bot_scheduler.claim_send("42", day)
+    assert not await celery_scheduler.claim_send("42", day)
+
+    await bot_scheduler.release_send("42", day)
+    assert await celery_scheduler.claim_send("42", day)
@@ -0,0 +1,62 @@
+from datetime import datetime
+
+import pytest
+
+from db.models import Insight, Reflection, User
+from handlers.search import render_results, result_rows
+from services.search_service import SearchService
+from utils.search import fts5_query, search_entries, stem
+
+
+def test_json_search_ranks_and_pages_results():
+    user_data = {
+        "insights": [
+            {"text": "Когда я не высыпаюсь, мне сложно говорить нет", "date": "2025-04-01 10:00"},
+            {"text": "Прогулка утром помогает", "date": "2025-04-02 10:00"},
+        ] + [{"text": f"Высыпаться важно #{i}", "date": f"2025-03-{i + 1:02d} 09:00"} for i in range(6)],
+        "reflections": [{"date": "2025-04-03 22:00", "q1": "сон", "q2": "высыпаться и высыпаться", "q3": None}],
+    }
+
+    assert stem("высыпаться") == stem("высыпаюсь") == "высып"
+    assert fts5_query('высыпаюсь "нет"') == '"высып"* "нет"*'
+
+    hits = search_entries(user_data, "высыпаюсь")
+    assert len(hits) == 8
+    # Два совпадения выше одного, короткие записи выше длинных, при равенстве свежие
+    assert (hits[0].kind, hits[0].pos) == ("reflection", 0)
+    assert [hit.pos for hit in hits[1:3]] == [7, 6]
+    assert hits[-1].pos == 0
+
+    text, markup = render_results(result_rows(hits, "высыпаюсь"), "высыпаюсь", 1)
+    assert "Страница 2 из 2" in text
+    assert [b.text for b in markup.inline_keyboard[0]] == ["⬅️"]
+
+
+@pytest.mark.asyncio
+async def test_fts_index_follows_inserts_and_deletes(memory_db):
+    session_factory = await memory_db("services.search_service")
+    created = datetime(2025, 4, 1, 12, 0)
+    async with session_factory() as session:
+        session.add_all([User(id=1, telegram_id="42"), User(id=2, telegram_id="43")])
+        session.add_all([
+            Insight(id=1, user_id=1, text="Когда я не высыпаюсь, мне сложно говорить нет", created_at=created),
+            Insight(id=2, user_id=2, text="Высыпаться важно", created_at=created),
+            Reflection(id=1, user_id=1, important="сон", worked="высыпаться и ещё раз высыпаться", change=None, created_at=created),
+        ])
+        await session.commit()
+
+    result = await SearchService.search("42", "высыпаться")
+    assert [(item["kind"], item["id"]) for item in result["items"]] == [("reflection", 1), ("insight", 1)]
+    assert result["items"][0]["text"] == "сон\nвысыпаться и ещё раз высыпаться\n"
+
+    page = await SearchService.search("42", "высыпаться", offset=0, limit=1)
+    assert len(page["items"]) == 1 and page["has_next"]
+
+    async with session_factory() as session:
+        await session.delete(await session.get(Reflection, 1))
+        await session.commit()
+
+    result = await SearchService.search("42", "высыпаться")
+    assert [(item["kind"], item["id"]) for item in result["items"]] == [("insight", 1)]
+    assert (await SearchService.search("42", "!!!"))["items"] == []
+    assert (await SearchService.search("unknown", "сон"))["items"] == []
@@ -0,0 +1,49 @@
+from datetime import date
+
+import pytest
+
+from db.models import User
+from handlers.stats import render_month, shift_month
+from services.stats_service import StatsService
+from utils.callback_codec import STATS_MONTH
+from utils.helpers import record_daily_stat
+
+
+def test_json_rollup_renders_month_calendar():
+    user_data = {}
+    record_daily_stat(user_data, phase="low")
+    record_daily_stat(user_data, "quests_added")
+    record_daily_stat(user_data, "quests_added")
+    record_daily_stat(user_data, phase="active")
+    today = date.today()
+
+    month = today.strftime("%Y-%m")
+    text, markup = render_month(user_data["daily_stats"], month, today)
+
+    assert "⚡ 1 · 🌀 0" in text
+    assert "Квестов добавлено: <b>2</b>" in text
+    # В текущем месяце нет перехода вперед и кнопки "Назад"
+    assert [[b.text for b in row] for row in markup.inline_keyboard] == [["<<"]]
+    assert markup.inline_keyboard[0][0].callback_data == STATS_MONTH.pack(month=shift_month(month, -1))
+    assert shift_month("2025-01", -1) == "2024-12"
+
+
+@pytest.mark.asyncio
+async def test_record_upserts_one_row_per_day(memory_db):
+    session_factory = await memory_db("services.stats_service")
+    async with session_factory() as session:
+        session.add(User(telegram_id="42"))
+        await session.commit()
+
+    day = date(2025, 4, 30)
+    await StatsService.record("42", phase="fog", day=day)
+    await StatsService.record("42", "quests_done", day=day)
+    await StatsService.record("42", "quests_done", day=day)
+    await StatsService.record("42", phase="active", day=day)
+    await StatsService.record("42", "insights", day=date(2025, 5, 1))
+
+    april = await StatsService.get_month("42", 2025, 4)
+
+    assert [(row.day, row.phase, row.quests_done, row.insights) for row in april] == [(day, "active", 2, 0)]
+    assert len(await StatsService.get_month("42", 2025, 5)) == 1
+    assert await StatsService.get_month("unknown", 2025, 4) == []
@@ -0,0 +1,81 @@
+import asyncio
+import copy
+import json
+import threading
+
+import pytest
+
+from utils.storage import Storage
+
+
+def test_snapshot_is_cached_read_only_and_invalidated_by_writes(tmp_path):
+    path = tmp_path / "data.json"
+    storage = Storage(str(path))
+    assert storage.read() == {}
+    assert storage.write({"1": {"quests": [{"id": 1, "text": "Зарядка"}]}})
+
+    data = storage.read()
+    # Неизменный файл отдается из памяти, в том числе другому экземпляру
+    assert storage.read() is data
+    assert Storage(str(path)).read() is data
+    with pytest.raises(TypeError):
+        data["2"] = {}
+    with pytest.raises(TypeError):
+        data["1"]["quests"].append({})
+    with pytest.raises(TypeError):
+        data["1"]["quests"][0]["status"] = "done"
+
+    # Копии и сериализация работают как с обычным dict
+    assert json.loads(json.dumps(data)) == data
+    clone = copy.deepcopy(data)
+    clone["1"]["quests"][0]["status"] = "done"
+    own = storage.read_copy()
+    own["1"]["quests"].append({"id": 2, "text": "Чтение"})
+    assert storage.read()["1"]["quests"] == [{"id": 1, "text": "Зарядка"}]
+
+    assert storage.update_user("1", lambda user: user.update(phase="active"))
+    assert storage.read() is not data
+    assert storage.read()["1"]["phase"] == "active"
+
+    # Запись в обход Storage замечается по размеру/mtime
+    path.write_text(json.dumps({"3": {}}))
+    assert storage.read() == {"3": {}}
+
+
+def test_writes_replace_the_file_atomically(tmp_path):
+    path = tmp_path / "data.json"
+    storage = Storage(str(path))
+    storage.write({"1": {"phase": "fog"}})
+    path.chmod(0o640)
+
+    async def write_in_order():
+        pending = asyncio.create_task(storage.write_async({"1": {"phase": "low"}}))
+        await asyncio.sleep(0)
+        # Запись видна читателям процесса сразу, еще до переименования файла
+        assert storage.read() == {"1": {"phase": "low"}}
+        await pending
+        return await asyncio.gather(*(storage.write_async({"1": {"phase": str(i)}}) for i in range(20)))
+
+    assert all(asyncio.run(write_in_order()))
+    # Записи применяются по порядку, компактно, с прежними правами и без временных файлов
+    assert path.stat().st_mode & 0o777 == 0o640
+    assert path.read_text() == '{"1":{"phase":"19"}}'
+    assert [p.name for p in tmp_path.iterdir()] == ["data.json"]
+    assert storage.read() == {"1": {"phase": "19"}}
+
+    # Читатель в другом потоке не видит пустой или недописанный файл
+    users = lambda first: {str(n): {"quests": [{"id": n, "text": "x" * 100}]} for n in range(first, first + 100)}
+    storage.write(users(0))
+    seen, done = [], threading.Event()
+
+    def reader():
+        while not done.is_set():
+            seen.append(len(storage.read()))
+
+    thread = threading.Thread(target=reader)
+    thread.start()
+    for i in range(1, 50):
+        storage.write(users(i))
+    done.set()
+    thread.join()
+    assert seen and set(seen) == {100}
@@ -0,0 +1,98 @@
+from datetime import date, timedelta
+from types import SimpleNamespace
+
+import pytest
+from aiogram.exceptions import TelegramForbiddenError, TelegramRetryAfter
+from aiogram.methods import SendMessage
+
+import utils.storage as storage
+from core.rate_limit import RateLimiter, send_paced
+from db.models import DailyStat, User
+from handlers.insight import save_insight
+from handlers.phase import save_phase
+from services.summary_service import SummaryService, render_summary, summarize_days, summary_window, window_stats
+from utils.json_stream import read_shard, write_shards
+
+
+def test_summary_window_is_last_complete_period():
+    wednesday = date(2025, 4, 16)
+    assert summary_window("week", wednesday) == (date(2025, 4, 7), date(2025, 4, 14))
+    assert summary_window("month", date(2025, 1, 1)) == (date(2024, 12, 1), date(2025, 1, 1))
+
+
+@pytest.mark.asyncio
+async def test_collect_groups_a_user_range(memory_db):
+    session_factory = await memory_db("services.summary_service")
+    async with session_factory() as session:
+        session.add_all(User(id=pk, telegram_id=str(100 + pk)) for pk in (1, 2, 3))
+        session.add_all([
+            DailyStat(user_id=1, day=date(2025, 4, 7), phase="low", quests_added=2, quests_done=0, insights=0, reflections=1),
+            DailyStat(user_id=1, day=date(2025, 4, 9), phase="low", quests_added=0, quests_done=3, insights=1, reflections=0),
+            DailyStat(user_id=1, day=date(2025, 4, 14), phase="fog", quests_added=5, quests_done=0, insights=0, reflections=0),
+            DailyStat(user_id=3, day=date(2025, 4, 8), phase="active", quests_added=1, quests_done=0, insights=0, reflections=0),
+        ])
+        await session.commit()
+
+    assert await SummaryService.user_id_ranges(2) == [(1, 2), (3, 3)]
+
+    summaries = await SummaryService.collect(1, 2, date(2025, 4, 7), date(2025, 4, 14))
+
+    assert summaries == [{
+        "telegram_id": "101", "quests_added": 2, "quests_done": 3, "insights": 1, "reflections": 1,
+        "phases": {"low": 2},
+    }]
+    text = render_summary("week", date(2025, 4, 7), date(2025, 4, 14), summaries[0])
+    assert "(07.04 — 13.04)" in text and "🌀 Спад 2" in text
+
+
+@pytest.mark.asyncio
+async def test_handler_events_reach_the_summary(tmp_path, monkeypatch):
+    data_file = tmp_path / "data.json"
+    monkeypatch.setattr(storage, "_data_storage", storage.Storage(str(data_file)))
+
+    async def noop(*args, **kwargs):
+        pass
+
+    message = SimpleNamespace(from_user=SimpleNamespace(id=42), text="Мысль", answer=noop)
+    await save_insight(message, SimpleNamespace(clear=noop))
+    await save_phase(42, "fog")
+    await save_phase(43, "low")
+    await storage.save_data({**storage.load_data(), "44": {"phase": "active"}})
+
+    # Окно, в которое попадает сегодняшний день
+    since, until = summary_window("week", date.today() + timedelta(days=7))
+    shards, users = write_shards(
+        str(data_file), str(tmp_path / "shards"), 1, lambda user_data: window_stats(user_data, since, until)
+    )
+    assert users == 2 and len(shards) == 2
+
+    summaries = [summarize_days(telegram_id, days) for path, _, _ in shards for telegram_id, days in read_shard(path)]
+    assert summaries[0] == {
+        "telegram_id": "42", "quests_added": 0, "quests_done": 0, "insights": 1, "reflections": 0,
+        "phases": {"fog": 1},
+    }
+    assert "🧠 Инсайтов: <b>1</b>" in render_summary("week", since, until, summaries[0])
+    assert window_stats(storage.read_data()["42"], until, until + timedelta(days=7)) is None
+
+
+@pytest.mark.asyncio
+async def test_send_paced_retries_flood_control_and_skips_blocked():
+    class FakeBot:
+        def __init__(self):
+            self.sent = []
+            self.flooded = False
+
+        async def send_message(self, chat_id, text):
+            method = SendMessage(chat_id=chat_id, text=text)
+            if chat_id == "blocked":
+                raise TelegramForbiddenError(method=method, message="bot was blocked by the user")
+            if not self.flooded:
+                self.flooded = True
+                raise TelegramRetryAfter(method=method, message="Too Many Requests", retry_after=0)
+            self.sent.append(chat_id)
+
+    bot = FakeBot()
+    counts = await send_paced(bot, [("1", "a"), ("blocked", "b"), ("2", "c")], RateLimiter(rate=1000, burst=10))
+
+    assert counts == {"sent": 2, "blocked": 1, "failed": 0}
+    assert bot.sent == ["1", "2"]
@@ -0,0 +1,49 @@
+from core.task_stats import TaskStatsSink
+
+
+class HashStore:
+    """Minimal in-memory stand-in for the Redis hash commands used by the sink"""
+    def __init__(self):
+        self.hashes = {}
+        self.ttl = {}
+
+    def pipeline(self, transaction=True):
+        return self
+
+    def hincrby(self, key, field, amount):
+        bucket = self.hashes.setdefault(key, {})
+        bucket[field] = bucket.get(field, 0) + amount
+
+    hincrbyfloat = hincrby
+
+    def expire(self, key, ttl):
+        self.ttl[key] = ttl
+
+    def execute(self):
+        pass
+
+    def hgetall(self, key):
+        return self.hashes.get(key, {})
+
+
+def test_sink_aggregates_runs_and_counters():
+    """Runs are folded into one hash per task instead of a result per run"""
+    store = HashStore()
+    sink = TaskStatsSink(store, ttl=60)
+
+    sink.record("tasks.check_reminders", "SUCCESS", 0.5,
+                {"status": "success", "time": "08:00", "sent_count": 3, "error_count": 1})
+    sink.record("tasks.check_reminders", "SUCCESS", 0.25, {"sent_count": 2, "error_count": 0})
+    sink.record("tasks.check_reminders", "FAILURE", 0.1, ValueError("boom"))
+
+    stats = sink.read("tasks.check_reminders")
+    assert stats == {
+        "runs": 3,
+        "state:SUCCESS": 2,
+        "state:FAILURE": 1,
+        "runtime_seconds": 0.85,
+        "sent_count": 5,
+        "error_count": 1,
+    }
+    assert len(store.hashes) == 1
+    assert list(store.ttl.values()) == [60]
@@ -0,0 +1,98 @@
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from core import tracing
+from core.tracing import Tracer, extract, inject, span, traced
+from utils.storage import Storage
+
+
+class ListProcessor:
+    """Collect finished spans instead of exporting them"""
+    def __init__(self):
+        self.spans = []
+
+    def on_end(self, finished):
+        self.spans.append(finished)
+
+    def shutdown(self):
+        pass
+
+
+@pytest.fixture
+def processor(monkeypatch):
+    collected = ListProcessor()
+    monkeypatch.setattr(tracing, "_tracer", Tracer(collected, sample_rate=1.0))
+    return collected
+
+
+@pytest.mark.asyncio
+async def test_child_spans_share_trace(processor):
+    """Decorated calls and SQL statements become children of the request span"""
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    tracing.instrument_engine(engine)
+
+    @traced("QuestService.get_user_quests")
+    async def load():
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    with span("update", command="/status") as root:
+        await load()
+    await engine.dispose()
+
+    names = [s.name for s in processor.spans]
+    assert names == ["db.SELECT", "QuestService.get_user_quests", "update"]
+    assert {s.trace_id for s in processor.spans} == {root.trace_id}
+    db_span, service_span, _ = processor.spans
+    assert db_span.parent_id == service_span.span_id
+    assert service_span.parent_id == root.span_id
+
+
+def test_unsampled_traces_are_not_exported(monkeypatch):
+    collected = ListProcessor()
+    monkeypatch.setattr(tracing, "_tracer", Tracer(collected, sample_rate=0.0))
+
+    with span("update"):
+        with span("child"):
+            pass
+
+    assert collected.spans == []
+
+
+def test_traceparent_round_trip(processor):
+    """Celery headers carry the trace to the worker side"""
+    headers = {}
+    with span("publish") as parent:
+        inject(headers)
+
+    remote = extract(headers["traceparent"])
+    assert remote.trace_id == parent.trace_id
+    assert remote.span_id == parent.span_id
+    assert remote.sampled
+
+
+def test_error_is_recorded(processor):
+    with pytest.raises(ValueError):
+        with span("update"):
+            raise ValueError("bad")
+
+    assert processor.spans[0].error == "ValueError: bad"
+
+
+@pytest.mark.asyncio
+async def test_json_storage_spans(processor, tmp_path):
+    """Loading and saving the JSON file shows up next to SQL and Telegram time"""
+    storage = Storage(str(tmp_path / "data.json"))
+    with span("update", command="/status") as root:
+        await storage.write_async({"1": {"quests": []}})
+        storage.read()
+        storage.read()
+
+    spans = {(s.name, s.attributes.get("cache")): s for s in processor.spans}
+    assert set(spans) == {
+        ("storage.json_dump", None), ("storage.json_write", None),
+        ("storage.json_load", "miss"), ("storage.json_load", "hit"), ("update", None),
+    }
+    assert {s.trace_id for s in processor.spans} == {root.trace_id}
+    assert spans[("storage.json_write", None)].parent_id == root.span_id
@@ -0,0 +1,223 @@
+import gzip
+import json
+import os
+import re
+from datetime import date
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from utils.helpers import shift_month
+
+# Cold storage of old months of insights and reflections.
+#
+# <root>/<table>/<YYYY-MM>.jsonl.gz holds one gzip member per user and
+# archiving run, <YYYY-MM>.idx.json maps the user's Telegram ID to the
+# (offset, length) of their members. Reading one user's month seeks to
+# their members and decompresses only those, however large the month is.
+#
+# Only reflections are archived: /reflections, /search and /export read
+# archived months back, insights have no such reader in /thoughts.
+ARCHIVED_TABLES = ("reflections",)
+# The PostgreSQL partition archive lives under <root>/db: it holds the
+# database copy of the same months, and sharing files and index keys with
+# the data.json archive would replace one archiver's members with the other's
+DB_ARCHIVE = "db"
+
+_MONTH = re.compile(r"^\d{4}-\d{2}")
+
+
+def db_archive_root(root: str) -> str:
+    """Archive directory of month partitions moved out of the database"""
+    return os.path.join(root, DB_ARCHIVE)
+
+
+def cutoff_month(today: date, months: int) -> str:
+    """Months before the returned one are cold after `months` full months"""
+    return shift_month(today.strftime("%Y-%m"), -months)
+
+
+def _paths(root: str, table: str, month: str) -> Tuple[Path, Path]:
+    folder = Path(root) / table
+    return folder / f"{month}.jsonl.gz", folder / f"{month}.idx.json"
+
+
+def _load_index(index_path: Path) -> Dict[str, List[List[int]]]:
+    if not index_path.exists():
+        return {}
+    with open(index_path, "r") as f:
+        return json.load(f)
+
+
+def append_month(
+    root: str,
+    table: str,
+    month: str,
+    members: Iterable[Tuple[str, List[Dict[str, Any]]]],
+    extend: Optional[Set[str]] = None,
+) -> int:
+    """
+    Append users' entries of a month to its archive.
+
+    The data is fsynced before the index is replaced, so a crash leaves
+    at most unreferenced bytes at the end of the archive. A user's new
+    member replaces their earlier ones (a retry after a crash rewrites
+    the whole month) unless they are listed in `extend`.
+
+    Args:
+        root: Archive directory
+        table: "insights" or "reflections"
+        month: YYYY-MM
+        members: (telegram_id, entries) pairs
+        extend: Users whose earlier members are kept
+
+    Returns:
+        Number of archived entries
+    """
+    data_path, index_path = _paths(root, table, month)
+    data_path.parent.mkdir(parents=True, exist_ok=True)
+    index = _load_index(index_path)
+    rows = 0
+    with open(data_path, "ab") as f:
+        offset = f.tell()
+        for telegram_id, entries in members:
+            if not entries:
+                continue
+            payload = "".join(json.dumps(entry, ensure_ascii=False) + "\n" for entry in entries)
+            block = gzip.compress(payload.encode("utf-8"), compresslevel=6, mtime=0)
+            f.write(block)
+            spans = index.get(str(telegram_id), []) if extend and str(telegram_id) in extend else []
+            index[str(telegram_id)] = spans + [[offset, len(block)]]
+            offset += len(block)
+            rows += len(entries)
+        f.flush()
+        os.fsync(f.fileno())
+
+    tmp_path = index_path.with_suffix(".tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(index, f, separators=(",", ":"))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, index_path)
+    _cached_index.cache_clear()
+    return rows
+
+
+@lru_cache(maxsize=64)
+def _cached_index(index_path: str, mtime_ns: int) -> Dict[str, List[List[int]]]:
+    return _load_index(Path(index_path))
+
+
+@lru_cache(maxsize=256)
+def _cached_entries(data_path: str, mtime_ns: int, spans: Tuple[Tuple[int, int], ...]) -> Tuple[Dict[str, Any], ...]:
+    entries = []
+    with open(data_path, "rb") as f:
+        for offset, length in spans:
+            f.seek(offset)
+            for line in gzip.decompress(f.read(length)).decode("utf-8").splitlines():
+                entries.append(json.loads(line))
+    return tuple(entries)
+
+
+def read_month(root: str, table: str, month: str, telegram_id: str) -> List[Dict[str, Any]]:
+    """Rehydrate one user's archived entries of a month, oldest first"""
+    data_path, index_path = _paths(root, table, month)
+    try:
+        index = _cached_index(str(index_path), index_path.stat().st_mtime_ns)
+    except FileNotFoundError:
+        return []
+    spans = tuple(tuple(span) for span in index.get(str(telegram_id), ()))
+    if not spans:
+        return []
+    return list(_cached_entries(str(data_path), data_path.stat().st_mtime_ns, spans))
+
+
+def archived_entries(root: str, table: str, user_data: Dict[str, Any], telegram_id: str) -> List[Dict[str, Any]]:
+    """Every archived entry of a JSON record's table, oldest first"""
+    months = (user_data.get("archived") or {}).get(table) or []
+    return [entry for month in sorted(months) for entry in read_month(root, table, month, telegram_id)]
+
+
+def with_archived(root: str, user_data: Dict[str, Any], telegram_id: str) -> Dict[str, Any]:
+    """
+    The JSON record with its archived months put back in front of the
+    live entries, for readers of the whole history (/search, /export).
+
+    The record itself is not changed; without archived months it is
+    returned as is.
+    """
+    known = user_data.get("archived") or {}
+    if not any(known.values()):
+        return user_data
+    merged = dict(user_data)
+    for table in known:
+        entries = archived_entries(root, table, user_data, telegram_id)
+        if entries:
+            merged[table] = entries + list(user_data.get(table) or [])
+    return merged
+
+
+def split_cold(user_data: Dict[str, Any], cutoff: str) -> Dict[Tuple[str, str], List[Dict[str, Any]]]:
+    """(table, month) -> entries of a JSON record dated before the cutoff month"""
+    cold: Dict[Tuple[str, str], List[Dict[str, Any]]] = {}
+    for table in ARCHIVED_TABLES:
+        for entry in user_data.get(table) or []:
+            stamp = entry.get("date", "") if isinstance(entry, dict) else ""
+            if _MONTH.match(stamp) and stamp[:7] < cutoff:
+                cold.setdefault((table, stamp[:7]), []).append(entry)
+    return cold
+
+
+def archive_snapshot(data: Dict[str, Any], root: str, cutoff: str) -> Dict[str, Dict[str, List[str]]]:
+    """
+    Write the cold months of every JSON record to the archive.
+
+    Runs on a snapshot of the data file; drop_archived then removes the
+    archived entries from the current data.
+
+    Returns:
+        Telegram ID -> table -> archived months
+    """
+    by_month: Dict[Tuple[str, str], List[Tuple[str, List[Dict[str, Any]]]]] = {}
+    extend: Dict[Tuple[str, str], Set[str]] = {}
+    archived: Dict[str, Dict[str, List[str]]] = {}
+    for telegram_id, user_data in data.items():
+        if not isinstance(user_data, dict):
+            continue
+        known = user_data.get("archived") or {}
+        for (table, month), entries in split_cold(user_data, cutoff).items():
+            by_month.setdefault((table, month), []).append((telegram_id, entries))
+            # Late entries of a month that is already archived are added to it
+            if month in known.get(table, ()):
+                extend.setdefault((table, month), set()).add(telegram_id)
+            archived.setdefault(telegram_id, {}).setdefault(table, []).append(month)
+    for (table, month), members in sorted(by_month.items()):
+        append_month(root, table, month, members, extend.get((table, month)))
+    return archived
+
+
+def drop_archived(data: Dict[str, Any], archived: Dict[str, Dict[str, List[str]]]) -> int:
+    """
+    Remove archived months from the JSON records and remember them in
+    user_data["archived"] so the handlers know where to look.
+
+    Returns:
+        Number of removed entries
+    """
+    removed = 0
+    for telegram_id, tables in archived.items():
+        user_data = data.get(telegram_id)
+        if not isinstance(user_data, dict):
+            continue
+        known = user_data.setdefault("archived", {})
+        for table, months in tables.items():
+            months = set(months)
+            entries = user_data.get(table) or []
+            kept = [
+                entry for entry in entries
+                if not (isinstance(entry, dict) and entry.get("date", "")[:7] in months)
+            ]
+            removed += len(entries) - len(kept)
+            user_data[table] = kept
+            known[table] = sorted(set(known.get(table, [])) | months)
+    return removed
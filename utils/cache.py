@@ -7,6 +7,8 @@ import inspect
 import asyncio
 
 from config import REDIS_HOST, REDIS_PORT
+from core.metrics import CACHE_REQUESTS
+from core.tracing import traced
 
 T = TypeVar('T')
 
@@ -22,16 +24,20 @@ class Cache:
     """Redis-based caching utility"""
     
     @staticmethod
+    @traced()
     async def get(key: str) -> Optional[str]:
         """Get value from cache by key"""
         try:
             value = await redis_client.get(key)
+            CACHE_REQUESTS.inc("hit" if value is not None else "miss")
             return value
         except Exception as e:
+            CACHE_REQUESTS.inc("error")
             logging.error(f"Redis get error: {e}")
             return None
     
     @staticmethod
+    @traced()
     async def set(key: str, value: Union[str, Dict, list], 
                   expire: int = 3600) -> bool:
         """
@@ -57,6 +63,7 @@ class Cache:
             return False
     
     @staticmethod
+    @traced()
     async def delete(key: str) -> bool:
         """Delete key from cache"""
         try:
@@ -67,6 +74,7 @@ class Cache:
             return False
     
     @staticmethod
+    @traced()
     async def exists(key: str) -> bool:
         """Check if key exists in cache"""
         try:
@@ -0,0 +1,183 @@
+import base64
+from collections import namedtuple
+from datetime import date
+from typing import Dict, NamedTuple, Optional, Tuple
+
+from aiogram import F
+
+# Telegram limit for InlineKeyboardButton.callback_data
+MAX_CALLBACK_BYTES = 64
+SEPARATOR = ":"
+
+_EPOCH = date(2000, 1, 1).toordinal()
+
+
+def _write_uint(buffer: bytearray, value: int) -> None:
+    """Unsigned LEB128 varint"""
+    if value < 0:
+        raise ValueError(f"Negative value for unsigned field: {value}")
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            buffer.append(byte | 0x80)
+        else:
+            buffer.append(byte)
+            return
+
+
+def _read_uint(payload: bytes, pos: int) -> Tuple[int, int]:
+    result = shift = 0
+    while True:
+        if pos >= len(payload):
+            raise ValueError("Truncated varint")
+        byte = payload[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return result, pos
+        shift += 7
+
+
+def _encode_field(buffer: bytearray, kind: str, value) -> None:
+    if kind == "uint":
+        _write_uint(buffer, value)
+    elif kind == "int":
+        # Zigzag: small negative numbers stay short
+        _write_uint(buffer, (value << 1) ^ (value >> 63))
+    elif kind == "date":
+        if isinstance(value, str):
+            value = date.fromisoformat(value[:10])
+        _write_uint(buffer, value.toordinal() - _EPOCH)
+    elif kind == "month":
+        # "2025-04" -> months since 2000-01
+        year, month = (int(part) for part in value[:7].split("-"))
+        _write_uint(buffer, (year - 2000) * 12 + month - 1)
+    elif kind == "str":
+        raw = value.encode("utf-8")
+        _write_uint(buffer, len(raw))
+        buffer.extend(raw)
+    else:
+        raise ValueError(f"Unknown field kind: {kind}")
+
+
+def _decode_field(payload: bytes, pos: int, kind: str):
+    value, pos = _read_uint(payload, pos)
+    if kind == "uint":
+        return value, pos
+    if kind == "int":
+        return (value >> 1) ^ -(value & 1), pos
+    if kind == "date":
+        return date.fromordinal(value + _EPOCH).isoformat(), pos
+    if kind == "month":
+        year, month = divmod(value, 12)
+        return f"{year + 2000:04d}-{month + 1:02d}", pos
+    if kind == "str":
+        end = pos + value
+        if end > len(payload):
+            raise ValueError("Truncated string")
+        return payload[pos:end].decode("utf-8"), end
+    raise ValueError(f"Unknown field kind: {kind}")
+
+
+class CallbackSchema:
+    """
+    Typed callback_data layout: "<prefix>:<base64url(varint fields)>".
+
+    Fields are (name, kind) pairs where kind is one of uint, int, date
+    ("YYYY-MM-DD"), month ("YYYY-MM") or str.
+
+    Usage:
+        QUEST_DONE = CallbackSchema("QuestDone", "qd", ("quest_id", "uint"))
+        QUEST_DONE.pack(quest_id=12)                  # "qd:DA"
+        QUEST_DONE.unpack(callback.data).quest_id     # 12
+        @router.callback_query(QUEST_DONE.filter)
+    """
+
+    def __init__(self, name: str, prefix: str, *fields: Tuple[str, str], navigation: bool = False):
+        if SEPARATOR in prefix:
+            raise ValueError(f"Prefix must not contain {SEPARATOR!r}: {prefix}")
+        if prefix in _SCHEMAS:
+            raise ValueError(f"Duplicate callback prefix: {prefix}")
+        self.name = name
+        self.prefix = prefix
+        self.fields = fields
+        # Navigation taps replace the message content and may be superseded
+        self.navigation = navigation
+        self.values = namedtuple(name, [field_name for field_name, _ in fields])
+        self._head = prefix + SEPARATOR
+        _SCHEMAS[prefix] = self
+
+    @property
+    def filter(self):
+        """Magic filter matching this schema (indexed by handlers.dispatch)"""
+        return F.data.startswith(self._head)
+
+    def pack(self, **values) -> str:
+        buffer = bytearray()
+        for field_name, kind in self.fields:
+            _encode_field(buffer, kind, values[field_name])
+        data = self._head + base64.urlsafe_b64encode(bytes(buffer)).rstrip(b"=").decode("ascii")
+        if len(data.encode("utf-8")) > MAX_CALLBACK_BYTES:
+            raise ValueError(f"callback_data for {self.name} exceeds {MAX_CALLBACK_BYTES} bytes")
+        return data
+
+    def unpack(self, data: str) -> NamedTuple:
+        if not data.startswith(self._head):
+            raise ValueError(f"Not a {self.name} callback: {data!r}")
+        body = data[len(self._head):]
+        payload = base64.urlsafe_b64decode(body + "=" * (-len(body) % 4))
+        values = []
+        pos = 0
+        for _, kind in self.fields:
+            value, pos = _decode_field(payload, pos, kind)
+            values.append(value)
+        return self.values(*values)
+
+
+_SCHEMAS: Dict[str, CallbackSchema] = {}
+
+
+def parse(data: Optional[str]) -> Optional[Tuple[CallbackSchema, NamedTuple]]:
+    """Find the schema by prefix and decode; None for unknown or malformed data"""
+    if not data:
+        return None
+    prefix, separator, _ = data.partition(SEPARATOR)
+    schema = _SCHEMAS.get(prefix) if separator else None
+    if schema is None:
+        return None
+    try:
+        return schema, schema.unpack(data)
+    except (ValueError, UnicodeDecodeError):
+        return None
+
+
+def is_navigation(data: Optional[str]) -> bool:
+    """Whether the callback only moves a cursor (pagination, next/previous)"""
+    if not data:
+        return False
+    schema = _SCHEMAS.get(data.partition(SEPARATOR)[0])
+    return schema is not None and schema.navigation
+
+
+# Callback layouts of the inline keyboards
+QUEST_DONE = CallbackSchema("QuestDone", "qd", ("quest_id", "uint"))
+QUEST_DELETE = CallbackSchema("QuestDelete", "qx", ("quest_id", "uint"))
+# Keyset cursors over quest ids, 0 means "not set"
+QUEST_PAGE = CallbackSchema(
+    "QuestPage", "qp", ("view", "uint"), ("after", "uint"), ("before", "uint"), navigation=True
+)
+INSIGHT_NAV = CallbackSchema("InsightNav", "in", ("pos", "uint"), navigation=True)
+INSIGHT_DELETE = CallbackSchema("InsightDelete", "ix", ("pos", "uint"))
+# Reflections carry the absolute position in the user's list; the date
+# guards against the list having changed since the keyboard was built
+REFLECT_MONTH = CallbackSchema("ReflectMonth", "rm", ("month", "month"), navigation=True)
+REFLECT_VIEW = CallbackSchema("ReflectView", "rv", ("pos", "uint"), ("day", "date"), navigation=True)
+REFLECT_DELETE = CallbackSchema("ReflectDelete", "rx", ("pos", "uint"), ("day", "date"))
+REFLECT_BACK = CallbackSchema("ReflectBack", "rb", ("month", "month"), navigation=True)
+STATS_MONTH = CallbackSchema("StatsMonth", "sm", ("month", "month"), navigation=True)
+FAQ_PAGE = CallbackSchema("FaqPage", "fp", ("page", "uint"), navigation=True)
+FAQ_ITEM = CallbackSchema("FaqItem", "fi", ("item", "uint"))
+SEARCH_PAGE = CallbackSchema("SearchPage", "sp", ("page", "uint"), navigation=True)
+EXPORT_FORMAT = CallbackSchema("ExportFormat", "ef", ("fmt", "str"))
+REPEAT_DELETE = CallbackSchema("RepeatDelete", "rd", ("template_id", "uint"))
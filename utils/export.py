@@ -0,0 +1,206 @@
+import json
+import os
+import tempfile
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, Iterable, Optional, Tuple
+
+from aiogram.types import InputFile
+
+from utils.json_stream import iter_json_object
+
+# Sections of an export in output order
+SECTIONS = ("quests", "insights", "reflections")
+
+SECTION_TITLES = {
+    "quests": "Квесты",
+    "insights": "Инсайты",
+    "reflections": "Рефлексии",
+}
+
+CONTENT_TYPES = {"md": "text/markdown", "json": "application/json"}
+
+# Row = (section, dict of column values)
+Row = Tuple[str, Dict[str, Any]]
+
+
+def _format_date(value: Any) -> str:
+    if isinstance(value, datetime):
+        return value.strftime("%Y-%m-%d %H:%M")
+    return str(value) if value else ""
+
+
+class MarkdownEncoder:
+    """Incremental Markdown writer: one chunk per section header and row"""
+
+    def header(self, telegram_id: str, exported_at: datetime) -> str:
+        return f"# Экспорт данных\n\nПользователь: {telegram_id}\nДата выгрузки: {_format_date(exported_at)}\n"
+
+    def open_section(self, section: str) -> str:
+        return f"\n## {SECTION_TITLES[section]}\n\n"
+
+    def row(self, section: str, row: Dict[str, Any], first: bool) -> str:
+        if section == "quests":
+            mark = "x" if row.get("status") == "done" else " "
+            phase = f" _({row['phase']})_" if row.get("phase") else ""
+            created = _format_date(row.get("created_at"))
+            return f"- [{mark}] {row.get('text', '')}{phase}{f' — {created}' if created else ''}\n"
+        if section == "insights":
+            return f"- **{_format_date(row.get('created_at'))}** {row.get('text', '')}\n"
+        return (
+            f"### {_format_date(row.get('created_at'))}\n\n"
+            f"**Что было важным:** {row.get('important') or ''}\n\n"
+            f"**Что сработало:** {row.get('worked') or ''}\n\n"
+            f"**Что изменить:** {row.get('change') or ''}\n\n"
+        )
+
+    def close_section(self, section: str, empty: bool) -> str:
+        return "_Пусто_\n" if empty else ""
+
+    def footer(self) -> str:
+        return ""
+
+
+class JsonEncoder:
+    """Incremental JSON writer producing one object with a list per section"""
+
+    def header(self, telegram_id: str, exported_at: datetime) -> str:
+        return (
+            "{"
+            f"\"telegram_id\": {json.dumps(telegram_id)}, "
+            f"\"exported_at\": {json.dumps(exported_at.isoformat())}"
+        )
+
+    def open_section(self, section: str) -> str:
+        return f", {json.dumps(section)}: ["
+
+    def row(self, section: str, row: Dict[str, Any], first: bool) -> str:
+        encoded = json.dumps(row, ensure_ascii=False, default=_json_default)
+        return encoded if first else ", " + encoded
+
+    def close_section(self, section: str, empty: bool) -> str:
+        return "]"
+
+    def footer(self) -> str:
+        return "}\n"
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+ENCODERS = {"md": MarkdownEncoder, "json": JsonEncoder}
+
+
+class ExportWriter:
+    """
+    Feeds rows through an encoder into a spooled temporary file.
+
+    Output stays in memory up to `spool_size` bytes and moves to disk
+    after that, so memory use does not depend on the history length.
+    Rows must arrive grouped by section in SECTIONS order.
+    """
+
+    def __init__(self, fmt: str, telegram_id: str, spool_size: int = 1024 * 1024):
+        if fmt not in ENCODERS:
+            raise ValueError(f"Unknown export format: {fmt}")
+        self.fmt = fmt
+        self.encoder = ENCODERS[fmt]()
+        self.file = tempfile.SpooledTemporaryFile(max_size=spool_size, mode="w+b")
+        self.rows = 0
+        self._section: Optional[str] = None
+        self._section_rows = 0
+        self._write(self.encoder.header(telegram_id, datetime.now()))
+
+    def _write(self, chunk: str) -> None:
+        if chunk:
+            self.file.write(chunk.encode("utf-8"))
+
+    def section(self, section: str) -> None:
+        if self._section is not None:
+            self._write(self.encoder.close_section(self._section, self._section_rows == 0))
+        self._section = section
+        self._section_rows = 0
+        self._write(self.encoder.open_section(section))
+
+    def write(self, section: str, row: Dict[str, Any]) -> None:
+        if section != self._section:
+            self.section(section)
+        self._write(self.encoder.row(section, row, self._section_rows == 0))
+        self._section_rows += 1
+        self.rows += 1
+
+    def finish(self):
+        """Close the document and rewind; returns the file object"""
+        # Sections without rows still appear in the document
+        remaining = SECTIONS[SECTIONS.index(self._section) + 1:] if self._section else SECTIONS
+        for section in remaining:
+            self.section(section)
+        self._write(self.encoder.close_section(self._section, self._section_rows == 0))
+        self._write(self.encoder.footer())
+        self.file.flush()
+        self.file.seek(0)
+        return self.file
+
+
+def write_rows(fmt: str, telegram_id: str, rows: Iterable[Row], spool_size: int = 1024 * 1024) -> ExportWriter:
+    """Encode rows of a synchronous source (legacy JSON storage)"""
+    writer = ExportWriter(fmt, telegram_id, spool_size)
+    for section, row in rows:
+        writer.write(section, row)
+    writer.finish()
+    return writer
+
+
+def export_filename(fmt: str) -> str:
+    return f"export-{datetime.now():%Y-%m-%d}.{fmt}"
+
+
+def find_legacy_user(path, telegram_id: str) -> Optional[Dict[str, Any]]:
+    """Stream the legacy JSON file until the user's record is found"""
+    if not os.path.exists(path):
+        return None
+    for user_id, user_data in iter_json_object(path):
+        if user_id == telegram_id:
+            return user_data
+    return None
+
+
+def legacy_rows(user_data: Dict[str, Any]) -> Iterable[Row]:
+    """Rows of a legacy JSON user record in export layout"""
+    for quest in user_data.get("quests", []):
+        if isinstance(quest, dict):
+            yield "quests", {
+                "id": quest.get("id"),
+                "text": quest.get("text", ""),
+                "status": quest.get("status", "todo"),
+                "phase": quest.get("phase"),
+                "created_at": quest.get("date"),
+            }
+    for insight in user_data.get("insights", []):
+        if isinstance(insight, str):
+            insight = {"text": insight}
+        if isinstance(insight, dict):
+            yield "insights", {"text": insight.get("text", ""), "created_at": insight.get("date")}
+    for reflection in user_data.get("reflections", []):
+        if isinstance(reflection, dict):
+            yield "reflections", {
+                "important": reflection.get("q1"),
+                "worked": reflection.get("q2"),
+                "change": reflection.get("q3"),
+                "created_at": reflection.get("date"),
+            }
+
+
+class SpooledInputFile(InputFile):
+    """Upload a file object in chunks instead of reading it into memory"""
+
+    def __init__(self, file, filename: str, chunk_size: int = 64 * 1024):
+        super().__init__(filename=filename, chunk_size=chunk_size)
+        self.file = file
+
+    async def read(self, bot) -> AsyncIterator[bytes]:
+        self.file.seek(0)
+        while chunk := self.file.read(self.chunk_size):
+            yield chunk
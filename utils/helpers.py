@@ -17,3 +17,29 @@ def update_last_active(user_data: Dict[str, Any], context: str, phase: Optional[
         "context": context,
         "phase": phase or user_data.get("phase") or "-"
     }
+
+def record_daily_stat(
+    user_data: Dict[str, Any],
+    counter: Optional[str] = None,
+    phase: Optional[str] = None,
+) -> None:
+    """
+    Add one event to today's rollup used by /stats (JSON counterpart of
+    StatsService.record). Counts are events, deletions do not decrement them.
+
+    Args:
+        user_data: User data dictionary
+        counter: "quests_added", "quests_done", "insights" or "reflections"
+        phase: Phase chosen today; the latest choice wins
+    """
+    day = user_data.setdefault("daily_stats", {}).setdefault(datetime.now().strftime("%Y-%m-%d"), {})
+    if counter:
+        day[counter] = day.get(counter, 0) + 1
+    if phase:
+        day["phase"] = phase
+
+def shift_month(month: str, delta: int) -> str:
+    """Move a YYYY-MM month by delta months"""
+    year, number = (int(part) for part in month.split("-"))
+    index = year * 12 + number - 1 + delta
+    return f"{index // 12:04d}-{index % 12 + 1:02d}"
@@ -0,0 +1,160 @@
+import json
+import os
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+_WHITESPACE = " \t\n\r"
+
+
+class _Reader:
+    """Sliding text buffer over a file with on-demand refills"""
+
+    def __init__(self, f, chunk_size: int):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def fill(self, size: int = 0) -> bool:
+        """
+        Append at least `size` more characters (one chunk by default),
+        dropping already consumed text; the buffer is rebuilt once per call
+        """
+        if self.eof:
+            return False
+        size = max(size, self.chunk_size)
+        parts = []
+        read = 0
+        while read < size:
+            chunk = self.f.read(size - read)
+            if not chunk:
+                self.eof = True
+                break
+            parts.append(chunk)
+            read += len(chunk)
+        if not parts:
+            return False
+        self.buf = self.buf[self.pos:] + "".join(parts)
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Next non-whitespace character without consuming it ("" at EOF)"""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self.fill():
+                return ""
+
+    def expect(self, chars: str) -> str:
+        char = self.peek()
+        if not char or char not in chars:
+            raise ValueError(f"Expected one of {chars!r}, got {char or 'EOF'!r}")
+        self.pos += 1
+        return char
+
+    def decode(self, decoder: json.JSONDecoder) -> Any:
+        """Decode one JSON value, reading more input until it is complete"""
+        self.peek()
+        while True:
+            try:
+                value, end = decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                # The value is incomplete: at least double the text held for
+                # it, so a large value takes log(n) retries and linear copying
+                if not self.fill(len(self.buf) - self.pos):
+                    raise
+                continue
+            # A number at the end of the buffer may continue in the next chunk
+            if end == len(self.buf) and not self.eof and self.fill():
+                continue
+            self.pos = end
+            return value
+
+
+def iter_json_object(path: str, chunk_size: int = 64 * 1024) -> Iterator[Tuple[str, Any]]:
+    """
+    Iterate over the top-level object of a JSON file one member at a time.
+
+    Only the member being decoded is kept in memory, so files much larger
+    than RAM can be processed as long as every single value fits.
+
+    Args:
+        path: JSON file whose root is an object
+        chunk_size: Number of characters read per refill
+
+    Yields:
+        (key, value) pairs in file order
+    """
+    decoder = json.JSONDecoder()
+    with open(path, "r", encoding="utf-8") as f:
+        reader = _Reader(f, chunk_size)
+        if not reader.peek():
+            return
+        reader.expect("{")
+        if reader.peek() == "}":
+            return
+
+        while True:
+            key = reader.decode(decoder)
+            if not isinstance(key, str):
+                raise ValueError(f"Object key must be a string, got {key!r}")
+            reader.expect(":")
+            value = reader.decode(decoder)
+            yield key, value
+            if reader.expect(",}") == "}":
+                return
+
+
+def write_shards(
+    path: str,
+    shard_dir: str,
+    chunk_size: int,
+    pick: Optional[Callable[[Any], Any]] = None,
+) -> Tuple[List[Tuple[str, str, str]], int]:
+    """
+    Split the top-level object of a JSON file into shard files in one pass,
+    so parallel workers each parse only their own slice.
+
+    Args:
+        path: JSON file whose root is an object
+        shard_dir: Directory receiving chunk-NNNNN.json files
+        chunk_size: Number of members per shard
+        pick: Part of a value to keep; members it maps to None are left out
+
+    Returns:
+        (shard path, first key, last key) per shard in file order, and the
+        number of members written
+    """
+    os.makedirs(shard_dir, exist_ok=True)
+    shards: List[Tuple[str, str, str]] = []
+    chunk: Dict[str, Any] = {}
+    members = 0
+
+    def flush():
+        shard_path = os.path.join(shard_dir, f"chunk-{len(shards):05d}.json")
+        with open(shard_path, "w", encoding="utf-8") as f:
+            json.dump(chunk, f, ensure_ascii=False, separators=(",", ":"))
+        shards.append((shard_path, next(iter(chunk)), next(reversed(chunk))))
+        chunk.clear()
+
+    for key, value in iter_json_object(path):
+        if pick is not None:
+            value = pick(value)
+            if value is None:
+                continue
+        chunk[key] = value
+        members += 1
+        if len(chunk) >= chunk_size:
+            flush()
+    if chunk:
+        flush()
+    return shards, members
+
+
+def read_shard(path: str) -> List[Tuple[str, Any]]:
+    """Members of a shard written by write_shards, in file order"""
+    with open(path, "r", encoding="utf-8") as f:
+        return list(json.load(f).items())
@@ -1,9 +1,28 @@
+import re
+
+PHASE_TIPS = {
+    "active": "Выбери 1 задачу из backlog и сделай её до конца 💪",
+    "low": "Напиши 1 мысль или идею, просто чтобы сохранить контакт с собой 🧘",
+    "fog": "Открой Obsidian, запиши 1 строчку: 'Что я сейчас чувствую?'",
+}
+UNKNOWN_PHASE_TIP = "Неопознанная фаза. Ты вне времени и пространства 👽"
+
+
 def get_quest_by_phase(phase: str) -> str:
-    if phase == "active":
-        return "Выбери 1 задачу из backlog и сделай её до конца 💪"
-    elif phase == "low":
-        return "Напиши 1 мысль или идею, просто чтобы сохранить контакт с собой 🧘"
-    elif phase == "fog":
-        return "Открой Obsidian, запиши 1 строчку: 'Что я сейчас чувствую?'" 
-    else:
-        return "Неопознанная фаза. Ты вне времени и пространства 👽"
+    return PHASE_TIPS.get(phase, UNKNOWN_PHASE_TIP)
+
+
+def _compile_keywords(tip: str):
+    # One alternation scans the text once instead of once per keyword
+    keywords = sorted(set(tip.lower().split()), key=len, reverse=True)
+    return re.compile("|".join(re.escape(keyword) for keyword in keywords))
+
+
+# Keyword matchers of the phase tips, built once instead of on every quest
+PHASE_KEYWORDS = {phase: _compile_keywords(tip) for phase, tip in PHASE_TIPS.items()}
+_UNKNOWN_KEYWORDS = _compile_keywords(UNKNOWN_PHASE_TIP)
+
+
+def matches_phase_tip(text: str, phase: str) -> bool:
+    """Whether the quest text contains any word of the phase tip (as a substring)"""
+    return PHASE_KEYWORDS.get(phase, _UNKNOWN_KEYWORDS).search(text.lower()) is not None
@@ -0,0 +1,192 @@
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
+
+from utils import callback_codec
+from utils.callback_codec import QUEST_DELETE, QUEST_DONE, QUEST_PAGE
+
+QUESTS_PAGE_SIZE = 10
+
+# Screens listing quests; the view travels in QUEST_PAGE callbacks
+VIEW_STATUS = 0
+VIEW_DONE = 1
+VIEW_DELETE = 2
+
+HEADERS = {
+    VIEW_STATUS: "📋 <b>Твои квесты:</b>\n",
+    VIEW_DONE: "Выбери квест, который выполнил:",
+    VIEW_DELETE: "Выбери квест для удаления:",
+}
+
+# Fragments are keyed by the quest content itself: editing a quest (text,
+# status, phase) yields a new key and the stale entry ages out of the LRU
+FragmentKey = Tuple[int, Any, str, Optional[str], Optional[str]]
+Fragment = Tuple[Optional[str], Optional[InlineKeyboardButton]]
+
+
+class QuestPage(NamedTuple):
+    """One keyset page: quests in ascending id order and neighbour flags"""
+    items: Sequence[Dict[str, Any]]
+    total: int
+    has_prev: bool
+    has_next: bool
+
+
+class _LRU(OrderedDict):
+    """Minimal LRU; the bot runs handlers on a single event loop thread"""
+
+    def __init__(self, max_entries: int):
+        super().__init__()
+        self.max_entries = max_entries
+
+    def lookup(self, key):
+        value = self.get(key)
+        if value is not None:
+            self.move_to_end(key)
+        return value
+
+    def store(self, key, value):
+        self[key] = value
+        if len(self) > self.max_entries:
+            self.popitem(last=False)
+        return value
+
+
+_fragments = _LRU(50000)
+_pages = _LRU(5000)
+
+
+def paginate(
+    quests: List[Dict[str, Any]],
+    after: int = 0,
+    before: int = 0,
+    limit: int = QUESTS_PAGE_SIZE,
+    status: Optional[str] = None,
+) -> QuestPage:
+    """
+    Keyset page over an in-memory quest list, same contract as
+    QuestService.get_quests_page.
+
+    Args:
+        quests: All quests of the user
+        after: Return quests with id greater than this (0 = from the start)
+        before: Return quests with id less than this; takes precedence
+        limit: Page size
+        status: Optional status filter
+
+    Returns:
+        QuestPage with at most `limit` quests and the filtered total
+    """
+    if status is not None:
+        quests = [q for q in quests if q.get("status") == status]
+    ids = [q["id"] for q in quests]
+    if any(ids[i] > ids[i + 1] for i in range(len(ids) - 1)):
+        quests = sorted(quests, key=lambda q: q["id"])
+        ids = [q["id"] for q in quests]
+
+    if before:
+        end = bisect_left(ids, before)
+        start = max(0, end - limit)
+    else:
+        start = bisect_right(ids, after) if after else 0
+        end = min(len(ids), start + limit)
+    # Cursor past the end (quests were deleted): show the last page instead of nothing
+    if start == end and ids:
+        end = len(ids)
+        start = max(0, end - limit)
+
+    return QuestPage(quests[start:end], len(quests), start > 0, end < len(quests))
+
+
+def current_after(markup: Optional[InlineKeyboardMarkup]) -> int:
+    """
+    Keyset cursor of the page a message shows, recovered from its own
+    "previous" button: that page starts right after `before - 1`.
+    """
+    if markup is None:
+        return 0
+    for row in markup.inline_keyboard:
+        for button in row:
+            parsed = callback_codec.parse(button.callback_data)
+            if parsed is not None and parsed[0] is QUEST_PAGE and parsed[1].before:
+                return parsed[1].before - 1
+    return 0
+
+
+def _fragment_key(view: int, quest: Dict[str, Any]) -> FragmentKey:
+    return view, quest["id"], quest.get("text", ""), quest.get("status"), quest.get("phase")
+
+
+def _render_fragment(key: FragmentKey) -> Fragment:
+    view, quest_id, text, status, phase = key
+    if view == VIEW_DONE:
+        return None, InlineKeyboardButton(
+            text=f"{quest_id}: {text[:30]}",
+            callback_data=QUEST_DONE.pack(quest_id=quest_id),
+        )
+    if view == VIEW_DELETE:
+        return None, InlineKeyboardButton(
+            text=f"❌ {quest_id}: {text[:30]}",
+            callback_data=QUEST_DELETE.pack(quest_id=quest_id),
+        )
+
+    status_icon = "✅" if status == "done" else "🕒"
+    phase_note = f" ({phase})" if phase else ""
+    line = f"{status_icon} <b>{quest_id}</b>: {text}{phase_note}"
+    button = None
+    if status != "done":
+        button = InlineKeyboardButton(
+            text=f"✅ Завершить: {text[:20]}",
+            callback_data=QUEST_DONE.pack(quest_id=quest_id),
+        )
+    return line, button
+
+
+def render_quest_list(page: QuestPage, view: int = VIEW_STATUS) -> Tuple[str, InlineKeyboardMarkup]:
+    """
+    Text and inline keyboard for one page of a quest list screen.
+
+    Each quest's line and button are cached by its content and the whole
+    page by its fragment keys, so showing an unchanged page again rebuilds
+    neither the text nor the keyboard. The returned markup is shared
+    between calls and must not be mutated.
+
+    Args:
+        page: Keyset page from paginate() or QuestService.get_quests_page()
+        view: VIEW_STATUS, VIEW_DONE or VIEW_DELETE
+
+    Returns:
+        (text, reply_markup) ready for answer/edit_text
+    """
+    keys = tuple(_fragment_key(view, quest) for quest in page.items)
+
+    page_key = (view, keys, page.total, page.has_prev, page.has_next)
+    cached = _pages.lookup(page_key)
+    if cached is not None:
+        return cached
+
+    lines = [HEADERS[view]]
+    rows = []
+    for key in keys:
+        line, button = _fragments.lookup(key) or _fragments.store(key, _render_fragment(key))
+        if line is not None:
+            lines.append(line)
+        if button is not None:
+            rows.append([button])
+
+    if page.has_prev or page.has_next:
+        lines.append(f"\nВсего: {page.total}")
+        nav = []
+        if page.has_prev:
+            nav.append(InlineKeyboardButton(
+                text="⬅️", callback_data=QUEST_PAGE.pack(view=view, after=0, before=keys[0][1])
+            ))
+        if page.has_next:
+            nav.append(InlineKeyboardButton(
+                text="➡️", callback_data=QUEST_PAGE.pack(view=view, after=keys[-1][1], before=0)
+            ))
+        rows.append(nav)
+
+    return _pages.store(page_key, ("\n".join(lines), InlineKeyboardMarkup(inline_keyboard=rows)))
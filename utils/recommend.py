@@ -0,0 +1,228 @@
+import asyncio
+import heapq
+import logging
+import os
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from config import RECOMMENDATION_MIN_USERS
+from utils.json_stream import iter_json_object
+from utils.search import stem, tokenize
+
+logger = logging.getLogger(__name__)
+
+# Suggestions kept precomputed per index and phase
+TOP_SIZE = 10
+# Completed quests indexed between two yields to the event loop
+APPLY_SLICE = 2000
+
+Completed = Tuple[str, str]  # (phase, quest text)
+
+
+def normalize(text: str) -> str:
+    """Key under which repeated quests with different spelling are counted"""
+    return " ".join(tokenize(text))
+
+
+class PhaseIndex:
+    """
+    Completed quests of one phase: how often each quest recurs and how
+    common its words are. The top list is recomputed only when marked dirty.
+    """
+
+    def __init__(self):
+        self.counts: Counter = Counter()
+        self.tokens: Counter = Counter()
+        self.texts: Dict[str, str] = {}
+        self.stems: Dict[str, frozenset] = {}
+        self.top: Tuple[Tuple[str, str], ...] = ()
+        self.dirty = False
+
+    def add(self, key: str, text: str, amount: int = 1) -> None:
+        stems = self.stems.get(key)
+        if stems is None:
+            stems = self.stems[key] = frozenset(stem(token) for token in key.split())
+            self.texts[key] = text
+        self.counts[key] += amount
+        for token in stems:
+            self.tokens[token] += amount
+            if self.tokens[token] <= 0:
+                del self.tokens[token]
+        if self.counts[key] <= 0:
+            del self.counts[key], self.texts[key], self.stems[key]
+        self.dirty = True
+
+    def score(self, key: str, total: int) -> float:
+        # Recurrence first; words typical for the phase break ties
+        stems = self.stems[key]
+        typical = sum(self.tokens[item] for item in stems) / (len(stems) or 1) / (total or 1)
+        return self.counts[key] + typical
+
+    def refresh(self, min_count: int = 1) -> None:
+        if not self.dirty:
+            return
+        total = sum(self.counts.values())
+        keys = (key for key, count in self.counts.items() if count >= min_count)
+        best = heapq.nlargest(TOP_SIZE, keys, key=lambda key: self.score(key, total))
+        self.top = tuple((key, self.texts[key]) for key in best)
+        self.dirty = False
+
+
+class QuestRecommender:
+    """
+    Per-user and global indexes of completed quests by phase.
+
+    A background job scans storage and re-indexes only users whose set of
+    completed quests changed (refresh_from_file); completions are also
+    recorded immediately from the handlers. Everything runs on the event
+    loop thread except scan(), which only reads. suggest() only reads the
+    precomputed top lists, so it costs O(k) regardless of history size.
+
+    The global index counts distinct users per quest and only suggests
+    quests completed by at least `min_users` people, so one user's own
+    wording never shows up for somebody else.
+    """
+
+    def __init__(self, min_users: int = 3):
+        self.min_users = min_users
+        self.users: Dict[str, Dict[str, PhaseIndex]] = {}
+        self.global_index: Dict[str, PhaseIndex] = {}
+        self.signatures: Dict[str, Tuple[int, int]] = {}
+
+    def _user_phase(self, user_id: str, phase: str) -> PhaseIndex:
+        phases = self.users.get(user_id)
+        if phases is None:
+            phases = self.users[user_id] = {}
+        return phases.get(phase) or phases.setdefault(phase, PhaseIndex())
+
+    def _global_phase(self, phase: str) -> PhaseIndex:
+        return self.global_index.get(phase) or self.global_index.setdefault(phase, PhaseIndex())
+
+    def _add(self, user_id: str, phase: Optional[str], text: str) -> Optional[PhaseIndex]:
+        key = normalize(text)
+        if not phase or not key:
+            return None
+        index = self._user_phase(user_id, phase)
+        if not index.counts[key]:
+            # Global counts are distinct users and show the normalized
+            # wording; their top lists are refreshed by the background job
+            self._global_phase(phase).add(key, key)
+        index.add(key, text)
+        return index
+
+    def record_done(self, user_id: str, phase: Optional[str], text: str) -> None:
+        """Count one completed quest right away"""
+        index = self._add(user_id, phase, text)
+        if index is not None:
+            index.refresh()
+
+    def _drop_user(self, user_id: str) -> None:
+        for phase, index in self.users.pop(user_id, {}).items():
+            for key in list(index.counts):
+                self._global_phase(phase).add(key, key, -1)
+
+    def _apply_users(self, changed: Dict[str, List[Completed]], seen: Optional[Set[str]] = None) -> None:
+        removed = set(self.users) - seen if seen is not None else set()
+        for user_id in removed | set(changed):
+            self._drop_user(user_id)
+        for user_id in removed:
+            self.signatures.pop(user_id, None)
+
+        for user_id, completed in changed.items():
+            for phase, text in completed:
+                self._add(user_id, phase, text)
+            for index in self.users.get(user_id, {}).values():
+                index.refresh()
+            self.signatures[user_id] = signature(completed)
+
+    def _refresh_global(self) -> None:
+        for index in self.global_index.values():
+            index.refresh(self.min_users)
+
+    def apply(self, changed: Dict[str, List[Completed]], seen: Optional[Set[str]] = None) -> None:
+        """
+        Re-index the given users from their completed quests and drop users
+        missing from `seen`; then recompute the affected top lists.
+        """
+        self._apply_users(changed, seen)
+        self._refresh_global()
+
+    async def refresh_from_file(self, path: str) -> int:
+        """
+        Background job step: scan storage in a thread, then apply the
+        changes on the event loop in slices of about APPLY_SLICE quests so
+        handlers are not held up by a large first build.
+        """
+        changed, seen = await asyncio.to_thread(self.scan, path)
+        self._apply_users({}, seen)
+        batch: Dict[str, List[Completed]] = {}
+        size = 0
+        for user_id, completed in changed.items():
+            batch[user_id] = completed
+            size += len(completed)
+            if size >= APPLY_SLICE:
+                self._apply_users(batch)
+                batch, size = {}, 0
+                await asyncio.sleep(0)
+        self._apply_users(batch)
+        self._refresh_global()
+        if changed:
+            logger.info(f"Quest recommendations re-indexed for {len(changed)} users")
+        return len(changed)
+
+    def scan(self, path: str) -> Tuple[Dict[str, List[Completed]], Set[str]]:
+        """
+        Stream the JSON storage and collect completed quests of users that
+        changed since the last apply(). Only reads the recommender state,
+        so it can run in a worker thread.
+        """
+        changed: Dict[str, List[Completed]] = {}
+        seen: Set[str] = set()
+        if not os.path.exists(path):
+            return changed, seen
+        for user_id, user_data in iter_json_object(path):
+            seen.add(user_id)
+            completed = completed_quests(user_data)
+            if self.signatures.get(user_id) != signature(completed):
+                changed[user_id] = completed
+        return changed, seen
+
+    def suggest(self, user_id: str, phase: Optional[str], k: int = 3, exclude: Iterable[str] = ()) -> List[str]:
+        """
+        Top-k quest texts for the phase: the user's own recurring quests
+        first, then popular ones from everyone.
+
+        Args:
+            user_id: Telegram user ID
+            phase: Current phase of the user
+            k: Number of suggestions
+            exclude: Texts to skip (e.g. quests already pending)
+        """
+        if not phase:
+            return []
+        skip = {normalize(text) for text in exclude}
+        suggestions = []
+        sources = (self.users.get(user_id, {}).get(phase), self.global_index.get(phase))
+        for index in sources:
+            for key, text in index.top if index else ():
+                if key not in skip:
+                    skip.add(key)
+                    suggestions.append(text)
+                    if len(suggestions) == k:
+                        return suggestions
+        return suggestions
+
+
+def completed_quests(user_data: Dict[str, Any]) -> List[Completed]:
+    return [
+        (quest.get("phase"), quest.get("text", ""))
+        for quest in user_data.get("quests", [])
+        if isinstance(quest, dict) and quest.get("status") == "done" and quest.get("phase")
+    ]
+
+
+def signature(completed: Sequence[Completed]) -> Tuple[int, int]:
+    return len(completed), hash(tuple(completed))
+
+
+recommender = QuestRecommender(RECOMMENDATION_MIN_USERS)
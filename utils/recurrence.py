@@ -0,0 +1,112 @@
+from datetime import date, datetime
+from typing import Any, Dict, Optional
+from zoneinfo import ZoneInfo
+
+# Bit i of a weekday mask is set when the quest repeats on date.weekday() == i
+DAILY = 0b1111111
+WEEKDAYS = 0b0011111
+WEEKENDS = 0b1100000
+
+DAY_NAMES = ("пн", "вт", "ср", "чт", "пт", "сб", "вс")
+
+RULE_ALIASES = {
+    "ежедневно": DAILY,
+    "каждый_день": DAILY,
+    "daily": DAILY,
+    "будни": WEEKDAYS,
+    "weekdays": WEEKDAYS,
+    "выходные": WEEKENDS,
+    "weekends": WEEKENDS,
+}
+
+
+def _cron_day(number: int) -> int:
+    """Cron day-of-week number (0 and 7 are Sunday) to date.weekday()"""
+    if not 0 <= number <= 7:
+        raise ValueError(f"Day of week out of range: {number}")
+    return (number - 1) % 7
+
+
+def parse_rule(rule: str) -> int:
+    """
+    Weekday mask of a repeat rule.
+
+    Accepts an alias ("ежедневно", "будни", "выходные"), a comma separated
+    list of short day names ("пн,ср,пт") or a cron day-of-week field
+    ("1-5", "1,3,5", "*").
+
+    Raises:
+        ValueError: If the rule cannot be parsed or selects no days
+    """
+    rule = rule.strip().lower()
+    if rule in RULE_ALIASES:
+        return RULE_ALIASES[rule]
+    if rule == "*":
+        return DAILY
+
+    mask = 0
+    for part in rule.split(","):
+        part = part.strip()
+        if part in DAY_NAMES:
+            mask |= 1 << DAY_NAMES.index(part)
+        elif "-" in part:
+            start, end = part.split("-", 1)
+            first, last = int(start), int(end)
+            if not 0 <= first <= last <= 7:
+                raise ValueError(f"Bad day range: {part}")
+            for number in range(first, last + 1):
+                mask |= 1 << _cron_day(number)
+        elif part.isdigit():
+            mask |= 1 << _cron_day(int(part))
+        else:
+            raise ValueError(f"Unknown repeat rule: {rule}")
+    if not mask:
+        raise ValueError(f"Repeat rule selects no days: {rule}")
+    return mask
+
+
+def describe_mask(mask: int) -> str:
+    for label, value in (("каждый день", DAILY), ("по будням", WEEKDAYS), ("по выходным", WEEKENDS)):
+        if mask == value:
+            return label
+    return ",".join(name for i, name in enumerate(DAY_NAMES) if mask & (1 << i))
+
+
+def repeats_on(mask: int, day: date) -> bool:
+    return bool(mask & (1 << day.weekday()))
+
+
+def local_today(timezone: str, now: Optional[datetime] = None) -> date:
+    return (now or datetime.now(ZoneInfo("UTC"))).astimezone(ZoneInfo(timezone)).date()
+
+
+def materialize_due(user_data: Dict[str, Any], now: Optional[datetime] = None) -> int:
+    """
+    Add today's instances of the user's repeating quests to the JSON record.
+
+    Each template remembers the last local date it produced a quest for,
+    so calling this on every /status or /today is idempotent.
+
+    Returns:
+        Number of quests added
+    """
+    templates = user_data.get("templates") or []
+    quests = user_data.setdefault("quests", [])
+    next_id = max((quest["id"] for quest in quests), default=0) + 1
+    added = 0
+    for template in templates:
+        today = local_today(template["tz"], now)
+        if template.get("last_date") == today.isoformat() or not repeats_on(template["mask"], today):
+            continue
+        quests.append({
+            "id": next_id,
+            "text": template["text"],
+            "status": "todo",
+            "phase": template.get("phase") or user_data.get("phase"),
+            "template_id": template["id"],
+            "due": today.isoformat(),
+        })
+        template["last_date"] = today.isoformat()
+        next_id += 1
+        added += 1
+    return added
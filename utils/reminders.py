@@ -0,0 +1,67 @@
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional
+
+# Reminder kinds in the order they are listed in a merged message
+REMINDER_KINDS = {
+    "phase": "🌗 Отметь фазу дня — /start_day",
+    "quests": "📋 Загляни в квесты — /status",
+    "reflection": "🧘 Пора на рефлексию. Напиши /reflect",
+}
+
+KIND_ALIASES = {
+    "фаза": "phase",
+    "квесты": "quests",
+    "рефлексия": "reflection",
+    **{kind: kind for kind in REMINDER_KINDS},
+}
+
+
+def parse_kind(value: str) -> Optional[str]:
+    return KIND_ALIASES.get(value.strip().lower())
+
+
+def minute_of_day(value: str) -> int:
+    """
+    Minutes after midnight of an HH:MM time.
+
+    Raises:
+        ValueError: If the value is not a valid HH:MM time
+    """
+    parsed = datetime.strptime(value.strip(), "%H:%M")
+    return parsed.hour * 60 + parsed.minute
+
+
+def format_minute(minute: int) -> str:
+    return f"{minute // 60:02d}:{minute % 60:02d}"
+
+
+def next_fire(minute: int, now: datetime) -> datetime:
+    """First moment strictly after now whose time of day is the given minute"""
+    fire = now.replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(minutes=minute)
+    return fire if fire > now else fire + timedelta(days=1)
+
+
+def render_reminder(kinds: Iterable[str]) -> str:
+    """One message for all reminders of a user that are due together"""
+    kinds = set(kinds)
+    lines = [text for kind, text in REMINDER_KINDS.items() if kind in kinds]
+    if len(lines) == 1:
+        return lines[0]
+    return "🔔 <b>Напоминания</b>\n\n" + "\n".join(f"• {line}" for line in lines)
+
+
+def user_reminders(user_data: Dict[str, Any]) -> Dict[str, str]:
+    """
+    Enabled reminders of a JSON record as kind -> HH:MM.
+
+    The reflection reminder keeps its original reminder_enabled and
+    reminder_time fields; other kinds live in the "reminders" mapping.
+    """
+    reminders = dict(user_data.get("reminders") or {})
+    if user_data.get("reminder_enabled") and user_data.get("reminder_time"):
+        reminders["reflection"] = user_data["reminder_time"]
+    return reminders
+
+
+def due_kinds(user_data: Dict[str, Any], hhmm: str) -> List[str]:
+    return [kind for kind, time in user_reminders(user_data).items() if time == hhmm]
@@ -0,0 +1,97 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from aiogram.exceptions import TelegramBadRequest
+from aiogram.types import InlineKeyboardMarkup, Message
+
+from core.metrics import MESSAGE_EDITS
+
+MessageKey = Tuple[int, int]
+
+
+def fingerprint(text: str, reply_markup: Optional[InlineKeyboardMarkup] = None) -> bytes:
+    """Hash of the rendered text and inline keyboard"""
+    digest = hashlib.blake2b(text.encode("utf-8"), digest_size=16)
+    if reply_markup is not None:
+        digest.update(b"\x00")
+        digest.update(reply_markup.model_dump_json(exclude_none=True).encode("utf-8"))
+    return digest.digest()
+
+
+class RenderCache:
+    """
+    Last rendered content per (chat_id, message_id), bounded LRU.
+
+    Only this process's own renders are known; after a restart the first
+    edit of an old message goes to the API and "message is not modified"
+    is handled there.
+    """
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[MessageKey, bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: MessageKey) -> Optional[bytes]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: MessageKey, value: bytes) -> None:
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+render_cache = RenderCache()
+
+
+def remember_sent(message: Message, text: str, reply_markup: Optional[InlineKeyboardMarkup] = None) -> None:
+    """Record the content of a just sent message so later identical edits are skipped"""
+    render_cache.set((message.chat.id, message.message_id), fingerprint(text, reply_markup))
+
+
+async def edit_text_cached(
+    message: Message,
+    text: str,
+    reply_markup: Optional[InlineKeyboardMarkup] = None,
+    **kwargs,
+) -> bool:
+    """
+    Edit a message unless it already shows exactly this text and keyboard.
+
+    Args:
+        message: Message to edit (usually callback.message)
+        text: New text
+        reply_markup: New inline keyboard
+
+    Returns:
+        True if the message was edited, False if the content was unchanged
+    """
+    key = (message.chat.id, message.message_id)
+    rendered = fingerprint(text, reply_markup)
+    if render_cache.get(key) == rendered:
+        MESSAGE_EDITS.inc("skipped")
+        return False
+
+    try:
+        await message.edit_text(text, reply_markup=reply_markup, **kwargs)
+    except TelegramBadRequest as e:
+        if "message is not modified" not in str(e):
+            raise
+        render_cache.set(key, rendered)
+        MESSAGE_EDITS.inc("not_modified")
+        return False
+
+    render_cache.set(key, rendered)
+    MESSAGE_EDITS.inc("edited")
+    return True
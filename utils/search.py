@@ -0,0 +1,115 @@
+import re
+from functools import lru_cache
+from typing import Any, Dict, List, NamedTuple, Optional
+
+SEARCH_PAGE_SIZE = 5
+SNIPPET_LENGTH = 120
+
+_WORD = re.compile(r"\w+", re.UNICODE)
+
+# Russian inflection endings cut off before prefix matching: a rough
+# stand-in for stemming where none is available (SQLite FTS5, JSON search)
+_REFLEXIVE = ("ся", "сь")
+_ENDINGS = frozenset((
+    "иями", "ями", "ами", "ого", "его", "ому", "ему", "ыми", "ими", "ией", "ения", "ение",
+    "ать", "ять", "ить", "еть", "ешь", "ишь", "ала", "ило", "али", "ют", "ут", "ет", "ит",
+    "аю", "яю", "ую", "ой", "ей", "ий", "ый", "ая", "яя", "ое", "ее", "ые", "ие", "ах", "ях",
+    "ам", "ям", "ом", "ем", "ов", "ев", "ть", "ию", "ия",
+    "а", "я", "о", "е", "ы", "и", "у", "ю", "ь", "й",
+))
+_ENDING_LENGTHS = sorted({len(ending) for ending in _ENDINGS}, reverse=True)
+_MIN_STEM = 3
+
+
+class SearchHit(NamedTuple):
+    kind: str  # "insight" | "reflection"
+    pos: int  # position in the user's list
+    text: str
+    date: str
+    score: float
+
+
+def tokenize(text: str) -> List[str]:
+    return [word.lower() for word in _WORD.findall(text or "")]
+
+
+@lru_cache(maxsize=65536)
+def stem(token: str) -> str:
+    """Word stem used as a search prefix"""
+    for ending in _REFLEXIVE:
+        if token.endswith(ending) and len(token) - len(ending) >= _MIN_STEM:
+            token = token[:-len(ending)]
+            break
+    for length in _ENDING_LENGTHS:
+        if len(token) - length >= _MIN_STEM and token[-length:] in _ENDINGS:
+            return token[:-length]
+    return token
+
+
+def query_stems(query: str) -> List[str]:
+    return list(dict.fromkeys(stem(token) for token in tokenize(query)))
+
+
+def fts5_query(query: str) -> Optional[str]:
+    """FTS5 MATCH expression: every stem is required and matched as a prefix"""
+    stems = query_stems(query)
+    if not stems:
+        return None
+    return " ".join('"' + item.replace('"', '""') + '"*' for item in stems)
+
+
+def reflection_text(reflection: Dict[str, Any]) -> str:
+    return "\n".join(filter(None, (reflection.get("q1"), reflection.get("q2"), reflection.get("q3"))))
+
+
+def score_text(text: str, stems: List[str]) -> float:
+    """Number of matching words, 0 unless every stem matches"""
+    tokens = tokenize(text)
+    score = 0
+    for item in stems:
+        matches = sum(1 for token in tokens if token.startswith(item))
+        if not matches:
+            return 0
+        score += matches
+    # Shorter entries with as many matches rank higher
+    return score / (1 + len(tokens) / 100)
+
+
+def search_entries(user_data: Dict[str, Any], query: str) -> List[SearchHit]:
+    """
+    Ranked search over the insights and reflections of a JSON user record.
+
+    Every query stem must occur in an entry; ties go to newer entries.
+    """
+    stems = query_stems(query)
+    if not stems:
+        return []
+    hits = []
+    for pos, insight in enumerate(user_data.get("insights", [])):
+        if isinstance(insight, str):
+            insight = {"text": insight}
+        text = insight.get("text") or ""
+        score = score_text(text, stems)
+        if score:
+            hits.append(SearchHit("insight", pos, text, insight.get("date") or "", score))
+    for pos, reflection in enumerate(user_data.get("reflections", [])):
+        text = reflection_text(reflection)
+        score = score_text(text, stems)
+        if score:
+            hits.append(SearchHit("reflection", pos, text, reflection.get("date") or "", score))
+    hits.sort(key=lambda hit: hit.date, reverse=True)
+    hits.sort(key=lambda hit: hit.score, reverse=True)
+    return hits
+
+
+def snippet(text: str, query: str, length: int = SNIPPET_LENGTH) -> str:
+    """Part of the text around the first match"""
+    text = " ".join(text.split())
+    if len(text) <= length:
+        return text
+    lowered = text.lower()
+    positions = [lowered.find(item) for item in query_stems(query)]
+    first = min((pos for pos in positions if pos >= 0), default=0)
+    start = max(0, min(first - length // 3, len(text) - length))
+    fragment = text[start:start + length]
+    return ("…" if start else "") + fragment + ("…" if start + length < len(text) else "")
@@ -1,83 +1,363 @@
+import asyncio
+import contextlib
 import json
-import fcntl
+import gc
+import itertools
 import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Tuple
 import logging
 
+from config import DATA_FILE
+from core.tracing import Span, current_span, span
+
+try:
+    import orjson
+except ImportError:  # orjson is optional, fall back to the stdlib codec
+    orjson = None
+
+_loads = orjson.loads if orjson is not None else json.loads
+
+
+def _dumps(data: Dict[str, Any]) -> bytes:
+    """Compact encoding; the stdlib one also turns int keys into strings"""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _read_only(*args, **kwargs):
+    raise TypeError("Storage snapshot is read-only, use Storage.read_copy() to modify data")
+
+
+class FrozenDict(dict):
+    """dict of a cached snapshot; mutating it raises TypeError"""
+    __slots__ = ()
+    __setitem__ = __delitem__ = _read_only
+    clear = pop = popitem = setdefault = update = _read_only
+    __ior__ = _read_only
+
+    def __copy__(self) -> Dict[str, Any]:
+        return dict(self)
+
+    def __deepcopy__(self, memo) -> Dict[str, Any]:
+        return _thaw(self)
+
+    def __reduce__(self):
+        return dict, (_thaw(self),)
+
+
+class FrozenList(list):
+    """list of a cached snapshot; mutating it raises TypeError"""
+    __slots__ = ()
+    __setitem__ = __delitem__ = _read_only
+    append = extend = insert = pop = remove = clear = sort = reverse = _read_only
+    __iadd__ = __imul__ = _read_only
+
+    def __copy__(self) -> list:
+        return list(self)
+
+    def __deepcopy__(self, memo) -> list:
+        return _thaw(self)
+
+    def __reduce__(self):
+        return list, (_thaw(self),)
+
+
+_CONTAINERS = (dict, list)
+
+
+def _freeze(value: Any) -> Any:
+    # Scalars are the bulk of a JSON document, skip the call for them
+    kind = type(value)
+    if kind is dict:
+        return FrozenDict({
+            key: _freeze(item) if type(item) in _CONTAINERS else item for key, item in value.items()
+        })
+    if kind is list:
+        return FrozenList([_freeze(item) if type(item) in _CONTAINERS else item for item in value])
+    return value
+
+
+def _parse(raw: bytes, freeze: bool = True) -> Any:
+    """Decode (and freeze) a document; JSON holds no cycles, so the GC is paused"""
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        data = _loads(raw)
+        return _freeze(data) if freeze else data
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def _thaw(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {key: _thaw(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_thaw(item) for item in value]
+    return value
+
+
+# Parsed snapshots shared by all Storage instances of a file:
+# path -> (key, frozen data, raw bytes), where the key is the file's
+# (st_ino, st_size, st_mtime_ns) or ("staged", seq) for a staged write
+_snapshots: Dict[str, Tuple[Tuple[Any, ...], FrozenDict, bytes]] = {}
+_snapshots_lock = threading.Lock()
+# Writes that are encoded but not yet on disk: path -> (seq, payload).
+# Readers of the process see the newest one at once.
+_staged: Dict[str, Tuple[int, bytes]] = {}
+_sequence = itertools.count(1)
+# Files are replaced one at a time; a staged write that a newer one
+# superseded is skipped
+_write_lock = threading.Lock()
+_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="storage-writer")
+
+
+def _stat_key(st: os.stat_result) -> Tuple[int, int, int]:
+    return st.st_ino, st.st_size, st.st_mtime_ns
+
+
 class Storage:
     """
     File storage utility for atomic operations with JSON data.
-    Provides thread-safe operations with file locking.
+    Writes replace the file atomically, so readers take no locks and see
+    either the old or the new version, never a partial one.
+
+    The last parsed snapshot of the file is kept in memory and reused while
+    the file's (inode, size, mtime_ns) stays the same.
     """
     def __init__(self, file_path: str):
         self.file_path = Path(file_path)
         self.file_path.parent.mkdir(parents=True, exist_ok=True)
-    
+        self._key = str(self.file_path.resolve())
+
+    def _snapshot(self, trace: Optional[Span] = None) -> Optional[Tuple[FrozenDict, bytes]]:
+        """Cached (frozen data, raw bytes) of the file, parsing it on a miss"""
+        with _snapshots_lock:
+            staged = _staged.get(self._key)
+            cached = _snapshots.get(self._key)
+        if staged is not None:
+            key, raw = ("staged", staged[0]), staged[1]
+        else:
+            try:
+                key = _stat_key(os.stat(self.file_path))
+            except FileNotFoundError:
+                return None
+        if cached is not None and cached[0] == key:
+            if trace is not None:
+                trace.set_attribute("cache", "hit")
+            return cached[1], cached[2]
+
+        if trace is not None:
+            trace.set_attribute("cache", "miss")
+        if staged is None:
+            with open(self.file_path, "rb") as f:
+                # Key of the bytes actually read, a writer may have replaced them since stat
+                key = _stat_key(os.fstat(f.fileno()))
+                raw = f.read()
+        try:
+            frozen = _parse(raw)
+        except ValueError as e:
+            logging.error(f"Error decoding JSON from {self.file_path}: {e}")
+            return None
+        if not isinstance(frozen, dict):
+            logging.error(f"Unexpected JSON in {self.file_path}: {type(frozen).__name__}")
+            return None
+        with _snapshots_lock:
+            _snapshots[self._key] = (key, frozen, raw)
+        return frozen, raw
+
+    def _invalidate(self) -> None:
+        with _snapshots_lock:
+            _snapshots.pop(self._key, None)
+
     def read(self) -> Dict[str, Any]:
         """
-        Read data from storage file with shared lock.
-        
+        Read data from storage file.
+
+        Served from the cached snapshot while the file is unchanged. The
+        result is shared between callers and read-only: mutating it raises
+        TypeError, use read_copy() for data that will be modified.
+
         Returns:
             Dictionary with data or empty dict if file doesn't exist
         """
-        if not self.file_path.exists():
-            return {}
-        
+        with span("storage.json_load", path=self.file_path.name) as trace:
+            try:
+                snapshot = self._snapshot(trace)
+            except Exception as e:
+                logging.error(f"Error reading from {self.file_path}: {e}")
+                return FrozenDict()
+            return snapshot[0] if snapshot is not None else FrozenDict()
+
+    def read_copy(self) -> Dict[str, Any]:
+        """
+        Read a private, mutable copy of the data.
+
+        Decoded from the cached bytes, so an unchanged file is not read again.
+
+        Returns:
+            Dictionary with data or empty dict if file doesn't exist
+        """
+        with span("storage.json_load", path=self.file_path.name, copy=True) as trace:
+            try:
+                snapshot = self._snapshot(trace)
+            except Exception as e:
+                logging.error(f"Error reading from {self.file_path}: {e}")
+                return {}
+            return _parse(snapshot[1], freeze=False) if snapshot is not None else {}
+
+    def _stage(self, data: Dict[str, Any]) -> Tuple[int, bytes]:
+        """Encode data and make it what readers of the process see"""
+        with span("storage.json_dump", path=self.file_path.name) as trace:
+            payload = _dumps(data)
+            if trace is not None:
+                trace.set_attribute("bytes", len(payload))
+        with _snapshots_lock:
+            seq = next(_sequence)
+            _staged[self._key] = (seq, payload)
+        return seq, payload
+
+    def _flush(self, seq: int, payload: bytes, parent: Optional[Span] = None) -> bool:
+        """Put a staged write on disk unless a newer one superseded it"""
+        folder = self.file_path.parent
         try:
-            with open(self.file_path, "r") as f:
-                fcntl.flock(f, fcntl.LOCK_SH)
+            with _write_lock, span("storage.json_write", parent, path=self.file_path.name):
+                with _snapshots_lock:
+                    current = _staged.get(self._key)
+                if current is None or current[0] != seq:
+                    return True
+
+                # Create parent directory if it doesn't exist
+                folder.mkdir(parents=True, exist_ok=True)
+                fd, tmp_path = tempfile.mkstemp(dir=folder, prefix=f".{self.file_path.name}.", suffix=".tmp")
+                try:
+                    with os.fdopen(fd, "wb") as f:
+                        f.write(payload)
+                        f.flush()
+                        os.fsync(f.fileno())
+                        key = _stat_key(os.fstat(f.fileno()))
+                    try:
+                        os.chmod(tmp_path, os.stat(self.file_path).st_mode & 0o777)
+                    except FileNotFoundError:
+                        os.chmod(tmp_path, 0o644)
+                    os.replace(tmp_path, self.file_path)
+                except BaseException:
+                    with contextlib.suppress(OSError):
+                        os.unlink(tmp_path)
+                    raise
+                # Persist the rename itself
+                dir_fd = os.open(folder, os.O_RDONLY)
                 try:
-                    return json.load(f)
-                except json.JSONDecodeError as e:
-                    logging.error(f"Error decoding JSON from {self.file_path}: {e}")
-                    return {}
+                    os.fsync(dir_fd)
                 finally:
-                    fcntl.flock(f, fcntl.LOCK_UN)
-        except FileNotFoundError:
-            return {}
+                    os.close(dir_fd)
+
+                with _snapshots_lock:
+                    if _staged.get(self._key) is current:
+                        del _staged[self._key]
+                        # The snapshot parsed from the staged bytes now describes the file
+                        cached = _snapshots.get(self._key)
+                        if cached is not None and cached[0] == ("staged", seq):
+                            _snapshots[self._key] = (key, cached[1], cached[2])
+            return True
         except Exception as e:
-            logging.error(f"Error reading from {self.file_path}: {e}")
-            return {}
-    
+            logging.error(f"Error writing to {self.file_path}: {e}")
+            # Readers fall back to what is on disk
+            with _snapshots_lock:
+                if _staged.get(self._key, (None,))[0] == seq:
+                    del _staged[self._key]
+                _snapshots.pop(self._key, None)
+            return False
+
     def write(self, data: Dict[str, Any]) -> bool:
         """
-        Write data to storage file with exclusive lock.
-        
+        Write data to storage file atomically.
+
+        The data goes to a temporary file in the same directory, which is
+        fsynced and then renamed over the target with os.replace.
+
         Args:
             data: Dictionary to write
-            
+
         Returns:
             True if successful, False otherwise
         """
         try:
-            # Create parent directory if it doesn't exist
-            os.makedirs(os.path.dirname(self.file_path), exist_ok=True)
-            
-            with open(self.file_path, "w") as f:
-                fcntl.flock(f, fcntl.LOCK_EX)
-                try:
-                    json.dump(data, f, indent=2)
-                    return True
-                finally:
-                    fcntl.flock(f, fcntl.LOCK_UN)
+            seq, payload = self._stage(data)
         except Exception as e:
-            logging.error(f"Error writing to {self.file_path}: {e}")
+            logging.error(f"Error encoding data for {self.file_path}: {e}")
             return False
-                
+        return self._flush(seq, payload)
+
+    async def write_async(self, data: Dict[str, Any]) -> bool:
+        """
+        Write data with the file I/O on the storage writer thread.
+
+        The data is encoded right away, so reads in this process see it
+        before the call returns control to the event loop and later changes
+        to the dict don't leak into the write. Writing, fsync and rename
+        happen off the event loop; of several queued writes only the newest
+        reaches the disk.
+
+        Args:
+            data: Dictionary to write
+
+        Returns:
+            True if successful, False otherwise
+        """
+        try:
+            seq, payload = self._stage(data)
+        except Exception as e:
+            logging.error(f"Error encoding data for {self.file_path}: {e}")
+            return False
+        loop = asyncio.get_running_loop()
+        # The writer thread doesn't inherit the context, pass the span on
+        return await loop.run_in_executor(_writer, self._flush, seq, payload, current_span())
+
     def update_user(self, user_id: str, update_func) -> bool:
         """
         Update user data with a function.
-        
+
         Args:
             user_id: User ID to update
             update_func: Function that takes user data and updates it
-            
+
         Returns:
             True if successful, False otherwise
         """
-        data = self.read()
+        data = self.read_copy()
         user_data = data.get(user_id, {})
         update_func(user_data)
         data[user_id] = user_data
-        return self.write(data) 
\ No newline at end of file
+        return self.write(data)
+
+
+_data_storage: Optional[Storage] = None
+
+
+def data_storage() -> Storage:
+    """Storage of the bot's JSON data file (DATA_FILE)"""
+    global _data_storage
+    if _data_storage is None:
+        _data_storage = Storage(DATA_FILE)
+    return _data_storage
+
+
+def read_data() -> Dict[str, Any]:
+    """Read-only snapshot of the data file for handlers that only look at it"""
+    return data_storage().read()
+
+
+def load_data() -> Dict[str, Any]:
+    """Mutable copy of the data file for handlers that change and save it"""
+    return data_storage().read_copy()
+
+
+async def save_data(data: Dict[str, Any]) -> bool:
+    """Save the data file without blocking the event loop"""
+    return await data_storage().write_async(data)